@@ -0,0 +1,147 @@
+"""
+保存済みのアクション単位のサンプルを集計して表示するコマンド
+
+使用例:
+    python -m src analyze output/20250101_120000
+    python -m src analyze node1/result/action_samples.parquet node2/result/action_samples.parquet --interval 300
+"""
+import argparse
+import math
+from typing import Dict, Any, List, Optional
+
+from src.utils import analytics
+from src.utils.analytics import SampleSet, moving_average
+from src.utils.console_table import format_table
+from src.utils.logger import setup_logger
+
+# 自動で決定する場合の時間帯の数の目安
+AUTO_BUCKETS = 30
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    コマンドライン引数のパーサーを作成する
+
+    Returns:
+        引数パーサー
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m src analyze',
+        description='アクション単位のサンプルから操作IDごとのパーセンタイル、時間帯ごとの推移、外れ値を表示します')
+    parser.add_argument('paths', nargs='+',
+                        help='出力ディレクトリ、テスト結果、またはアクション単位のサンプル（.parquet / .csv）。'
+                             '複数指定した場合は合わせて集計する')
+    parser.add_argument('--interval', type=float, help='時間帯の幅（秒、省略時は実行時間から自動で決定）')
+    parser.add_argument('--window', type=int, default=5, help='移動平均の窓の大きさ（時間帯の数）')
+    parser.add_argument('--action', help='時間帯ごとの推移の対象の操作ID（省略時はすべての操作）')
+    parser.add_argument('--outlier-factor', type=float, default=3.0,
+                        help='外れ値とする閾値（第3四分位 + 係数 × 四分位範囲）の係数')
+    parser.add_argument('--outliers', type=int, default=10, help='表示する外れ値の件数')
+    return parser
+
+
+def _value(value: float, digits: int = 3) -> str:
+    return "-" if value is None or math.isnan(value) else f"{value:.{digits}f}"
+
+
+def auto_interval(samples: SampleSet) -> float:
+    """
+    実行時間から時間帯の幅を決定する（AUTO_BUCKETS 個程度、1秒単位）
+
+    Args:
+        samples: サンプル
+
+    Returns:
+        時間帯の幅（秒）
+    """
+    starts = [value for value in samples.start_times if not math.isnan(value)]
+    if not starts:
+        return 60.0
+    return float(max(1, math.ceil((max(starts) - min(starts)) / AUTO_BUCKETS)))
+
+
+def format_actions(stats: Dict[str, Dict[str, Any]]) -> str:
+    """
+    操作IDごとの集計の表を作成する
+
+    Args:
+        stats: SampleSet.grouped_percentiles の戻り値
+
+    Returns:
+        表の文字列
+    """
+    header = ["操作ID", "件数", "失敗", "平均", "p50", "p90", "p95", "p99", "最大"]
+    rows = [[action_id, str(item["count"]), str(item["failure"])]
+            + [_value(item[name]) for name in ("mean", "p50", "p90", "p95", "p99", "max")]
+            for action_id, item in stats.items()]
+    return format_table(header, rows)
+
+
+def format_series(series: List[Dict[str, Any]], window: int) -> str:
+    """
+    時間帯ごとの推移の表を作成する
+
+    Args:
+        series: SampleSet.time_series の戻り値
+        window: 移動平均の窓の大きさ
+
+    Returns:
+        表の文字列
+    """
+    averages = moving_average([row["p95"] for row in series], window)
+    error_averages = moving_average([row["error_rate"] for row in series], window)
+    header = ["経過(秒)", "件数", "エラー", "エラー率", "エラー率(移動平均)", "p50", "p95", "p95(移動平均)"]
+    rows = [[f"{row['start']:.0f}", str(row["count"]), str(row["errors"]),
+             "-" if math.isnan(row["error_rate"]) else f"{row['error_rate'] * 100:.1f}%",
+             "-" if math.isnan(error_average) else f"{error_average * 100:.1f}%",
+             _value(row["p50"]), _value(row["p95"]), _value(average)]
+            for row, average, error_average in zip(series, averages, error_averages)]
+    return format_table(header, rows)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    集計コマンドのエントリーポイント
+
+    Args:
+        argv: コマンドライン引数（Noneの場合は sys.argv）
+
+    Returns:
+        終了コード
+    """
+    logger = setup_logger("AnalyzeCommand")
+    args = build_parser().parse_args(argv)
+    if args.interval is not None and args.interval <= 0:
+        logger.error("エラー: --interval は0より大きい値を指定してください")
+        return 1
+
+    try:
+        samples = SampleSet.load(args.paths)
+    except (OSError, ValueError) as e:
+        logger.error(f"サンプルの読み込みに失敗しました: {str(e)}")
+        return 1
+    if not len(samples):
+        logger.error("エラー: 集計するサンプルがありません")
+        return 1
+
+    interval = args.interval or auto_interval(samples)
+    print(f"サンプル: {len(samples)} 件（{len(args.paths)} ファイル）  "
+          f"集計: {'NumPy' if analytics.np is not None else '標準ライブラリ'}")
+    print()
+    print("操作IDごとの所要時間（秒）")
+    print(format_actions(samples.grouped_percentiles()))
+
+    series = samples.time_series(interval, action_id=args.action)
+    if series:
+        print()
+        print(f"時間帯ごとの推移（{interval:g}秒ごと、移動平均は{args.window}区間"
+              f"{'、操作ID ' + args.action if args.action else ''}）")
+        print(format_series(series, args.window))
+
+    outliers = samples.outliers(args.outlier_factor, args.outliers)
+    print()
+    print(f"外れ値（第3四分位 + {args.outlier_factor:g} × 四分位範囲 を超える所要時間、上位{args.outliers}件）")
+    print(format_table(["操作ID", "セッションID", "所要時間", "閾値"],
+                       [[item["action_id"], str(item["session_id"]), _value(item["duration"]),
+                         _value(item["threshold"])] for item in outliers]))
+    return 0
@@ -1,8 +1,10 @@
 """
 ブラウザセッション管理モジュール
 """
+import json
 import logging
 import os
+import time
 import traceback
 from datetime import datetime
 from typing import Dict, Any, Optional, Tuple
@@ -10,8 +12,14 @@ from typing import Dict, Any, Optional, Tuple
 from selenium.common.exceptions import WebDriverException
 
 from src.action_handler import ActionHandler
+from src.utils.browser_reaper import get_driver_pids, get_service_pids, kill_process_tree
 from src.utils.browser_utils import build_url_with_auth
+from src.utils.hooks import ScreenshotCaptured
 from src.utils.logger import setup_logger
+from src.utils.page_timing import NAVIGATION_TYPES, capture_page_timing
+from src.utils.screencast import ScreencastRecorder
+from src.utils.screenshot_sampling import ScreenshotSamplingPolicy
+from src.utils.web_vitals import drain_web_vitals, install_web_vitals
 
 # PILをインポート
 try:
@@ -23,7 +31,8 @@ except ImportError:
 class BrowserSession:
     """ブラウザセッションを管理するクラス"""
 
-    def __init__(self, user: Dict[str, str], config: Dict[str, Any], session_id: int, output_dir: str):
+    def __init__(self, user: Dict[str, str], config: Dict[str, Any], session_id: int, output_dir: str,
+                 exemplar_collector=None, metrics=None, tracer=None, hooks=None):
         """
         コンストラクタ
         
@@ -32,12 +41,19 @@ class BrowserSession:
             config: 設定情報
             session_id: セッションID
             output_dir: 出力ディレクトリ
+            exemplar_collector: 低速アクションのエグゼンプラーコレクタ（Noneの場合は無効）
+            metrics: 実行中のメトリクスの集計（Noneの場合は無効）
+            tracer: 実行全体のトレースの記録（Noneの場合は無効）
+            hooks: ライフサイクルフックの管理（Noneの場合は無効）
         """
         self.user = user
         self.config = config
         self.session_id = session_id
         self.output_dir = output_dir
         self.driver = None
+        # 起動中のドライバーのサービス（WebDriverの作成前に中断する場合に使用）と中断の理由
+        self._service = None
+        self.abort_reason: Optional[str] = None
         self.base_url = config.get('url', '')
         self.logger = self._setup_logger()
         
@@ -48,12 +64,46 @@ class BrowserSession:
         # スクリーンショットタイミングが文字列の場合はリストに変換
         if isinstance(self.screenshot_timing, str):
             self.screenshot_timing = [self.screenshot_timing]
+        
+        # サンプリングポリシーに従い、このセッションで撮影するタイミングを開始時に決定する
+        self.sampling_policy = ScreenshotSamplingPolicy.from_config(config)
+        self.sampled = self.sampling_policy.is_session_sampled(session_id)
+        self.screenshot_timing = self.sampling_policy.timing_for_session(session_id, self.screenshot_timing)
+        self.capture_enabled = len(self.screenshot_timing) > 0
+        
+        # 画面録画モード（"none" または "screencast"）
+        self.recording = str(config.get('recording', 'none')).lower()
+        self.screencast: Optional[ScreencastRecorder] = None
+        self.recording_info: Optional[Dict[str, Any]] = None
             
         self.logger.debug(f"スクリーンショットタイミング設定: {self.screenshot_timing}")
         
         self.current_action_id = None
         self.current_action = None  # 現在実行中のアクション情報
         
+        # アクションの実行時間（直近のアクション）
+        self.last_action_timing: Dict[str, Any] = {}
+        
+        # 低速アクションのエグゼンプラー収集
+        self.exemplar_collector = exemplar_collector
+        
+        # 実行中のメトリクス（WebDriverのコマンド数、撮影中のスクリーンショット数）
+        self.metrics = metrics
+        
+        # 実行全体のトレース（アクションとフェーズ、スクリーンショット）
+        self.tracer = tracer
+        
+        # ライフサイクルフック（スクリーンショットの撮影を通知する）
+        self.hooks = hooks
+        
+        # ページ読み込みの計測（前回計測したページの timeOrigin）
+        self.page_timing = bool(config.get('page_timing', False))
+        self._page_origin: Optional[float] = None
+        
+        # Core Web Vitals とロングタスクの収集（収集スクリプトを追加できた場合のみ取り出す）
+        self.web_vitals = bool(config.get('web_vitals', False))
+        self._web_vitals_installed = False
+        
     def _setup_logger(self):
         """
         ロガーの設定
@@ -142,11 +192,22 @@ class BrowserSession:
             
             # ブラウザドライバーの作成
             from src.utils.browser_utils import create_browser
-            self.driver = create_browser(browser_type, headless)
+            self.driver = create_browser(browser_type, headless, service_created=self._set_service)
             if not self.driver:
                 self.logger.error("ブラウザドライバーの作成に失敗しました")
                 return False
             
+            # ブラウザの起動中に中断された場合は、起動したブラウザを終了して初期化を失敗させる
+            if self.abort_reason:
+                self.logger.error(f"ブラウザの起動中にセッションが中断されました: {self.abort_reason}")
+                self.abort(self.abort_reason)
+                self.driver = None
+                return False
+            
+            # WebDriverのコマンドの実行数を記録
+            if self.metrics:
+                self.metrics.instrument_driver(self.driver)
+            
             # 使用したブラウザタイプをログに出力
             self.logger.info(f"ブラウザ初期化: {browser_type}")
             
@@ -157,19 +218,40 @@ class BrowserSession:
             window_size = self.driver.get_window_size()
             self.logger.info(f"ウィンドウサイズ: {window_size['width']}x{window_size['height']}")
             
-            # スクリーンショット機能のテスト
-            try:
-                self.logger.debug("スクリーンショット機能のテスト実行")
-                # テストスクリーンショットはresultディレクトリに保存せず、一時的に撮影するだけ
-                result = self.driver.save_screenshot("/tmp/test_screenshot.png")
-                self.logger.debug(f"テストスクリーンショット結果: {result}")
-                if os.path.exists("/tmp/test_screenshot.png"):
-                    self.logger.debug(f"テストスクリーンショットファイルが正常に作成されました")
-                else:
-                    self.logger.error(f"テストスクリーンショットファイルが作成されませんでした")
-            except Exception as e:
-                self.logger.error(f"テストスクリーンショットの撮影に失敗しました: {str(e)}")
-                self.logger.error(f"スタックトレース: {traceback.format_exc()}")
+            # スクリーンショット機能のテスト（撮影対象外のセッションでは省略）
+            if self.capture_enabled:
+                try:
+                    self.logger.debug("スクリーンショット機能のテスト実行")
+                    # テストスクリーンショットはresultディレクトリに保存せず、一時的に撮影するだけ
+                    result = self.driver.save_screenshot("/tmp/test_screenshot.png")
+                    self.logger.debug(f"テストスクリーンショット結果: {result}")
+                    if os.path.exists("/tmp/test_screenshot.png"):
+                        self.logger.debug(f"テストスクリーンショットファイルが正常に作成されました")
+                    else:
+                        self.logger.error(f"テストスクリーンショットファイルが作成されませんでした")
+                except Exception as e:
+                    self.logger.error(f"テストスクリーンショットの撮影に失敗しました: {str(e)}")
+                    self.logger.error(f"スタックトレース: {traceback.format_exc()}")
+            
+            # 画面録画の開始（撮影対象のセッションのみ）
+            if self.recording == 'screencast' and self.sampled:
+                self._start_screencast()
+            
+            # エグゼンプラー収集用にCDPのパフォーマンス指標を有効化（Chromium系のみ）
+            if self.exemplar_collector and hasattr(self.driver, 'execute_cdp_cmd'):
+                try:
+                    self.driver.execute_cdp_cmd('Performance.enable', {})
+                except Exception as e:
+                    self.logger.debug(f"CDPのパフォーマンス指標を有効化できませんでした: {str(e)}")
+            
+            # Web Vitals の収集スクリプトを以降に読み込まれるページに追加（Chromium系のみ）
+            if self.web_vitals:
+                try:
+                    self._web_vitals_installed = install_web_vitals(self.driver)
+                    if not self._web_vitals_installed:
+                        self.logger.info(f"{browser_type} は Web Vitals の収集に対応していません")
+                except Exception as e:
+                    self.logger.warning(f"Web Vitals の収集スクリプトを追加できませんでした: {str(e)}")
             
             self.driver.set_page_load_timeout(self.config.get('timeout', 30))
             self.logger.info(f"ブラウザ初期化: {browser_type}")
@@ -232,24 +314,39 @@ class BrowserSession:
         self.current_action_id = action.get('操作ID', 'unknown')
         self.current_action = action  # 現在のアクションを保存
         
-        # Excel出力フラグの取得
-        excel_output_value = action.get('Excel出力', False)
-        if isinstance(excel_output_value, bool):
-            excel_output = excel_output_value
-        elif isinstance(excel_output_value, str):
-            excel_output = excel_output_value.lower() in ['yes', 'true', '1', 'y']
-        else:
-            self.logger.warning(f"Excel出力の値が不正な型です: {type(excel_output_value)}, 'no'を使用します")
-            excel_output = False
+        # 撮影対象外のセッションではスクリーンショット関連の処理をすべて省略する
+        excel_output = False
+        capture_action = False
+        if self.capture_enabled:
+            # Excel出力フラグの取得
+            excel_output_value = action.get('Excel出力', False)
+            if isinstance(excel_output_value, bool):
+                excel_output = excel_output_value
+            elif isinstance(excel_output_value, str):
+                excel_output = excel_output_value.lower() in ['yes', 'true', '1', 'y']
+            else:
+                self.logger.warning(f"Excel出力の値が不正な型です: {type(excel_output_value)}, 'no'を使用します")
+                excel_output = False
+                
+            # デバッグ用にExcel出力フラグを表示
+            self.logger.debug(f"アクション {self.current_action_id} のExcel出力フラグ: {excel_output}")
             
-        # デバッグ用にExcel出力フラグを表示
-        self.logger.debug(f"アクション {self.current_action_id} のExcel出力フラグ: {excel_output}")
+            # スクリーンショットタイミングの確認
+            self.logger.debug(f"設定されているスクリーンショットタイミング: {self.screenshot_timing}")
+            
+            # アクション前後の撮影は対象の操作IDに限定する
+            capture_action = self.sampling_policy.is_action_sampled(self.current_action_id)
+        
+        # 画面録画にアクション境界のマーカーを記録
+        if self.screencast:
+            self.screencast.mark(self.current_action_id)
         
-        # スクリーンショットタイミングの確認
-        self.logger.debug(f"設定されているスクリーンショットタイミング: {self.screenshot_timing}")
+        # 各フェーズの時間計測
+        action_start_wall = time.time()
+        phase_start = time.perf_counter()
         
         # アクション実行前のスクリーンショット
-        if 'before_action' in self.screenshot_timing:
+        if capture_action and 'before_action' in self.screenshot_timing:
             self.logger.debug(f"アクション実行前のスクリーンショットを撮影します: {self.current_action_id}")
             self.take_screenshot(f"before_{self.current_action_id}_session_{self.session_id}", excel_output)
         
@@ -268,17 +365,55 @@ class BrowserSession:
             slow_mode=slow_mode,
             action_delay=action_delay
         )
+        handler_start = time.perf_counter()
         success, error = handler.handle_action(action)
+        handler_end = time.perf_counter()
+        action_duration = handler_end - handler_start
         
         # アクション実行後のスクリーンショット
         if not success and 'on_error' in self.screenshot_timing:
             # エラー時のスクリーンショット
             self.logger.debug(f"エラー発生時のスクリーンショットを撮影します: {self.current_action_id}")
             self.take_screenshot(f"error_{self.current_action_id}_session_{self.session_id}", excel_output)
-        elif 'after_action' in self.screenshot_timing:
+        elif capture_action and 'after_action' in self.screenshot_timing:
             # 成功時または on_error が設定されていない失敗時のスクリーンショット
             self.logger.debug(f"アクション実行後のスクリーンショットを撮影します: {self.current_action_id}")
             self.take_screenshot(f"after_{self.current_action_id}_session_{self.session_id}", excel_output)
+        phase_end = time.perf_counter()
+        
+        self.last_action_timing = {
+            "start_time": datetime.fromtimestamp(action_start_wall).isoformat(),
+            "duration": action_duration,
+            "phases": {
+                "before_action": handler_start - phase_start,
+                "action": action_duration,
+                "after_action": phase_end - handler_end
+            }
+        }
+        
+        # アクションとフェーズをトレースに記録
+        if self.tracer:
+            track = self.tracer.session_track(self.session_id)
+            self.tracer.complete(f"操作 {self.current_action_id}", phase_start, phase_end, track, "action",
+                                 {"action_id": self.current_action_id, "type": action.get('操作タイプ', ''),
+                                  "success": success, "error": error})
+            self.tracer.complete("before_action", phase_start, handler_start, track, "phase")
+            self.tracer.complete("action", handler_start, handler_end, track, "phase")
+            self.tracer.complete("after_action", handler_end, phase_end, track, "phase")
+        
+        # ページ遷移後の読み込みの計測（アクションの所要時間には含めない）
+        if self.page_timing and action.get('操作タイプ', '') in NAVIGATION_TYPES:
+            self._capture_page_timing()
+        
+        # アクションの実行中に記録された Web Vitals とロングタスクを取り出す
+        if self._web_vitals_installed:
+            self._drain_web_vitals()
+        
+        # 低速アクションの証跡を収集
+        if self.exemplar_collector:
+            threshold = self.exemplar_collector.observe(self.current_action_id, action_duration)
+            if threshold is not None:
+                self._capture_exemplar(action_duration, threshold, action_start_wall)
         
         return success, error
 
@@ -293,6 +428,28 @@ class BrowserSession:
         Returns:
             スクリーンショットのファイルパス（失敗した場合はNone）
         """
+        if not self.metrics and not self.tracer and not self.hooks:
+            return self._take_screenshot(prefix, excel_output)
+        if self.metrics:
+            self.metrics.screenshot_started()
+        start = time.perf_counter()
+        filepath = None
+        try:
+            filepath = self._take_screenshot(prefix, excel_output)
+            return filepath
+        finally:
+            end = time.perf_counter()
+            if self.metrics:
+                self.metrics.screenshot_finished()
+            if self.tracer:
+                self.tracer.complete("スクリーンショット", start, end,
+                                     self.tracer.session_track(self.session_id), "screenshot", {"prefix": prefix})
+            if self.hooks and filepath:
+                self.hooks.emit(ScreenshotCaptured(session_id=self.session_id, action_id=self.current_action_id,
+                                                   path=filepath, duration=end - start))
+
+    def _take_screenshot(self, prefix: str, excel_output: bool) -> Optional[str]:
+        """スクリーンショットを撮影する（take_screenshot の本体）"""
         if not self.driver:
             self.logger.error("ドライバーが初期化されていません")
             return None
@@ -382,13 +539,186 @@ class BrowserSession:
             self.logger.error(f"スタックトレース: {traceback.format_exc()}")
             return None
 
+    def _start_screencast(self) -> None:
+        """
+        CDPスクリーンキャストによる画面録画を開始する
+        
+        録画中はアクション前後のスクリーンショットを撮影せず、エラー時の撮影のみ行う。
+        """
+        if not ScreencastRecorder.is_supported(self.driver):
+            self.logger.warning("このブラウザはスクリーンキャストに対応していないため、スクリーンショットを使用します")
+            return
+            
+        from src.utils.toml_utils import get_float, get_int
+        session_dir = os.path.join(self.output_dir, "screenshot", f"session_{self.session_id}", "screencast")
+        recorder = ScreencastRecorder(
+            self.driver,
+            self.output_dir,
+            session_dir,
+            self.logger,
+            fps=get_float(self.config, 'screencast_fps', 2.0),
+            quality=get_int(self.config, 'screencast_quality', 40)
+        )
+        if not recorder.start():
+            return
+            
+        self.screencast = recorder
+        self.screenshot_timing = [timing for timing in self.screenshot_timing if timing == 'on_error']
+        self.capture_enabled = len(self.screenshot_timing) > 0
+        self.logger.debug(f"画面録画中のスクリーンショットタイミング: {self.screenshot_timing}")
+
+    def _capture_page_timing(self) -> None:
+        """新しいページに遷移していれば読み込みの計測値を直近のアクションの実行時間に追加する"""
+        if not self.driver:
+            return
+        try:
+            timing = capture_page_timing(self.driver, self._page_origin)
+        except Exception as e:
+            self.logger.warning(f"ページ読み込みの計測値を取得できませんでした: {str(e)}")
+            return
+        if timing:
+            self._page_origin = timing.get("origin")
+            self.last_action_timing["page_timing"] = timing
+            self.logger.debug(f"ページ読み込み ({self.current_action_id}): TTFB={timing.get('ttfb')}, "
+                              f"load={timing.get('load')}, リソース={timing.get('resources')}")
+    
+    def _drain_web_vitals(self) -> None:
+        """ページ内のバッファの Web Vitals を直近のアクションの実行時間に追加する"""
+        if not self.driver:
+            return
+        try:
+            vitals = drain_web_vitals(self.driver)
+        except Exception as e:
+            self.logger.warning(f"Web Vitals を取得できませんでした: {str(e)}")
+            return
+        if vitals:
+            self.last_action_timing["web_vitals"] = vitals
+    
+    def _capture_exemplar(self, duration: float, threshold: float, action_start: float) -> None:
+        """
+        低速アクションの証跡（スクリーンショット、ネットワーク、パフォーマンス指標）を収集する
+        
+        Args:
+            duration: アクションの所要時間（秒）
+            threshold: 判定に使用した閾値（秒）
+            action_start: アクション開始時刻（エポック秒）
+        """
+        if not self.driver:
+            return
+            
+        action_id = self.current_action_id
+        self.logger.info(f"低速アクションを検出しました: 操作ID {action_id}, {duration:.3f}秒 (閾値: {threshold:.3f}秒)")
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        rel_dir = os.path.join("exemplar", f"action_{action_id}", f"session_{self.session_id}_{timestamp}")
+        exemplar_dir = os.path.join(self.output_dir, rel_dir)
+        exemplar = {
+            "action_id": action_id,
+            "session_id": self.session_id,
+            "user_id": self.user.get('app_username', ''),
+            "duration": duration,
+            "threshold": threshold,
+            "start_time": datetime.fromtimestamp(action_start).isoformat(),
+            "dir": rel_dir,
+            "screenshot": None,
+            "network": None,
+            "metrics": None
+        }
+        
+        try:
+            os.makedirs(exemplar_dir, exist_ok=True)
+            
+            # スクリーンショット
+            screenshot_path = os.path.join(exemplar_dir, "screenshot.png")
+            if self.driver.save_screenshot(screenshot_path):
+                exemplar["screenshot"] = os.path.join(rel_dir, "screenshot.png")
+            
+            # アクション開始以降のネットワークリクエスト（Resource Timing）
+            network = self.driver.execute_script(
+                "var since = arguments[0];"
+                "return performance.getEntriesByType('navigation')"
+                ".concat(performance.getEntriesByType('resource'))"
+                ".filter(function(e) { return performance.timeOrigin + e.startTime >= since; })"
+                ".map(function(e) { return {name: e.name, type: e.initiatorType || e.entryType,"
+                " start: e.startTime, duration: e.duration, transferSize: e.transferSize || 0}; });",
+                action_start * 1000
+            )
+            with open(os.path.join(exemplar_dir, "network.json"), 'w', encoding='utf-8') as f:
+                json.dump(network or [], f, ensure_ascii=False)
+            exemplar["network"] = os.path.join(rel_dir, "network.json")
+            
+            # CDPのパフォーマンス指標（Chromium系のみ）
+            if hasattr(self.driver, 'execute_cdp_cmd'):
+                metrics = self.driver.execute_cdp_cmd('Performance.getMetrics', {})
+                with open(os.path.join(exemplar_dir, "metrics.json"), 'w', encoding='utf-8') as f:
+                    json.dump(metrics, f, ensure_ascii=False)
+                exemplar["metrics"] = os.path.join(rel_dir, "metrics.json")
+        except Exception as e:
+            self.logger.error(f"エグゼンプラーの収集に失敗しました: {str(e)}")
+            
+        self.exemplar_collector.add(action_id, duration, exemplar)
+
+    def _set_service(self, service) -> None:
+        """起動するドライバーのサービスを記録する（create_browser から呼び出される）"""
+        self._service = service
+    
+    def abort(self, reason: str) -> bool:
+        """
+        WebDriverの接続を強制的に切断する（ウォッチドッグから別スレッドで呼び出される）
+        
+        ドライバーのプロセスツリーを終了することで、応答待ちのWebDriverコマンドを失敗させ、
+        セッションを実行しているワーカースレッドを解放する。WebDriverの作成前（ドライバーの起動中）は
+        起動したサービスのプロセスツリーを終了する。
+        
+        Args:
+            reason: 中断の理由
+            
+        Returns:
+            中断の処理を行った場合True（ドライバーのプロセスがまだ起動していない場合はFalse）
+        """
+        self.abort_reason = reason
+        driver = self.driver
+        pids = get_driver_pids(driver) if driver else get_service_pids(self._service)
+        if not driver and not pids:
+            self.logger.debug(f"ドライバーの起動前のため、セッションを中断できませんでした: {reason}")
+            return False
+        
+        self.logger.error(f"セッションを中断します: {reason}")
+        if pids:
+            killed = kill_process_tree(pids[0])
+            self.logger.info(f"ドライバーのプロセスを終了しました: {killed} 個")
+        else:
+            self.logger.warning("ドライバーのプロセスを特定できないため、接続を切断できませんでした")
+        return True
+
+    def detach_driver(self):
+        """
+        セッションからドライバーを切り離す（終了処理は呼び出し側で行う）
+        
+        画面録画を行っている場合は、ドライバーを切り離す前に停止する。
+        
+        Returns:
+            切り離したWebDriverインスタンス（初期化されていない場合はNone）
+        """
+        # 画面録画の停止（ドライバーの終了前に行う）
+        if self.screencast:
+            try:
+                self.recording_info = self.screencast.stop()
+            except Exception as e:
+                self.logger.error(f"画面録画の停止に失敗しました: {str(e)}")
+            finally:
+                self.screencast = None
+                
+        driver = self.driver
+        self.driver = None
+        return driver
+
     def close(self):
         """ブラウザを閉じる"""
-        if self.driver:
+        driver = self.detach_driver()
+        if driver:
             try:
-                self.driver.quit()
+                driver.quit()
                 self.logger.info("ブラウザを閉じました")
             except Exception as e:
                 self.logger.error(f"ブラウザを閉じる際にエラーが発生しました: {str(e)}")
-            finally:
-                self.driver = None
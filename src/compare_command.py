@@ -0,0 +1,154 @@
+"""
+2つの実行（基準と候補）の保存済みのテスト結果を比較するコマンド
+
+使用例:
+    python -m src compare output/20250101_120000 output/20250108_120000
+    python -m src compare output/20250101_120000 output/20250108_120000 --iterations 5000 --output compare.xlsx
+"""
+import argparse
+import math
+import os
+from typing import Dict, Any, List, Optional
+
+from src.config_loader import ConfigLoader
+from src.utils.console_table import format_table
+from src.utils.excel_report import COMPARISON_VERDICTS, build_excel_report_config, generate_comparison_report
+from src.utils.logger import setup_logger
+from src.utils.run_comparison import VERDICT_SLOWER, compare_statistics, load_run
+
+# 端末に表示するエラーの件数
+CONSOLE_ERROR_ROWS = 10
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    コマンドライン引数のパーサーを作成する
+
+    Returns:
+        引数パーサー
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m src compare',
+        description='2つの実行のテスト結果を操作IDごとに比較します')
+    parser.add_argument('run_a', help='基準の実行の出力ディレクトリ（例: output/20250101_120000）')
+    parser.add_argument('run_b', help='候補の実行の出力ディレクトリ（例: output/20250108_120000）')
+    parser.add_argument('--config', default='resources/config.toml', help='設定ファイルのパス（.toml形式）')
+    parser.add_argument('--output', help='比較レポートの出力先（省略時は <run_b>/result/comparison_<run_aのディレクトリ名>.xlsx）')
+    parser.add_argument('--iterations', type=int, default=2000, help='ブートストラップの反復回数')
+    parser.add_argument('--confidence', type=float, default=0.95, help='差の信頼区間の信頼水準')
+    parser.add_argument('--seed', type=int, default=0, help='ブートストラップの乱数のシード')
+    parser.add_argument('--fail-on-regression', action='store_true', help='所要時間またはエラー率が悪化した操作がある場合は終了コード2で終了する')
+    return parser
+
+
+def _value(value: float, digits: int = 3) -> str:
+    return "-" if math.isnan(value) else f"{value:.{digits}f}"
+
+
+def _delta(item: Dict[str, Any]) -> str:
+    """差と信頼区間の表示"""
+    if math.isnan(item["delta"]):
+        return "-"
+    low, high = item["ci"]
+    return f"{item['delta']:+.3f} [{_value(low)}, {_value(high)}]"
+
+
+def _rate(failures: int, count: int) -> str:
+    return f"{failures / count * 100:.1f}%" if count else "-"
+
+
+def format_comparison(comparison: Dict[str, Any]) -> str:
+    """
+    操作IDごとの比較の表を作成する
+
+    Args:
+        comparison: compare_statistics の戻り値
+
+    Returns:
+        表の文字列
+    """
+    header = ["操作ID", "説明", "p50 基準", "p50 候補", "p50の差 [信頼区間]", "p95 基準", "p95 候補",
+              "p95の差 [信頼区間]", "エラー率 基準→候補", "判定"]
+    rows = []
+    for action in comparison["actions"]:
+        p50, p95 = action["p50"], action["p95"]
+        rows.append([action["action_id"], action["description"], _value(p50["a"]), _value(p50["b"]), _delta(p50),
+                     _value(p95["a"]), _value(p95["b"]), _delta(p95),
+                     f"{_rate(action['failure'][0], action['count'][0])}→{_rate(action['failure'][1], action['count'][1])}",
+                     COMPARISON_VERDICTS.get(action["verdict"], ("-",))[0]])
+    return format_table(header, rows)
+
+
+def format_errors(comparison: Dict[str, Any], limit: int = CONSOLE_ERROR_ROWS) -> str:
+    """
+    件数の差が大きいエラーの表を作成する
+
+    Args:
+        comparison: compare_statistics の戻り値
+        limit: 表示する件数
+
+    Returns:
+        表の文字列
+    """
+    rows = [[error["action_id"], error["message"][:60], str(error["count"][0]), str(error["count"][1]),
+             f"{error['count'][1] - error['count'][0]:+d}"]
+            for error in comparison["errors"][:limit]]
+    return format_table(["操作ID", "エラー", "基準", "候補", "差"], rows)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    比較コマンドのエントリーポイント
+
+    Args:
+        argv: コマンドライン引数（Noneの場合は sys.argv）
+
+    Returns:
+        終了コード（悪化した操作があり --fail-on-regression を指定した場合は2）
+    """
+    logger = setup_logger("CompareCommand")
+    args = build_parser().parse_args(argv)
+
+    for output_dir in (args.run_a, args.run_b):
+        if not os.path.isdir(output_dir):
+            logger.error(f"エラー: 出力ディレクトリ '{output_dir}' が見つかりません")
+            return 1
+    if not 0 < args.confidence < 1 or args.iterations < 1:
+        logger.error("エラー: --confidence は0より大きく1より小さい値、--iterations は1以上を指定してください")
+        return 1
+
+    config_path = args.config if args.config.endswith('.toml') else args.config + '.toml'
+    config = ConfigLoader(config_file=config_path).config if os.path.exists(config_path) else {}
+
+    try:
+        _, stats_a = load_run(args.run_a)
+        _, stats_b = load_run(args.run_b)
+    except (OSError, ValueError) as e:
+        logger.error(f"テスト結果の読み込みに失敗しました: {str(e)}")
+        return 1
+
+    comparison = compare_statistics(stats_a, stats_b, args.iterations, args.confidence, args.seed)
+    labels = (os.path.basename(os.path.normpath(args.run_a)), os.path.basename(os.path.normpath(args.run_b)))
+    sessions = comparison["sessions"]
+    print(f"基準: {labels[0]} ({sessions['count'][0]} セッション, 失敗 {sessions['failure'][0]})  "
+          f"候補: {labels[1]} ({sessions['count'][1]} セッション, 失敗 {sessions['failure'][1]})")
+    print(f"所要時間（秒）の差は 候補 - 基準、信頼区間は {args.confidence * 100:.0f}%（ブートストラップ {args.iterations} 回）")
+    print()
+    print(format_comparison(comparison))
+    if comparison["errors"]:
+        print()
+        print("エラーの件数の差")
+        print(format_errors(comparison))
+
+    output = args.output or os.path.join(args.run_b, "result", f"comparison_{labels[0]}.xlsx")
+    if not generate_comparison_report(comparison, output, build_excel_report_config(config), labels):
+        return 1
+    print()
+    print(f"比較レポート: {output}")
+
+    slower = [action["action_id"] for action in comparison["actions"] if action["verdict"] == VERDICT_SLOWER]
+    if slower:
+        logger.warning(f"所要時間またはエラー率が悪化した操作: {', '.join(slower)}")
+        if args.fail_on_regression:
+            return 2
+    return 0
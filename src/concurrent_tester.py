@@ -2,8 +2,10 @@
 複数のブラウザセッションを同時に実行するモジュール
 """
 import concurrent.futures
+import contextlib
 import logging
 import os
+import time
 import traceback
 from datetime import datetime
 from typing import Dict, Any
@@ -11,10 +13,31 @@ from typing import Dict, Any
 from src.browser_session import BrowserSession
 from src.config_loader import ConfigLoader
 from src.scenario_loader import ScenarioLoader
-from src.utils.excel_report import generate_excel_report
+from src.utils.browser_reaper import BrowserReaper
+from src.utils.excel_report import build_excel_report_config, resolve_report_mode, select_excel_report_generator
+from src.utils.exemplar import ExemplarCollector
 from src.utils.file_utils import create_output_directory, save_json
+from src.utils.hooks import (AfterAction, BeforeAction, ErrorOccurred, HookManager, RunEnded, RunStarted,
+                             SessionEnded, SessionStarted)
+from src.utils.html_report import generate_html_report
+from src.utils.live_metrics import LiveMetrics
+from src.utils.live_stats import LiveStats, LiveStatsReporter
+from src.utils.page_timing import PageTimingStats
+from src.utils.report_builder import SUMMARY_FILE, build_results_summary
+from src.utils.report_pipeline import ReportPipeline
+from src.utils.results_io import ResultsWriter, resolve_results_format, results_path, save_results
+from src.utils.run_history import history_db_path, record_run_history
+from src.utils.run_statistics import RunStatistics
+from src.utils.sample_export import export_action_samples
+from src.utils.session_watchdog import SessionWatchdog
+from src.utils.timeline import TimelineCollector
+from src.utils.trace_recorder import TraceRecorder
+from src.utils.web_vitals import WebVitalsStats
 from src.utils.logger import setup_logger
 
+# テスト終了時にログに出力するエラーの分類の件数
+ERROR_CLUSTER_LOG_LIMIT = 5
+
 
 class ConcurrentTester:
     """複数のブラウザセッションを同時に実行するクラス"""
@@ -150,9 +173,79 @@ class ConcurrentTester:
             'action_delay': self.action_delay,  # 既に正しく変換された値を使用
             'timeout': get_int(self.config_loader.config, 'timeout', 30),
             'screenshot_timing': get_list(self.config_loader.config, 'screenshot_timing', ['on_error']),
+            # スクリーンショットのサンプリング設定
+            'screenshot_sample_first': get_int(self.config_loader.config, 'screenshot_sample_first', 0),
+            'screenshot_sample_every': get_int(self.config_loader.config, 'screenshot_sample_every', 0),
+            'screenshot_sample_actions': get_list(self.config_loader.config, 'screenshot_sample_actions', []),
+            'screenshot_sample_on_error': get_bool(self.config_loader.config, 'screenshot_sample_on_error', True),
+            # 画面録画の設定
+            'recording': get_str(self.config_loader.config, 'recording', 'none'),
+            'screencast_fps': get_float(self.config_loader.config, 'screencast_fps', 2.0),
+            'screencast_quality': get_int(self.config_loader.config, 'screencast_quality', 40),
+            # ページ読み込みの計測
+            'page_timing': get_bool(self.config_loader.config, 'page_timing', False),
+            # Core Web Vitals とロングタスクの収集
+            'web_vitals': get_bool(self.config_loader.config, 'web_vitals', False),
             'browser': get_str(self.config_loader.config, 'browser', 'chrome')  # ブラウザタイプを追加
         }
         
+        # ブラウザの終了処理をバックグラウンドで行うかどうか
+        self.async_teardown = get_bool(self.config_loader.config, 'async_teardown', True)
+        self.teardown_timeout = get_float(self.config_loader.config, 'teardown_timeout', 10.0)
+        self.teardown_workers = get_int(self.config_loader.config, 'teardown_workers', 2)
+        self.reaper = None
+        
+        # Excelレポートの生成方式（standard: 通常、streaming: 書き込み専用ワークブック）
+        self.report_engine = get_str(self.config_loader.config, 'report_engine', 'standard').lower()
+        # 1ワークブックあたりのセッション数（0の場合は分割しない）と生成プロセス数
+        self.report_shard_size = get_int(self.config_loader.config, 'report_shard_size', 0)
+        self.report_workers = get_int(self.config_loader.config, 'report_workers', 0)
+        # テストの実行と並行してExcelレポートを生成するかどうか
+        self.report_pipeline = get_bool(self.config_loader.config, 'report_pipeline', False)
+        # レポートの構成（detailed / aggregate / auto）と auto の場合に集計レポートにするセッション数
+        self.report_mode = get_str(self.config_loader.config, 'report_mode', 'detailed').lower()
+        self.report_aggregate_threshold = get_int(self.config_loader.config, 'report_aggregate_threshold', 200)
+        # Excelレポートに加えてHTMLレポートを生成するかどうか
+        self.html_report = get_bool(self.config_loader.config, 'html_report', False)
+        # アクション単位のサンプルの出力形式（none / auto / parquet / csv）
+        self.sample_export = get_str(self.config_loader.config, 'sample_export', 'none').lower()
+        # テスト結果の保存形式（json / msgpack）
+        self.results_format = resolve_results_format(get_str(self.config_loader.config, 'results_format', 'json'))
+        # 実行履歴のデータベースに記録するかどうか（記録先は出力ディレクトリの親ディレクトリ）
+        self.run_history = get_bool(self.config_loader.config, 'run_history', True)
+        
+        # 集計レポート用の実行全体の統計（エラーは完了したセッションから順にテンプレートごとに分類する）
+        self.max_error_clusters = get_int(self.config_loader.config, 'max_error_clusters', 100)
+        self.statistics = RunStatistics(max_error_kinds=self.max_error_clusters)
+        
+        # 実行中の時系列（同時実行数、スループット、レイテンシ）の収集（無効の場合はNone）
+        self.timeline = TimelineCollector.from_config(self.config_loader.config)
+        
+        # セッション／アクションの実行時間の上限（無効の場合はNone）
+        self.watchdog = SessionWatchdog.from_config(self.config_loader.config)
+        
+        # 低速アクションのエグゼンプラー収集（無効の場合はNone）
+        self.exemplar_collector = ExemplarCollector.from_config(self.config_loader.config, self.output_dir)
+        
+        # 実行中のメトリクスのエンドポイント（無効の場合はNone）
+        self.metrics = LiveMetrics.from_config(self.config_loader.config)
+        
+        # 実行中の統計の端末表示（--live-stats、無効の場合はNone）
+        self.live_stats_interval = get_float(self.config_loader.config, 'live_stats_interval', 0.0)
+        self.live_stats = LiveStats() if self.live_stats_interval > 0 else None
+        
+        # 実行全体のトレース（--trace、無効の場合はNone）
+        self.tracer = TraceRecorder.from_config(self.config_loader.config, self.output_dir)
+        
+        # ライフサイクルフック（設定ファイルとエントリーポイントから登録、ない場合はNone）
+        self.hooks = HookManager.from_config(self.config_loader.config)
+        
+        # 操作IDごとのページ読み込みの集計（無効の場合はNone）
+        self.page_timing = PageTimingStats() if self.config['page_timing'] else None
+        
+        # 操作IDごとの Web Vitals とロングタスクの集計（無効の場合はNone）
+        self.web_vitals = WebVitalsStats() if self.config['web_vitals'] else None
+        
         # ブラウザタイプのデバッグ出力
         self.logger.debug(f"設定ファイルのブラウザタイプ: {self.config['browser']}")
         
@@ -184,7 +277,9 @@ class ConcurrentTester:
         # テストモードを確実に設定
         session_config['test_mode'] = self.test_mode
         
-        session = BrowserSession(user, session_config, session_id, self.output_dir)
+        session = BrowserSession(user, session_config, session_id, self.output_dir,
+                                 exemplar_collector=self.exemplar_collector, metrics=self.metrics,
+                                 tracer=self.tracer, hooks=self.hooks)
         
         result = {
             "session_id": session_id,
@@ -198,25 +293,77 @@ class ConcurrentTester:
             "errors": []
         }
         
+        # 実行時間の監視を開始（ブラウザの初期化も対象）
+        if self.watchdog:
+            self.watchdog.start_session(session_id, session.abort)
+        if self.timeline:
+            self.timeline.session_started()
+        if self.metrics:
+            self.metrics.session_started()
+        if self.live_stats:
+            self.live_stats.session_started()
+        if self.tracer:
+            session_track = self.tracer.session_track(session_id, user.get('app_username', ''))
+        if self.hooks:
+            self.hooks.emit(SessionStarted(session_id=session_id, user_id=result["user_id"],
+                                           start_time=result["start_time"]))
+        session_started_at = time.perf_counter()
+        
         try:
             # ブラウザの初期化
-            if not session.initialize():
+            initialized = session.initialize()
+            if self.tracer:
+                self.tracer.complete("ブラウザの起動", session_started_at, time.perf_counter(), session_track,
+                                     "browser", {"success": initialized})
+            if not initialized:
                 result["errors"].append("ブラウザの初期化に失敗しました")
+                if self.hooks:
+                    self.hooks.emit(ErrorOccurred(session_id=session_id, message=result["errors"][-1]))
                 return result
             
+            # 残存プロセスの掃除のため、起動したプロセスを記録
+            if self.reaper:
+                self.reaper.register(session.driver)
+            
             # シナリオの実行
             actions = self.scenario_loader.get_actions()
             for action in actions:
                 action_id = action.get('操作ID', '')
                 description = action.get('説明', action.get('操作タイプ', ''))
                 
+                if self.watchdog:
+                    self.watchdog.start_action(session_id, action_id)
+                if self.hooks and self.hooks.wants(BeforeAction):
+                    self.hooks.emit(BeforeAction(session_id=session_id, action_id=action_id,
+                                                 action_type=action.get('操作タイプ', ''), description=description))
                 success, error = session.perform_action(action)
+                if self.watchdog:
+                    self.watchdog.end_action(session_id)
+                if self.timeline:
+                    self.timeline.record_action(session.last_action_timing.get("duration"), success)
+                if self.metrics:
+                    self.metrics.record_action(action_id, session.last_action_timing.get("duration"), success)
+                if self.live_stats:
+                    self.live_stats.record_action(action_id, session.last_action_timing.get("duration"), success)
+                if self.page_timing is not None and session.last_action_timing.get("page_timing"):
+                    self.page_timing.add(action_id, session.last_action_timing["page_timing"])
+                if self.web_vitals is not None and session.last_action_timing.get("web_vitals"):
+                    self.web_vitals.add(action_id, session.last_action_timing["web_vitals"],
+                                        session.last_action_timing.get("duration"))
+                if self.hooks and self.hooks.wants(AfterAction):
+                    timing = session.last_action_timing
+                    self.hooks.emit(AfterAction(session_id=session_id, action_id=action_id,
+                                                action_type=action.get('操作タイプ', ''), success=success, error=error,
+                                                start_time=timing.get("start_time"), duration=timing.get("duration"),
+                                                phases=dict(timing.get("phases", {}))))
                 
                 action_result = {
                     "action_id": action_id,
                     "description": description,
                     "success": success,
                     "error": error,
+                    # アクションの実行時間（開始時刻、所要時間、フェーズ別の内訳）
+                    **session.last_action_timing,
                     # アクション情報をそのまま保持
                     **action
                 }
@@ -225,14 +372,19 @@ class ConcurrentTester:
                 
                 if not success:
                     result["errors"].append(f"アクション {action_id} の実行に失敗しました: {error}")
+                    if self.hooks:
+                        self.hooks.emit(ErrorOccurred(session_id=session_id, message=result["errors"][-1],
+                                                      action_id=action_id))
                     break
             
             # スクリーンショットの収集
             screenshots = []
             screenshot_dir = os.path.join(self.output_dir, "screenshot")
             
-            # スクリーンショットを検索
-            if os.path.exists(screenshot_dir):
+            # スクリーンショットを検索（撮影対象外のセッションは検索しない）
+            if not session.capture_enabled:
+                self.logger.debug(f"セッション{session_id}はスクリーンショットの撮影対象外です")
+            elif os.path.exists(screenshot_dir):
                 # セッションディレクトリを検索
                 session_dir = os.path.join(screenshot_dir, f"session_{session_id}")
                 if os.path.exists(session_dir):
@@ -253,9 +405,12 @@ class ConcurrentTester:
             
         except Exception as e:
             result["errors"].append(f"セッション実行中にエラーが発生しました: {str(e)}")
-            # 例外発生時にもスクリーンショットを撮影
+            if self.hooks:
+                self.hooks.emit(ErrorOccurred(session_id=session_id, message=result["errors"][-1],
+                                              action_id=session.current_action_id))
+            # 例外発生時にもスクリーンショットを撮影（中断したセッションはドライバーが終了しているため省略）
             try:
-                if session and session.driver:
+                if session and session.driver and not (self.watchdog and self.watchdog.is_timed_out(session_id)):
                     error_screenshot = session.take_screenshot(f"exception", True)
                     if error_screenshot:
                         if "screenshots" not in result:
@@ -267,9 +422,38 @@ class ConcurrentTester:
                 self.logger.error(f"例外発生時のスクリーンショット撮影に失敗しました: {str(screenshot_error)}")
             
         finally:
-            # ブラウザを閉じる
+            if self.timeline:
+                self.timeline.session_ended()
+            
+            # 実行時間の上限を超過した場合はタイムアウトとして記録
+            if self.watchdog:
+                timeout_reason = self.watchdog.end_session(session_id)
+                if timeout_reason:
+                    result["timed_out"] = True
+                    result["timeout_reason"] = timeout_reason
+                    result["errors"].append(f"セッションがタイムアウトしました: {timeout_reason}")
+                    result["success"] = False
+                    if self.hooks:
+                        self.hooks.emit(ErrorOccurred(session_id=session_id, message=result["errors"][-1],
+                                                      action_id=session.current_action_id))
+            if self.metrics:
+                self.metrics.session_ended(result["success"])
+            if self.live_stats:
+                self.live_stats.session_ended(result["success"])
+            
+            # ブラウザを閉じる（非同期の場合はバックグラウンドに任せてスロットを即座に解放する）
             if session:
-                session.close()
+                if self.reaper:
+                    self.reaper.submit(session)
+                elif self.tracer:
+                    with self.tracer.span("ブラウザの終了", session_track, "browser"):
+                        session.close()
+                else:
+                    session.close()
+                
+                # 画面録画の情報を記録
+                if session.recording_info:
+                    result["recording"] = session.recording_info
                 
             # 終了時間と実行時間を記録
             end_time = datetime.now()
@@ -280,8 +464,41 @@ class ConcurrentTester:
             status = "成功" if result["success"] else "失敗"
             self.logger.info(f"セッション{session_id}終了: {result.get('user_id', '')} (結果: {status})")
             
+            if self.hooks:
+                self.hooks.emit(SessionEnded(session_id=session_id, user_id=result["user_id"],
+                                             success=result["success"], start_time=result["start_time"],
+                                             end_time=result["end_time"], duration=result["duration"],
+                                             errors=tuple(result["errors"]),
+                                             timed_out=result.get("timed_out", False)))
+            
+            # ワーカーのトラックにセッションを記録
+            if self.tracer:
+                self.tracer.complete(f"セッション{session_id}", session_started_at, time.perf_counter(),
+                                     category="session", args={"user": result["user_id"], "success": result["success"]})
+            
         return result
         
+    def _get_excel_config(self) -> Dict[str, Any]:
+        """
+        Excelレポートの設定を取得する
+        
+        Returns:
+            Excelレポートの設定
+        """
+        return build_excel_report_config(self.config_loader.config)
+        
+    def _trace(self, name: str):
+        """
+        レポートの生成等の処理をトレースに記録する
+        
+        Args:
+            name: 処理の名前
+            
+        Returns:
+            コンテキストマネージャ（トレースが無効の場合は何もしない）
+        """
+        return self.tracer.span(name, category="report") if self.tracer else contextlib.nullcontext()
+        
     def run(self) -> Dict[str, Any]:
         """
         テストを実行する
@@ -323,6 +540,57 @@ class ConcurrentTester:
         # 同時実行数の設定
         max_workers = min(len(users), self.config_loader.config.get('max_concurrent_sessions', 5))
         
+        # 完了したセッションから順にExcelレポートを生成するプロセスの起動
+        # （スレッドを起動する前にプロセスを作成する）
+        pipeline = None
+        if self.report_pipeline:
+            if resolve_report_mode(self.report_mode, len(users), self.report_aggregate_threshold) == "aggregate":
+                self.logger.info("集計レポートを生成するため、Excelレポートの並行生成は行いません")
+            elif 0 < self.report_shard_size < len(users):
+                self.logger.warning("report_shard_size が有効なため、Excelレポートの並行生成は行いません")
+            else:
+                pipeline = ReportPipeline(self.output_dir, self._get_excel_config())
+                if not pipeline.start():
+                    pipeline = None
+        
+        # フックの通知スレッドの起動と実行の開始の通知（プロセスを作成した後に行う）
+        if self.hooks:
+            self.hooks.start()
+            self.hooks.emit(RunStarted(output_dir=self.output_dir, start_time=results["start_time"],
+                                       total_sessions=len(users), url=self.config['url'],
+                                       scenario_file=str(self.scenario_file)))
+        
+        # ブラウザの終了処理を行うバックグラウンドスレッドの起動
+        if self.async_teardown:
+            self.reaper = BrowserReaper(quit_timeout=self.teardown_timeout, workers=self.teardown_workers,
+                                        tracer=self.tracer)
+        
+        # 実行中のメトリクスのエンドポイントの起動（起動できない場合も集計は続ける）
+        if self.metrics:
+            if self.reaper:
+                self.metrics.add_gauge("teardown_queue_depth", "終了処理を待っているブラウザの数",
+                                       self.reaper.queue_depth)
+            self.metrics.start()
+        
+        # 実行中の統計の表示の開始
+        live_stats_reporter = None
+        if self.live_stats:
+            self.live_stats.start(len(users))
+            live_stats_reporter = LiveStatsReporter(self.live_stats, self.live_stats_interval)
+            live_stats_reporter.start()
+        
+        # 実行時間の監視スレッドの起動
+        if self.watchdog:
+            self.watchdog.start()
+        
+        # 時系列の経過時間の計測開始
+        if self.timeline:
+            self.timeline.start()
+        
+        # 完了したセッションから順にテスト結果を書き出す
+        result_dir = os.path.join(self.output_dir, "result")
+        results_writer = ResultsWriter(results_path(result_dir, self.results_format), self.results_format)
+        
         # セッションの実行
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
             # セッションの実行
@@ -337,6 +605,10 @@ class ConcurrentTester:
                 try:
                     session_result = future.result()
                     results["sessions"].append(session_result)
+                    results_writer.write_session(session_result)
+                    self.statistics.add_session(session_result)
+                    if pipeline:
+                        pipeline.submit(session_result)
                     
                     # 成功/失敗のカウント
                     if session_result["success"]:
@@ -361,21 +633,77 @@ class ConcurrentTester:
                         "errors": [f"セッション実行中に例外が発生しました: {str(e)}"]
                     }
                     results["sessions"].append(error_result)
+                    results_writer.write_session(error_result)
+                    self.statistics.add_session(error_result)
+                    if pipeline:
+                        pipeline.submit(error_result)
                     results["failed_sessions"] += 1
                     results["success"] = False
         
+        # 実行時間の監視を終了し、タイムアウトによる損失時間を記録
+        if self.watchdog:
+            results["watchdog"] = self.watchdog.stop()
+            if results["watchdog"]["timed_out_sessions"]:
+                self.logger.warning(
+                    f"タイムアウトしたセッション: {results['watchdog']['timed_out_sessions']} 件 "
+                    f"(損失時間: {results['watchdog']['lost_seconds']:.2f}秒)")
+        
+        # バックグラウンドの終了処理の完了を待ち、残存プロセスを掃除
+        if self.reaper:
+            with self._trace("ブラウザの終了処理の完了待ち"):
+                results["teardown"] = self.reaper.shutdown()
+            self.reaper = None
+            self.logger.info(f"ブラウザの終了処理: {results['teardown']}")
+        
+        # 実行中のメトリクスのエンドポイントの停止
+        if self.metrics:
+            self.metrics.stop()
+        
+        # 実行中の統計の表示を終了（最終的な統計を表示する）
+        if live_stats_reporter:
+            live_stats_reporter.stop()
+        
         # 終了時間と実行時間を記録
         end_time = datetime.now()
         results["end_time"] = end_time.isoformat()
         results["duration"] = (end_time - start_time).total_seconds()
         
-        # 結果をJSONファイルに保存
+        # 実行中の時系列
+        if self.timeline:
+            results["timeline"] = self.timeline.to_dict()
+        
+        # エラーの分類（件数の多い順）
+        results["error_clusters"] = self.statistics.error_clusters()
+        for cluster in results["error_clusters"][:ERROR_CLUSTER_LOG_LIMIT]:
+            self.logger.warning(f"エラー {cluster['count']} 件 (操作ID: {', '.join(cluster['action_ids'])}): "
+                                f"{cluster['template']}")
+        
+        # 操作IDごとのページ読み込み（集計が空の場合は偽になるため None と比較する）
+        if self.page_timing is not None:
+            results["page_timing"] = self.page_timing.summary()
+            self.logger.info(f"ページ読み込みを計測した操作: {len(results['page_timing'])} 件")
+        
+        # 操作IDごとの Web Vitals とロングタスク（集計が空の場合は偽になるため None と比較する）
+        if self.web_vitals is not None:
+            results["web_vitals"] = self.web_vitals.summary()
+            self.logger.info(f"Web Vitals を収集した操作: {len(results['web_vitals'])} 件")
+        
+        # 低速アクションのエグゼンプラー
+        if self.exemplar_collector:
+            results["exemplars"] = self.exemplar_collector.get_exemplars()
+            self.logger.info(f"低速アクションのエグゼンプラー: {len(results['exemplars'])} 件")
+        
+        # 結果をファイルに保存（逐次書き出しに失敗した場合はまとめて保存する）
         try:
-            result_dir = os.path.join(self.output_dir, "result")
             os.makedirs(result_dir, exist_ok=True)
-            result_file = os.path.join(result_dir, "test_results.json")
-            save_json(results, result_file)
+            result_file = results_writer.path
+            with self._trace("テスト結果の保存"):
+                if not results_writer.close(results):
+                    save_results(results, result_file, self.results_format)
             self.logger.info(f"テスト結果保存: {result_file}")
+            # テスト結果の要約（python -m src report で再生成できる）
+            with self._trace("テスト結果の要約の保存"):
+                save_json(build_results_summary(results), os.path.join(result_dir, SUMMARY_FILE))
             
             # ファイルが実際に作成されたか確認
             if os.path.exists(result_file):
@@ -385,7 +713,7 @@ class ConcurrentTester:
                 # 代替ファイルパスを使用
                 alt_result_file = os.path.join(os.getcwd(), "output_fallback", "test_results.json")
                 os.makedirs(os.path.dirname(alt_result_file), exist_ok=True)
-                save_json(results, alt_result_file)
+                save_results(results, alt_result_file)
                 self.logger.info(f"代替ファイルパスに保存しました: {alt_result_file}")
                 result_file = alt_result_file
         except Exception as e:
@@ -395,7 +723,7 @@ class ConcurrentTester:
             alt_result_file = os.path.join(os.getcwd(), "output_fallback", "test_results.json")
             try:
                 os.makedirs(os.path.dirname(alt_result_file), exist_ok=True)
-                save_json(results, alt_result_file)
+                save_results(results, alt_result_file)
                 self.logger.info(f"代替ファイルパスに保存しました: {alt_result_file}")
                 result_file = alt_result_file
             except Exception as e2:
@@ -405,7 +733,25 @@ class ConcurrentTester:
         # 結果にファイルパスを追加
         results["output_file"] = result_file
         
+        # 分析用のアクション単位のサンプル（列指向形式）
+        if self.sample_export != "none":
+            with self._trace("アクション単位のサンプルの出力"):
+                samples_file = export_action_samples(results, self.output_dir, self.sample_export)
+            if samples_file:
+                results["action_samples"] = samples_file
+        
+        # HTMLレポートの生成（短時間で生成できるため、Excelレポートより先に生成する）
+        if self.html_report:
+            with self._trace("HTMLレポートの生成"):
+                html_report_file = generate_html_report(results, self.output_dir, self._get_excel_config())
+            if html_report_file:
+                results["html_report"] = html_report_file
+        
         # Excelレポートの生成
+        report_mode = resolve_report_mode(self.report_mode, len(results["sessions"]), self.report_aggregate_threshold)
+        report_generator = select_excel_report_generator(self.report_engine, len(results["sessions"]),
+                                                         self.report_shard_size, self.report_workers,
+                                                         report_mode, self.statistics)
         try:
             # 設定値を明示的に出力
             self.logger.info("=== Excel Report Config ===")
@@ -413,26 +759,24 @@ class ConcurrentTester:
             self.logger.info(f"company_name: {self.config_loader.config.get('company_name', '')}")
             self.logger.info(f"project_name: {self.config_loader.config.get('project_name', '')}")
             self.logger.info(f"include_timestamp: {self.config_loader.config.get('include_timestamp', True)}")
+            self.logger.info(f"report_engine: {self.report_engine}")
+            self.logger.info(f"report_shard_size: {self.report_shard_size}")
+            self.logger.info(f"report_mode: {report_mode}")
             self.logger.info("=========================")
             
-            # 設定値を直接渡す
-            excel_config = {
-                "report_title": self.config_loader.config.get("report_title", "テスト実行結果報告書"),
-                "company_name": self.config_loader.config.get("company_name", ""),
-                "project_name": self.config_loader.config.get("project_name", ""),
-                "report_logo": self.config_loader.config.get("report_logo", ""),
-                "zoom_scale": self.config_loader.config.get("zoom_scale", 50),
-                "include_timestamp": self.config_loader.config.get("include_timestamp", True),
-                "timestamp_format": self.config_loader.config.get("timestamp_format", "%Y-%m-%d %H:%M:%S"),
-                "header_bg_color": self.config_loader.config.get("header_bg_color", "#4472C4"),
-                "header_font_color": self.config_loader.config.get("header_font_color", "#FFFFFF"),
-                "alt_row_color": self.config_loader.config.get("alt_row_color", "#E6F0FF"),
-                "success_color": self.config_loader.config.get("success_color", "#C6EFCE"),
-                "failure_color": self.config_loader.config.get("failure_color", "#FFC7CE"),
-                "screenshot_title_cell_color": self.config_loader.config.get("screenshot_title_cell_color", "#ffebcd")
-            }
+            excel_config = self._get_excel_config()
             
-            excel_report_file = generate_excel_report(results, self.output_dir, excel_config)
+            # 並行生成したレポートにサマリーを追加して保存（失敗した場合は再生成する）
+            excel_report_file = ""
+            if pipeline:
+                with self._trace("Excelレポートの保存（並行生成）"):
+                    excel_report_file = pipeline.finish(results)
+                pipeline = None
+                if not excel_report_file:
+                    self.logger.warning("並行生成したExcelレポートを保存できなかったため、再生成します")
+            if not excel_report_file:
+                with self._trace("Excelレポートの生成"):
+                    excel_report_file = report_generator(results, self.output_dir, excel_config)
             if os.path.exists(excel_report_file):
                 self.logger.info(f"Excelレポートが正常に生成されました: {excel_report_file}")
                 # Excelレポートのパスも結果に追加
@@ -446,13 +790,36 @@ class ConcurrentTester:
             # 代替ファイルパスでの再試行
             try:
                 alt_output_dir = os.path.join(os.getcwd(), "output_fallback")
-                excel_report_file = generate_excel_report(results, alt_output_dir, excel_config)
+                excel_report_file = report_generator(results, alt_output_dir, excel_config)
                 self.logger.info(f"代替パスでExcelレポートを生成しました: {excel_report_file}")
                 results["excel_report"] = excel_report_file
             except Exception as e2:
                 self.logger.error(f"代替パスでのExcelレポート生成にも失敗しました: {str(e2)}")
                 results["excel_report"] = "生成に失敗しました"
         
+        # 実行履歴のデータベースに記録（python -m src history で推移と劣化を確認できる）
+        if self.run_history:
+            db_path = history_db_path(self.config_loader.config, os.path.dirname(os.path.abspath(self.output_dir)))
+            with self._trace("実行履歴の記録"):
+                record_run_history(db_path, results, {**self.config_loader.config, **self.config},
+                                   self.scenario_file, self.output_dir, self.statistics)
+        
+        # フックに実行の終了を通知し、残ったイベントの通知を待つ
+        if self.hooks:
+            self.hooks.emit(RunEnded(output_dir=self.output_dir, start_time=results["start_time"],
+                                     end_time=results["end_time"], duration=results["duration"],
+                                     total_sessions=results["total_sessions"],
+                                     successful_sessions=results["successful_sessions"],
+                                     failed_sessions=results["failed_sessions"], results=results))
+            with self._trace("フックへの通知の完了待ち"):
+                results["hooks"] = self.hooks.close()
+        
+        # トレースの書き出し（Perfetto や chrome://tracing で読み込める）
+        if self.tracer:
+            trace_file = self.tracer.close()
+            if trace_file:
+                results["trace_file"] = trace_file
+        
         # 終了ログ
         self.logger.info(f"テスト終了: {end_time.strftime('%Y-%m-%d %H:%M:%S')} (所要時間: {results['duration']:.2f}秒)")
         
@@ -21,6 +21,11 @@ except ImportError:
     except ImportError:
         from PyQt6.QtGui import QFileSystemModel
 
+from src.utils.results_io import find_results_file, is_results_file, preview_results
+
+# テスト結果の表示に読み込むセッション数の上限
+PREVIEW_SESSIONS = 100
+
 class ResultViewer(QWidget):
     """
     テスト結果表示画面
@@ -202,9 +207,9 @@ class ResultViewer(QWidget):
                 # ファイルツリーのルートパスを設定
                 self.file_tree.setRootIndex(self.file_model.index(dir_path))
                 
-                # test_results.jsonを探して表示
-                json_path = os.path.join(dir_path, "result", "test_results.json")
-                if os.path.exists(json_path):
+                # test_results.json（または test_results.msgpack）を探して表示
+                json_path = find_results_file(os.path.join(dir_path, "result"))
+                if json_path:
                     self.load_json_results(json_path)
     
     def on_file_selected(self, index):
@@ -213,8 +218,8 @@ class ResultViewer(QWidget):
         """
         file_path = self.file_model.filePath(index)
         
-        # JSONファイルの場合
-        if file_path.endswith('.json'):
+        # JSONファイル（テスト結果）の場合
+        if file_path.endswith('.json') or is_results_file(file_path):
             self.load_json_results(file_path)
         # 画像ファイルの場合
         elif file_path.endswith(('.png', '.jpg', '.jpeg')):
@@ -228,8 +233,15 @@ class ResultViewer(QWidget):
         JSONファイルを読み込んで表示する
         """
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            note = ""
+            if is_results_file(json_path):
+                # テスト結果は全体を読み込まず、先頭のセッションのみを表示する
+                data, session_count = preview_results(json_path, PREVIEW_SESSIONS)
+                if session_count > len(data["sessions"]):
+                    note = f"（先頭の{len(data['sessions'])}セッションのみ表示しています。全{session_count}セッション）\n"
+            else:
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
             
             # テーブルをクリア
             self.result_table.setRowCount(0)
@@ -247,7 +259,7 @@ class ResultViewer(QWidget):
             
             # JSON全体を表示
             formatted_json = json.dumps(data, indent=2, ensure_ascii=False)
-            self.json_viewer.setText(formatted_json)
+            self.json_viewer.setText(note + formatted_json)
             self.json_viewer.show()
             
         except Exception as e:
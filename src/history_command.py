@@ -0,0 +1,151 @@
+"""
+実行履歴から操作IDごとの所要時間の推移と性能劣化を表示するコマンド
+
+使用例:
+    python -m src history
+    python -m src history --run 20250108_120000 --baseline 10 --fail-on-regression
+"""
+import argparse
+import os
+from typing import Dict, Any, List, Optional
+
+from src.config_loader import ConfigLoader
+from src.utils.console_table import format_table
+from src.utils.logger import setup_logger
+from src.utils.run_history import (
+    RunHistory, VERDICT_IMPROVEMENT, VERDICT_INSUFFICIENT, VERDICT_NO_CHANGE, VERDICT_REGRESSION, history_db_path
+)
+
+# 判定結果の表示名
+VERDICT_LABELS = {
+    VERDICT_REGRESSION: "劣化",
+    VERDICT_IMPROVEMENT: "改善",
+    VERDICT_NO_CHANGE: "変化なし",
+    VERDICT_INSUFFICIENT: "データ不足",
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    コマンドライン引数のパーサーを作成する
+
+    Returns:
+        引数パーサー
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m src history',
+        description='実行履歴から操作IDごとの所要時間の推移と性能劣化を表示します')
+    parser.add_argument('--config', default='resources/config.toml', help='設定ファイルのパス（.toml形式）')
+    parser.add_argument('--db', help='実行履歴のデータベースファイル（設定ファイルの history_db より優先）')
+    parser.add_argument('--run', help='対象の実行ID（出力ディレクトリ名）または番号（省略時は最新の実行）')
+    parser.add_argument('--runs', type=int, default=8, help='推移として表示する実行数')
+    parser.add_argument('--baseline', type=int, default=5, help='基準とする直前の実行数')
+    parser.add_argument('--alpha', type=float, default=0.01, help='劣化と判定する有意水準')
+    parser.add_argument('--min-change', type=float, default=0.1,
+                        help='劣化と判定する中央値の変化率の下限（0.1 = 10%%）')
+    parser.add_argument('--fail-on-regression', action='store_true', help='劣化した操作がある場合は終了コード2で終了する')
+    return parser
+
+
+def _seconds(value: Optional[float]) -> str:
+    """所要時間の表示（秒）"""
+    return "-" if value is None else f"{value:.3f}"
+
+
+def format_trend(history: RunHistory, run: Dict[str, Any], count: int) -> str:
+    """
+    操作IDごとの所要時間の中央値の推移の表を作成する
+
+    Args:
+        history: 実行履歴
+        run: 対象の実行
+        count: 表示する実行数
+
+    Returns:
+        表の文字列（古い実行から順に列を並べる）
+    """
+    runs = [run] + history.baseline_runs(run, count - 1)
+    runs.reverse()
+    stats = history.action_stats([item["id"] for item in runs])
+    action_ids: Dict[str, str] = {}
+    for item in runs:
+        for action_id, action in stats[item["id"]].items():
+            action_ids.setdefault(action_id, action["description"] or "")
+    header = ["操作ID", "説明"] + [item["run_id"] for item in runs]
+    rows = [[action_id, description] + [_seconds(stats[item["id"]].get(action_id, {}).get("p50")) for item in runs]
+            for action_id, description in action_ids.items()]
+    summary = [["セッション数", ""] + [str(item["total_sessions"]) for item in runs],
+               ["失敗数", ""] + [str(item["failed_sessions"]) for item in runs]]
+    return format_table(header, summary + rows)
+
+
+def format_findings(findings: List[Dict[str, Any]]) -> str:
+    """
+    性能劣化の判定の表を作成する
+
+    Args:
+        findings: 操作IDごとの判定
+
+    Returns:
+        表の文字列
+    """
+    header = ["操作ID", "説明", "基準p50", "今回p50", "変化率", "p値/z", "判定"]
+    rows = []
+    for finding in findings:
+        if finding["p_value"] is not None:
+            statistic = f"p={finding['p_value']:.4f}"
+        elif finding["z"] is not None:
+            statistic = f"z={finding['z']:.2f}"
+        else:
+            statistic = "-"
+        change = "-" if finding["change"] is None else f"{finding['change'] * 100:+.1f}%"
+        rows.append([finding["action_id"], finding["description"] or "", _seconds(finding["baseline_p50"]),
+                     _seconds(finding["p50"]), change, statistic, VERDICT_LABELS.get(finding["verdict"], "-")])
+    return format_table(header, rows)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    実行履歴コマンドのエントリーポイント
+
+    Args:
+        argv: コマンドライン引数（Noneの場合は sys.argv）
+
+    Returns:
+        終了コード（劣化した操作があり --fail-on-regression を指定した場合は2）
+    """
+    logger = setup_logger("HistoryCommand")
+    args = build_parser().parse_args(argv)
+
+    db_path = args.db
+    if not db_path:
+        config_path = args.config if args.config.endswith('.toml') else args.config + '.toml'
+        config = ConfigLoader(config_file=config_path).config if os.path.exists(config_path) else {}
+        db_path = history_db_path(config)
+    if not os.path.exists(db_path):
+        logger.error(f"エラー: 実行履歴のデータベース '{db_path}' が見つかりません")
+        return 1
+
+    history = RunHistory(db_path)
+    run = history.find_run(args.run)
+    if run is None:
+        logger.error(f"エラー: 実行 '{args.run or '(最新)'}' が実行履歴に見つかりません")
+        return 1
+
+    baseline = history.baseline_runs(run, args.baseline)
+    findings = history.detect_regressions(run, args.baseline, args.alpha, args.min_change)
+    print(f"対象: {run['run_id']} ({run['started_at']})  URL: {run['url']}  ブラウザ: {run['browser']}  "
+          f"シナリオ: {run['scenario_hash']}  環境: {run['env_hash']}")
+    print()
+    print("所要時間の中央値（秒）の推移")
+    print(format_trend(history, run, max(1, args.runs)))
+    print()
+    print(f"直前の{len(baseline)}件の実行を基準とした判定（有意水準 {args.alpha}、変化率 {args.min_change * 100:.0f}% 以上）")
+    print(format_findings(findings))
+
+    regressions = [finding for finding in findings if finding["verdict"] == VERDICT_REGRESSION]
+    if regressions:
+        logger.warning(f"所要時間が劣化した操作: {', '.join(finding['action_id'] for finding in regressions)}")
+        if args.fail_on_regression:
+            return 2
+    return 0
@@ -10,6 +10,28 @@ from src.concurrent_tester import ConcurrentTester
 from src.config_loader import ConfigLoader
 from src.utils.logger import setup_logger
 
+# サブコマンド（python -m src <コマンド> ...）
+COMMANDS = {
+    "report": "src.report_command",
+    "history": "src.history_command",
+    "compare": "src.compare_command",
+    "analyze": "src.analyze_command",
+}
+
+def run_command(name, argv):
+    """
+    サブコマンドを実行する
+    
+    Args:
+        name: コマンド名
+        argv: コマンド名以降のコマンドライン引数
+        
+    Returns:
+        終了コード
+    """
+    import importlib
+    return importlib.import_module(COMMANDS[name]).main(argv)
+
 def validate_files(args):
     """
     コマンドライン引数で指定されたファイルの存在を確認する
@@ -63,6 +85,10 @@ def main():
         print("エラー: Python 3.12以上が必要です")
         return 1
     
+    # サブコマンドの実行
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        return run_command(sys.argv[1], sys.argv[2:])
+    
     # デフォルトのロガーを設定
     logger = setup_logger("Main")
     
@@ -79,6 +105,10 @@ def main():
     parser.add_argument('--scenario-config', help='シナリオファイルのパス（CSV形式）')
     parser.add_argument('--debug', action='store_true', help='デバッグモードで実行（詳細なログ出力）')
     parser.add_argument('--gui', action='store_true', help='GUIモードで実行')
+    parser.add_argument('--live-stats', type=float, nargs='?', const=5.0, metavar='秒',
+                        help='実行中の操作IDごとの統計の表を指定した間隔（省略時は5秒）で表示する')
+    parser.add_argument('--trace', action='store_true',
+                        help='実行全体のトレース（result/trace.json、Perfetto等で表示可能）を記録する')
     args = parser.parse_args()
     
     # GUIモードの場合はGUIアプリケーションを起動
@@ -135,6 +165,14 @@ def main():
         if args.action_delay is not None:
             config_loader.config['action_delay'] = args.action_delay
             
+        # 実行中の統計の表示間隔の設定
+        if args.live_stats is not None:
+            config_loader.config['live_stats_interval'] = args.live_stats
+            
+        # トレースの記録の設定
+        if args.trace:
+            config_loader.config['trace'] = True
+            
         # 型変換ユーティリティをインポート
         from src.utils.toml_utils import get_bool
             
@@ -0,0 +1,81 @@
+"""
+保存済みのテスト結果からレポートを再生成するコマンド
+
+使用例:
+    python -m src report output/20250101_120000
+    python -m src report output/20250101_120000 --sessions 1-10,15 --workers 4
+"""
+import argparse
+import os
+from typing import List, Optional
+
+from src.config_loader import ConfigLoader
+from src.utils.logger import setup_logger
+from src.utils.report_builder import ReportBuilder, parse_session_spec
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    コマンドライン引数のパーサーを作成する
+
+    Returns:
+        引数パーサー
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m src report',
+        description='保存済みのテスト結果からレポートを再生成します')
+    parser.add_argument('output_dir', help='テスト実行時の出力ディレクトリ（例: output/20250101_120000）')
+    parser.add_argument('--config', default='resources/config.toml', help='設定ファイルのパス（.toml形式）')
+    parser.add_argument('--sessions', help='対象のセッションID（例: 1-10,15）。指定した場合は別ファイルに出力する')
+    parser.add_argument('--workers', type=int, default=0, help='並列に生成するプロセス数（0: CPU数、1: 順番に生成）')
+    parser.add_argument('--engine', choices=['standard', 'streaming'], help='Excelレポートの生成方式')
+    parser.add_argument('--shard-size', type=int, help='1つのワークブックに含めるセッション数（0: 分割しない）')
+    parser.add_argument('--mode', choices=['detailed', 'aggregate', 'auto'], help='Excelレポートの構成')
+    parser.add_argument('--html', action='store_true', help='HTMLレポートも生成する（設定ファイルの html_report より優先）')
+    parser.add_argument('--samples', choices=['auto', 'parquet', 'csv'],
+                        help='アクション単位のサンプルも出力する（設定ファイルの sample_export より優先）')
+    parser.add_argument('--force', action='store_true', help='入力が変わっていないレポートも再生成する')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    レポート再生成コマンドのエントリーポイント
+
+    Args:
+        argv: コマンドライン引数（Noneの場合は sys.argv）
+
+    Returns:
+        終了コード
+    """
+    logger = setup_logger("ReportCommand")
+    args = build_parser().parse_args(argv)
+
+    if not os.path.isdir(args.output_dir):
+        logger.error(f"エラー: 出力ディレクトリ '{args.output_dir}' が見つかりません")
+        return 1
+
+    config_path = args.config if args.config.endswith('.toml') else args.config + '.toml'
+    if not os.path.exists(config_path):
+        logger.error(f"エラー: 設定ファイル '{config_path}' が見つかりません")
+        return 1
+
+    try:
+        session_ids = parse_session_spec(args.sessions) if args.sessions else None
+    except ValueError as e:
+        logger.error(f"エラー: {str(e)}")
+        return 1
+
+    config_loader = ConfigLoader(config_file=config_path)
+    builder = ReportBuilder(args.output_dir, config_loader.config, session_ids=session_ids,
+                            workers=args.workers, force=args.force, engine=args.engine, shard_size=args.shard_size,
+                            mode=args.mode, html=True if args.html else None, sample_format=args.samples)
+    try:
+        status = builder.build()
+    except (OSError, ValueError) as e:
+        logger.error(f"レポートの再生成に失敗しました: {str(e)}")
+        return 1
+
+    for name, item in status.items():
+        logger.info(f"{name}: {item['status']} ({item['path']})")
+    return 0 if all(item["status"] != "failed" for item in status.values()) else 1
@@ -0,0 +1,513 @@
+"""
+アクション単位のサンプルの集計モジュール
+
+長時間の実行や複数ノードの実行を合わせた数百万件のアクションのサンプルを、型付き配列（array）に
+列として読み込み、操作IDごとのパーセンタイル、時間帯ごとの件数・エラー率・パーセンタイル、
+移動平均、外れ値の検出を計算する。
+
+NumPyがインストールされている場合は型付き配列をコピーせずにNumPyの配列として参照し、
+ソートとグループ化をまとめて行う。ない場合は同じ結果を標準ライブラリのみで計算する。
+パーセンタイルはいずれも線形補間（NumPyの既定の方法と同じ）で計算する。
+"""
+import csv
+import math
+import os
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterable, List, Optional, Sequence
+
+from src.utils.results_io import find_results_file, iter_sessions
+from src.utils.sample_export import SAMPLES_FILE
+
+# NumPyはオプション（ない場合は標準ライブラリのみで計算する）
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# pyarrowはオプション（Parquet形式のサンプルの読み込みに使用する）
+try:
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pc = pq = None
+
+# タイムスタンプの単位ごとの1秒あたりの値
+_TIMESTAMP_UNITS = {"s": 1, "ms": 1000, "us": 1000000, "ns": 1000000000}
+
+DEFAULT_PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values, p: float) -> float:
+    """
+    ソート済みの値からパーセンタイルを計算する（線形補間）
+
+    Args:
+        sorted_values: 昇順にソートされた値
+        p: パーセンタイル（0-100）
+
+    Returns:
+        パーセンタイル値（値がない場合はNaN）
+    """
+    if not sorted_values:
+        return math.nan
+    position = (len(sorted_values) - 1) * p / 100.0
+    lower = int(math.floor(position))
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _vector(values, dtype=None):
+    """型付き配列をコピーせずにNumPyの配列として参照する（その他のシーケンスは変換する）"""
+    if isinstance(values, array):
+        if len(values) == 0:
+            return np.empty(0, dtype=dtype or np.float64)
+        return np.frombuffer(values, dtype=dtype or np.float64)
+    return np.asarray(values, dtype=dtype or np.float64)
+
+
+def summarize(values: Sequence[float], percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, float]:
+    """
+    値の平均・最大値・パーセンタイルを計算する（NaNは除外する）
+
+    Args:
+        values: 値（array('d') の場合はコピーせずに参照する）
+        percentiles: 計算するパーセンタイル
+
+    Returns:
+        count, mean, max, p<パーセンタイル>（値がない場合はNaN）
+    """
+    if np is not None:
+        vector = _vector(values)
+        vector = vector[~np.isnan(vector)]
+        count = len(vector)
+        summary = {"count": count,
+                   "mean": float(vector.mean()) if count else math.nan,
+                   "max": float(vector.max()) if count else math.nan}
+        quantiles = np.percentile(vector, percentiles) if count and percentiles else [math.nan] * len(percentiles)
+        for p, value in zip(percentiles, quantiles):
+            summary[f"p{p}"] = float(value)
+        return summary
+
+    ordered = sorted(value for value in values if not math.isnan(value))
+    summary = {"count": len(ordered),
+               "mean": sum(ordered) / len(ordered) if ordered else math.nan,
+               "max": ordered[-1] if ordered else math.nan}
+    for p in percentiles:
+        summary[f"p{p}"] = percentile(ordered, p)
+    return summary
+
+
+def _grouped(codes, values, group_count: int, percentiles: Sequence[float]) -> List[Dict[str, float]]:
+    """
+    グループ番号ごとに値の件数・平均・最大値・パーセンタイルを計算する（NaNは除外する）
+
+    Args:
+        codes: 値ごとのグループ番号（0以上 group_count 未満）
+        values: 値
+        group_count: グループ数
+        percentiles: 計算するパーセンタイル
+
+    Returns:
+        グループ番号の順の集計
+    """
+    if group_count == 0:
+        return []
+    if np is not None:
+        codes, values = _vector(codes, np.int64), _vector(values)
+        valid = ~np.isnan(values)
+        codes, values = codes[valid], values[valid]
+        # グループ番号でまとめてからグループごとに値をソートし（2つのキーで全体をソートするより速い）、
+        # グループの先頭の位置からパーセンタイルの位置を求める
+        ordered = values[np.argsort(codes, kind="stable")]
+        counts = np.bincount(codes, minlength=group_count)
+        starts = np.cumsum(counts) - counts
+        present = counts > 0
+        for start, count in zip(starts[present].tolist(), counts[present].tolist()):
+            ordered[start:start + count].sort()
+        last = np.where(present, starts + counts - 1, 0)
+        sums = np.bincount(codes, weights=values, minlength=group_count)
+        columns = {"count": counts,
+                   "mean": np.where(present, sums / np.maximum(counts, 1), np.nan),
+                   "max": np.where(present, ordered[last] if len(ordered) else np.nan, np.nan)}
+        for p in percentiles:
+            position = starts + (counts - 1) * p / 100.0
+            lower = np.floor(position).astype(np.int64)
+            upper = np.minimum(lower + 1, last)
+            lower = np.where(present, lower, 0)
+            if len(ordered):
+                value = ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+            else:
+                value = np.full(group_count, np.nan)
+            columns[f"p{p}"] = np.where(present, value, np.nan)
+        return [{name: (int(column[i]) if name == "count" else float(column[i])) for name, column in columns.items()}
+                for i in range(group_count)]
+
+    groups: List[List[float]] = [[] for _ in range(group_count)]
+    for code, value in zip(codes, values):
+        if not math.isnan(value):
+            groups[code].append(value)
+    return [summarize(group, percentiles) for group in groups]
+
+
+def moving_average(values: Sequence[float], window: int) -> List[float]:
+    """
+    直前の window 個の値の移動平均を計算する（NaNは除外する）
+
+    Args:
+        values: 値（時間帯の順）
+        window: 窓の大きさ
+
+    Returns:
+        値ごとの移動平均（窓に値がない場合はNaN）
+    """
+    window = max(1, window)
+    if np is not None:
+        vector = _vector(values)
+        valid = ~np.isnan(vector)
+        sums = np.concatenate(([0.0], np.cumsum(np.where(valid, vector, 0.0))))
+        counts = np.concatenate(([0], np.cumsum(valid)))
+        end = np.arange(1, len(vector) + 1)
+        start = np.maximum(end - window, 0)
+        window_counts = counts[end] - counts[start]
+        averages = np.where(window_counts > 0, (sums[end] - sums[start]) / np.maximum(window_counts, 1), np.nan)
+        return averages.tolist()
+
+    averages = []
+    total, count = 0.0, 0
+    for i, value in enumerate(values):
+        if not math.isnan(value):
+            total, count = total + value, count + 1
+        if i >= window and not math.isnan(values[i - window]):
+            total, count = total - values[i - window], count - 1
+        averages.append(total / count if count else math.nan)
+    return averages
+
+
+def _timestamp(value: Any) -> float:
+    """ISO形式の日時、datetime、UNIX時間をUNIX時間に変換する（変換できない場合はNaN）"""
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return math.nan
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return math.nan
+
+
+def _duration(value: Any) -> float:
+    """所要時間を数値に変換する（数値でない場合はNaN）"""
+    if isinstance(value, bool):
+        return math.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value) if value not in (None, "") else math.nan
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _timestamps(column):
+    """
+    pyarrowのタイムスタンプの列をUNIX時間のNumPyの配列に変換する（NumPyが必要）
+
+    タイムゾーンのない値は _timestamp と同じくローカル時刻として扱い、UTCとの差は
+    1時間単位の区間ごとに1回のみ計算する。
+    """
+    unit = getattr(column.type, "unit", None)
+    if unit not in _TIMESTAMP_UNITS:
+        return np.array([_timestamp(value) for value in column.to_pylist()], dtype=np.float64)
+    values = column.combine_chunks().view("int64").to_numpy(zero_copy_only=False).astype(np.float64)
+    seconds = values / _TIMESTAMP_UNITS[unit]
+    if column.type.tz is None:
+        valid = ~np.isnan(seconds)
+        hours, inverse = np.unique(np.floor(seconds[valid] / 3600), return_inverse=True)
+        offsets = np.array([datetime.fromtimestamp(hour * 3600, timezone.utc).replace(tzinfo=None).timestamp()
+                            - hour * 3600 for hour in hours])
+        seconds[valid] += offsets[inverse]
+    return seconds
+
+
+class SampleSet:
+    """アクション単位のサンプルを列として保持するクラス"""
+
+    def __init__(self):
+        # 操作ID（初出順）と操作IDの番号
+        self.action_ids: List[str] = []
+        self._codes: Dict[str, int] = {}
+        # サンプルごとの列（読み込み順）
+        self.codes = array('q')
+        self.session_ids = array('q')
+        self.start_times = array('d')
+        self.durations = array('d')
+        self.successes = array('b')
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def add(self, action_id: str, session_id: Any, start_time: Any, duration: Any, success: bool) -> None:
+        """
+        サンプルを1件追加する
+
+        Args:
+            action_id: 操作ID
+            session_id: セッションID
+            start_time: 開始日時（ISO形式の文字列、datetime またはUNIX時間）
+            duration: 所要時間（秒）
+            success: 成功したかどうか
+        """
+        self.codes.append(self._action_code(action_id))
+        self.session_ids.append(session_id if isinstance(session_id, int) and not isinstance(session_id, bool) else 0)
+        self.start_times.append(_timestamp(start_time))
+        self.durations.append(_duration(duration))
+        self.successes.append(1 if success else 0)
+
+    def _action_code(self, action_id: str) -> int:
+        """操作IDの番号を返す（初出の場合は追加する）"""
+        code = self._codes.get(action_id)
+        if code is None:
+            code = self._codes[action_id] = len(self.action_ids)
+            self.action_ids.append(action_id)
+        return code
+
+    def add_session(self, session: Dict[str, Any]) -> None:
+        """
+        セッションの結果のアクションをサンプルとして追加する
+
+        Args:
+            session: セッションの実行結果
+        """
+        session_id = session.get("session_id")
+        session_id = session_id if isinstance(session_id, int) and not isinstance(session_id, bool) else 0
+        # サンプル数が多いため、列への追記は add を経由せずにまとめて行う
+        codes, action_ids = self._codes, self.action_ids
+        for action in session.get("actions", []):
+            action_id = str(action.get("action_id", action.get("操作ID", "")))
+            code = codes.get(action_id)
+            if code is None:
+                code = codes[action_id] = len(action_ids)
+                action_ids.append(action_id)
+            duration = action.get("duration")
+            self.codes.append(code)
+            self.session_ids.append(session_id)
+            self.start_times.append(_timestamp(action.get("start_time")))
+            self.durations.append(duration if type(duration) is float else _duration(duration))
+            self.successes.append(1 if action.get("result", action.get("success", False)) else 0)
+
+    @classmethod
+    def from_results(cls, results: Dict[str, Any]) -> "SampleSet":
+        """
+        テスト結果からサンプルを作成する
+
+        Args:
+            results: テスト結果
+
+        Returns:
+            サンプル
+        """
+        samples = cls()
+        for session in results.get("sessions", []):
+            samples.add_session(session)
+        return samples
+
+    @classmethod
+    def load(cls, paths: Iterable[str]) -> "SampleSet":
+        """
+        保存済みのファイルからサンプルを読み込む（複数のファイルは1つのサンプルとして合わせる）
+
+        出力ディレクトリを指定した場合は、アクション単位のサンプルのファイル（Parquet、CSV）があれば
+        それを、なければテスト結果をセッションごとに読み込む。
+
+        Args:
+            paths: 出力ディレクトリ、テスト結果、またはアクション単位のサンプル（.parquet / .csv）のパス
+
+        Returns:
+            サンプル
+
+        Raises:
+            FileNotFoundError: 読み込むファイルが見つからない場合
+        """
+        samples = cls()
+        for path in paths:
+            samples._load_path(_resolve_samples_path(path))
+        return samples
+
+    def _load_path(self, path: str) -> None:
+        """ファイルの形式に応じてサンプルを読み込む"""
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".parquet":
+            self._load_parquet(path)
+        elif extension == ".csv":
+            with open(path, encoding="utf-8", newline="") as f:
+                for row in csv.DictReader(f):
+                    session_id = row.get("session_id")
+                    self.add(row.get("action_id", ""), int(session_id) if session_id else 0, row.get("start_time"),
+                             row.get("duration"), row.get("success") == "True")
+        else:
+            for session in iter_sessions(path):
+                self.add_session(session)
+
+    def _load_parquet(self, path: str) -> None:
+        """
+        Parquet形式のサンプルを行グループごとに読み込む（pyarrowが必要）
+
+        NumPyがある場合は列をNumPyの配列に変換して型付き配列にまとめて追記し、
+        操作IDは辞書エンコードした辞書のみを操作IDの番号に対応付ける。
+        """
+        if pq is None:
+            raise ValueError(f"Parquet形式のサンプルの読み込みにはpyarrowが必要です: {path}")
+        columns = ["action_id", "session_id", "start_time", "duration", "success"]
+        parquet = pq.ParquetFile(path)
+        for index in range(parquet.num_row_groups):
+            table = parquet.read_row_group(index, columns=columns)
+            if np is not None:
+                self._extend_columns(table)
+                continue
+            table = table.to_pydict()
+            for action_id, session_id, start_time, duration, success in zip(*(table[name] for name in columns)):
+                self.add(action_id or "", session_id, start_time, duration, bool(success))
+
+    def _extend_columns(self, table) -> None:
+        """pyarrowのテーブルの列を型付き配列に追記する（NumPyが必要）"""
+        if table.num_rows == 0:
+            return
+        encoded = pc.fill_null(table.column("action_id"), "").combine_chunks().dictionary_encode()
+        mapping = np.array([self._action_code(action_id) for action_id in encoded.dictionary.to_pylist()],
+                           dtype=np.int64)
+        codes = mapping[encoded.indices.to_numpy(zero_copy_only=False)]
+        session_ids = pc.fill_null(table.column("session_id"), 0).to_numpy()
+        durations = table.column("duration").to_numpy().astype(np.float64)
+        successes = pc.fill_null(table.column("success"), False).to_numpy()
+        self.codes.frombytes(codes.astype(np.int64).tobytes())
+        self.session_ids.frombytes(session_ids.astype(np.int64).tobytes())
+        self.start_times.frombytes(_timestamps(table.column("start_time")).tobytes())
+        self.durations.frombytes(durations.tobytes())
+        self.successes.frombytes(successes.astype(np.int8).tobytes())
+
+    def grouped_percentiles(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Dict[str, Any]]:
+        """
+        操作IDごとの所要時間の集計を計算する
+
+        Args:
+            percentiles: 計算するパーセンタイル
+
+        Returns:
+            操作ID（初出順）ごとの count（所要時間のある件数）, failure, mean, max, p<パーセンタイル>
+        """
+        stats = _grouped(self.codes, self.durations, len(self.action_ids), percentiles)
+        failures = self._failures_by(self.codes, len(self.action_ids))
+        for item, failure in zip(stats, failures):
+            item["failure"] = failure
+        return dict(zip(self.action_ids, stats))
+
+    def _failures_by(self, codes, group_count: int) -> List[int]:
+        """グループ番号ごとの失敗数"""
+        if np is not None:
+            failed = _vector(self.successes, np.int8) == 0
+            return np.bincount(_vector(codes, np.int64)[failed], minlength=group_count).tolist()
+        failures = [0] * group_count
+        for code, success in zip(codes, self.successes):
+            if not success:
+                failures[code] += 1
+        return failures
+
+    def time_series(self, interval: float = 60.0, percentiles: Sequence[float] = (50, 95),
+                    action_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        開始時刻の時間帯ごとの件数・エラー率・所要時間のパーセンタイルを計算する
+
+        Args:
+            interval: 時間帯の幅（秒）
+            percentiles: 計算するパーセンタイル
+            action_id: 対象の操作ID（Noneの場合はすべての操作）
+
+        Returns:
+            最初のサンプルの時間帯からの時間帯ごとの start（最初の時間帯の開始からの秒数）, count, errors,
+            error_rate, p<パーセンタイル>（サンプルのない時間帯を含む）
+        """
+        if np is not None:
+            starts = _vector(self.start_times)
+            mask = ~np.isnan(starts)
+            if action_id is not None:
+                mask &= _vector(self.codes, np.int64) == self._codes.get(action_id, -1)
+            if not mask.any():
+                return []
+            origin = math.floor(starts[mask].min() / interval) * interval
+            buckets = np.full(len(starts), -1, dtype=np.int64)
+            buckets[mask] = ((starts[mask] - origin) // interval).astype(np.int64)
+            bucket_count = int(buckets.max()) + 1
+            stats = _grouped(buckets[mask], _vector(self.durations)[mask], bucket_count, percentiles)
+            counts = np.bincount(buckets[mask], minlength=bucket_count)
+            failed = mask & (_vector(self.successes, np.int8) == 0)
+            errors = np.bincount(buckets[failed], minlength=bucket_count).tolist()
+            counts = counts.tolist()
+        else:
+            code = self._codes.get(action_id, -1) if action_id is not None else None
+            rows = [i for i, start in enumerate(self.start_times)
+                    if not math.isnan(start) and (code is None or self.codes[i] == code)]
+            if not rows:
+                return []
+            origin = math.floor(min(self.start_times[i] for i in rows) / interval) * interval
+            buckets = [int((self.start_times[i] - origin) // interval) for i in rows]
+            bucket_count = max(buckets) + 1
+            stats = _grouped(buckets, [self.durations[i] for i in rows], bucket_count, percentiles)
+            counts, errors = [0] * bucket_count, [0] * bucket_count
+            for bucket, i in zip(buckets, rows):
+                counts[bucket] += 1
+                if not self.successes[i]:
+                    errors[bucket] += 1
+
+        series = []
+        for index, (item, count, error_count) in enumerate(zip(stats, counts, errors)):
+            row = {"start": index * interval, "count": count, "errors": error_count,
+                   "error_rate": error_count / count if count else math.nan}
+            row.update({f"p{p}": item[f"p{p}"] for p in percentiles})
+            series.append(row)
+        return series
+
+    def outliers(self, factor: float = 3.0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        操作IDごとの四分位範囲から外れ値（第3四分位 + factor × 四分位範囲 を超える所要時間）を検出する
+
+        Args:
+            factor: 四分位範囲に掛ける係数
+            limit: 返す件数の上限（Noneの場合はすべて）
+
+        Returns:
+            閾値に対する比率の大きい順の action_id, session_id, duration, threshold
+        """
+        quartiles = _grouped(self.codes, self.durations, len(self.action_ids), (25, 75))
+        thresholds = [item["p75"] + factor * (item["p75"] - item["p25"]) for item in quartiles]
+        if np is not None:
+            durations = _vector(self.durations)
+            codes = _vector(self.codes, np.int64)
+            limits = np.asarray(thresholds, dtype=np.float64)[codes] if len(codes) else np.empty(0)
+            rows = np.nonzero(durations > limits)[0].tolist()
+        else:
+            rows = [i for i, (code, duration) in enumerate(zip(self.codes, self.durations))
+                    if duration > thresholds[code]]
+        found = [{"action_id": self.action_ids[self.codes[i]], "session_id": self.session_ids[i],
+                  "duration": self.durations[i], "threshold": thresholds[self.codes[i]]} for i in rows]
+        found.sort(key=lambda item: item["duration"] / item["threshold"] if item["threshold"] > 0 else math.inf,
+                   reverse=True)
+        return found[:limit] if limit is not None else found
+
+
+def _resolve_samples_path(path: str) -> str:
+    """出力ディレクトリの場合は読み込むファイルを決定する"""
+    if not os.path.isdir(path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"サンプルのファイルが見つかりません: {path}")
+        return path
+    result_dir = os.path.join(path, "result")
+    for extension in ((".parquet", ".csv") if pq is not None else (".csv",)):
+        candidate = os.path.join(result_dir, SAMPLES_FILE + extension)
+        if os.path.exists(candidate):
+            return candidate
+    results_path = find_results_file(result_dir)
+    if results_path is None:
+        raise FileNotFoundError(f"テスト結果のファイルが見つかりません: {path}")
+    return results_path
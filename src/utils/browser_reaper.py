@@ -0,0 +1,326 @@
+"""
+ブラウザの非同期終了処理モジュール
+
+driver.quit() をバックグラウンドのスレッドで実行し、ワーカーのスロットを即座に解放する。
+終了が期限内に完了しない場合はプロセスツリーを強制終了し、実行終了時には
+この実行で起動したドライバー／ブラウザの残存プロセスを掃除する。
+"""
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+from typing import Dict, Any, List, Optional
+
+from src.utils.logger import setup_logger
+
+# psutilはオプション（ない場合は /proc を参照する）
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def _child_pids(pid: int) -> List[int]:
+    """
+    子孫プロセスのPIDを取得する
+
+    Args:
+        pid: 親プロセスのPID
+
+    Returns:
+        子孫プロセスのPIDのリスト
+    """
+    if psutil:
+        try:
+            return [child.pid for child in psutil.Process(pid).children(recursive=True)]
+        except psutil.Error:
+            return []
+
+    # psutilがない場合は /proc から親子関係を辿る（Linuxのみ）
+    if not os.path.isdir('/proc'):
+        return []
+    parents: Dict[int, List[int]] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                # コマンド名に空白や括弧が含まれる場合があるため、最後の ')' 以降を解析する
+                fields = f.read().rsplit(')', 1)[1].split()
+            parents.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+
+    result = []
+    stack = [pid]
+    while stack:
+        for child in parents.get(stack.pop(), []):
+            result.append(child)
+            stack.append(child)
+    return result
+
+
+def _process_start_token(pid: int) -> Optional[str]:
+    """
+    プロセスの起動時刻を表す識別子を取得する（PIDの再利用を区別するために使用）
+
+    Args:
+        pid: プロセスのPID
+
+    Returns:
+        識別子（プロセスが存在しない、または取得できない場合はNone）
+    """
+    if psutil:
+        try:
+            process = psutil.Process(pid)
+            if process.status() == psutil.STATUS_ZOMBIE:
+                return None
+            return str(process.create_time())
+        except psutil.Error:
+            return None
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        # fields[0] は状態、fields[19] は起動時刻（starttime）
+        if fields[0] == 'Z':
+            return None
+        return fields[19]
+    except (OSError, IndexError):
+        return None
+
+
+def get_driver_pids(driver) -> List[int]:
+    """
+    ドライバーのプロセス（chromedriver等）とその子孫（ブラウザ）のPIDを取得する
+
+    Args:
+        driver: WebDriverインスタンス
+
+    Returns:
+        PIDのリスト（リモートドライバー等で取得できない場合は空）
+    """
+    return get_service_pids(getattr(driver, 'service', None))
+
+
+def get_service_pids(service) -> List[int]:
+    """
+    ドライバーのサービス（chromedriver等）とその子孫のPIDを取得する（WebDriverの作成前でも取得できる）
+
+    Args:
+        service: selenium の Service インスタンス
+
+    Returns:
+        PIDのリスト（プロセスが起動していない場合は空）
+    """
+    process = getattr(service, 'process', None)
+    pid = getattr(process, 'pid', None)
+    if not isinstance(pid, int):
+        return []
+    return [pid] + _child_pids(pid)
+
+
+def kill_process_tree(pid: int) -> int:
+    """
+    プロセスツリーを強制終了する
+
+    Args:
+        pid: ルートプロセスのPID
+
+    Returns:
+        終了を試みたプロセス数
+    """
+    if sys.platform == 'win32':
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(pid)],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return 1
+
+    killed = 0
+    # 子から先に終了させる
+    for target in reversed([pid] + _child_pids(pid)):
+        try:
+            os.kill(target, signal.SIGKILL)
+            killed += 1
+        except OSError:
+            pass
+    return killed
+
+
+class BrowserReaper:
+    """ブラウザの終了処理をバックグラウンドで行うクラス"""
+
+    def __init__(self, quit_timeout: float = 10.0, workers: int = 2, tracer=None):
+        """
+        コンストラクタ
+
+        Args:
+            quit_timeout: driver.quit() の完了を待つ期限（秒）。超過した場合はプロセスツリーを強制終了する
+            workers: 終了処理を行うスレッド数
+            tracer: 実行全体のトレースの記録（Noneの場合は記録しない）
+        """
+        self.quit_timeout = quit_timeout
+        self.tracer = tracer
+        self.logger = setup_logger("BrowserReaper")
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._lock = threading.Lock()
+        # この実行で起動したプロセス（PID -> 起動時刻の識別子）
+        self._run_pids: Dict[int, Optional[str]] = {}
+        self._stats = {
+            "submitted": 0,
+            "quit_ok": 0,
+            "quit_failed": 0,
+            "quit_timeout": 0,
+            "killed_processes": 0,
+            "orphans_swept": 0
+        }
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"browser-reaper-{i + 1}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _count(self, key: str, value: int = 1) -> None:
+        """カウンタを加算する"""
+        with self._lock:
+            self._stats[key] += value
+
+    def register(self, driver) -> None:
+        """
+        この実行で起動したドライバー／ブラウザのPIDを記録する（残存プロセスの掃除に使用）
+
+        Args:
+            driver: WebDriverインスタンス
+        """
+        pids = get_driver_pids(driver)
+        tokens = {pid: _process_start_token(pid) for pid in pids}
+        with self._lock:
+            for pid, token in tokens.items():
+                if token is not None:
+                    self._run_pids[pid] = token
+
+    def submit(self, session) -> None:
+        """
+        セッションのブラウザ終了処理をキューに登録する（即座に戻る）
+
+        Args:
+            session: BrowserSessionインスタンス
+        """
+        driver = session.detach_driver()
+        if driver is None:
+            return
+        # 終了処理の間に起動したブラウザの子プロセスも掃除対象に含める
+        self.register(driver)
+        self._count("submitted")
+        self._queue.put((driver, session.logger, session.session_id))
+
+    def _worker(self) -> None:
+        """終了処理スレッドのエントリーポイント"""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if self.tracer:
+                    with self.tracer.span("ブラウザの終了", self.tracer.session_track(item[2]), "browser"):
+                        self._quit(*item)
+                else:
+                    self._quit(*item)
+            finally:
+                self._queue.task_done()
+
+    def _quit(self, driver, logger, session_id: int) -> None:
+        """
+        期限付きで driver.quit() を実行する
+
+        Args:
+            driver: WebDriverインスタンス
+            logger: セッションのロガー
+            session_id: セッションID
+        """
+        pids = get_driver_pids(driver)
+        errors: List[str] = []
+
+        def quit_driver():
+            try:
+                driver.quit()
+            except Exception as e:
+                errors.append(str(e))
+
+        quit_thread = threading.Thread(target=quit_driver, name=f"quit-session-{session_id}", daemon=True)
+        quit_thread.start()
+        quit_thread.join(self.quit_timeout)
+
+        if quit_thread.is_alive():
+            self._count("quit_timeout")
+            logger.warning(f"ブラウザの終了が{self.quit_timeout}秒以内に完了しないため、プロセスを強制終了します")
+            if pids:
+                self._count("killed_processes", kill_process_tree(pids[0]))
+        elif errors:
+            self._count("quit_failed")
+            logger.error(f"ブラウザを閉じる際にエラーが発生しました: {errors[0]}")
+        else:
+            self._count("quit_ok")
+            logger.info("ブラウザを閉じました")
+
+    def shutdown(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        キューに残った終了処理の完了を待ち、残存プロセスを掃除する
+
+        Args:
+            timeout: 終了処理の完了を待つ最大時間（秒、Noneの場合は期限×キュー長から算出）
+
+        Returns:
+            終了処理のカウンタ
+        """
+        for _ in self._threads:
+            self._queue.put(None)
+        if timeout is None:
+            timeout = self.quit_timeout * (self._queue.qsize() + 1)
+        deadline_per_thread = timeout / len(self._threads)
+        for thread in self._threads:
+            thread.join(deadline_per_thread)
+
+        # この実行で起動したプロセスのうち残存しているものを強制終了
+        # （起動時刻が一致しない場合はPIDが再利用された別プロセスのため対象外）
+        with self._lock:
+            run_pids = dict(self._run_pids)
+        orphans = [pid for pid, token in sorted(run_pids.items()) if _process_start_token(pid) == token]
+        for pid in orphans:
+            self._kill(pid)
+        if orphans:
+            self._count("orphans_swept", len(orphans))
+            self.logger.warning(f"残存していたブラウザ関連プロセスを終了しました: {len(orphans)} 個")
+
+        return self.get_stats()
+
+    @staticmethod
+    def _kill(pid: int) -> None:
+        """単一のプロセスを強制終了する"""
+        if sys.platform == 'win32':
+            kill_process_tree(pid)
+            return
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+    def queue_depth(self) -> int:
+        """
+        終了処理を待っているブラウザの数を返す
+
+        Returns:
+            キューの長さ
+        """
+        return self._queue.qsize()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        終了処理のカウンタを返す
+
+        Returns:
+            カウンタの辞書
+        """
+        with self._lock:
+            return dict(self._stats)
@@ -3,26 +3,42 @@
 """
 import logging
 import traceback
-from typing import Tuple, Optional, Any
+from typing import Tuple, Optional, Any, Callable
 from urllib.parse import urlparse, urlunparse
 
 from selenium import webdriver
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.common.by import By
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.edge.options import Options as EdgeOptions
+from selenium.webdriver.edge.service import Service as EdgeService
+from selenium.webdriver.safari.service import Service as SafariService
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
 
-def create_browser(browser_type: str = 'chrome', headless: bool = True) -> Optional[webdriver.Remote]:
+def _service(service_class, service_created: Optional[Callable[[Any], None]]):
+    """ドライバーのサービスを作成して通知する（通知先がない場合はNoneでseleniumの既定値を使用する）"""
+    if service_created is None:
+        return None
+    service = service_class()
+    service_created(service)
+    return service
+
+
+def create_browser(browser_type: str = 'chrome', headless: bool = True,
+                   service_created: Optional[Callable[[Any], None]] = None) -> Optional[webdriver.Remote]:
     """
     ブラウザインスタンスを作成する
 
     Args:
         browser_type: ブラウザの種類 ('chrome', 'firefox', 'edge', 'safari')
         headless: ヘッドレスモードで実行するかどうか
+        service_created: ドライバーのサービスを起動する前に呼び出す関数（引数はServiceインスタンス）。
+            ドライバーの起動がハングした場合に、サービスのプロセスを特定して終了するために使用する
 
     Returns:
         作成したブラウザインスタンス（失敗した場合はNone）
@@ -47,19 +63,19 @@ def create_browser(browser_type: str = 'chrome', headless: bool = True) -> Optio
             options.add_argument('--no-sandbox')
             options.add_argument('--disable-dev-shm-usage')
             options.add_argument('--window-size=1024,768')  # 画面サイズを1024x768に設定
-            driver = webdriver.Chrome(options=options)
+            driver = webdriver.Chrome(options=options, service=_service(ChromeService, service_created))
         elif browser_type.lower() == 'firefox':
             options = FirefoxOptions()
             if headless:
                 options.add_argument('-headless')
-            driver = webdriver.Firefox(options=options)
+            driver = webdriver.Firefox(options=options, service=_service(FirefoxService, service_created))
         elif browser_type.lower() == 'edge':
             options = EdgeOptions()
             if headless:
                 options.add_argument('--headless')
-            driver = webdriver.Edge(options=options)
+            driver = webdriver.Edge(options=options, service=_service(EdgeService, service_created))
         elif browser_type.lower() == 'safari':
-            driver = webdriver.Safari()
+            driver = webdriver.Safari(service=_service(SafariService, service_created))
         else:
             logging.error(f"未対応のブラウザタイプ: {browser_type}")
             return None
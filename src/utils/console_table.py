@@ -0,0 +1,36 @@
+"""
+コマンドの実行結果を端末に表として表示するためのユーティリティモジュール
+"""
+import unicodedata
+from typing import List
+
+
+def display_width(text: str) -> int:
+    """
+    端末での表示幅を返す
+
+    Args:
+        text: 文字列
+
+    Returns:
+        表示幅（全角文字は2）
+    """
+    return sum(2 if unicodedata.east_asian_width(char) in ("F", "W") else 1 for char in text)
+
+
+def format_table(header: List[str], rows: List[List[str]]) -> str:
+    """
+    列の幅を揃えた表の文字列を作成する
+
+    Args:
+        header: 列見出し
+        rows: 行
+
+    Returns:
+        表の文字列（見出しの下に区切り線を入れる）
+    """
+    widths = [max(display_width(str(row[i])) for row in [header] + rows) for i in range(len(header))]
+    lines = ["  ".join(str(cell) + " " * (width - display_width(str(cell))) for cell, width in zip(row, widths)).rstrip()
+             for row in [header] + rows]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
@@ -0,0 +1,218 @@
+"""
+エラーメッセージの分類モジュール
+
+セッションやアクションのエラーメッセージから、URL、ID、数値などの実行ごとに異なる部分を
+プレースホルダーに置き換えたテンプレートを作成し、同じテンプレートのエラーを1つの分類として
+件数、初回・最終の発生日時、発生した操作ID、代表のスクリーンショットとともに集計する。
+分類の数には上限があり、上限を超えた新しいテンプレートは「その他のエラー」に集計するため、
+エラーの件数が増えてもメモリ使用量は一定に保たれる。
+"""
+import os
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+# 分類の数の上限を超えた場合の集計先
+OTHER_ERRORS = "その他のエラー"
+# 操作以外（初期化の失敗、タイムアウト等）のエラーの操作ID
+SESSION_ACTION_ID = "-"
+
+# 置き換えの対象（上から順に置き換える）
+_TEMPLATE_PATTERNS = (
+    (re.compile(r"\b(?:https?|wss?|file)://[^\s'\"<>()\[\]{}]+"), "<URL>"),
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?"), "<TIME>"),
+    (re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"), "<ID>"),
+    # セッションID、要素の参照などの英数字の混在した長いトークン、16進数
+    (re.compile(r"\b(?=[\w.-]*\d)(?=[\w.-]*[A-Za-z])[A-Za-z0-9][\w.-]{15,}\b"), "<ID>"),
+    (re.compile(r"\b(?:0x)?(?=[0-9a-fA-F]*\d)(?=[0-9a-fA-F]*[a-fA-F])[0-9a-fA-F]{8,}\b"), "<ID>"),
+    # 英字に続かない数値（h2、button3 などのセレクタの一部は残す）
+    (re.compile(r"(?<![A-Za-z0-9])\d+(?:[.,:]\d+)*"), "<N>"),
+    (re.compile(r"\s+"), " "),
+)
+
+
+def normalize_error(error: Any, max_length: int = 200) -> str:
+    """
+    エラー内訳の集計用にエラーメッセージを正規化する（1行目のみ、最大長で切り詰め）
+
+    Args:
+        error: エラーメッセージ
+        max_length: 最大長
+
+    Returns:
+        正規化したエラーメッセージ
+    """
+    lines = str(error).strip().splitlines()
+    message = lines[0].strip() if lines else ""
+    return message[:max_length] or "不明なエラー"
+
+
+def error_template(error: Any, max_length: int = 200) -> str:
+    """
+    エラーメッセージから実行ごとに異なる部分を置き換えたテンプレートを作成する
+
+    Args:
+        error: エラーメッセージ
+        max_length: 最大長
+
+    Returns:
+        テンプレート（例: "アクション <N> の実行に失敗しました: 要素が見つかりません: #login-button"）
+    """
+    template = normalize_error(error, max_length * 2)
+    for pattern, replacement in _TEMPLATE_PATTERNS:
+        template = pattern.sub(replacement, template)
+    return template.strip()[:max_length]
+
+
+def _error_screenshot(session: Dict[str, Any], prefix: str) -> Optional[str]:
+    """セッションのスクリーンショットから指定したプレフィックスのファイルを探す"""
+    for path in session.get("screenshots", []) or []:
+        if os.path.basename(str(path)).startswith(prefix):
+            return str(path)
+    return None
+
+
+class _Cluster:
+    """1つの分類の集計"""
+
+    __slots__ = ("template", "count", "first_seen", "last_seen", "action_counts", "example", "session_id",
+                 "screenshot")
+
+    def __init__(self, template: str, example: str, session_id: Any):
+        self.template = template
+        self.count = 0
+        self.first_seen: Optional[str] = None
+        self.last_seen: Optional[str] = None
+        # 操作IDごとの件数（初出順）
+        self.action_counts: Dict[str, int] = {}
+        self.example = example
+        self.session_id = session_id
+        self.screenshot: Optional[str] = None
+
+
+class ErrorClusters:
+    """エラーメッセージをテンプレートごとに逐次分類するクラス"""
+
+    def __init__(self, max_clusters: int = 100):
+        """
+        コンストラクタ
+
+        Args:
+            max_clusters: 保持する分類の数の上限（超えた場合は「その他のエラー」に集計する）
+        """
+        self.max_clusters = max(1, max_clusters)
+        self._clusters: Dict[str, _Cluster] = {}
+        self.total = 0
+
+    def __len__(self) -> int:
+        return len(self._clusters)
+
+    def add(self, action_id: Any, error: Any, occurred_at: Optional[str] = None, session_id: Any = None,
+            screenshot: Optional[str] = None) -> None:
+        """
+        エラーを1件分類する
+
+        Args:
+            action_id: 操作ID（操作以外のエラーは "-"）
+            error: エラーメッセージ
+            occurred_at: 発生日時（ISO形式）
+            session_id: セッションID
+            screenshot: エラー時のスクリーンショット（出力ディレクトリからの相対パス）
+        """
+        template = error_template(error)
+        cluster = self._clusters.get(template)
+        if cluster is None:
+            if len(self._clusters) >= self.max_clusters:
+                template = OTHER_ERRORS
+                cluster = self._clusters.get(template)
+            if cluster is None:
+                cluster = self._clusters[template] = _Cluster(template, normalize_error(error), session_id)
+        self.total += 1
+        cluster.count += 1
+        action_id = str(action_id)
+        cluster.action_counts[action_id] = cluster.action_counts.get(action_id, 0) + 1
+        if occurred_at:
+            occurred_at = str(occurred_at)
+            if cluster.first_seen is None or occurred_at < cluster.first_seen:
+                cluster.first_seen = occurred_at
+            if cluster.last_seen is None or occurred_at > cluster.last_seen:
+                cluster.last_seen = occurred_at
+        # 代表のスクリーンショットは最初に見つかったものを1件のみ保持する
+        if screenshot and cluster.screenshot is None:
+            cluster.screenshot = screenshot
+            cluster.session_id = session_id
+
+    def add_session(self, session: Dict[str, Any]) -> None:
+        """
+        セッションの結果のエラーを分類する（失敗したアクション、またはアクション以外のエラー）
+
+        Args:
+            session: セッションの実行結果
+        """
+        session_id = session.get("session_id")
+        session_time = session.get("end_time") or session.get("start_time")
+        failed = False
+        for action in session.get("actions", []):
+            if action.get("result", action.get("success", False)):
+                continue
+            failed = True
+            action_id = str(action.get("action_id", action.get("操作ID", "")))
+            self.add(action_id, action.get("error") or "", action.get("start_time") or session_time, session_id,
+                     _error_screenshot(session, f"error_{action_id}_"))
+        # アクション以外のエラー（初期化の失敗、タイムアウト等）
+        if not failed and not session.get("success", False):
+            screenshot = _error_screenshot(session, "exception_")
+            for error in session.get("errors", []) or ["不明なエラー"]:
+                self.add(SESSION_ACTION_ID, error, session_time, session_id, screenshot)
+
+    def clusters(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        分類を件数の多い順に返す
+
+        Args:
+            limit: 返す件数の上限（Noneの場合はすべて）
+
+        Returns:
+            template, count, first_seen, last_seen, action_ids（件数の多い順）, example, session_id,
+            screenshot のリスト
+        """
+        ordered = sorted(self._clusters.values(), key=lambda cluster: (-cluster.count, cluster.template))
+        if limit is not None:
+            ordered = ordered[:limit]
+        return [{
+            "template": cluster.template,
+            "count": cluster.count,
+            "first_seen": cluster.first_seen,
+            "last_seen": cluster.last_seen,
+            "action_ids": sorted(cluster.action_counts, key=lambda key: -cluster.action_counts[key]),
+            "example": cluster.example,
+            "session_id": cluster.session_id,
+            "screenshot": cluster.screenshot,
+        } for cluster in ordered]
+
+    def breakdown(self) -> List[Tuple[str, str, int]]:
+        """
+        操作IDと分類ごとの件数を件数の多い順に返す
+
+        Returns:
+            (操作ID, テンプレート, 件数) のリスト
+        """
+        return sorted(((action_id, cluster.template, count) for cluster in self._clusters.values()
+                       for action_id, count in cluster.action_counts.items()),
+                      key=lambda item: (-item[2], item[0], item[1]))
+
+
+def cluster_errors(sessions, max_clusters: int = 100) -> List[Dict[str, Any]]:
+    """
+    セッションの結果のエラーを分類する
+
+    Args:
+        sessions: セッションの実行結果
+        max_clusters: 分類の数の上限
+
+    Returns:
+        ErrorClusters.clusters の戻り値
+    """
+    clusters = ErrorClusters(max_clusters)
+    for session in sessions:
+        clusters.add_session(session)
+    return clusters.clusters()
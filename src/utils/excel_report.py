@@ -3,8 +3,16 @@ Excelレポート生成ユーティリティモジュール
 """
 import os
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
+
+from src.utils.page_timing import TIMING_FIELDS
+from src.utils.run_statistics import RunStatistics, STATUS_FAILURE, STATUS_NOT_RUN
+from src.utils.thumbnails import ThumbnailPool
+from src.utils.web_vitals import VITAL_FIELDS
 import gc
+import concurrent.futures
+import functools
+import math
 import tempfile
 import shutil
 import traceback
@@ -12,21 +20,525 @@ from datetime import datetime
 
 try:
     import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.chart import AreaChart, LineChart, Reference
     from openpyxl.drawing.image import Image
-    from openpyxl.styles import Alignment, PatternFill, Font, Border, Side
+    from openpyxl.styles import Alignment, PatternFill, Font, Border, Side, NamedStyle
     from openpyxl.utils import get_column_letter
     from PIL import Image as PILImage
     EXCEL_AVAILABLE = True
 except ImportError:
     import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.chart import AreaChart, LineChart, Reference
     from openpyxl.drawing.image import Image
-    from openpyxl.styles import Alignment, PatternFill, Font, Border, Side
+    from openpyxl.styles import Alignment, PatternFill, Font, Border, Side, NamedStyle
     from openpyxl.utils import get_column_letter
     from PIL import Image as PILImage
     EXCEL_AVAILABLE = False
 
 
-def generate_excel_report(results: Dict[str, Any], output_dir: str, config: Dict[str, Any]) -> str:
+def extract_action_id(path: str):
+    """
+    スクリーンショットのパスからアクションIDを抽出する
+    
+    Args:
+        path: スクリーンショットのパス（before_/after_/error_で始まるファイル名）
+        
+    Returns:
+        アクションID（抽出できない場合はNone）
+    """
+    # ファイル名からアクションIDを抽出
+    parts = os.path.basename(path).split('_')
+    if len(parts) >= 3:
+        if parts[0] in ['before', 'after', 'error']:
+            return parts[1]
+    return None
+
+
+def collect_screenshot_pairs(session_id, screenshot_dir: str):
+    """
+    セッションのExcel出力対象のスクリーンショットをアクションIDごとにグループ化する
+    
+    Args:
+        session_id: セッションID
+        screenshot_dir: スクリーンショットディレクトリ
+        
+    Returns:
+        (アクションIDごとのBefore/After/Errorのリスト, 見つからなかった場合のメッセージ)
+    """
+    # スクリーンショットディレクトリが存在するか確認
+    if not os.path.exists(screenshot_dir):
+        logging.warning(f"スクリーンショットディレクトリが存在しません: {screenshot_dir}")
+        return [], "スクリーンショットディレクトリが存在しません"
+        
+    # セッションIDに関連するスクリーンショットを検索
+    session_dir = os.path.join(screenshot_dir, f"session_{session_id}")
+    
+    if not os.path.exists(session_dir):
+        logging.warning(f"セッションディレクトリが存在しません: {session_dir}")
+        return [], "セッションディレクトリが存在しません"
+    
+    # セッションディレクトリ内のすべてのスクリーンショットを再帰的に検索
+    screenshots = []
+    for root, _, files in os.walk(session_dir):
+        for file in files:
+            if file.endswith('.png'):
+                # Excel出力フラグをチェック
+                marker_file = os.path.join(root, file + ".excel")
+                if os.path.exists(marker_file):  # Excel出力フラグがある場合のみ追加
+                    screenshots.append(os.path.join(root, file))
+                    logging.debug(f"Excel出力用スクリーンショット追加: {os.path.join(root, file)}")
+                else:
+                    logging.debug(f"Excel出力用マーカーファイルがないためスキップ: {marker_file}")
+    
+    if not screenshots:
+        logging.warning(f"セッション {session_id} のスクリーンショットが見つかりませんでした")
+        return [], "スクリーンショットが見つかりませんでした"
+    
+    # スクリーンショットをアクションIDでグループ化
+    action_screenshots = {}
+    for screenshot in screenshots:
+        action_id = extract_action_id(screenshot)
+        if action_id:
+            # ファイル名からセッションIDを抽出
+            filename = os.path.basename(screenshot)
+            parts = filename.split('_')
+            screenshot_session_id = None
+            
+            # ファイル名からセッションIDを抽出
+            for i, part in enumerate(parts):
+                if part == "session" and i + 1 < len(parts):
+                    try:
+                        screenshot_session_id = int(parts[i + 1])
+                        break
+                    except ValueError:
+                        pass
+            
+            # セッションIDが一致する場合のみ処理
+            if screenshot_session_id == session_id:
+                # 各アクションIDに対して複数のスクリーンショットを保持
+                if action_id not in action_screenshots:
+                    action_screenshots[action_id] = {'before': None, 'after': None, 'error': None}
+                
+                if filename.startswith('before'):
+                    action_screenshots[action_id]['before'] = screenshot
+                elif filename.startswith('after'):
+                    action_screenshots[action_id]['after'] = screenshot
+                elif filename.startswith('error'):
+                    action_screenshots[action_id]['error'] = screenshot
+            else:
+                logging.debug(f"セッションID不一致のためスキップ: {filename}, 期待: {session_id}, 実際: {screenshot_session_id}")
+    
+    # グループ化したスクリーンショットをリストに変換
+    screenshot_pairs = []
+    for action_id, pair in action_screenshots.items():
+        screenshot_pairs.append({
+            'action_id': action_id,
+            'before': pair['before'],
+            'after': pair['after'],
+            'error': pair['error']
+        })
+    
+    # アクションIDでソート
+    screenshot_pairs.sort(key=lambda x: int(x['action_id']) if x['action_id'].isdigit() else float('inf'))
+    return screenshot_pairs, None
+
+
+# スクリーンショットシートのアクション間の行数（原寸の画像を埋め込む場合）
+SCREENSHOT_ROW_SPAN = 50
+# 既定の行の高さ（15ポイント）と列幅1文字あたりのピクセル数
+ROW_HEIGHT_PX = 20
+COLUMN_CHAR_PX = 7
+
+
+def _screenshot_pair_images(pair: Dict[str, Any]):
+    """
+    スクリーンショットシートに表示する画像を返す
+    
+    Args:
+        pair: アクションIDごとのBefore/After/Error
+        
+    Returns:
+        (Before画像, After画像（エラー画像がある場合はエラー画像）)
+    """
+    return pair["before"], pair["error"] or pair["after"]
+
+
+def _screenshot_row_span(pair: Dict[str, Any], thumbnails: Dict[str, Dict[str, Any]] = None) -> int:
+    """
+    画像行から次のアクションまでの行数を返す（サムネイルの場合は画像の高さに合わせる）
+    
+    Args:
+        pair: アクションIDごとのBefore/After/Error
+        thumbnails: スクリーンショットのパスごとのサムネイル（Noneの場合は原寸の画像）
+        
+    Returns:
+        行数
+    """
+    if thumbnails is None:
+        return SCREENSHOT_ROW_SPAN
+    heights = [thumbnails[path]["height"] for path in _screenshot_pair_images(pair) if path in thumbnails]
+    if len(heights) < len([path for path in _screenshot_pair_images(pair) if path]):
+        # サムネイルの生成に失敗した画像は原寸で埋め込む
+        return SCREENSHOT_ROW_SPAN
+    return math.ceil(max(heights, default=0) / ROW_HEIGHT_PX) + 2
+
+
+def _screenshot_column_width(thumbnails: Dict[str, Dict[str, Any]] = None) -> float:
+    """スクリーンショットの画像列の幅（サムネイルの場合は最大の幅に合わせる）"""
+    if not thumbnails:
+        return 143
+    return max(thumbnail["width"] for thumbnail in thumbnails.values()) / COLUMN_CHAR_PX + 2
+
+
+def _write_exemplar_sheet(sheet, exemplars, header_fill, header_font, thin_border) -> None:
+    """
+    低速アクションのエグゼンプラー一覧シートを作成する
+    
+    Args:
+        sheet: 出力先のワークシート
+        exemplars: エグゼンプラー情報のリスト
+        header_fill: ヘッダーの塗りつぶし
+        header_font: ヘッダーのフォント
+        thin_border: 罫線
+    """
+    sheet["A1"] = "低速アクションのエグゼンプラー"
+    sheet["A1"].font = Font(size=14, bold=True)
+    sheet.merge_cells("A1:H1")
+    
+    headers = ["操作ID", "セッションID", "ユーザーID", "所要時間(秒)", "閾値(秒)",
+               "スクリーンショット", "ネットワーク", "パフォーマンス指標"]
+    for i, header in enumerate(headers):
+        cell = sheet.cell(row=3, column=i + 1, value=header)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.border = thin_border
+    
+    for row, exemplar in enumerate(exemplars, start=4):
+        sheet.cell(row=row, column=1, value=str(exemplar.get("action_id", "")))
+        sheet.cell(row=row, column=2, value=exemplar.get("session_id", ""))
+        sheet.cell(row=row, column=3, value=exemplar.get("user_id", ""))
+        sheet.cell(row=row, column=4, value=round(exemplar.get("duration", 0), 3))
+        sheet.cell(row=row, column=5, value=round(exemplar.get("threshold", 0), 3))
+        
+        # 証跡ファイルへのリンク（レポートはresultディレクトリにあるため親ディレクトリからの相対パス）
+        for col, key in ((6, "screenshot"), (7, "network"), (8, "metrics")):
+            path = exemplar.get(key)
+            cell = sheet.cell(row=row, column=col)
+            if path:
+                cell.value = os.path.basename(path)
+                cell.hyperlink = os.path.join("..", path).replace(os.sep, "/")
+                cell.font = Font(color="0563C1", underline="single")
+            else:
+                cell.value = "-"
+        
+        for col in range(1, len(headers) + 1):
+            sheet.cell(row=row, column=col).border = thin_border
+    
+    for col, width in zip("ABCDEFGH", (10, 12, 20, 14, 12, 20, 16, 20)):
+        sheet.column_dimensions[col].width = width
+
+
+# エラー分類シートの列（見出し, 幅）
+ERROR_CLUSTER_COLUMNS = (("件数", 8), ("エラー（テンプレート）", 60), ("操作ID", 14), ("初回", 22), ("最終", 22),
+                         ("例", 60), ("セッションID", 12), ("スクリーンショット", 30))
+
+
+def _error_cluster_values(cluster: Dict[str, Any]) -> List[Any]:
+    """エラー分類シートのスクリーンショット以外の列の値"""
+    return [cluster.get("count", 0), cluster.get("template", ""), ", ".join(cluster.get("action_ids", [])),
+            cluster.get("first_seen") or "-", cluster.get("last_seen") or "-", cluster.get("example", ""),
+            cluster.get("session_id") if cluster.get("session_id") is not None else "-"]
+
+
+def _write_error_cluster_sheet(sheet, clusters, header_fill, header_font, thin_border) -> None:
+    """
+    エラーの分類（テンプレートごとの件数）シートを作成する
+    
+    Args:
+        sheet: 出力先のワークシート
+        clusters: エラーの分類のリスト（件数の多い順）
+        header_fill: ヘッダーの塗りつぶし
+        header_font: ヘッダーのフォント
+        thin_border: 罫線
+    """
+    sheet["A1"] = "エラーの分類"
+    sheet["A1"].font = Font(size=14, bold=True)
+    sheet.merge_cells("A1:H1")
+    
+    for i, (header, _) in enumerate(ERROR_CLUSTER_COLUMNS):
+        cell = sheet.cell(row=3, column=i + 1, value=header)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.border = thin_border
+    
+    for row, cluster in enumerate(clusters, start=4):
+        for col, value in enumerate(_error_cluster_values(cluster), start=1):
+            sheet.cell(row=row, column=col, value=value)
+        # 代表のスクリーンショットへのリンク（レポートはresultディレクトリにあるため親ディレクトリからの相対パス）
+        path = cluster.get("screenshot")
+        cell = sheet.cell(row=row, column=len(ERROR_CLUSTER_COLUMNS))
+        if path:
+            cell.value = os.path.basename(path)
+            cell.hyperlink = os.path.join("..", path).replace(os.sep, "/")
+            cell.font = Font(color="0563C1", underline="single")
+        else:
+            cell.value = "-"
+        for col in (2, 6):
+            sheet.cell(row=row, column=col).alignment = Alignment(wrap_text=True, vertical="top")
+        for col in range(1, len(ERROR_CLUSTER_COLUMNS) + 1):
+            sheet.cell(row=row, column=col).border = thin_border
+    
+    for i, (_, width) in enumerate(ERROR_CLUSTER_COLUMNS):
+        sheet.column_dimensions[get_column_letter(i + 1)].width = width
+
+
+# ページ読み込みシートの列（見出し, 幅）
+PAGE_TIMING_COLUMNS = (("操作ID", 12), ("ページ数", 10),
+                       *((f"{label} p50(秒)", 14) for _, label in TIMING_FIELDS),
+                       *((f"{label} p95(秒)", 14) for _, label in TIMING_FIELDS),
+                       ("リソース数", 12), ("転送量(KB)", 12), ("キャッシュヒット率", 16))
+
+
+def _page_timing_values(row: Dict[str, Any]) -> List[Any]:
+    """ページ読み込みシートの1行の値（計測値がない項目は "-"）"""
+    def percentile_value(key: str, name: str) -> Any:
+        value = (row.get(key) or {}).get(name)
+        return round(value, 3) if value is not None else "-"
+    
+    ratio = row.get("cache_hit_ratio")
+    return [str(row.get("action_id", "")), row.get("pages", 0),
+            *(percentile_value(key, "p50") for key, _ in TIMING_FIELDS),
+            *(percentile_value(key, "p95") for key, _ in TIMING_FIELDS),
+            row.get("resources", 0), round((row.get("transfer_bytes") or 0) / 1024, 1),
+            f"{ratio * 100:.1f}%" if ratio is not None else "-"]
+
+
+def _write_page_timing_sheet(sheet, page_timing, header_fill, header_font, thin_border) -> None:
+    """
+    操作IDごとのページ読み込み（Navigation Timing / Resource Timing）のシートを作成する
+    
+    Args:
+        sheet: 出力先のワークシート
+        page_timing: 操作IDごとのページ読み込みの集計
+        header_fill: ヘッダーの塗りつぶし
+        header_font: ヘッダーのフォント
+        thin_border: 罫線
+    """
+    sheet["A1"] = "ページ読み込み"
+    sheet["A1"].font = Font(size=14, bold=True)
+    sheet.merge_cells(f"A1:{get_column_letter(len(PAGE_TIMING_COLUMNS))}1")
+    
+    for i, (header, _) in enumerate(PAGE_TIMING_COLUMNS):
+        cell = sheet.cell(row=3, column=i + 1, value=header)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.border = thin_border
+        cell.alignment = Alignment(wrap_text=True, horizontal="center", vertical="center")
+    
+    for row, action in enumerate(page_timing, start=4):
+        for col, value in enumerate(_page_timing_values(action), start=1):
+            cell = sheet.cell(row=row, column=col, value=value)
+            cell.border = thin_border
+    
+    for i, (_, width) in enumerate(PAGE_TIMING_COLUMNS):
+        sheet.column_dimensions[get_column_letter(i + 1)].width = width
+
+
+# Web Vitals シートの列（見出し, 幅）
+WEB_VITALS_COLUMNS = (("操作ID", 12), ("ページ", 40), ("件数", 8), ("所要時間 p50(秒)", 14), ("所要時間 p95(秒)", 14),
+                      *(column for _, label, _ in VITAL_FIELDS
+                        for column in ((f"{label} p75" + ("" if label == "CLS" else "(秒)"), 12),
+                                       (f"{label} 良好率", 12))),
+                      ("ロングタスク数", 14), ("ロングタスク合計(秒)", 18), ("ロングタスク最大(秒)", 18))
+
+
+def _web_vitals_values(row: Dict[str, Any]) -> List[Any]:
+    """Web Vitals シートの1行の値（値がない項目は "-"）"""
+    def rounded(value: Any) -> Any:
+        return round(value, 3) if value is not None else "-"
+    
+    latency = row.get("latency") or {}
+    values = [str(row.get("action_id", "")), row.get("page") or "-", row.get("samples", 0),
+              rounded(latency.get("p50")), rounded(latency.get("p95"))]
+    for key, _, _ in VITAL_FIELDS:
+        vital = row.get(key)
+        values.extend([rounded(vital.get("p75")), f"{vital['good'] * 100:.1f}%"] if vital else ["-", "-"])
+    values.extend([row.get("long_tasks", 0), rounded(row.get("long_task_time")), rounded(row.get("long_task_max"))])
+    return values
+
+
+def _write_web_vitals_sheet(sheet, web_vitals, header_fill, header_font, thin_border) -> None:
+    """
+    操作IDごとの Web Vitals とロングタスクのシートを作成する
+    
+    Args:
+        sheet: 出力先のワークシート
+        web_vitals: 操作IDごとの Web Vitals の集計
+        header_fill: ヘッダーの塗りつぶし
+        header_font: ヘッダーのフォント
+        thin_border: 罫線
+    """
+    sheet["A1"] = "Web Vitals"
+    sheet["A1"].font = Font(size=14, bold=True)
+    sheet.merge_cells(f"A1:{get_column_letter(len(WEB_VITALS_COLUMNS))}1")
+    
+    for i, (header, _) in enumerate(WEB_VITALS_COLUMNS):
+        cell = sheet.cell(row=3, column=i + 1, value=header)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.border = thin_border
+        cell.alignment = Alignment(wrap_text=True, horizontal="center", vertical="center")
+    
+    for row, action in enumerate(web_vitals, start=4):
+        for col, value in enumerate(_web_vitals_values(action), start=1):
+            cell = sheet.cell(row=row, column=col, value=value)
+            cell.border = thin_border
+    
+    for i, (_, width) in enumerate(WEB_VITALS_COLUMNS):
+        sheet.column_dimensions[get_column_letter(i + 1)].width = width
+
+
+def _write_recording_links(sheet, recording, start_row, header_fill, header_font) -> None:
+    """
+    画面録画（スクリーンキャスト）の操作IDごとのフレームへのリンクを出力する
+    
+    Args:
+        sheet: 出力先のワークシート
+        recording: 録画情報（index, frame_count, markers）
+        start_row: 出力を開始する行
+        header_fill: ヘッダーの塗りつぶし
+        header_font: ヘッダーのフォント
+    """
+    link_font = Font(color="0563C1", underline="single")
+    
+    title_cell = sheet.cell(row=start_row, column=1, value="画面録画")
+    title_cell.font = Font(size=12, bold=True)
+    index_cell = sheet.cell(row=start_row, column=2,
+                            value=f"インデックス ({recording.get('frame_count', 0)} フレーム)")
+    index_cell.hyperlink = os.path.join("..", recording.get("index", "")).replace(os.sep, "/")
+    index_cell.font = link_font
+    
+    row = start_row + 1
+    for col, header in ((1, "操作ID"), (2, "フレーム")):
+        cell = sheet.cell(row=row, column=col, value=header)
+        cell.fill = header_fill
+        cell.font = header_font
+    
+    for action_id, frame in recording.get("markers", {}).items():
+        row += 1
+        sheet.cell(row=row, column=1, value=action_id)
+        frame_cell = sheet.cell(row=row, column=2)
+        if frame:
+            frame_cell.value = os.path.basename(frame)
+            frame_cell.hyperlink = os.path.join("..", frame).replace(os.sep, "/")
+            frame_cell.font = link_font
+        else:
+            frame_cell.value = "-"
+
+
+TIMELINE_HEADERS = ["経過時間(秒)", "同時実行セッション数", "完了アクション数", "エラー数", "p50(秒)", "p95(秒)"]
+# 時系列シートのデータの開始行（1行目: タイトル、3行目: ヘッダー）
+TIMELINE_FIRST_ROW = 4
+
+
+def _timeline_rows(timeline: Dict[str, Any]) -> List[List[Any]]:
+    """
+    時系列シートのデータ行を作成する
+    
+    Args:
+        timeline: 実行中に収集した時系列（interval, buckets）
+        
+    Returns:
+        経過時間、同時実行数、完了アクション数、エラー数、p50、p95 の行のリスト
+        （アクションのない区間のパーセンタイルは空欄）
+    """
+    rows = []
+    for bucket in timeline.get("buckets", []):
+        row = [bucket.get("time", 0), bucket.get("active", 0), bucket.get("actions", 0), bucket.get("errors", 0)]
+        for key in ("p50", "p95"):
+            value = bucket.get(key)
+            row.append(round(value, 3) if isinstance(value, (int, float)) else None)
+        rows.append(row)
+    return rows
+
+
+def _add_timeline_charts(sheet, row_count: int) -> None:
+    """
+    時系列シートに同時実行数・スループット・レイテンシのグラフを追加する
+    
+    Args:
+        sheet: 時系列のデータを出力したワークシート
+        row_count: データの行数
+    """
+    if row_count == 0:
+        return
+    last_row = TIMELINE_FIRST_ROW + row_count - 1
+    categories = Reference(sheet, min_col=1, min_row=TIMELINE_FIRST_ROW, max_row=last_row)
+    
+    def series(chart, min_col, max_col):
+        # ヘッダー行を系列名として含める
+        data = Reference(sheet, min_col=min_col, max_col=max_col, min_row=TIMELINE_FIRST_ROW - 1, max_row=last_row)
+        chart.add_data(data, titles_from_data=True)
+        chart.set_categories(categories)
+        chart.x_axis.title = "経過時間(秒)"
+        chart.width = 24
+        chart.height = 8
+    
+    concurrency = AreaChart()
+    concurrency.title = "同時実行セッション数"
+    concurrency.y_axis.title = "セッション数"
+    series(concurrency, 2, 2)
+    sheet.add_chart(concurrency, "H3")
+    
+    throughput = LineChart()
+    throughput.title = "完了アクション数・エラー数（区間ごと）"
+    throughput.y_axis.title = "件数"
+    series(throughput, 3, 4)
+    sheet.add_chart(throughput, "H20")
+    
+    latency = LineChart()
+    latency.title = "アクションの所要時間"
+    latency.y_axis.title = "秒"
+    series(latency, 5, 6)
+    sheet.add_chart(latency, "H37")
+
+
+def _write_timeline_sheet(sheet, timeline: Dict[str, Any], header_fill, header_font, thin_border) -> None:
+    """
+    実行中の時系列のシートを作成する
+    
+    Args:
+        sheet: 出力先のワークシート
+        timeline: 実行中に収集した時系列（interval, buckets）
+        header_fill: ヘッダーの塗りつぶし
+        header_font: ヘッダーのフォント
+        thin_border: 罫線
+    """
+    sheet["A1"] = f"時系列（間隔: {timeline.get('interval', 0):g}秒）"
+    sheet["A1"].font = Font(size=14, bold=True)
+    sheet.merge_cells("A1:F1")
+    
+    for i, header in enumerate(TIMELINE_HEADERS):
+        cell = sheet.cell(row=TIMELINE_FIRST_ROW - 1, column=i + 1, value=header)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.border = thin_border
+    
+    rows = _timeline_rows(timeline)
+    for row, values in enumerate(rows, start=TIMELINE_FIRST_ROW):
+        for col, value in enumerate(values, start=1):
+            sheet.cell(row=row, column=col, value=value).border = thin_border
+    
+    for col, width in zip("ABCDEF", (14, 20, 16, 10, 10, 10)):
+        sheet.column_dimensions[col].width = width
+    sheet.freeze_panes = f"A{TIMELINE_FIRST_ROW}"
+    _add_timeline_charts(sheet, len(rows))
+
+
+def generate_excel_report(results: Dict[str, Any], output_dir: str, config: Dict[str, Any],
+                          excel_path: str = None) -> str:
     """
     テスト結果をExcelレポートとして出力する
     
@@ -34,6 +546,7 @@ def generate_excel_report(results: Dict[str, Any], output_dir: str, config: Dict
         results: テスト結果
         output_dir: 出力ディレクトリ
         config: 設定情報
+        excel_path: 出力先のExcelファイルのパス（Noneの場合は result/test_report.xlsx）
         
     Returns:
         Excelファイルのパス
@@ -60,12 +573,18 @@ def generate_excel_report(results: Dict[str, Any], output_dir: str, config: Dict
     screenshot_dir = os.path.join(output_dir, "screenshot")
     
     # Excelファイルのパス
-    excel_path = os.path.join(result_dir, "test_report.xlsx")
+    if excel_path is None:
+        excel_path = os.path.join(result_dir, "test_report.xlsx")
     
     # 一時ディレクトリの作成（画像処理用）
     temp_dir = tempfile.mkdtemp()
     temp_files = []
     
+    # サムネイルを埋め込む場合のサムネイル生成プール
+    thumbnail_width = config.get("thumbnail_width", 0)
+    thumbnail_pool = ThumbnailPool(output_dir, thumbnail_width, config.get("thumbnail_workers", 0)) \
+        if thumbnail_width else None
+    
     # 日付フォーマットを統一（2025-04-04 03:05:04形式）
     date_format = "%Y-%m-%d %H:%M:%S"
     current_time = datetime.now().strftime(date_format)
@@ -315,6 +834,36 @@ def generate_excel_report(results: Dict[str, Any], output_dir: str, config: Dict
         summary_sheet.column_dimensions["C"].width = 15
         summary_sheet.column_dimensions["D"].width = 15
         
+        # 実行中の時系列シート（サマリーの直後に配置）
+        timeline = results.get("timeline")
+        if timeline and timeline.get("buckets"):
+            timeline_sheet = wb.create_sheet("時系列")
+            _write_timeline_sheet(timeline_sheet, timeline, header_fill, header_font, thin_border)
+        
+        # エラーの分類シート（サマリーの直後に配置）
+        error_clusters = results.get("error_clusters", [])
+        if error_clusters:
+            error_cluster_sheet = wb.create_sheet("エラー分類")
+            _write_error_cluster_sheet(error_cluster_sheet, error_clusters, header_fill, header_font, thin_border)
+        
+        # ページ読み込みシート（サマリーの直後に配置）
+        page_timing = results.get("page_timing", [])
+        if page_timing:
+            page_timing_sheet = wb.create_sheet("ページ読み込み")
+            _write_page_timing_sheet(page_timing_sheet, page_timing, header_fill, header_font, thin_border)
+        
+        # Web Vitals シート（サマリーの直後に配置）
+        web_vitals = results.get("web_vitals", [])
+        if web_vitals:
+            web_vitals_sheet = wb.create_sheet("Web Vitals")
+            _write_web_vitals_sheet(web_vitals_sheet, web_vitals, header_fill, header_font, thin_border)
+        
+        # 低速アクションのエグゼンプラーシート（サマリーの直後に配置）
+        exemplars = results.get("exemplars", [])
+        if exemplars:
+            exemplar_sheet = wb.create_sheet("エグゼンプラー")
+            _write_exemplar_sheet(exemplar_sheet, exemplars, header_fill, header_font, thin_border)
+        
         # セッション詳細シートとスクリーンショットシートを交互に作成
         for session in results.get("sessions", []):
             session_id = session.get("session_id", "unknown")
@@ -427,6 +976,11 @@ def generate_excel_report(results: Dict[str, Any], output_dir: str, config: Dict
             session_sheet.column_dimensions["E"].width = 30
             session_sheet.column_dimensions["F"].width = 10
             
+            # 画面録画のアクション境界へのリンク
+            recording = session.get("recording")
+            if recording:
+                _write_recording_links(session_sheet, recording, session_sheet.max_row + 2, header_fill, header_font)
+            
             # 対応するスクリーンショットシートを作成（セッションシートの直後に）
             # シート名の最大長は31文字
             screenshot_sheet_name = f"スクリーンショット{session_id}"
@@ -439,100 +993,17 @@ def generate_excel_report(results: Dict[str, Any], output_dir: str, config: Dict
             screenshots_sheet["A1"].font = Font(size=14, bold=True)
             screenshots_sheet.merge_cells("A1:C1")
             
-            # スクリーンショットを収集
-            screenshots = []
-            
-            # スクリーンショットディレクトリが存在するか確認
-            if not os.path.exists(screenshot_dir):
-                logging.warning(f"スクリーンショットディレクトリが存在しません: {screenshot_dir}")
-                screenshots_sheet["A2"] = "スクリーンショットディレクトリが存在しません"
-                continue
-                
-            # セッションIDに関連するスクリーンショットを検索
-            session_dir = os.path.join(screenshot_dir, f"session_{session_id}")
-            
-            if not os.path.exists(session_dir):
-                logging.warning(f"セッションディレクトリが存在しません: {session_dir}")
-                screenshots_sheet["A2"] = "セッションディレクトリが存在しません"
-                continue
-            
-            # セッションディレクトリ内のすべてのスクリーンショットを再帰的に検索
-            for root, _, files in os.walk(session_dir):
-                for file in files:
-                    if file.endswith('.png'):
-                        # Excel出力フラグをチェック
-                        marker_file = os.path.join(root, file + ".excel")
-                        if os.path.exists(marker_file):  # Excel出力フラグがある場合のみ追加
-                            screenshots.append(os.path.join(root, file))
-                            logging.debug(f"Excel出力用スクリーンショット追加: {os.path.join(root, file)}")
-                        else:
-                            logging.debug(f"Excel出力用マーカーファイルがないためスキップ: {marker_file}")
-            
-            if not screenshots:
-                logging.warning(f"セッション {session_id} のスクリーンショットが見つかりませんでした")
-                screenshots_sheet["A2"] = "スクリーンショットが見つかりませんでした"
-                continue
-            
             # スクリーンショットをアクションIDでグループ化
-            screenshot_pairs = []
-            
-            # スクリーンショットのパスからアクションIDを抽出する関数
-            def extract_action_id(path):
-                # パスからファイル名を取得
-                filename = os.path.basename(path)
-                # ファイル名からアクションIDを抽出
-                parts = filename.split('_')
-                if len(parts) >= 3:
-                    if parts[0] in ['before', 'after', 'error']:
-                        return parts[1]
-                return None
-            
-            # スクリーンショットをアクションIDでグループ化
-            action_screenshots = {}
-            for screenshot in screenshots:
-                action_id = extract_action_id(screenshot)
-                if action_id:
-                    # ファイル名からセッションIDを抽出
-                    filename = os.path.basename(screenshot)
-                    parts = filename.split('_')
-                    screenshot_session_id = None
-                    
-                    # ファイル名からセッションIDを抽出
-                    for i, part in enumerate(parts):
-                        if part == "session" and i + 1 < len(parts):
-                            try:
-                                screenshot_session_id = int(parts[i + 1])
-                                break
-                            except ValueError:
-                                pass
-                    
-                    # セッションIDが一致する場合のみ処理
-                    if screenshot_session_id == session_id:
-                        # 各アクションIDに対して複数のスクリーンショットを保持
-                        if action_id not in action_screenshots:
-                            action_screenshots[action_id] = {'before': None, 'after': None, 'error': None}
-                        
-                        if filename.startswith('before'):
-                            action_screenshots[action_id]['before'] = screenshot
-                        elif filename.startswith('after'):
-                            action_screenshots[action_id]['after'] = screenshot
-                        elif filename.startswith('error'):
-                            action_screenshots[action_id]['error'] = screenshot
-                    else:
-                        logging.debug(f"セッションID不一致のためスキップ: {filename}, 期待: {session_id}, 実際: {screenshot_session_id}")
-            
-            
-            # グループ化したスクリーンショットをリストに変換
-            for action_id, pair in action_screenshots.items():
-                screenshot_pairs.append({
-                    'action_id': action_id,
-                    'before': pair['before'],
-                    'after': pair['after'],
-                    'error': pair['error']
-                })
+            screenshot_pairs, message = collect_screenshot_pairs(session_id, screenshot_dir)
+            if message:
+                screenshots_sheet["A2"] = message
+                continue
             
-            # アクションIDでソート
-            screenshot_pairs.sort(key=lambda x: int(x['action_id']) if x['action_id'].isdigit() else float('inf'))
+            # サムネイルの生成（セッションの画像をまとめて並列に生成）
+            thumbnails = None
+            if thumbnail_pool:
+                thumbnails = thumbnail_pool.generate(
+                    path for pair in screenshot_pairs for path in _screenshot_pair_images(pair))
             
             # スクリーンショットの表示
             row = 3
@@ -552,8 +1023,8 @@ def generate_excel_report(results: Dict[str, Any], output_dir: str, config: Dict
 
                 # 列幅の調整
                 screenshots_sheet.column_dimensions["A"].width = 20
-                screenshots_sheet.column_dimensions["B"].width = 143
-                screenshots_sheet.column_dimensions["C"].width = 143
+                screenshots_sheet.column_dimensions["B"].width = _screenshot_column_width(thumbnails)
+                screenshots_sheet.column_dimensions["C"].width = _screenshot_column_width(thumbnails)
                 
                 # ラベル行
                 row += 1
@@ -595,6 +1066,19 @@ def generate_excel_report(results: Dict[str, Any], output_dir: str, config: Dict
                     else:
                         screenshots_sheet[f"{after_col}{row}"] = "After:"
                 
+                # サムネイルの場合はラベルから原寸の画像を開けるようにする
+                if thumbnails is not None:
+                    before_image, after_image = _screenshot_pair_images(pair)
+                    for col, path, is_error in (("B", before_image, False),
+                                                ("C" if has_before else "B", after_image, bool(pair["error"]))):
+                        if not path:
+                            continue
+                        label_cell = screenshots_sheet[f"{col}{row}"]
+                        label_cell.hyperlink = os.path.relpath(
+                            path, os.path.dirname(os.path.abspath(excel_path))).replace(os.sep, "/")
+                        if not is_error:
+                            label_cell.font = Font(color="0563C1", underline="single")
+                
                 # 画像行
                 row += 1
                 
@@ -605,8 +1089,11 @@ def generate_excel_report(results: Dict[str, Any], output_dir: str, config: Dict
                         temp_file_before = os.path.join(temp_dir, f"temp_before_{session_id}_{action_id}_{idx}.png")
                         temp_files.append(temp_file_before)
                         
-                        # 画像をそのままコピー（リサイズなし）
-                        shutil.copy(pair["before"], temp_file_before)
+                        # 画像をそのままコピー（リサイズなし、サムネイルがある場合はサムネイルを使用）
+                        if thumbnails and pair["before"] in thumbnails:
+                            temp_file_before = thumbnails[pair["before"]]["path"]
+                        else:
+                            shutil.copy(pair["before"], temp_file_before)
                         
                         # Excelに挿入
                         excel_img = Image(temp_file_before)
@@ -629,8 +1116,11 @@ def generate_excel_report(results: Dict[str, Any], output_dir: str, config: Dict
                         temp_file_after = os.path.join(temp_dir, f"temp_after_{session_id}_{action_id}_{idx}.png")
                         temp_files.append(temp_file_after)
                         
-                        # 画像をそのままコピー（リサイズなし）
-                        shutil.copy(after_image, temp_file_after)
+                        # 画像をそのままコピー（リサイズなし、サムネイルがある場合はサムネイルを使用）
+                        if thumbnails and after_image in thumbnails:
+                            temp_file_after = thumbnails[after_image]["path"]
+                        else:
+                            shutil.copy(after_image, temp_file_after)
                         
                         # Excelに挿入
                         excel_img = Image(temp_file_after)
@@ -647,8 +1137,8 @@ def generate_excel_report(results: Dict[str, Any], output_dir: str, config: Dict
                         after_col = "B" if not pair["before"] else "C"
                         screenshots_sheet[f"{after_col}{row}"] = f"画像の挿入に失敗: {str(e)}"
                 
-                # 次のアクションのための行を確保（50行の間隔を開ける）
-                row += 50
+                # 次のアクションのための行を確保（原寸の画像の場合は50行の間隔を開ける）
+                row += _screenshot_row_span(pair, thumbnails)
         
         # ワークブックの保存
         # スクリーンショットシートの表示倍率を設定
@@ -673,6 +1163,9 @@ def generate_excel_report(results: Dict[str, Any], output_dir: str, config: Dict
         return ""
     
     finally:
+        if thumbnail_pool:
+            thumbnail_pool.close()
+        
         # 一時ファイルの削除
         for temp_file in temp_files:
             if os.path.exists(temp_file):
@@ -687,3 +1180,1317 @@ def generate_excel_report(results: Dict[str, Any], output_dir: str, config: Dict
                 shutil.rmtree(temp_dir)
             except:
                 pass
+
+
+# 書き込み専用ワークブックで共有する名前付きスタイル
+STYLE_TITLE = "report_title"
+STYLE_SECTION = "report_section"
+STYLE_LABEL = "report_label"
+STYLE_HEADER = "report_header"
+STYLE_CELL = "report_cell"
+STYLE_CELL_ALT = "report_cell_alt"
+STYLE_SUCCESS = "report_success"
+STYLE_FAILURE = "report_failure"
+STYLE_ERROR_MESSAGE = "report_error_message"
+STYLE_LINK = "report_link"
+STYLE_SCREENSHOT_TITLE = "report_screenshot_title"
+STYLE_ERROR_LABEL = "report_error_label"
+
+
+def _color(value: str) -> str:
+    """#付きの色コードをopenpyxl形式に変換する"""
+    return value.replace("#", "")
+
+
+def _register_report_styles(wb, config: Dict[str, Any]) -> None:
+    """
+    レポートで使用する名前付きスタイルをワークブックに登録する
+    
+    セルごとにAlignment/Border/Fillを生成せず、登録したスタイルを名前で共有する。
+    
+    Args:
+        wb: ワークブック
+        config: 設定情報（色の設定）
+    """
+    header_bg_color = _color(config.get("header_bg_color", "#4472C4"))
+    header_font_color = _color(config.get("header_font_color", "#FFFFFF"))
+    alt_row_color = _color(config.get("alt_row_color", "#E6F0FF"))
+    success_color = _color(config.get("success_color", "#C6EFCE"))
+    failure_color = _color(config.get("failure_color", "#FFC7CE"))
+    screenshot_title_cell_color = _color(config.get("screenshot_title_cell_color", "#ffebcd"))
+    
+    thin = Side(style='thin')
+    thin_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    center = Alignment(horizontal="center", vertical="center")
+    
+    # エラーラベルの文字色は背景色の明るさから決定する
+    r, g, b = (int(failure_color[i:i + 2], 16) for i in (0, 2, 4))
+    brightness = (r * 299 + g * 587 + b * 114) / 1000
+    error_label_font_color = "000000" if brightness >= 128 else "FFFFFF"
+    
+    def solid(color):
+        return PatternFill(start_color=color, end_color=color, fill_type="solid")
+    
+    styles = [
+        NamedStyle(name=STYLE_TITLE, font=Font(size=16, bold=True), alignment=center),
+        NamedStyle(name=STYLE_SECTION, font=Font(size=14, bold=True)),
+        NamedStyle(name=STYLE_LABEL, font=Font(bold=True)),
+        NamedStyle(name=STYLE_HEADER, font=Font(bold=True, color=header_font_color),
+                   fill=solid(header_bg_color), border=thin_border, alignment=center),
+        NamedStyle(name=STYLE_CELL, border=thin_border, alignment=center),
+        NamedStyle(name=STYLE_CELL_ALT, border=thin_border, alignment=center, fill=solid(alt_row_color)),
+        NamedStyle(name=STYLE_SUCCESS, border=thin_border, alignment=center, fill=solid(success_color)),
+        NamedStyle(name=STYLE_FAILURE, border=thin_border, alignment=center, fill=solid(failure_color)),
+        NamedStyle(name=STYLE_ERROR_MESSAGE, border=thin_border, fill=solid("FFEEEE")),
+        NamedStyle(name=STYLE_LINK, font=Font(color="0563C1", underline="single")),
+        NamedStyle(name=STYLE_SCREENSHOT_TITLE, font=Font(bold=True), fill=solid(screenshot_title_cell_color)),
+        NamedStyle(name=STYLE_ERROR_LABEL, font=Font(bold=True, color=error_label_font_color),
+                   fill=solid(failure_color)),
+    ]
+    for style in styles:
+        wb.add_named_style(style)
+
+
+def _styled(sheet, value, style: str = None, hyperlink: str = None):
+    """
+    名前付きスタイルを適用した書き込み専用セルを作成する
+    
+    Args:
+        sheet: 書き込み専用ワークシート
+        value: セルの値
+        style: 名前付きスタイル名
+        hyperlink: ハイパーリンク先
+        
+    Returns:
+        書き込み専用セル
+    """
+    cell = WriteOnlyCell(sheet, value=value)
+    if style:
+        cell.style = style
+    if hyperlink:
+        cell.hyperlink = hyperlink
+    return cell
+
+
+def _report_link(path: str, link_base: str = "..") -> str:
+    """
+    出力ディレクトリからの相対パスを、レポートからのリンクに変換する
+    
+    Args:
+        path: 出力ディレクトリからの相対パス
+        link_base: レポートの保存先から出力ディレクトリへの相対パス
+        
+    Returns:
+        リンク先のパス
+    """
+    return os.path.join(link_base, path).replace(os.sep, "/")
+
+
+def _sheet_name(name: str) -> str:
+    """シート名の最大長（31文字）に切り詰める"""
+    return name[:31]
+
+
+def _stream_summary_sheet(wb, results: Dict[str, Any], config: Dict[str, Any], current_time: str,
+                          session_links: Dict[Any, str] = None, index: int = None) -> None:
+    """
+    サマリーシートを書き込み専用で出力する
+    
+    Args:
+        wb: 書き込み専用ワークブック
+        results: テスト結果
+        config: 設定情報
+        current_time: レポートの実行日時
+        session_links: セッションIDごとの詳細シートへのリンク（シャード分割時に使用）
+        index: シートの挿入位置（Noneの場合は末尾）
+    """
+    sheet = wb.create_sheet("サマリー", index)
+    for col, width in zip("ABCD", (15, 25, 15, 15)):
+        sheet.column_dimensions[col].width = width
+    
+    report_title = config.get("report_title", "テスト実行結果報告書")
+    company_name = config.get("company_name", "")
+    project_name = config.get("project_name", "")
+    report_logo = config.get("report_logo", "")
+    include_timestamp = config.get("include_timestamp", True)
+    timestamp_format = config.get("timestamp_format", "%Y-%m-%d %H:%M:%S")
+    
+    sheet.merged_cells.add("A1:D1")
+    sheet.append([_styled(sheet, report_title, STYLE_TITLE)])
+    row = 1
+    
+    # 会社名・プロジェクト名・タイムスタンプ（設定されている場合のみ）
+    header_items = []
+    if company_name and company_name.strip():
+        header_items.append(("会社名:", company_name))
+    if project_name and project_name.strip():
+        header_items.append(("プロジェクト名:", project_name))
+    if include_timestamp:
+        header_items.append(("実行日時:", datetime.now().strftime(timestamp_format or "%Y-%m-%d %H:%M:%S")))
+    for label, value in header_items:
+        sheet.append([_styled(sheet, label, STYLE_LABEL), value])
+        row += 1
+    
+    # ロゴの追加（一時ファイルを作らず、表示サイズのみ調整する）
+    if report_logo and os.path.exists(report_logo):
+        try:
+            logo = Image(report_logo)
+            scale = 200 / logo.width
+            logo.width, logo.height = 200, int(logo.height * scale)
+            sheet.add_image(logo, "D2")
+        except Exception as e:
+            logging.error(f"ロゴの追加に失敗しました: {str(e)}")
+    
+    # 空行
+    sheet.append([])
+    sheet.append([])
+    row += 2
+    
+    # テスト結果サマリー
+    row += 1
+    sheet.merged_cells.add(f"A{row}:D{row}")
+    sheet.append([_styled(sheet, "テスト結果サマリー", STYLE_SECTION)])
+    sheet.append([_styled(sheet, header, STYLE_HEADER) for header in ("項目", "内容", "項目", "内容")])
+    row += 1
+    
+    sessions = results.get("sessions", [])
+    total_sessions = len(sessions)
+    success_sessions = sum(1 for session in sessions if session.get("success", False))
+    failure_sessions = total_sessions - success_sessions
+    success_rate = (success_sessions / total_sessions * 100) if total_sessions > 0 else 0
+    
+    if success_rate == 100:
+        rate_style = STYLE_SUCCESS
+    elif success_rate < 80:
+        rate_style = STYLE_FAILURE
+    else:
+        rate_style = STYLE_CELL
+    
+    summary_rows = [
+        ("実行日時", current_time, "テスト総数", f"{total_sessions} セッション", STYLE_CELL),
+        ("実行環境", config.get("browser", "chrome").capitalize(), "成功数",
+         f"{success_sessions} セッション", STYLE_SUCCESS),
+        ("実行ユーザー", ", ".join(results.get("app_users", [])), "失敗数", f"{failure_sessions} セッション",
+         STYLE_FAILURE if failure_sessions > 0 else STYLE_CELL),
+        ("", "", "成功率", f"{success_rate:.1f}%", rate_style),
+    ]
+    for label_a, value_a, label_c, value_c, style_d in summary_rows:
+        sheet.append([
+            _styled(sheet, label_a, STYLE_CELL),
+            _styled(sheet, value_a, STYLE_CELL),
+            _styled(sheet, label_c, STYLE_CELL),
+            _styled(sheet, value_c, style_d),
+        ])
+        row += 1
+    
+    # セッション一覧テーブル
+    sheet.append([])
+    row += 2
+    sheet.merged_cells.add(f"A{row}:D{row}")
+    sheet.append([_styled(sheet, "セッション一覧", STYLE_SECTION)])
+    sheet.append([_styled(sheet, header, STYLE_HEADER)
+                  for header in ("セッションID", "ユーザーID", "結果", "所要時間(秒)")])
+    
+    for i, session in enumerate(sessions):
+        cell_style = STYLE_CELL_ALT if i % 2 == 1 else STYLE_CELL
+        result = session.get("success", False)
+        session_id = session.get("session_id", "unknown")
+        link = (session_links or {}).get(session_id)
+        sheet.append([
+            _styled(sheet, session_id, cell_style, link),
+            _styled(sheet, session.get("user_id", ""), cell_style),
+            _styled(sheet, "成功" if result else "失敗", STYLE_SUCCESS if result else STYLE_FAILURE),
+            _styled(sheet, f"{session.get('duration', 0):.2f}", cell_style),
+        ])
+
+
+def _stream_exemplar_sheet(wb, exemplars, link_base: str = "..", index: int = None) -> None:
+    """
+    低速アクションのエグゼンプラー一覧シートを書き込み専用で出力する
+    
+    Args:
+        wb: 書き込み専用ワークブック
+        exemplars: エグゼンプラー情報のリスト
+        link_base: レポートの保存先から出力ディレクトリへの相対パス
+        index: シートの挿入位置（Noneの場合は末尾）
+    """
+    sheet = wb.create_sheet("エグゼンプラー", index)
+    for col, width in zip("ABCDEFGH", (10, 12, 20, 14, 12, 20, 16, 20)):
+        sheet.column_dimensions[col].width = width
+    
+    sheet.merged_cells.add("A1:H1")
+    sheet.append([_styled(sheet, "低速アクションのエグゼンプラー", STYLE_SECTION)])
+    sheet.append([])
+    sheet.append([_styled(sheet, header, STYLE_HEADER) for header in (
+        "操作ID", "セッションID", "ユーザーID", "所要時間(秒)", "閾値(秒)",
+        "スクリーンショット", "ネットワーク", "パフォーマンス指標")])
+    
+    for exemplar in exemplars:
+        cells = [
+            _styled(sheet, str(exemplar.get("action_id", "")), STYLE_CELL),
+            _styled(sheet, exemplar.get("session_id", ""), STYLE_CELL),
+            _styled(sheet, exemplar.get("user_id", ""), STYLE_CELL),
+            _styled(sheet, round(exemplar.get("duration", 0), 3), STYLE_CELL),
+            _styled(sheet, round(exemplar.get("threshold", 0), 3), STYLE_CELL),
+        ]
+        for key in ("screenshot", "network", "metrics"):
+            path = exemplar.get(key)
+            if path:
+                cells.append(_styled(sheet, os.path.basename(path), STYLE_LINK, _report_link(path, link_base)))
+            else:
+                cells.append(_styled(sheet, "-", STYLE_CELL))
+        sheet.append(cells)
+
+
+def _stream_error_cluster_sheet(wb, clusters, link_base: str = "..", index: int = None) -> None:
+    """
+    エラーの分類（テンプレートごとの件数）シートを書き込み専用で出力する
+    
+    Args:
+        wb: 書き込み専用ワークブック
+        clusters: エラーの分類のリスト（件数の多い順）
+        link_base: レポートの保存先から出力ディレクトリへの相対パス
+        index: シートの挿入位置（Noneの場合は末尾）
+    """
+    sheet = wb.create_sheet("エラー分類", index)
+    for i, (_, width) in enumerate(ERROR_CLUSTER_COLUMNS):
+        sheet.column_dimensions[get_column_letter(i + 1)].width = width
+    
+    sheet.merged_cells.add("A1:H1")
+    sheet.append([_styled(sheet, "エラーの分類", STYLE_SECTION)])
+    sheet.append([])
+    sheet.append([_styled(sheet, header, STYLE_HEADER) for header, _ in ERROR_CLUSTER_COLUMNS])
+    
+    for i, cluster in enumerate(clusters):
+        cell_style = STYLE_CELL_ALT if i % 2 == 1 else STYLE_CELL
+        values = _error_cluster_values(cluster)
+        cells = [_styled(sheet, value, STYLE_ERROR_MESSAGE if col in (1, 5) else cell_style)
+                 for col, value in enumerate(values)]
+        path = cluster.get("screenshot")
+        if path:
+            cells.append(_styled(sheet, os.path.basename(path), STYLE_LINK, _report_link(path, link_base)))
+        else:
+            cells.append(_styled(sheet, "-", cell_style))
+        sheet.append(cells)
+
+
+def _stream_page_timing_sheet(wb, page_timing, index: int = None) -> None:
+    """
+    操作IDごとのページ読み込みのシートを書き込み専用で出力する
+    
+    Args:
+        wb: 書き込み専用ワークブック
+        page_timing: 操作IDごとのページ読み込みの集計
+        index: シートの挿入位置（Noneの場合は末尾）
+    """
+    sheet = wb.create_sheet("ページ読み込み", index)
+    for i, (_, width) in enumerate(PAGE_TIMING_COLUMNS):
+        sheet.column_dimensions[get_column_letter(i + 1)].width = width
+    
+    sheet.merged_cells.add(f"A1:{get_column_letter(len(PAGE_TIMING_COLUMNS))}1")
+    sheet.append([_styled(sheet, "ページ読み込み", STYLE_SECTION)])
+    sheet.append([])
+    sheet.append([_styled(sheet, header, STYLE_HEADER) for header, _ in PAGE_TIMING_COLUMNS])
+    
+    for i, action in enumerate(page_timing):
+        cell_style = STYLE_CELL_ALT if i % 2 == 1 else STYLE_CELL
+        sheet.append([_styled(sheet, value, cell_style) for value in _page_timing_values(action)])
+
+
+def _stream_web_vitals_sheet(wb, web_vitals, index: int = None) -> None:
+    """
+    操作IDごとの Web Vitals とロングタスクのシートを書き込み専用で出力する
+    
+    Args:
+        wb: 書き込み専用ワークブック
+        web_vitals: 操作IDごとの Web Vitals の集計
+        index: シートの挿入位置（Noneの場合は末尾）
+    """
+    sheet = wb.create_sheet("Web Vitals", index)
+    for i, (_, width) in enumerate(WEB_VITALS_COLUMNS):
+        sheet.column_dimensions[get_column_letter(i + 1)].width = width
+    
+    sheet.merged_cells.add(f"A1:{get_column_letter(len(WEB_VITALS_COLUMNS))}1")
+    sheet.append([_styled(sheet, "Web Vitals", STYLE_SECTION)])
+    sheet.append([])
+    sheet.append([_styled(sheet, header, STYLE_HEADER) for header, _ in WEB_VITALS_COLUMNS])
+    
+    for i, action in enumerate(web_vitals):
+        cell_style = STYLE_CELL_ALT if i % 2 == 1 else STYLE_CELL
+        sheet.append([_styled(sheet, value, cell_style) for value in _web_vitals_values(action)])
+
+
+def _stream_timeline_sheet(wb, timeline: Dict[str, Any], index: int = None) -> None:
+    """
+    実行中の時系列のシートを書き込み専用で出力する
+    
+    Args:
+        wb: 書き込み専用ワークブック
+        timeline: 実行中に収集した時系列（interval, buckets）
+        index: シートの挿入位置（Noneの場合は末尾）
+    """
+    sheet = wb.create_sheet("時系列", index)
+    for col, width in zip("ABCDEF", (14, 20, 16, 10, 10, 10)):
+        sheet.column_dimensions[col].width = width
+    sheet.freeze_panes = f"A{TIMELINE_FIRST_ROW}"
+    
+    sheet.merged_cells.add("A1:F1")
+    sheet.append([_styled(sheet, f"時系列（間隔: {timeline.get('interval', 0):g}秒）", STYLE_SECTION)])
+    sheet.append([])
+    sheet.append([_styled(sheet, header, STYLE_HEADER) for header in TIMELINE_HEADERS])
+    
+    rows = _timeline_rows(timeline)
+    for values in rows:
+        sheet.append([_styled(sheet, value, STYLE_CELL) for value in values])
+    _add_timeline_charts(sheet, len(rows))
+
+
+def _stream_session_sheet(wb, session: Dict[str, Any], config: Dict[str, Any], current_time: str,
+                          link_base: str = "..") -> None:
+    """
+    セッション詳細シートを書き込み専用で出力する
+    
+    Args:
+        wb: 書き込み専用ワークブック
+        session: セッションの実行結果
+        config: 設定情報
+        current_time: レポートの実行日時
+        link_base: レポートの保存先から出力ディレクトリへの相対パス
+    """
+    session_id = session.get("session_id", "unknown")
+    sheet = wb.create_sheet(_sheet_name(f"セッション{session_id}"))
+    for col, width in zip("ABCDEF", (10, 15, 20, 20, 30, 10)):
+        sheet.column_dimensions[col].width = width
+    
+    sheet.merged_cells.add("A1:F1")
+    sheet.append([_styled(sheet, f"セッション{session_id} 詳細レポート", STYLE_TITLE)])
+    sheet.append([])
+    
+    # セッション情報テーブル
+    sheet.append([_styled(sheet, header, STYLE_HEADER)
+                  for header in ("セッションID", "ユーザーID", "実行日時", "結果", "所要時間", "テスト環境")])
+    success = session.get("success", False)
+    sheet.append([
+        _styled(sheet, session_id, STYLE_CELL),
+        _styled(sheet, session.get("user_id", ""), STYLE_CELL),
+        _styled(sheet, current_time, STYLE_CELL),
+        _styled(sheet, "成功" if success else "失敗", STYLE_SUCCESS if success else STYLE_FAILURE),
+        _styled(sheet, f"{session.get('duration', 0):.2f} 秒", STYLE_CELL),
+        _styled(sheet, config.get("browser", "chrome").capitalize(), STYLE_CELL),
+    ])
+    
+    # アクション一覧
+    sheet.append([_styled(sheet, header, STYLE_HEADER)
+                  for header in ("操作ID", "操作タイプ", "対象要素", "入力値", "説明", "結果")])
+    row = 5
+    
+    actions = session.get("actions", [])
+    if not actions:
+        row += 1
+        sheet.merged_cells.add(f"A{row}:F{row}")
+        sheet.append([_styled(sheet, "アクションデータがありません", STYLE_CELL)])
+    
+    for i, action in enumerate(actions):
+        row += 1
+        cell_style = STYLE_CELL_ALT if i % 2 == 1 else STYLE_CELL
+        result = action.get("result", action.get("success", False))
+        sheet.append([_styled(sheet, action.get(key, ""), cell_style)
+                      for key in ("操作ID", "操作タイプ", "対象要素", "入力値", "説明")]
+                     + [_styled(sheet, "成功" if result else "失敗", STYLE_SUCCESS if result else STYLE_FAILURE)])
+        
+        # エラーメッセージがある場合は表示
+        if not result and action.get("error"):
+            row += 1
+            sheet.merged_cells.add(f"B{row}:F{row}")
+            sheet.append([_styled(sheet, "エラー:", STYLE_CELL),
+                          _styled(sheet, action.get("error", ""), STYLE_ERROR_MESSAGE)])
+    
+    # 画面録画のアクション境界へのリンク
+    recording = session.get("recording")
+    if recording:
+        sheet.append([])
+        sheet.append([
+            _styled(sheet, "画面録画", STYLE_LABEL),
+            _styled(sheet, f"インデックス ({recording.get('frame_count', 0)} フレーム)", STYLE_LINK,
+                    _report_link(recording.get("index", ""), link_base))
+        ])
+        sheet.append([_styled(sheet, "操作ID", STYLE_HEADER), _styled(sheet, "フレーム", STYLE_HEADER)])
+        for action_id, frame in recording.get("markers", {}).items():
+            if frame:
+                sheet.append([action_id, _styled(sheet, os.path.basename(frame), STYLE_LINK,
+                                                 _report_link(frame, link_base))])
+            else:
+                sheet.append([action_id, "-"])
+
+
+def _stream_screenshot_sheet(wb, session: Dict[str, Any], screenshot_pairs, message, zoom_scale: int,
+                             thumbnails: Dict[str, Dict[str, Any]] = None, report_dir: str = None) -> None:
+    """
+    スクリーンショットシートを書き込み専用で出力する
+    
+    画像は一時ディレクトリにコピーせず、元のファイルを保存時に直接読み込む。
+    サムネイルを指定した場合はサムネイルを埋め込み、ラベルに原寸の画像へのリンクを設定する。
+    
+    Args:
+        wb: 書き込み専用ワークブック
+        session: セッションの実行結果
+        screenshot_pairs: アクションIDごとのスクリーンショット
+        message: スクリーンショットが見つからなかった場合のメッセージ
+        zoom_scale: 表示倍率（%）
+        thumbnails: スクリーンショットのパスごとのサムネイル（Noneの場合は原寸の画像を埋め込む）
+        report_dir: レポートの保存先ディレクトリ（原寸の画像へのリンクの基準）
+    """
+    session_id = session.get("session_id", "unknown")
+    sheet = wb.create_sheet(_sheet_name(f"スクリーンショット{session_id}"))
+    
+    # シートの表示設定と列幅は最初の行を書き込む前に設定する
+    sheet.sheet_view.zoomScale = zoom_scale
+    sheet.column_dimensions["A"].width = 20
+    sheet.column_dimensions["B"].width = _screenshot_column_width(thumbnails)
+    sheet.column_dimensions["C"].width = _screenshot_column_width(thumbnails)
+    
+    sheet.merged_cells.add("A1:C1")
+    sheet.append([_styled(sheet, f"セッション{session_id} スクリーンショット", STYLE_SECTION)])
+    if message:
+        sheet.append([message])
+        return
+    sheet.append([])
+    
+    actions = session.get("actions", [])
+    descriptions = {str(action.get("操作ID", "")): action.get("説明", "") for action in actions}
+    
+    row = 3
+    for pair in screenshot_pairs:
+        action_id = pair["action_id"]
+        
+        # アクションIDの表示
+        sheet.merged_cells.add(f"A{row}:C{row}")
+        sheet.append([_styled(sheet, f"アクション {action_id}: {descriptions.get(action_id, '')}",
+                              STYLE_SCREENSHOT_TITLE)])
+        
+        # ラベル行（Beforeがない場合はAfter/ErrorをB列に表示）
+        before_image, after_image = _screenshot_pair_images(pair)
+        after_col = "C" if pair["before"] else "B"
+        label_items = []
+        if pair["before"]:
+            label_items.append(("Before:", None, before_image))
+        if pair["error"]:
+            label_items.append(("Error:", STYLE_ERROR_LABEL, after_image))
+        elif pair["after"]:
+            label_items.append(("After:", None, after_image))
+        labels = [None]
+        for label, style, path in label_items:
+            if thumbnails is not None:
+                # サムネイルの場合はラベルから原寸の画像を開けるようにする
+                link = os.path.relpath(path, report_dir).replace(os.sep, "/")
+                labels.append(_styled(sheet, label, style or STYLE_LINK, link))
+            elif style:
+                labels.append(_styled(sheet, label, style))
+            else:
+                labels.append(label)
+        sheet.append(labels)
+        
+        # 画像行
+        image_row = row + 2
+        image_cells = [None, None, None]
+        for col, path in (("B", before_image), (after_col, after_image)):
+            if not path:
+                continue
+            try:
+                thumbnail = thumbnails.get(path) if thumbnails else None
+                sheet.add_image(Image(thumbnail["path"] if thumbnail else path), f"{col}{image_row}")
+            except Exception as e:
+                logging.error(f"画像の挿入に失敗しました: {str(e)}, パス: {path}")
+                image_cells[ord(col) - ord("A")] = f"画像の挿入に失敗: {str(e)}"
+        sheet.append(image_cells)
+        
+        # 次のアクションのための行を確保（原寸の画像の場合は画像行から50行の間隔を開ける）
+        row_span = _screenshot_row_span(pair, thumbnails)
+        for _ in range(row_span - 1):
+            sheet.append([])
+        row = image_row + row_span
+
+
+class StreamingExcelReportWriter:
+    """セッション単位でシートを追記する書き込み専用のExcelレポート"""
+    
+    def __init__(self, output_dir: str, config: Dict[str, Any], excel_path: str = None):
+        """
+        コンストラクタ
+        
+        Args:
+            output_dir: 出力ディレクトリ
+            config: 設定情報
+            excel_path: 出力先のExcelファイルのパス（Noneの場合は result/test_report.xlsx）
+        """
+        result_dir = os.path.join(output_dir, "result")
+        os.makedirs(result_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.config = config
+        self.excel_path = excel_path or os.path.join(result_dir, "test_report.xlsx")
+        self.screenshot_dir = os.path.join(output_dir, "screenshot")
+        self.zoom_scale = config.get("zoom_scale", 50)
+        self.link_base = os.path.relpath(os.path.abspath(output_dir),
+                                         os.path.dirname(os.path.abspath(self.excel_path)))
+        self.current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.session_count = 0
+        
+        # サムネイルを埋め込む場合のサムネイル生成プール（セッション間で再利用する）
+        thumbnail_width = config.get("thumbnail_width", 0)
+        self.thumbnails = ThumbnailPool(output_dir, thumbnail_width, config.get("thumbnail_workers", 0)) \
+            if thumbnail_width else None
+        
+        self.wb = openpyxl.Workbook(write_only=True)
+        _register_report_styles(self.wb, config)
+    
+    def add_session(self, session: Dict[str, Any]) -> None:
+        """
+        セッション詳細シートとスクリーンショットシートを追記する
+        
+        書き込み専用のシートは追記した時点で一時ファイルに書き出されるため、
+        セッションの実行結果を保持し続ける必要はない。
+        
+        Args:
+            session: セッションの実行結果
+        """
+        session_id = session.get("session_id", "unknown")
+        _stream_session_sheet(self.wb, session, self.config, self.current_time, self.link_base)
+        screenshot_pairs, message = collect_screenshot_pairs(session_id, self.screenshot_dir)
+        thumbnails = None
+        if self.thumbnails:
+            thumbnails = self.thumbnails.generate(
+                path for pair in screenshot_pairs for path in _screenshot_pair_images(pair))
+        _stream_screenshot_sheet(self.wb, session, screenshot_pairs, message, self.zoom_scale,
+                                 thumbnails, os.path.dirname(os.path.abspath(self.excel_path)))
+        self.session_count += 1
+    
+    def finish(self, results: Dict[str, Any]) -> str:
+        """
+        サマリー、時系列、エラー分類、エグゼンプラーの各シートを先頭に追加して保存する
+        
+        Args:
+            results: テスト結果
+            
+        Returns:
+            Excelファイルのパス
+        """
+        _stream_summary_sheet(self.wb, results, self.config, self.current_time, index=0)
+        index = 1
+        timeline = results.get("timeline")
+        if timeline and timeline.get("buckets"):
+            _stream_timeline_sheet(self.wb, timeline, index=index)
+            index += 1
+        error_clusters = results.get("error_clusters", [])
+        if error_clusters:
+            _stream_error_cluster_sheet(self.wb, error_clusters, self.link_base, index=index)
+            index += 1
+        page_timing = results.get("page_timing", [])
+        if page_timing:
+            _stream_page_timing_sheet(self.wb, page_timing, index=index)
+            index += 1
+        web_vitals = results.get("web_vitals", [])
+        if web_vitals:
+            _stream_web_vitals_sheet(self.wb, web_vitals, index=index)
+            index += 1
+        exemplars = results.get("exemplars", [])
+        if exemplars:
+            _stream_exemplar_sheet(self.wb, exemplars, self.link_base, index=index)
+        self.close()
+        self.wb.save(self.excel_path)
+        logging.info(f"Excelレポートを保存しました: {self.excel_path}")
+        return self.excel_path
+    
+    def close(self) -> None:
+        """サムネイル生成のワーカープロセスを終了する"""
+        if self.thumbnails:
+            self.thumbnails.close()
+
+
+def generate_excel_report_streaming(results: Dict[str, Any], output_dir: str, config: Dict[str, Any],
+                                    excel_path: str = None) -> str:
+    """
+    テスト結果を書き込み専用ワークブックでExcelレポートとして出力する
+    
+    generate_excel_report と同じ構成のレポートを、行単位のストリーミング書き込みで生成する。
+    スタイルは名前付きスタイルとして共有し、画像は一時ファイルへコピーしないため、
+    セッション数が増えてもメモリ使用量が一定に保たれる。
+    
+    Args:
+        results: テスト結果
+        output_dir: 出力ディレクトリ
+        config: 設定情報
+        excel_path: 出力先のExcelファイルのパス（Noneの場合は result/test_report.xlsx）
+        
+    Returns:
+        Excelファイルのパス（失敗した場合は空文字列）
+    """
+    if not EXCEL_AVAILABLE:
+        logging.error("openpyxlまたはPillowがインストールされていないため、Excelレポートを生成できません")
+        return ""
+    
+    writer = None
+    try:
+        writer = StreamingExcelReportWriter(output_dir, config, excel_path)
+        # セッション詳細シートとスクリーンショットシートを交互に作成
+        for session in results.get("sessions", []):
+            writer.add_session(session)
+        return writer.finish(results)
+    except Exception as e:
+        logging.error(f"Excelレポートの生成に失敗しました: {str(e)}")
+        logging.error(traceback.format_exc())
+        return ""
+    finally:
+        if writer:
+            writer.close()
+
+
+def split_into_shards(sessions: List[Dict[str, Any]], shard_size: int) -> List[List[Dict[str, Any]]]:
+    """
+    セッションをシャードサイズごとに分割する
+    
+    Args:
+        sessions: セッションの実行結果のリスト
+        shard_size: 1つのワークブックに含めるセッション数
+        
+    Returns:
+        シャードごとのセッションのリスト
+    """
+    shard_size = max(1, shard_size)
+    return [sessions[i:i + shard_size] for i in range(0, len(sessions), shard_size)]
+
+
+def _generate_report_shard(args) -> str:
+    """ワーカープロセスでシャードのワークブックを生成する"""
+    results, output_dir, config, excel_path = args
+    return generate_excel_report_streaming(results, output_dir, config, excel_path)
+
+
+def _stream_shard_sheet(wb, shards: List[Dict[str, Any]]) -> None:
+    """
+    シャードのワークブック一覧シートを書き込み専用で出力する
+    
+    Args:
+        wb: 書き込み専用ワークブック
+        shards: シャード情報（セッションID、成功数、インデックスからのリンク）のリスト
+    """
+    sheet = wb.create_sheet("シャード一覧")
+    for col, width in zip("ABCDEF", (10, 20, 12, 10, 10, 30)):
+        sheet.column_dimensions[col].width = width
+    
+    sheet.merged_cells.add("A1:F1")
+    sheet.append([_styled(sheet, "レポートファイル一覧", STYLE_SECTION)])
+    sheet.append([])
+    sheet.append([_styled(sheet, header, STYLE_HEADER)
+                  for header in ("シャード", "セッションID", "セッション数", "成功", "失敗", "ファイル")])
+    
+    for i, shard in enumerate(shards):
+        cell_style = STYLE_CELL_ALT if i % 2 == 1 else STYLE_CELL
+        session_ids = shard["session_ids"]
+        if shard["link"]:
+            file_cell = _styled(sheet, os.path.basename(shard["link"]), STYLE_LINK, shard["link"])
+        else:
+            file_cell = _styled(sheet, "生成に失敗しました", STYLE_FAILURE)
+        sheet.append([
+            _styled(sheet, i + 1, cell_style),
+            _styled(sheet, f"{session_ids[0]} - {session_ids[-1]}" if session_ids else "-", cell_style),
+            _styled(sheet, len(session_ids), cell_style),
+            _styled(sheet, shard["success"], cell_style),
+            _styled(sheet, len(session_ids) - shard["success"], cell_style),
+            file_cell,
+        ])
+
+
+def generate_excel_report_sharded(results: Dict[str, Any], output_dir: str, config: Dict[str, Any],
+                                  shard_size: int, workers: int = 0, excel_path: str = None) -> str:
+    """
+    テスト結果を複数のワークブックに分割してExcelレポートとして出力する
+    
+    セッションを shard_size 件ずつ result/shards/ 配下のワークブックに分割し、
+    各ワークブックを別プロセスで並列に生成する。result/test_report.xlsx には
+    全体のサマリー、エグゼンプラー、各ワークブックへのリンクのみを含むインデックスを出力する。
+    
+    Args:
+        results: テスト結果
+        output_dir: 出力ディレクトリ
+        config: 設定情報
+        shard_size: 1つのワークブックに含めるセッション数
+        workers: ワークブックを生成するプロセス数（0の場合はCPU数）
+        excel_path: インデックスのExcelファイルのパス（Noneの場合は result/test_report.xlsx、
+            それ以外の場合はシャードを <ファイル名>_shards/ 配下に保存する）
+        
+    Returns:
+        インデックスのExcelファイルのパス（失敗した場合は空文字列）
+    """
+    if not EXCEL_AVAILABLE:
+        logging.error("openpyxlまたはPillowがインストールされていないため、Excelレポートを生成できません")
+        return ""
+    
+    if excel_path is None:
+        result_dir = os.path.join(output_dir, "result")
+        shard_dir = os.path.join(result_dir, "shards")
+        index_path = os.path.join(result_dir, "test_report.xlsx")
+    else:
+        result_dir = os.path.dirname(os.path.abspath(excel_path))
+        shard_dir = os.path.join(result_dir, os.path.splitext(os.path.basename(excel_path))[0] + "_shards")
+        index_path = excel_path
+    os.makedirs(shard_dir, exist_ok=True)
+    
+    session_shards = split_into_shards(results.get("sessions", []), shard_size)
+    report_title = config.get("report_title", "テスト実行結果報告書")
+    tasks = []
+    for i, sessions in enumerate(session_shards):
+        shard_results = {"app_users": results.get("app_users", []), "sessions": sessions}
+        # シャードを並列に生成するため、サムネイルはシャードのプロセス内で順番に生成する
+        shard_config = {**config, "report_title": f"{report_title} ({i + 1}/{len(session_shards)})",
+                        "thumbnail_workers": 1}
+        shard_path = os.path.join(shard_dir, f"test_report_{i + 1:03d}.xlsx")
+        tasks.append((shard_results, output_dir, shard_config, shard_path))
+    
+    # シャードごとにワーカープロセスでワークブックを生成
+    workers = min(workers or os.cpu_count() or 1, max(1, len(tasks)))
+    shard_files = [""] * len(tasks)
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_generate_report_shard, task): i for i, task in enumerate(tasks)}
+            for future in concurrent.futures.as_completed(futures):
+                i = futures[future]
+                try:
+                    shard_files[i] = future.result()
+                except Exception as e:
+                    logging.error(f"シャード {i + 1} のExcelレポート生成に失敗しました: {str(e)}")
+    except (OSError, NotImplementedError) as e:
+        # プロセスを起動できない環境では順番に生成する
+        logging.warning(f"ワーカープロセスを起動できないため、シャードを順番に生成します: {str(e)}")
+        shard_files = [_generate_report_shard(task) for task in tasks]
+    
+    # インデックスのワークブック（サマリーと各シャードへのリンク）
+    shards = []
+    session_links = {}
+    for sessions, shard_file in zip(session_shards, shard_files):
+        link = os.path.relpath(shard_file, result_dir).replace(os.sep, "/") if shard_file else ""
+        shards.append({
+            "session_ids": [session.get("session_id", "unknown") for session in sessions],
+            "success": sum(1 for session in sessions if session.get("success", False)),
+            "link": link
+        })
+        if link:
+            for session in sessions:
+                session_id = session.get("session_id", "unknown")
+                session_links[session_id] = f"{link}#'{_sheet_name(f'セッション{session_id}')}'!A1"
+    
+    try:
+        wb = openpyxl.Workbook(write_only=True)
+        _register_report_styles(wb, config)
+        
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        _stream_summary_sheet(wb, results, config, current_time, session_links)
+        timeline = results.get("timeline")
+        if timeline and timeline.get("buckets"):
+            _stream_timeline_sheet(wb, timeline)
+        _stream_shard_sheet(wb, shards)
+        
+        error_clusters = results.get("error_clusters", [])
+        if error_clusters:
+            _stream_error_cluster_sheet(wb, error_clusters)
+        
+        page_timing = results.get("page_timing", [])
+        if page_timing:
+            _stream_page_timing_sheet(wb, page_timing)
+        web_vitals = results.get("web_vitals", [])
+        if web_vitals:
+            _stream_web_vitals_sheet(wb, web_vitals)
+        
+        exemplars = results.get("exemplars", [])
+        if exemplars:
+            _stream_exemplar_sheet(wb, exemplars)
+        
+        wb.save(index_path)
+        logging.info(f"Excelレポートを保存しました: {index_path} (シャード数: {len(shards)})")
+        return index_path
+    except Exception as e:
+        logging.error(f"Excelレポートのインデックス生成に失敗しました: {str(e)}")
+        logging.error(traceback.format_exc())
+        return ""
+
+
+def build_excel_report_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    設定ファイルの内容からExcelレポートの設定を取得する
+    
+    Args:
+        config: 設定ファイルの内容
+        
+    Returns:
+        Excelレポートの設定
+    """
+    return {
+        "report_title": config.get("report_title", "テスト実行結果報告書"),
+        "company_name": config.get("company_name", ""),
+        "project_name": config.get("project_name", ""),
+        "report_logo": config.get("report_logo", ""),
+        "zoom_scale": config.get("zoom_scale", 50),
+        "include_timestamp": config.get("include_timestamp", True),
+        "timestamp_format": config.get("timestamp_format", "%Y-%m-%d %H:%M:%S"),
+        "header_bg_color": config.get("header_bg_color", "#4472C4"),
+        "header_font_color": config.get("header_font_color", "#FFFFFF"),
+        "alt_row_color": config.get("alt_row_color", "#E6F0FF"),
+        "success_color": config.get("success_color", "#C6EFCE"),
+        "failure_color": config.get("failure_color", "#FFC7CE"),
+        "screenshot_title_cell_color": config.get("screenshot_title_cell_color", "#ffebcd"),
+        "thumbnail_width": config.get("report_thumbnail_width", 0),
+        "thumbnail_workers": config.get("report_thumbnail_workers", 0)
+    }
+
+
+def resolve_report_mode(mode: str, session_count: int, aggregate_threshold: int = 200) -> str:
+    """
+    レポートの構成を決定する
+    
+    Args:
+        mode: 設定値（detailed / aggregate / auto）
+        session_count: セッション数
+        aggregate_threshold: auto の場合に集計レポートにするセッション数の閾値
+        
+    Returns:
+        detailed（セッションごとのシート）または aggregate（集計シート）
+    """
+    mode = (mode or "detailed").lower()
+    if mode == "auto":
+        return "aggregate" if session_count > aggregate_threshold else "detailed"
+    return "aggregate" if mode == "aggregate" else "detailed"
+
+
+def select_excel_report_generator(engine: str, session_count: int, shard_size: int = 0, workers: int = 0,
+                                  mode: str = "detailed", statistics: RunStatistics = None):
+    """
+    生成方式とセッション数からExcelレポートの生成関数を選択する
+    
+    Args:
+        engine: 生成方式（standard / streaming）
+        session_count: セッション数
+        shard_size: 1つのワークブックに含めるセッション数（0の場合は分割しない）
+        workers: 分割したワークブックを生成するプロセス数（0の場合はCPU数）
+        mode: レポートの構成（resolve_report_mode の戻り値）
+        statistics: 集計レポートに使用する実行中に記録した統計（Noneの場合はテスト結果から作成）
+        
+    Returns:
+        generate_excel_report と同じ引数（results, output_dir, config, excel_path）を取る生成関数
+    """
+    if mode == "aggregate":
+        return functools.partial(generate_excel_report_aggregate, statistics=statistics)
+    if 0 < shard_size < session_count:
+        return functools.partial(generate_excel_report_sharded, shard_size=shard_size, workers=workers)
+    if engine == "streaming":
+        return generate_excel_report_streaming
+    return generate_excel_report
+
+
+# 集計レポートで出力するパーセンタイル
+AGGREGATE_PERCENTILES = (50, 90, 95, 99)
+
+
+def _number(value: float, digits: int = 3):
+    """数値を丸めてセルの値にする（NaNの場合は "-"）"""
+    return "-" if math.isnan(value) else round(value, digits)
+
+
+def _stream_aggregate_summary_sheet(wb, results: Dict[str, Any], statistics: RunStatistics,
+                                    config: Dict[str, Any], current_time: str) -> None:
+    """
+    集計レポートのサマリーシートを書き込み専用で出力する（セッションの一覧は出力しない）
+    
+    Args:
+        wb: 書き込み専用ワークブック
+        results: テスト結果（セッション以外の情報のみ参照する）
+        statistics: 実行全体の統計
+        config: 設定情報
+        current_time: レポートの実行日時
+    """
+    sheet = wb.create_sheet("サマリー")
+    for col, width in zip("ABCDEF", (15, 25, 15, 15, 12, 12)):
+        sheet.column_dimensions[col].width = width
+    
+    sheet.merged_cells.add("A1:D1")
+    sheet.append([_styled(sheet, config.get("report_title", "テスト実行結果報告書"), STYLE_TITLE)])
+    row = 1
+    
+    header_items = []
+    for label, key in (("会社名:", "company_name"), ("プロジェクト名:", "project_name")):
+        value = config.get(key, "")
+        if value and value.strip():
+            header_items.append((label, value))
+    if config.get("include_timestamp", True):
+        timestamp_format = config.get("timestamp_format", "%Y-%m-%d %H:%M:%S") or "%Y-%m-%d %H:%M:%S"
+        header_items.append(("実行日時:", datetime.now().strftime(timestamp_format)))
+    for label, value in header_items:
+        sheet.append([_styled(sheet, label, STYLE_LABEL), value])
+        row += 1
+    
+    sheet.append([])
+    row += 2
+    sheet.merged_cells.add(f"A{row}:D{row}")
+    sheet.append([_styled(sheet, "テスト結果サマリー", STYLE_SECTION)])
+    sheet.append([_styled(sheet, header, STYLE_HEADER) for header in ("項目", "内容", "項目", "内容")])
+    row += 1
+    
+    sessions = statistics.session_summary(AGGREGATE_PERCENTILES)
+    success_rate = (sessions["success"] / sessions["count"] * 100) if sessions["count"] > 0 else 0
+    if success_rate == 100:
+        rate_style = STYLE_SUCCESS
+    elif success_rate < 80:
+        rate_style = STYLE_FAILURE
+    else:
+        rate_style = STYLE_CELL
+    summary_rows = [
+        ("実行日時", current_time, "テスト総数", f"{sessions['count']} セッション", STYLE_CELL),
+        ("実行環境", config.get("browser", "chrome").capitalize(), "成功数",
+         f"{sessions['success']} セッション", STYLE_SUCCESS),
+        ("ユーザー数", f"{len(set(results.get('app_users', [])))} ユーザー", "失敗数",
+         f"{sessions['failure']} セッション", STYLE_FAILURE if sessions["failure"] > 0 else STYLE_CELL),
+        ("操作数", f"{len(statistics.action_ids)} 操作", "成功率", f"{success_rate:.1f}%", rate_style),
+    ]
+    for label_a, value_a, label_c, value_c, style_d in summary_rows:
+        sheet.append([
+            _styled(sheet, label_a, STYLE_CELL),
+            _styled(sheet, value_a, STYLE_CELL),
+            _styled(sheet, label_c, STYLE_CELL),
+            _styled(sheet, value_c, style_d),
+        ])
+        row += 1
+    
+    # セッションの所要時間の分布
+    sheet.append([])
+    row += 2
+    sheet.merged_cells.add(f"A{row}:F{row}")
+    sheet.append([_styled(sheet, "セッション所要時間(秒)", STYLE_SECTION)])
+    headers = ["平均"] + [f"p{p}" for p in AGGREGATE_PERCENTILES] + ["最大"]
+    sheet.append([_styled(sheet, header, STYLE_HEADER) for header in headers])
+    values = [sessions["mean"]] + [sessions[f"p{p}"] for p in AGGREGATE_PERCENTILES] + [sessions["max"]]
+    sheet.append([_styled(sheet, _number(value), STYLE_CELL) for value in values])
+
+
+def _stream_aggregate_matrix_sheet(wb, statistics: RunStatistics) -> None:
+    """
+    セッション×アクションの所要時間と結果の行列シートを書き込み専用で出力する
+    
+    先頭に操作IDごとの集計行（実行数、失敗数、平均、パーセンタイル、最大）を出力し、
+    その下にセッションごとの行を出力する。失敗したアクションのセルは失敗色、未実行は "-" とする。
+    
+    Args:
+        wb: 書き込み専用ワークブック
+        statistics: 実行全体の統計
+    """
+    sheet = wb.create_sheet("集計")
+    action_ids = statistics.action_ids
+    sheet.column_dimensions["A"].width = 12
+    sheet.column_dimensions["B"].width = 16
+    sheet.column_dimensions["C"].width = 8
+    sheet.column_dimensions["D"].width = 14
+    for i in range(len(action_ids)):
+        sheet.column_dimensions[get_column_letter(i + 5)].width = 12
+    # 見出し（操作ID・説明）とセッションの列を固定
+    sheet.freeze_panes = "E5"
+    
+    last_col = get_column_letter(max(4, len(action_ids) + 4))
+    sheet.merged_cells.add(f"A1:{last_col}1")
+    sheet.append([_styled(sheet, "セッション×アクション 所要時間(秒)", STYLE_SECTION)])
+    sheet.append([])
+    sheet.append([_styled(sheet, header, STYLE_HEADER) for header in ("セッションID", "ユーザーID", "結果", "所要時間(秒)")]
+                 + [_styled(sheet, action_id, STYLE_HEADER) for action_id in action_ids])
+    row = 4
+    sheet.merged_cells.add(f"A{row}:D{row}")
+    sheet.append([_styled(sheet, "説明", STYLE_LABEL), None, None, None]
+                 + [_styled(sheet, statistics.action_description(action_id), STYLE_CELL) for action_id in action_ids])
+    
+    # 操作IDごとの集計行
+    summaries = [statistics.action_summary(action_id, AGGREGATE_PERCENTILES) for action_id in action_ids]
+    stat_rows = [("実行数", "count"), ("失敗数", "failure"), ("平均", "mean")]
+    stat_rows += [(f"p{p}", f"p{p}") for p in AGGREGATE_PERCENTILES]
+    stat_rows += [("最大", "max")]
+    for label, key in stat_rows:
+        row += 1
+        sheet.merged_cells.add(f"A{row}:D{row}")
+        cells = [_styled(sheet, label, STYLE_LABEL), None, None, None]
+        for summary in summaries:
+            value = summary[key]
+            if key == "failure" and value > 0:
+                cells.append(_styled(sheet, value, STYLE_FAILURE))
+            else:
+                cells.append(_styled(sheet, _number(value) if isinstance(value, float) else value, STYLE_CELL_ALT))
+        sheet.append(cells)
+    
+    # セッションごとの行（完了順）
+    columns = [statistics.action_cells(action_id) for action_id in action_ids]
+    not_run = _styled(sheet, "-", STYLE_CELL)
+    for i in range(statistics.session_count):
+        success = statistics.successes[i] == 1
+        cells = [
+            _styled(sheet, statistics.session_ids[i], STYLE_CELL),
+            _styled(sheet, statistics.user_ids[i], STYLE_CELL),
+            _styled(sheet, "成功" if success else "失敗", STYLE_SUCCESS if success else STYLE_FAILURE),
+            _styled(sheet, round(statistics.durations[i], 3), STYLE_CELL),
+        ]
+        # セル数が多いため、書式は失敗・未実行のセルのみに設定する
+        for latencies, statuses in columns:
+            status = statuses[i]
+            if status == STATUS_NOT_RUN:
+                cells.append(not_run)
+            elif status == STATUS_FAILURE:
+                cells.append(_styled(sheet, _number(latencies[i]), STYLE_FAILURE))
+            else:
+                cells.append(_number(latencies[i]))
+        sheet.append(cells)
+
+
+def _stream_error_breakdown_sheet(wb, statistics: RunStatistics) -> None:
+    """
+    エラー内訳シートを書き込み専用で出力する
+    
+    Args:
+        wb: 書き込み専用ワークブック
+        statistics: 実行全体の統計
+    """
+    sheet = wb.create_sheet("エラー内訳")
+    for col, width in zip("ABC", (12, 100, 10)):
+        sheet.column_dimensions[col].width = width
+    
+    sheet.merged_cells.add("A1:C1")
+    sheet.append([_styled(sheet, "エラー内訳", STYLE_SECTION)])
+    sheet.append([])
+    sheet.append([_styled(sheet, header, STYLE_HEADER) for header in ("操作ID", "エラー", "件数")])
+    
+    breakdown = statistics.error_breakdown()
+    if not breakdown:
+        sheet.append([_styled(sheet, "エラーはありません", STYLE_CELL)])
+    for i, (action_id, message, count) in enumerate(breakdown):
+        cell_style = STYLE_CELL_ALT if i % 2 == 1 else STYLE_CELL
+        sheet.append([
+            _styled(sheet, action_id, cell_style),
+            _styled(sheet, message, STYLE_ERROR_MESSAGE),
+            _styled(sheet, count, cell_style),
+        ])
+
+
+def generate_excel_report_aggregate(results: Dict[str, Any], output_dir: str, config: Dict[str, Any],
+                                    excel_path: str = None, statistics: RunStatistics = None) -> str:
+    """
+    テスト結果を集計レポート（セッションごとのシートなし）として出力する
+    
+    サマリー、セッション×アクションの所要時間の行列と操作IDごとのパーセンタイル、
+    エラーの分類、エラー内訳の各シートを書き込み専用ワークブックで出力する。実行中に記録した統計を
+    使用するため、セッションの結果を走査せずに大規模な実行のレポートを生成できる。
+    
+    Args:
+        results: テスト結果（statistics を指定した場合はセッション以外の情報のみ参照する）
+        output_dir: 出力ディレクトリ
+        config: 設定情報
+        excel_path: 出力先のExcelファイルのパス（Noneの場合は result/test_report.xlsx）
+        statistics: 実行中に記録した統計（Noneの場合はテスト結果から作成する）
+        
+    Returns:
+        Excelファイルのパス（失敗した場合は空文字列）
+    """
+    if not EXCEL_AVAILABLE:
+        logging.error("openpyxlまたはPillowがインストールされていないため、Excelレポートを生成できません")
+        return ""
+    
+    result_dir = os.path.join(output_dir, "result")
+    os.makedirs(result_dir, exist_ok=True)
+    if excel_path is None:
+        excel_path = os.path.join(result_dir, "test_report.xlsx")
+    link_base = os.path.relpath(os.path.abspath(output_dir), os.path.dirname(os.path.abspath(excel_path)))
+    
+    try:
+        if statistics is None:
+            statistics = RunStatistics.from_results(results)
+        
+        wb = openpyxl.Workbook(write_only=True)
+        _register_report_styles(wb, config)
+        
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        _stream_aggregate_summary_sheet(wb, results, statistics, config, current_time)
+        timeline = results.get("timeline")
+        if timeline and timeline.get("buckets"):
+            _stream_timeline_sheet(wb, timeline)
+        _stream_aggregate_matrix_sheet(wb, statistics)
+        error_clusters = results.get("error_clusters", [])
+        if error_clusters:
+            _stream_error_cluster_sheet(wb, error_clusters, link_base)
+        _stream_error_breakdown_sheet(wb, statistics)
+        page_timing = results.get("page_timing", [])
+        if page_timing:
+            _stream_page_timing_sheet(wb, page_timing)
+        web_vitals = results.get("web_vitals", [])
+        if web_vitals:
+            _stream_web_vitals_sheet(wb, web_vitals)
+        
+        exemplars = results.get("exemplars", [])
+        if exemplars:
+            _stream_exemplar_sheet(wb, exemplars, link_base)
+        
+        wb.save(excel_path)
+        logging.info(f"Excelレポート（集計）を保存しました: {excel_path}")
+        return excel_path
+    except Exception as e:
+        logging.error(f"Excelレポートの生成に失敗しました: {str(e)}")
+        logging.error(traceback.format_exc())
+        return ""
+
+
+# 比較レポートの判定の表示名と書式
+COMPARISON_VERDICTS = {
+    "slower": ("悪化", STYLE_FAILURE),
+    "faster": ("改善", STYLE_SUCCESS),
+    "same": ("差なし", STYLE_CELL),
+    "added": ("候補のみ", STYLE_CELL_ALT),
+    "removed": ("基準のみ", STYLE_CELL_ALT),
+}
+
+
+def _percent(value: float, digits: int = 1):
+    """割合を百分率のセルの値にする（NaNの場合は "-"）"""
+    return "-" if math.isnan(value) else round(value * 100, digits)
+
+
+def _stream_comparison_sheet(wb, comparison: Dict[str, Any], labels: Tuple[str, str],
+                             config: Dict[str, Any]) -> None:
+    """
+    比較シート（セッションの集計と操作IDごとの所要時間・エラー率の差）を書き込み専用で出力する
+    
+    Args:
+        wb: 書き込み専用ワークブック
+        comparison: compare_statistics の戻り値
+        labels: (基準の実行ID, 候補の実行ID)
+        config: 設定情報
+    """
+    sheet = wb.create_sheet("比較")
+    widths = (10, 24) + (10,) * 18
+    for i, width in enumerate(widths):
+        sheet.column_dimensions[get_column_letter(i + 1)].width = width
+    sheet.freeze_panes = "C13"
+    confidence = f"{comparison['confidence'] * 100:.0f}%"
+    
+    sheet.merged_cells.add("A1:F1")
+    sheet.append([_styled(sheet, f"{config.get('report_title', 'テスト実行結果報告書')}（実行の比較）", STYLE_TITLE)])
+    sheet.append([_styled(sheet, "基準:", STYLE_LABEL), labels[0]])
+    sheet.append([_styled(sheet, "候補:", STYLE_LABEL), labels[1]])
+    sheet.append([_styled(sheet, "差の信頼区間:", STYLE_LABEL),
+                  f"{confidence}（ブートストラップ {comparison['iterations']} 回）"])
+    sheet.append([])
+    
+    # セッションの集計
+    sessions = comparison["sessions"]
+    sheet.append([_styled(sheet, header, STYLE_HEADER)
+                  for header in ("項目", "", "基準", "候補", "差", "下限", "上限")])
+    sheet.merged_cells.add("A6:B6")
+    rate_delta, rate_low, rate_high = sessions["failure_rate"]
+    count_a, count_b = sessions["count"]
+    failure_a, failure_b = sessions["failure"]
+    rows = [
+        ("セッション数", count_a, count_b, count_b - count_a, "-", "-"),
+        ("失敗率(%)", _percent(failure_a / count_a if count_a else math.nan),
+         _percent(failure_b / count_b if count_b else math.nan),
+         _percent(rate_delta), _percent(rate_low), _percent(rate_high)),
+    ]
+    for p in (50, 95):
+        item = sessions["duration"][f"p{p}"]
+        rows.append((f"所要時間 p{p}(秒)", _number(item["a"]), _number(item["b"]), _number(item["delta"]),
+                     _number(item["ci"][0]), _number(item["ci"][1])))
+    for row_index, (label, *values) in enumerate(rows, start=7):
+        sheet.merged_cells.add(f"A{row_index}:B{row_index}")
+        sheet.append([_styled(sheet, label, STYLE_LABEL), None]
+                     + [_styled(sheet, value, STYLE_CELL) for value in values])
+    sheet.append([])
+    
+    # 操作IDごとの比較
+    headers = ["操作ID", "説明", "実行数(基準)", "実行数(候補)"]
+    for p in (50, 95):
+        headers += [f"p{p}(基準)", f"p{p}(候補)", f"p{p}の差", "下限", "上限", "変化率(%)"]
+    headers += ["エラー率(基準)(%)", "エラー率(候補)(%)", "エラー率の差(%)", "判定"]
+    sheet.append([_styled(sheet, header, STYLE_HEADER) for header in headers])
+    for i, action in enumerate(comparison["actions"]):
+        cell_style = STYLE_CELL_ALT if i % 2 == 1 else STYLE_CELL
+        values = [action["action_id"], action["description"], action["count"][0], action["count"][1]]
+        for p in (50, 95):
+            item = action[f"p{p}"]
+            values += [_number(item["a"]), _number(item["b"]), _number(item["delta"]),
+                       _number(item["ci"][0]), _number(item["ci"][1]), _percent(item["change"])]
+        rate_delta = action["failure_rate"][0]
+        count_a, count_b = action["count"]
+        values += [_percent(action["failure"][0] / count_a if count_a else math.nan),
+                   _percent(action["failure"][1] / count_b if count_b else math.nan),
+                   _percent(rate_delta)]
+        label, verdict_style = COMPARISON_VERDICTS.get(action["verdict"], ("-", STYLE_CELL))
+        sheet.append([_styled(sheet, value, cell_style) for value in values] + [_styled(sheet, label, verdict_style)])
+
+
+def _stream_error_comparison_sheet(wb, comparison: Dict[str, Any]) -> None:
+    """
+    エラー比較シート（操作IDとエラーメッセージごとの件数の差）を書き込み専用で出力する
+    
+    Args:
+        wb: 書き込み専用ワークブック
+        comparison: compare_statistics の戻り値
+    """
+    sheet = wb.create_sheet("エラー比較")
+    for col, width in zip("ABCDEF", (12, 90, 12, 12, 10, 10)):
+        sheet.column_dimensions[col].width = width
+    
+    sheet.merged_cells.add("A1:F1")
+    sheet.append([_styled(sheet, "エラー比較", STYLE_SECTION)])
+    sheet.append([])
+    sheet.append([_styled(sheet, header, STYLE_HEADER)
+                  for header in ("操作ID", "エラー", "件数(基準)", "件数(候補)", "差", "状態")])
+    if not comparison["errors"]:
+        sheet.append([_styled(sheet, "エラーはありません", STYLE_CELL)])
+    for i, error in enumerate(comparison["errors"]):
+        cell_style = STYLE_CELL_ALT if i % 2 == 1 else STYLE_CELL
+        count_a, count_b = error["count"]
+        if count_a == 0:
+            status = _styled(sheet, "新規", STYLE_FAILURE)
+        elif count_b == 0:
+            status = _styled(sheet, "解消", STYLE_SUCCESS)
+        else:
+            status = _styled(sheet, "-", cell_style)
+        sheet.append([
+            _styled(sheet, error["action_id"], cell_style),
+            _styled(sheet, error["message"], STYLE_ERROR_MESSAGE),
+            _styled(sheet, count_a, cell_style),
+            _styled(sheet, count_b, cell_style),
+            _styled(sheet, count_b - count_a, cell_style),
+            status,
+        ])
+
+
+def generate_comparison_report(comparison: Dict[str, Any], excel_path: str, config: Dict[str, Any],
+                               labels: Tuple[str, str] = ("A", "B")) -> str:
+    """
+    2つの実行の比較をExcelファイルに出力する
+    
+    Args:
+        comparison: compare_statistics の戻り値
+        excel_path: 出力先のExcelファイルのパス
+        config: 設定情報（タイトルと色の設定）
+        labels: (基準の実行ID, 候補の実行ID)
+        
+    Returns:
+        Excelファイルのパス（失敗した場合は空文字列）
+    """
+    if not EXCEL_AVAILABLE:
+        logging.error("openpyxlまたはPillowがインストールされていないため、Excelレポートを生成できません")
+        return ""
+    
+    try:
+        directory = os.path.dirname(os.path.abspath(excel_path))
+        os.makedirs(directory, exist_ok=True)
+        wb = openpyxl.Workbook(write_only=True)
+        _register_report_styles(wb, config)
+        _stream_comparison_sheet(wb, comparison, labels, config)
+        _stream_error_comparison_sheet(wb, comparison)
+        wb.save(excel_path)
+        logging.info(f"比較レポートを保存しました: {excel_path}")
+        return excel_path
+    except Exception as e:
+        logging.error(f"比較レポートの生成に失敗しました: {str(e)}")
+        logging.error(traceback.format_exc())
+        return ""
@@ -0,0 +1,154 @@
+"""
+低速アクションのエグゼンプラー（証跡）収集モジュール
+
+操作IDごとに直近の所要時間からベースラインを保持し、閾値を超えた
+低速アクションについてのみ証跡（スクリーンショット、ネットワーク、
+パフォーマンス指標）を収集する。証跡は操作IDごとに遅い順に上位N件のみ保持する。
+"""
+import heapq
+import os
+import shutil
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional, Deque, Tuple
+
+from src.utils.logger import setup_logger
+from src.utils.toml_utils import get_bool, get_float, get_int
+
+
+class ExemplarCollector:
+    """実行全体で共有される低速アクションのエグゼンプラー管理クラス"""
+
+    def __init__(self, output_dir: str, threshold_factor: float = 2.0, percentile: float = 95.0,
+                 min_samples: int = 20, window: int = 200, keep: int = 3):
+        """
+        コンストラクタ
+
+        Args:
+            output_dir: 出力ディレクトリ
+            threshold_factor: ベースラインのパーセンタイル値に掛ける倍率
+            percentile: ベースラインに使用するパーセンタイル（0-100）
+            min_samples: 閾値判定を開始するまでに必要なサンプル数
+            window: ベースラインとして保持する直近のサンプル数
+            keep: 操作IDごとに保持するエグゼンプラーの最大数
+        """
+        self.output_dir = output_dir
+        self.exemplar_dir = os.path.join(output_dir, "exemplar")
+        self.threshold_factor = threshold_factor
+        self.percentile = percentile
+        self.min_samples = max(1, min_samples)
+        self.window = max(self.min_samples, window)
+        self.keep = max(1, keep)
+        self.logger = setup_logger("ExemplarCollector")
+
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        # 操作IDごとの (所要時間, 連番, エグゼンプラー) の最小ヒープ
+        self._exemplars: Dict[str, List[Tuple[float, int, Dict[str, Any]]]] = {}
+        self._sequence = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], output_dir: str) -> Optional["ExemplarCollector"]:
+        """
+        設定からコレクタを作成する
+
+        Args:
+            config: 設定情報
+            output_dir: 出力ディレクトリ
+
+        Returns:
+            エグゼンプラーモードが無効の場合はNone
+        """
+        if not get_bool(config, 'exemplar_mode', False):
+            return None
+        return cls(
+            output_dir,
+            threshold_factor=get_float(config, 'exemplar_threshold_factor', 2.0),
+            percentile=get_float(config, 'exemplar_percentile', 95.0),
+            min_samples=get_int(config, 'exemplar_min_samples', 20),
+            window=get_int(config, 'exemplar_window', 200),
+            keep=get_int(config, 'exemplar_keep', 3)
+        )
+
+    def _threshold(self, samples: Deque[float]) -> Optional[float]:
+        """ベースラインから閾値を計算する（サンプル不足の場合はNone）"""
+        if len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(self.percentile / 100.0 * (len(ordered) - 1))))
+        return ordered[index] * self.threshold_factor
+
+    def observe(self, action_id: Any, duration: float) -> Optional[float]:
+        """
+        アクションの所要時間を記録し、証跡を収集すべきか判定する
+
+        Args:
+            action_id: 操作ID
+            duration: 所要時間（秒）
+
+        Returns:
+            証跡を収集すべき場合は判定に使用した閾値、それ以外はNone
+        """
+        key = str(action_id)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = deque(maxlen=self.window)
+                self._samples[key] = samples
+            threshold = self._threshold(samples)
+            samples.append(duration)
+
+            if threshold is None or duration <= threshold:
+                return None
+
+            # 既に保持している上位N件より速い場合は収集しない
+            retained = self._exemplars.get(key, [])
+            if len(retained) >= self.keep and duration <= retained[0][0]:
+                return None
+            return threshold
+
+    def add(self, action_id: Any, duration: float, exemplar: Dict[str, Any]) -> None:
+        """
+        収集したエグゼンプラーを登録する（上位N件から外れたものは削除する）
+
+        Args:
+            action_id: 操作ID
+            duration: 所要時間（秒）
+            exemplar: エグゼンプラー情報（"dir"キーに証跡ディレクトリを含む）
+        """
+        key = str(action_id)
+        evicted = None
+        with self._lock:
+            retained = self._exemplars.setdefault(key, [])
+            self._sequence += 1
+            entry = (duration, self._sequence, exemplar)
+            if len(retained) < self.keep:
+                heapq.heappush(retained, entry)
+            else:
+                evicted = heapq.heappushpop(retained, entry)[2]
+
+        # 上位N件から外れた証跡のファイルを削除
+        if evicted is not None and evicted.get("dir"):
+            evicted_dir = os.path.join(self.output_dir, evicted["dir"])
+            shutil.rmtree(evicted_dir, ignore_errors=True)
+            self.logger.debug(f"エグゼンプラーを破棄しました: {evicted_dir}")
+
+    def get_exemplars(self) -> List[Dict[str, Any]]:
+        """
+        保持しているエグゼンプラーを操作ID順、所要時間の降順で返す
+
+        Returns:
+            エグゼンプラー情報のリスト
+        """
+        with self._lock:
+            items = [(key, list(retained)) for key, retained in self._exemplars.items()]
+
+        def sort_key(item):
+            key = item[0]
+            return (0, int(key), key) if key.isdigit() else (1, 0, key)
+
+        exemplars = []
+        for _, retained in sorted(items, key=sort_key):
+            for duration, _, exemplar in sorted(retained, key=lambda e: e[0], reverse=True):
+                exemplars.append(exemplar)
+        return exemplars
@@ -6,7 +6,7 @@ import traceback
 import json
 import tomllib
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from src.utils.logger import setup_logger
 
 # ロガーの設定
@@ -56,13 +56,14 @@ def create_output_directory(base_dir: str = "output") -> str:
     return output_dir
 
 
-def save_json(data: Dict[str, Any], file_path: str) -> None:
+def save_json(data: Dict[str, Any], file_path: str, indent: Optional[int] = None) -> None:
     """
     データをJSONファイルに保存する
 
     Args:
         data: 保存するデータ
         file_path: 保存先のファイルパス
+        indent: インデントの幅（Noneの場合はインデントや空白のないコンパクトな形式）
     """
     try:
         # ディレクトリが存在しない場合は作成
@@ -72,7 +73,8 @@ def save_json(data: Dict[str, Any], file_path: str) -> None:
         
         # ファイルの書き込み
         with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            separators = None if indent is not None else (",", ":")
+            json.dump(data, f, ensure_ascii=False, indent=indent, separators=separators)
         
         # ファイルが正常に作成されたか確認
         if os.path.exists(file_path):
@@ -0,0 +1,333 @@
+"""
+ライフサイクルフックモジュール
+
+テストの実行の開始・終了、セッションの開始・終了、アクションの前後、スクリーンショットの撮影、
+エラーの発生をイベントオブジェクトとして登録されたフックに通知する。独自の計測や外部システムへの
+エクスポートを ConcurrentTester 等を変更せずに追加するためのもの。
+
+フックは on_run_start、on_session_end のようにイベントに対応するメソッドを持つオブジェクトで、
+設定ファイルの hooks（"モジュール:属性" の形式）またはエントリーポイント（aitesttoolq.hooks）で
+登録する。実装していないメソッドのイベントは通知しない。hooks_async を有効にすると、
+イベントはキューに追加するのみで専用のスレッド（start() で起動する）から通知するため、
+フックの処理が遅い場合もセッションの実行を妨げない（キューが一杯の場合はイベントを破棄する）。
+
+例:
+    class MyExporter:
+        def on_after_action(self, event: AfterAction) -> None:
+            send_metric(f"action.{event.action_id}.duration", event.duration)
+"""
+import importlib
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from importlib import metadata
+from typing import Dict, Any, Callable, ClassVar, List, Optional, Tuple, Type
+
+from src.utils.logger import setup_logger
+from src.utils.toml_utils import get_bool, get_int, get_list
+
+ENTRY_POINT_GROUP = "aitesttoolq.hooks"
+
+
+@dataclass(frozen=True, kw_only=True)
+class HookEvent:
+    """イベントの基底クラス"""
+
+    # フックのメソッド名
+    method: ClassVar[str] = ""
+    # イベントの発生時刻（UNIX時間）
+    timestamp: float = field(default_factory=time.time)
+
+
+@dataclass(frozen=True, kw_only=True)
+class RunStarted(HookEvent):
+    """テストの実行の開始"""
+
+    method: ClassVar[str] = "on_run_start"
+    output_dir: str
+    start_time: str
+    total_sessions: int
+    url: str = ""
+    scenario_file: str = ""
+
+
+@dataclass(frozen=True, kw_only=True)
+class RunEnded(HookEvent):
+    """テストの実行の終了（レポートの生成後）"""
+
+    method: ClassVar[str] = "on_run_end"
+    output_dir: str
+    start_time: str
+    end_time: str
+    duration: float
+    total_sessions: int
+    successful_sessions: int
+    failed_sessions: int
+    results: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+
+@dataclass(frozen=True, kw_only=True)
+class SessionStarted(HookEvent):
+    """セッションの開始"""
+
+    method: ClassVar[str] = "on_session_start"
+    session_id: int
+    user_id: str
+    start_time: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class SessionEnded(HookEvent):
+    """セッションの終了"""
+
+    method: ClassVar[str] = "on_session_end"
+    session_id: int
+    user_id: str
+    success: bool
+    start_time: str
+    end_time: str
+    duration: float
+    errors: Tuple[str, ...] = ()
+    timed_out: bool = False
+
+
+@dataclass(frozen=True, kw_only=True)
+class BeforeAction(HookEvent):
+    """アクションの実行前"""
+
+    method: ClassVar[str] = "on_before_action"
+    session_id: int
+    action_id: str
+    action_type: str
+    description: str = ""
+
+
+@dataclass(frozen=True, kw_only=True)
+class AfterAction(HookEvent):
+    """アクションの実行後"""
+
+    method: ClassVar[str] = "on_after_action"
+    session_id: int
+    action_id: str
+    action_type: str
+    success: bool
+    error: Optional[str] = None
+    start_time: Optional[str] = None
+    # アクションの所要時間（秒、前後のスクリーンショットを除く）
+    duration: Optional[float] = None
+    # フェーズ別の所要時間（before_action / action / after_action）
+    phases: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(frozen=True, kw_only=True)
+class ScreenshotCaptured(HookEvent):
+    """スクリーンショットの撮影"""
+
+    method: ClassVar[str] = "on_screenshot"
+    session_id: int
+    action_id: Optional[str]
+    path: str
+    # 撮影と保存にかかった時間（秒）
+    duration: float
+
+
+@dataclass(frozen=True, kw_only=True)
+class ErrorOccurred(HookEvent):
+    """エラーの発生（アクションの失敗、ブラウザの初期化の失敗、例外、タイムアウト）"""
+
+    method: ClassVar[str] = "on_error"
+    session_id: int
+    message: str
+    action_id: Optional[str] = None
+
+
+EVENT_TYPES: Tuple[Type[HookEvent], ...] = (RunStarted, RunEnded, SessionStarted, SessionEnded, BeforeAction,
+                                            AfterAction, ScreenshotCaptured, ErrorOccurred)
+
+
+def load_hook(reference: str) -> Any:
+    """
+    "モジュール:属性" の形式で指定されたフックを読み込む（クラスの場合はインスタンスを作成する）
+
+    Args:
+        reference: フックの参照（例: "mypackage.exporter:StatsdExporter"）
+
+    Returns:
+        フックのオブジェクト
+
+    Raises:
+        ImportError: モジュールが見つからない場合
+        AttributeError: 属性が見つからない場合
+        ValueError: 形式が正しくない場合
+    """
+    module_name, _, attribute = reference.partition(":")
+    if not module_name or not attribute:
+        raise ValueError(f"フックは \"モジュール:属性\" の形式で指定してください: {reference}")
+    target = importlib.import_module(module_name.strip())
+    for name in attribute.strip().split("."):
+        target = getattr(target, name)
+    return target() if isinstance(target, type) else target
+
+
+def _entry_point_hooks() -> List[Tuple[str, Any]]:
+    """エントリーポイントに登録されたフックを読み込む"""
+    hooks = []
+    for entry_point in metadata.entry_points(group=ENTRY_POINT_GROUP):
+        target = entry_point.load()
+        hooks.append((entry_point.name, target() if isinstance(target, type) else target))
+    return hooks
+
+
+class HookManager:
+    """登録されたフックにイベントを通知するクラス"""
+
+    def __init__(self, hooks: List[Any], asynchronous: bool = False, queue_size: int = 10000):
+        """
+        コンストラクタ
+
+        Args:
+            hooks: フックのオブジェクト
+            asynchronous: 専用のスレッドからイベントを通知するかどうか
+            queue_size: 非同期の場合にキューに保持するイベント数の上限（超えた場合は破棄する）
+        """
+        self.logger = setup_logger("HookManager")
+        self.hooks = list(hooks)
+        # イベントの種類ごとの通知先（実装しているメソッドのみ）
+        self._handlers: Dict[Type[HookEvent], List[Callable[[HookEvent], Any]]] = {}
+        for event_type in EVENT_TYPES:
+            handlers = [getattr(hook, event_type.method) for hook in self.hooks
+                        if callable(getattr(hook, event_type.method, None))]
+            if handlers:
+                self._handlers[event_type] = handlers
+        self.asynchronous = asynchronous
+        self.dropped = 0
+        self.failures = 0
+        self._queue: Optional["queue.Queue[Optional[HookEvent]]"] = None
+        self._thread: Optional[threading.Thread] = None
+        if asynchronous and self._handlers:
+            self._queue = queue.Queue(maxsize=max(1, queue_size))
+
+    def start(self) -> None:
+        """
+        非同期の通知スレッドを起動する（同期の場合は何もしない）
+
+        スレッドの起動後にプロセスを作成すると、ロックを保持したままのスレッドが子プロセスに
+        複製されるため、呼び出し元はプロセスを作成した後に呼び出す。起動前のイベントはキューに保持する。
+        """
+        if self._queue is None or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._worker, name="hook-dispatcher", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["HookManager"]:
+        """
+        設定ファイルの内容とエントリーポイントからフックを読み込んで作成する
+
+        Args:
+            config: 設定ファイルの内容
+
+        Returns:
+            フックの管理（フックが1つもない場合はNone）
+        """
+        logger = setup_logger("HookManager")
+        hooks = []
+        references = config.get('hooks', [])
+        references = [references] if isinstance(references, str) else get_list(config, 'hooks', [])
+        for reference in references:
+            try:
+                hooks.append(load_hook(str(reference)))
+                logger.info(f"フックを登録しました: {reference}")
+            except Exception as e:
+                logger.error(f"フックを読み込めませんでした ({reference}): {str(e)}")
+        if get_bool(config, 'hooks_entry_points', True):
+            try:
+                for name, hook in _entry_point_hooks():
+                    hooks.append(hook)
+                    logger.info(f"フックを登録しました: {name} (エントリーポイント)")
+            except Exception as e:
+                logger.error(f"エントリーポイントのフックを読み込めませんでした: {str(e)}")
+        if not hooks:
+            return None
+        return cls(hooks, get_bool(config, 'hooks_async', False), get_int(config, 'hooks_queue_size', 10000))
+
+    def wants(self, event_type: Type[HookEvent]) -> bool:
+        """
+        イベントを受け取るフックがあるかどうかを返す（イベントの作成を省略する場合に使用する）
+
+        Args:
+            event_type: イベントの種類
+
+        Returns:
+            受け取るフックがある場合True
+        """
+        return event_type in self._handlers
+
+    def emit(self, event: HookEvent) -> None:
+        """
+        イベントを通知する（非同期の場合はキューに追加するのみ）
+
+        Args:
+            event: イベント
+        """
+        if type(event) not in self._handlers:
+            return
+        if self._queue is None:
+            self._dispatch(event)
+            return
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def _dispatch(self, event: HookEvent) -> None:
+        """フックのメソッドを呼び出す（例外はログに出力して続行する）"""
+        for handler in self._handlers.get(type(event), ()):
+            try:
+                handler(event)
+            except Exception as e:
+                self.failures += 1
+                self.logger.error(f"フックの {event.method} でエラーが発生しました: {type(e).__name__}: {str(e)}")
+
+    def _worker(self) -> None:
+        """非同期の通知スレッドのエントリーポイント"""
+        while True:
+            event = self._queue.get()
+            try:
+                if event is None:
+                    return
+                self._dispatch(event)
+            finally:
+                self._queue.task_done()
+
+    def close(self, timeout: float = 30.0) -> Dict[str, int]:
+        """
+        キューに残ったイベントを通知し、フックの close() を呼び出す
+
+        Args:
+            timeout: 非同期の通知スレッドの終了を待つ期限（秒）
+
+        Returns:
+            dropped（キューが一杯で破棄したイベント数）、failures（フックで発生したエラー数）
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                self.logger.warning(f"フックへのイベントの通知が{timeout}秒以内に完了しませんでした")
+            self._thread = None
+        elif self._queue is not None:
+            # 通知スレッドを起動しなかった場合はキューに残ったイベントをこのスレッドから通知する
+            while not self._queue.empty():
+                self._dispatch(self._queue.get_nowait())
+        for hook in self.hooks:
+            close = getattr(hook, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception as e:
+                    self.logger.error(f"フックの close でエラーが発生しました: {type(e).__name__}: {str(e)}")
+        if self.dropped:
+            self.logger.warning(f"キューが一杯のため通知しなかったイベント: {self.dropped} 件")
+        return {"dropped": self.dropped, "failures": self.failures}
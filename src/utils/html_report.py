@@ -0,0 +1,537 @@
+"""
+テスト結果のHTMLレポート生成モジュール
+
+テスト結果を1つのHTMLファイル（result/test_report.html）として出力する。
+セッションとアクションの結果は文字列を重複させないコンパクトなJSONとしてページに埋め込み、
+表の描画（表示範囲の行のみを描画する仮想スクロール）、所要時間のグラフ、
+スクリーンショットの遅延読み込みはすべてブラウザ側で行う。画像の読み込みやシートの作成を
+行わないため、数千セッションの実行でもExcelレポートに比べて短時間で生成できる。
+"""
+import html
+import json
+import logging
+import os
+import re
+import traceback
+from datetime import datetime
+from typing import Dict, Any, List
+
+from src.utils.excel_report import extract_action_id
+
+# スクリーンショットの種類（ファイル名の接頭辞）
+SCREENSHOT_KINDS = {"before": "b", "after": "a", "error": "e", "exception": "e"}
+# 埋め込むエラーメッセージの最大長
+MAX_ERROR_LENGTH = 500
+
+
+class _StringTable:
+    """重複する文字列をインデックスで参照するための表"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def add(self, value: Any) -> int:
+        """文字列を追加してインデックスを返す"""
+        value = str(value)
+        index = self._index.get(value)
+        if index is None:
+            index = len(self.values)
+            self._index[value] = index
+            self.values.append(value)
+        return index
+
+
+def _screenshot_kind(path: str) -> str:
+    """スクリーンショットのファイル名から種類（b / a / e、不明な場合は空文字列）を返す"""
+    prefix = os.path.basename(path).split("_", 1)[0]
+    return SCREENSHOT_KINDS.get(prefix, "")
+
+
+def build_html_report_data(results: Dict[str, Any], config: Dict[str, Any], link_base: str = "..") -> Dict[str, Any]:
+    """
+    HTMLレポートに埋め込むデータを作成する
+
+    ユーザーID、操作ID、エラーメッセージは表に1回だけ格納し、セッションとアクションは
+    表のインデックスを含む配列（列の並びは固定）として格納する。
+
+    Args:
+        results: テスト結果
+        config: 設定情報
+        link_base: レポートの保存先から出力ディレクトリへの相対パス
+
+    Returns:
+        埋め込み用のデータ
+    """
+    users = _StringTable()
+    errors = _StringTable()
+    action_index: Dict[str, int] = {}
+    actions: List[List[str]] = []
+    sessions = []
+    steps = []
+    shots = []
+
+    def action_of(action_id: str, description: str = "") -> int:
+        index = action_index.get(action_id)
+        if index is None:
+            index = len(actions)
+            action_index[action_id] = index
+            actions.append([action_id, description])
+        elif description and not actions[index][1]:
+            actions[index][1] = description
+        return index
+
+    successful = 0
+    for session in results.get("sessions", []):
+        success = bool(session.get("success", False))
+        successful += success
+        session_errors = session.get("errors", [])
+        sessions.append([
+            session.get("session_id", 0),
+            users.add(session.get("user_id", "")),
+            1 if success else 0,
+            round(float(session.get("duration", 0) or 0), 3),
+            errors.add(str(session_errors[0])[:MAX_ERROR_LENGTH]) if session_errors else -1,
+        ])
+
+        # アクション: [操作IDのインデックス, 成否, 所要時間(ms、不明な場合は-1), エラーのインデックス]
+        session_steps = []
+        for action in session.get("actions", []):
+            action_id = str(action.get("action_id", action.get("操作ID", "")))
+            ok = action.get("result", action.get("success", False))
+            duration = action.get("duration")
+            error = action.get("error")
+            session_steps.append([
+                action_of(action_id, str(action.get("description", action.get("説明", "")) or "")),
+                1 if ok else 0,
+                round(duration * 1000) if isinstance(duration, (int, float)) else -1,
+                errors.add(str(error)[:MAX_ERROR_LENGTH]) if error and not ok else -1,
+            ])
+        steps.append(session_steps)
+
+        # スクリーンショット: [操作IDのインデックス（不明な場合は-1）, 種類, パス]
+        # パスはセッションのスクリーンショットディレクトリ直下の場合はファイル名のみ、
+        # それ以外は出力ディレクトリからの相対パスとする
+        session_dir = f"screenshot/session_{session.get('session_id', 0)}/"
+        session_shots = []
+        for path in session.get("screenshots", []):
+            action_id = extract_action_id(path)
+            path = path.replace(os.sep, "/")
+            name = path[len(session_dir):]
+            session_shots.append([
+                action_of(action_id) if action_id else -1,
+                _screenshot_kind(path),
+                name if path.startswith(session_dir) and "/" not in name else path,
+            ])
+        shots.append(session_shots)
+
+    include_timestamp = config.get("include_timestamp", True)
+    timestamp_format = config.get("timestamp_format", "%Y-%m-%d %H:%M:%S")
+    return {
+        "title": config.get("report_title", "テスト実行結果報告書"),
+        "company": config.get("company_name", ""),
+        "project": config.get("project_name", ""),
+        "generated": datetime.now().strftime(timestamp_format) if include_timestamp else "",
+        "base": link_base.replace(os.sep, "/").rstrip("/") + "/",
+        "summary": {
+            "total": len(sessions),
+            "success": successful,
+            "failure": len(sessions) - successful,
+            "duration": round(float(results.get("duration", 0) or 0), 2),
+            "start": results.get("start_time", ""),
+            "end": results.get("end_time", ""),
+        },
+        "users": users.values,
+        "errors": errors.values,
+        "actions": actions,
+        "sessions": sessions,
+        "steps": steps,
+        "shots": shots,
+        "timeline": results.get("timeline"),
+    }
+
+
+def render_html_report(data: Dict[str, Any]) -> str:
+    """
+    埋め込み用のデータからHTMLを作成する
+
+    Args:
+        data: build_html_report_data で作成したデータ
+
+    Returns:
+        HTML文字列
+    """
+    # </script> でスクリプト要素が閉じられないようにエスケープする
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+    values = {"TITLE": html.escape(str(data.get("title", ""))), "DATA": payload}
+    # 置換後の値に含まれるプレースホルダーを再置換しないよう1回で置換する
+    return re.sub(r"__(TITLE|DATA)__", lambda match: values[match.group(1)], HTML_TEMPLATE)
+
+
+def generate_html_report(results: Dict[str, Any], output_dir: str, config: Dict[str, Any],
+                         html_path: str = None) -> str:
+    """
+    テスト結果をHTMLレポートとして出力する
+
+    Args:
+        results: テスト結果
+        output_dir: 出力ディレクトリ
+        config: 設定情報
+        html_path: 出力先のHTMLファイルのパス（Noneの場合は result/test_report.html）
+
+    Returns:
+        HTMLファイルのパス（失敗した場合は空文字列）
+    """
+    if html_path is None:
+        html_path = os.path.join(output_dir, "result", "test_report.html")
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(html_path)), exist_ok=True)
+        link_base = os.path.relpath(os.path.abspath(output_dir), os.path.dirname(os.path.abspath(html_path)))
+        content = render_html_report(build_html_report_data(results, config, link_base))
+        with open(html_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        logging.info(f"HTMLレポートを保存しました: {html_path}")
+        return html_path
+    except Exception as e:
+        logging.error(f"HTMLレポートの生成に失敗しました: {str(e)}")
+        logging.error(traceback.format_exc())
+        return ""
+
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="ja">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+body { font-family: "Segoe UI", "Meiryo", sans-serif; margin: 0; color: #222; background: #f5f6f8; }
+header { background: #4472C4; color: #fff; padding: 12px 20px; }
+header h1 { margin: 0; font-size: 20px; }
+header .meta { font-size: 12px; opacity: .85; margin-top: 4px; }
+main { padding: 16px 20px; }
+section { background: #fff; border: 1px solid #dde1e7; border-radius: 4px; margin-bottom: 16px; padding: 12px 16px; }
+h2 { font-size: 16px; margin: 0 0 10px; }
+.cards { display: flex; gap: 12px; flex-wrap: wrap; }
+.card { border: 1px solid #dde1e7; border-radius: 4px; padding: 8px 14px; min-width: 110px; }
+.card .value { font-size: 22px; font-weight: bold; }
+.card .label { font-size: 12px; color: #666; }
+.toolbar { display: flex; gap: 8px; margin-bottom: 8px; align-items: center; font-size: 13px; }
+.vtable { border: 1px solid #dde1e7; font-size: 13px; }
+.vtable .head, .vtable .row { display: flex; height: 26px; line-height: 26px; }
+.vtable .head { background: #4472C4; color: #fff; font-weight: bold; cursor: pointer; user-select: none; }
+.vtable .body { position: relative; overflow-y: auto; }
+.vtable .row { position: absolute; left: 0; right: 0; border-bottom: 1px solid #eef0f3; cursor: pointer; }
+.vtable .row.alt { background: #E6F0FF; }
+.vtable .row.selected { outline: 2px solid #4472C4; outline-offset: -2px; }
+.vtable .cell { padding: 0 8px; overflow: hidden; white-space: nowrap; text-overflow: ellipsis; flex: none; }
+.ok { color: #1e7b34; }
+.ng { color: #c00000; font-weight: bold; }
+canvas { width: 100%; height: 260px; }
+.charts { display: grid; grid-template-columns: 1fr 1fr; gap: 16px; }
+.shots { display: flex; flex-wrap: wrap; gap: 12px; margin-top: 10px; }
+.shots figure { margin: 0; width: 320px; }
+.shots img { width: 320px; min-height: 60px; border: 1px solid #dde1e7; background: #fafafa; }
+.shots figcaption { font-size: 12px; }
+.empty { color: #888; font-size: 13px; }
+</style>
+</head>
+<body>
+<script id="report-data" type="application/json">__DATA__</script>
+<header><h1 id="title"></h1><div class="meta" id="meta"></div></header>
+<main>
+<section><h2>サマリー</h2><div class="cards" id="cards"></div></section>
+<section><h2>所要時間</h2><div class="charts">
+<div><canvas id="latency-chart"></canvas></div><div><canvas id="timeline-chart"></canvas></div>
+</div></section>
+<section><h2>アクション別の集計</h2><div id="action-table"></div></section>
+<section><h2>セッション</h2>
+<div class="toolbar">
+<select id="session-filter"><option value="all">すべて</option><option value="ng">失敗のみ</option><option value="ok">成功のみ</option></select>
+<input id="session-search" type="search" placeholder="セッションID・ユーザーIDで絞り込み">
+<span id="session-count"></span>
+</div>
+<div id="session-table"></div>
+</section>
+<section><h2 id="detail-title">セッション詳細</h2><div id="step-table"></div><div class="shots" id="shots"></div></section>
+</main>
+<script>
+(function () {
+  "use strict";
+  var D = JSON.parse(document.getElementById("report-data").textContent);
+  var ROW = 26;
+
+  function text(id, value) { document.getElementById(id).textContent = value; }
+  function fmt(value, digits) { return value === null || value === undefined || isNaN(value) ? "-" : value.toFixed(digits); }
+  function percentile(sorted, p) {
+    if (!sorted.length) return NaN;
+    var pos = (sorted.length - 1) * p / 100, lo = Math.floor(pos), hi = Math.min(lo + 1, sorted.length - 1);
+    return sorted[lo] + (sorted[hi] - sorted[lo]) * (pos - lo);
+  }
+
+  // 表示範囲の行のみを描画する表
+  function VTable(container, columns, height) {
+    var self = this;
+    this.columns = columns;
+    this.rows = [];
+    this.selectedItem = null;
+    this.onselect = null;
+    this.head = document.createElement("div");
+    this.head.className = "head";
+    columns.forEach(function (column, i) {
+      var cell = document.createElement("div");
+      cell.className = "cell";
+      cell.style.width = column.width + "px";
+      cell.textContent = column.title;
+      cell.onclick = function () { self.sortBy(i); };
+      self.head.appendChild(cell);
+    });
+    this.body = document.createElement("div");
+    this.body.className = "body";
+    this.body.style.height = height + "px";
+    this.spacer = document.createElement("div");
+    this.body.appendChild(this.spacer);
+    this.body.addEventListener("scroll", function () { self.schedule(); });
+    var root = document.createElement("div");
+    root.className = "vtable";
+    root.appendChild(this.head);
+    root.appendChild(this.body);
+    container.appendChild(root);
+    this.sortColumn = -1;
+    this.sortDesc = false;
+  }
+  VTable.prototype.setRows = function (rows) {
+    this.rows = rows;
+    if (this.sortColumn >= 0) this.applySort();
+    this.spacer.style.height = rows.length * ROW + "px";
+    this.render();
+  };
+  VTable.prototype.sortBy = function (i) {
+    this.sortDesc = this.sortColumn === i ? !this.sortDesc : false;
+    this.sortColumn = i;
+    this.applySort();
+    this.render();
+  };
+  VTable.prototype.applySort = function () {
+    var key = this.columns[this.sortColumn].key, desc = this.sortDesc ? -1 : 1;
+    this.rows.sort(function (a, b) { var x = key(a), y = key(b); return (x < y ? -1 : x > y ? 1 : 0) * desc; });
+  };
+  VTable.prototype.schedule = function () {
+    var self = this;
+    if (this.pending) return;
+    this.pending = true;
+    requestAnimationFrame(function () { self.pending = false; self.render(); });
+  };
+  VTable.prototype.render = function () {
+    var self = this;
+    var first = Math.max(0, Math.floor(this.body.scrollTop / ROW) - 5);
+    var last = Math.min(this.rows.length, Math.ceil((this.body.scrollTop + this.body.clientHeight) / ROW) + 5);
+    while (this.body.childNodes.length > 1) this.body.removeChild(this.body.lastChild);
+    for (var r = first; r < last; r++) {
+      var row = document.createElement("div"), item = this.rows[r];
+      row.className = "row" + (r % 2 ? " alt" : "") + (item === this.selectedItem ? " selected" : "");
+      row.style.top = r * ROW + "px";
+      this.columns.forEach(function (column) {
+        var cell = document.createElement("div");
+        cell.className = "cell" + (column.cls ? " " + column.cls(item) : "");
+        cell.style.width = column.width + "px";
+        cell.textContent = column.value(item);
+        cell.title = cell.textContent;
+        row.appendChild(cell);
+      });
+      row.onclick = (function (selected) {
+        return function () { self.selectedItem = selected; self.render(); if (self.onselect) self.onselect(selected); };
+      })(item);
+      this.body.appendChild(row);
+    }
+  };
+
+  // ヘッダーとサマリー
+  var S = D.summary;
+  document.title = D.title;
+  text("title", D.title);
+  text("meta", [D.company, D.project, D.generated && "作成日時: " + D.generated].filter(Boolean).join(" / "));
+  var cards = [["総セッション数", S.total], ["成功", S.success], ["失敗", S.failure],
+               ["成功率", S.total ? (S.success / S.total * 100).toFixed(1) + "%" : "-"], ["実行時間(秒)", fmt(S.duration, 1)]];
+  cards.forEach(function (card) {
+    var el = document.createElement("div"), value = document.createElement("div"), label = document.createElement("div");
+    el.className = "card";
+    value.className = "value";
+    value.textContent = card[1];
+    label.className = "label";
+    label.textContent = card[0];
+    el.appendChild(value);
+    el.appendChild(label);
+    document.getElementById("cards").appendChild(el);
+  });
+
+  // 操作IDごとの所要時間の集計
+  var perAction = D.actions.map(function () { return { values: [], count: 0, failures: 0 }; });
+  D.steps.forEach(function (steps) {
+    steps.forEach(function (step) {
+      var a = perAction[step[0]];
+      a.count++;
+      if (!step[1]) a.failures++;
+      if (step[2] >= 0) a.values.push(step[2] / 1000);
+    });
+  });
+  var actionRows = D.actions.map(function (action, i) {
+    var values = perAction[i].values.sort(function (a, b) { return a - b; });
+    return { id: action[0], description: action[1], count: perAction[i].count, failures: perAction[i].failures,
+             mean: values.length ? values.reduce(function (s, v) { return s + v; }, 0) / values.length : NaN,
+             p50: percentile(values, 50), p95: percentile(values, 95), max: values.length ? values[values.length - 1] : NaN };
+  });
+  var actionTable = new VTable(document.getElementById("action-table"), [
+    { title: "操作ID", width: 90, key: function (r) { return r.id; }, value: function (r) { return r.id; } },
+    { title: "説明", width: 260, key: function (r) { return r.description; }, value: function (r) { return r.description; } },
+    { title: "実行数", width: 80, key: function (r) { return r.count; }, value: function (r) { return r.count; } },
+    { title: "失敗数", width: 80, key: function (r) { return r.failures; }, value: function (r) { return r.failures; },
+      cls: function (r) { return r.failures ? "ng" : ""; } },
+    { title: "平均(秒)", width: 90, key: function (r) { return r.mean; }, value: function (r) { return fmt(r.mean, 3); } },
+    { title: "p50(秒)", width: 90, key: function (r) { return r.p50; }, value: function (r) { return fmt(r.p50, 3); } },
+    { title: "p95(秒)", width: 90, key: function (r) { return r.p95; }, value: function (r) { return fmt(r.p95, 3); } },
+    { title: "最大(秒)", width: 90, key: function (r) { return r.max; }, value: function (r) { return fmt(r.max, 3); } }
+  ], Math.min(actionRows.length, 10) * ROW + 2);
+  actionTable.setRows(actionRows);
+
+  // グラフ（canvas に直接描画する）
+  function chart(canvasId, title, labels, series, xLabel) {
+    var canvas = document.getElementById(canvasId), ratio = window.devicePixelRatio || 1;
+    var width = canvas.clientWidth, height = canvas.clientHeight;
+    canvas.width = width * ratio;
+    canvas.height = height * ratio;
+    var ctx = canvas.getContext("2d");
+    ctx.scale(ratio, ratio);
+    ctx.font = "12px sans-serif";
+    ctx.fillStyle = "#222";
+    ctx.fillText(title, 8, 14);
+    if (!labels.length) { ctx.fillStyle = "#888"; ctx.fillText("データがありません", 8, 40); return; }
+    var left = 48, top = 40, right = width - 12, bottom = height - 28;
+    var max = 0;
+    series.forEach(function (s) { s.values.forEach(function (v) { if (v > max) max = v; }); });
+    max = max || 1;
+    ctx.strokeStyle = "#ccc";
+    ctx.beginPath(); ctx.moveTo(left, top); ctx.lineTo(left, bottom); ctx.lineTo(right, bottom); ctx.stroke();
+    for (var t = 0; t <= 4; t++) {
+      var y = bottom - (bottom - top) * t / 4;
+      ctx.fillStyle = "#666";
+      ctx.fillText((max * t / 4).toPrecision(3), 2, y + 4);
+    }
+    var step = labels.length > 1 ? (right - left) / (labels.length - 1) : 0;
+    var every = Math.max(1, Math.ceil(labels.length / 10));
+    labels.forEach(function (label, i) {
+      if (i % every === 0) ctx.fillText(label, left + step * i - 8, bottom + 14);
+    });
+    if (xLabel) ctx.fillText(xLabel, right - ctx.measureText(xLabel).width, height - 2);
+    series.forEach(function (s, n) {
+      ctx.strokeStyle = s.color;
+      ctx.fillStyle = s.color;
+      ctx.beginPath();
+      var started = false;
+      s.values.forEach(function (v, i) {
+        if (v === null || isNaN(v)) { started = false; return; }
+        var x = left + step * i, y = bottom - (bottom - top) * v / max;
+        if (labels.length === 1) ctx.fillRect(x - 3, y - 3, 6, 6);
+        if (started) ctx.lineTo(x, y); else ctx.moveTo(x, y);
+        started = true;
+      });
+      ctx.stroke();
+      ctx.fillRect(left + 90 * n, 22, 10, 10);
+      ctx.fillText(s.name, left + 90 * n + 14, 31);
+    });
+  }
+  chart("latency-chart", "操作IDごとの所要時間(秒)", actionRows.map(function (r) { return r.id; }), [
+    { name: "p50", color: "#4472C4", values: actionRows.map(function (r) { return r.p50; }) },
+    { name: "p95", color: "#ED7D31", values: actionRows.map(function (r) { return r.p95; }) },
+    { name: "最大", color: "#A5A5A5", values: actionRows.map(function (r) { return r.max; }) }
+  ], "操作ID");
+  var buckets = D.timeline && D.timeline.buckets ? D.timeline.buckets : [];
+  chart("timeline-chart", "経過時間ごとの所要時間(秒)・同時実行数", buckets.map(function (b) { return b.time; }), [
+    { name: "p50", color: "#4472C4", values: buckets.map(function (b) { return b.p50; }) },
+    { name: "p95", color: "#ED7D31", values: buckets.map(function (b) { return b.p95; }) },
+    { name: "同時実行数", color: "#70AD47", values: buckets.map(function (b) { return b.active; }) }
+  ], "経過時間(秒)");
+
+  // セッション一覧
+  var sessionRows = D.sessions.map(function (s, i) {
+    return { index: i, id: s[0], user: D.users[s[1]], ok: s[2], duration: s[3],
+             actions: D.steps[i].length, error: s[4] >= 0 ? D.errors[s[4]] : "" };
+  });
+  var sessionTable = new VTable(document.getElementById("session-table"), [
+    { title: "セッションID", width: 100, key: function (r) { return r.id; }, value: function (r) { return r.id; } },
+    { title: "ユーザーID", width: 180, key: function (r) { return r.user; }, value: function (r) { return r.user; } },
+    { title: "結果", width: 70, key: function (r) { return r.ok; }, value: function (r) { return r.ok ? "成功" : "失敗"; },
+      cls: function (r) { return r.ok ? "ok" : "ng"; } },
+    { title: "所要時間(秒)", width: 110, key: function (r) { return r.duration; }, value: function (r) { return fmt(r.duration, 2); } },
+    { title: "アクション数", width: 100, key: function (r) { return r.actions; }, value: function (r) { return r.actions; } },
+    { title: "エラー", width: 480, key: function (r) { return r.error; }, value: function (r) { return r.error; } }
+  ], 18 * ROW + 2);
+  function filterSessions() {
+    var mode = document.getElementById("session-filter").value;
+    var query = document.getElementById("session-search").value.trim().toLowerCase();
+    var rows = sessionRows.filter(function (r) {
+      if (mode === "ok" && !r.ok) return false;
+      if (mode === "ng" && r.ok) return false;
+      return !query || String(r.id).indexOf(query) >= 0 || r.user.toLowerCase().indexOf(query) >= 0;
+    });
+    text("session-count", rows.length + " / " + sessionRows.length + " 件");
+    sessionTable.setRows(rows);
+  }
+  document.getElementById("session-filter").onchange = filterSessions;
+  document.getElementById("session-search").oninput = filterSessions;
+  filterSessions();
+
+  // セッション詳細（アクション一覧とスクリーンショット）
+  var stepTable = new VTable(document.getElementById("step-table"), [
+    { title: "操作ID", width: 90, key: function (r) { return r.id; }, value: function (r) { return r.id; } },
+    { title: "説明", width: 260, key: function (r) { return r.description; }, value: function (r) { return r.description; } },
+    { title: "結果", width: 70, key: function (r) { return r.ok; }, value: function (r) { return r.ok ? "成功" : "失敗"; },
+      cls: function (r) { return r.ok ? "ok" : "ng"; } },
+    { title: "所要時間(秒)", width: 110, key: function (r) { return r.duration; }, value: function (r) { return r.duration >= 0 ? fmt(r.duration, 3) : "-"; } },
+    { title: "エラー", width: 480, key: function (r) { return r.error; }, value: function (r) { return r.error; } }
+  ], 8 * ROW + 2);
+  var KINDS = { b: "Before", a: "After", e: "Error" };
+  function shotPath(sessionIndex, path) {
+    return D.base + (path.indexOf("/") >= 0 ? path : "screenshot/session_" + D.sessions[sessionIndex][0] + "/" + path);
+  }
+  function showShots(sessionIndex, actionIndex) {
+    var container = document.getElementById("shots");
+    container.innerHTML = "";
+    var shots = D.shots[sessionIndex].filter(function (shot) { return actionIndex === undefined || shot[0] === actionIndex; });
+    if (!shots.length) {
+      container.innerHTML = '<div class="empty">スクリーンショットはありません</div>';
+      return;
+    }
+    shots.forEach(function (shot) {
+      var figure = document.createElement("figure"), link = document.createElement("a"), img = document.createElement("img");
+      var caption = document.createElement("figcaption");
+      link.href = shotPath(sessionIndex, shot[2]);
+      link.target = "_blank";
+      img.loading = "lazy";
+      img.src = link.href;
+      caption.textContent = (shot[0] >= 0 ? D.actions[shot[0]][0] + " " : "") + (KINDS[shot[1]] || "") + " " + shot[2].split("/").pop();
+      link.appendChild(img);
+      figure.appendChild(link);
+      figure.appendChild(caption);
+      container.appendChild(figure);
+    });
+  }
+  sessionTable.onselect = function (session) {
+    text("detail-title", "セッション" + session.id + " 詳細（" + session.user + "）");
+    stepTable.setRows(D.steps[session.index].map(function (step) {
+      return { action: step[0], id: D.actions[step[0]][0], description: D.actions[step[0]][1], ok: step[1],
+               duration: step[2] >= 0 ? step[2] / 1000 : -1, error: step[3] >= 0 ? D.errors[step[3]] : "" };
+    }));
+    stepTable.onselect = function (step) { showShots(session.index, step.action); };
+    showShots(session.index);
+  };
+  if (sessionRows.length) {
+    var firstFailed = sessionRows.filter(function (r) { return !r.ok; })[0] || sessionRows[0];
+    sessionTable.selectedItem = firstFailed;
+    sessionTable.render();
+    sessionTable.onselect(firstFailed);
+  }
+})();
+</script>
+</body>
+</html>
+"""
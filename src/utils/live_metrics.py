@@ -0,0 +1,375 @@
+"""
+実行中のメトリクスの公開モジュール
+
+テストの実行中にセッション数、操作IDごとのアクションの所要時間のヒストグラム、WebDriverの
+コマンド数、撮影中のスクリーンショット数、ホストのCPU・メモリ使用量を集計し、Prometheusの
+テキスト形式でローカルのHTTPエンドポイントから公開する。HTTPサーバーはデーモンスレッドで動作し、
+集計はカウンタの加算のみ、文字列への変換は取得（スクレイプ）のたびに行うため、
+セッションの実行への影響はほとんどない。
+"""
+import math
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from src.utils.logger import setup_logger
+from src.utils.toml_utils import get_int, get_str
+
+# psutilはオプション（ない場合は /proc を参照する）
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+METRIC_PREFIX = "aitest"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# アクションの所要時間のヒストグラムのバケットの上限値（秒）
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: Any) -> str:
+    """ラベルの値をエスケープする"""
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    """メトリクスの値を文字列にする"""
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class HostUsage:
+    """ホストのCPU・メモリ使用量の取得（psutilがない場合は /proc を参照する）"""
+
+    def __init__(self):
+        # 前回取得時の (アイドル時間, 合計時間)
+        self._last_cpu: Optional[Tuple[int, int]] = None
+
+    def cpu_percent(self) -> Optional[float]:
+        """
+        前回の取得からのCPU使用率を返す（初回は起動時からの平均）
+
+        Returns:
+            CPU使用率（%、取得できない場合はNone）
+        """
+        if psutil:
+            return psutil.cpu_percent(interval=None)
+        try:
+            with open('/proc/stat', 'r') as f:
+                fields = [int(value) for value in f.readline().split()[1:9]]
+        except (OSError, ValueError):
+            return None
+        if len(fields) < 4:
+            return None
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+        total = sum(fields)
+        last_idle, last_total = self._last_cpu or (0, 0)
+        self._last_cpu = (idle, total)
+        if total <= last_total:
+            return 0.0
+        return 100.0 * (1 - (idle - last_idle) / (total - last_total))
+
+    @staticmethod
+    def memory() -> Optional[Tuple[int, int]]:
+        """
+        ホストのメモリ使用量を返す
+
+        Returns:
+            (使用量, 合計)（バイト、取得できない場合はNone）
+        """
+        if psutil:
+            memory = psutil.virtual_memory()
+            return memory.total - memory.available, memory.total
+        values = {}
+        try:
+            with open('/proc/meminfo', 'r') as f:
+                for line in f:
+                    name, _, value = line.partition(':')
+                    values[name] = int(value.split()[0]) * 1024
+        except (OSError, ValueError, IndexError):
+            return None
+        if 'MemTotal' not in values or 'MemAvailable' not in values:
+            return None
+        return values['MemTotal'] - values['MemAvailable'], values['MemTotal']
+
+
+class _ActionMetrics:
+    """1つの操作IDのアクションの集計"""
+
+    __slots__ = ("buckets", "sum", "count", "failures")
+
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+        self.failures = 0
+
+
+class LiveMetrics:
+    """実行中のメトリクスを集計し、Prometheus形式で公開するクラス"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9464):
+        """
+        コンストラクタ
+
+        Args:
+            host: 待ち受けるアドレス
+            port: 待ち受けるポート（0の場合は空いているポートを使用する）
+        """
+        self.host = host
+        self.port = port
+        self.logger = setup_logger("LiveMetrics")
+        self._lock = threading.Lock()
+        self.active_sessions = 0
+        self.sessions_started = 0
+        self.sessions_completed = 0
+        self.sessions_failed = 0
+        self.screenshots_in_progress = 0
+        self.screenshots_total = 0
+        self.commands_in_flight = 0
+        self._actions: Dict[str, _ActionMetrics] = {}
+        self._commands: Dict[str, int] = {}
+        self._command_errors: Dict[str, int] = {}
+        # 取得時に値を問い合わせるゲージ（名前, 説明, 値を返す関数）
+        self._gauges: List[Tuple[str, str, Callable[[], float]]] = []
+        self._host = HostUsage()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["LiveMetrics"]:
+        """
+        設定ファイルの内容から作成する
+
+        Args:
+            config: 設定ファイルの内容
+
+        Returns:
+            メトリクスの集計（metrics_port が0以下の場合はNone）
+        """
+        port = get_int(config, 'metrics_port', 0)
+        if port <= 0:
+            return None
+        return cls(get_str(config, 'metrics_host', '127.0.0.1'), port)
+
+    @property
+    def url(self) -> str:
+        """メトリクスのURL"""
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def session_started(self) -> None:
+        """セッションの開始を記録する"""
+        with self._lock:
+            self.active_sessions += 1
+            self.sessions_started += 1
+
+    def session_ended(self, success: bool) -> None:
+        """
+        セッションの終了を記録する
+
+        Args:
+            success: 成功したかどうか
+        """
+        with self._lock:
+            self.active_sessions = max(0, self.active_sessions - 1)
+            self.sessions_completed += 1
+            if not success:
+                self.sessions_failed += 1
+
+    def record_action(self, action_id: Any, duration: Optional[float], success: bool) -> None:
+        """
+        アクションの完了を記録する
+
+        Args:
+            action_id: 操作ID
+            duration: 所要時間（秒、不明な場合はNone）
+            success: 成功したかどうか
+        """
+        action_id = str(action_id)
+        with self._lock:
+            metrics = self._actions.get(action_id)
+            if metrics is None:
+                metrics = self._actions[action_id] = _ActionMetrics()
+            if not success:
+                metrics.failures += 1
+            if isinstance(duration, (int, float)):
+                metrics.count += 1
+                metrics.sum += duration
+                for index, bound in enumerate(LATENCY_BUCKETS):
+                    if duration <= bound:
+                        metrics.buckets[index] += 1
+                        break
+
+    def screenshot_started(self) -> None:
+        """スクリーンショットの撮影の開始を記録する"""
+        with self._lock:
+            self.screenshots_in_progress += 1
+
+    def screenshot_finished(self) -> None:
+        """スクリーンショットの撮影の終了を記録する"""
+        with self._lock:
+            self.screenshots_in_progress = max(0, self.screenshots_in_progress - 1)
+            self.screenshots_total += 1
+
+    def add_gauge(self, name: str, help_text: str, callback: Callable[[], float]) -> None:
+        """
+        取得時に値を問い合わせるゲージを追加する
+
+        Args:
+            name: メトリクス名（プレフィックスを除く）
+            help_text: 説明
+            callback: 値を返す関数
+        """
+        with self._lock:
+            self._gauges.append((name, help_text, callback))
+
+    def instrument_driver(self, driver) -> None:
+        """
+        WebDriverのコマンドの実行数を記録するようにドライバーを設定する
+
+        すべてのコマンドは driver.execute を経由するため、インスタンスの execute を
+        コマンド名ごとに件数を加算する関数に置き換える。
+
+        Args:
+            driver: WebDriverのインスタンス
+        """
+        execute = driver.execute
+
+        def counting_execute(driver_command, params=None):
+            with self._lock:
+                self._commands[driver_command] = self._commands.get(driver_command, 0) + 1
+                self.commands_in_flight += 1
+            try:
+                return execute(driver_command, params)
+            except Exception:
+                with self._lock:
+                    self._command_errors[driver_command] = self._command_errors.get(driver_command, 0) + 1
+                raise
+            finally:
+                with self._lock:
+                    self.commands_in_flight -= 1
+
+        driver.execute = counting_execute
+
+    def render(self) -> str:
+        """
+        メトリクスをPrometheusのテキスト形式に変換する
+
+        Returns:
+            メトリクスの文字列
+        """
+        lines: List[str] = []
+
+        def metric(name: str, metric_type: str, help_text: str, samples) -> None:
+            name = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for suffix, labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape(label)}"' for key, label in labels)
+                lines.append(f"{name}{suffix}{{{label_text}}} {_number(value)}" if label_text
+                             else f"{name}{suffix} {_number(value)}")
+
+        with self._lock:
+            counters = (self.active_sessions, self.sessions_started, self.sessions_completed, self.sessions_failed,
+                        self.screenshots_in_progress, self.screenshots_total, self.commands_in_flight)
+            actions = [(action_id, list(item.buckets), item.sum, item.count, item.failures)
+                       for action_id, item in self._actions.items()]
+            commands = sorted(self._commands.items())
+            command_errors = sorted(self._command_errors.items())
+            gauges = list(self._gauges)
+        active, started, completed, failed, screenshots_in_progress, screenshots, in_flight = counters
+
+        metric("active_sessions", "gauge", "実行中のセッション数", [("", (), active)])
+        metric("sessions_started_total", "counter", "開始したセッション数", [("", (), started)])
+        metric("sessions_completed_total", "counter", "終了したセッション数（失敗を含む）", [("", (), completed)])
+        metric("sessions_failed_total", "counter", "失敗したセッション数", [("", (), failed)])
+
+        histogram = []
+        for action_id, buckets, total, count, _ in actions:
+            cumulative = 0
+            for bound, bucket in zip(LATENCY_BUCKETS, buckets):
+                cumulative += bucket
+                histogram.append(("_bucket", (("action_id", action_id), ("le", _number(bound))), cumulative))
+            histogram.append(("_bucket", (("action_id", action_id), ("le", "+Inf")), count))
+            histogram.append(("_sum", (("action_id", action_id),), total))
+            histogram.append(("_count", (("action_id", action_id),), count))
+        metric("action_duration_seconds", "histogram", "操作IDごとのアクションの所要時間（秒）", histogram)
+        metric("action_failures_total", "counter", "操作IDごとの失敗したアクション数",
+               [("", (("action_id", action_id),), failures) for action_id, _, _, _, failures in actions])
+
+        metric("webdriver_commands_total", "counter", "WebDriverのコマンドごとの実行数",
+               [("", (("command", command),), count) for command, count in commands])
+        metric("webdriver_command_errors_total", "counter", "WebDriverのコマンドごとの失敗数",
+               [("", (("command", command),), count) for command, count in command_errors])
+        metric("webdriver_commands_in_flight", "gauge", "実行中のWebDriverのコマンド数", [("", (), in_flight)])
+        metric("screenshots_in_progress", "gauge", "撮影中のスクリーンショット数", [("", (), screenshots_in_progress)])
+        metric("screenshots_total", "counter", "撮影したスクリーンショット数", [("", (), screenshots)])
+
+        for name, help_text, callback in gauges:
+            try:
+                value = callback()
+            except Exception as e:
+                self.logger.debug(f"メトリクス {name} の取得に失敗しました: {str(e)}")
+                continue
+            metric(name, "gauge", help_text, [("", (), value)])
+
+        cpu = self._host.cpu_percent()
+        if cpu is not None:
+            metric("host_cpu_percent", "gauge", "ホストのCPU使用率（%、前回の取得から）", [("", (), round(cpu, 2))])
+        memory = self._host.memory()
+        if memory is not None:
+            metric("host_memory_used_bytes", "gauge", "ホストのメモリ使用量（バイト）", [("", (), memory[0])])
+            metric("host_memory_total_bytes", "gauge", "ホストのメモリの合計（バイト）", [("", (), memory[1])])
+        if hasattr(os, "getloadavg"):
+            metric("host_load1", "gauge", "ホストの1分間のロードアベレージ", [("", (), os.getloadavg()[0])])
+        return "\n".join(lines) + "\n"
+
+    def start(self) -> bool:
+        """
+        HTTPサーバーをバックグラウンドのスレッドで起動する
+
+        Returns:
+            起動に成功した場合True
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                metrics.logger.debug(f"メトリクスの取得: {self.address_string()} {format % args}")
+
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            self.logger.warning(f"メトリクスのエンドポイントを起動できませんでした ({self.host}:{self.port}): {str(e)}")
+            self._server = None
+            return False
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="live-metrics", daemon=True)
+        self._thread.start()
+        self.logger.info(f"メトリクスのエンドポイント: {self.url}")
+        return True
+
+    def stop(self) -> None:
+        """HTTPサーバーを停止する"""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=5.0)
+        self._server = None
+        self._thread = None
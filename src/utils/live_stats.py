@@ -0,0 +1,244 @@
+"""
+実行中の統計の端末表示モジュール
+
+アクションの完了ごとに操作IDごとの件数、エラー数、所要時間の固定のヒストグラム
+（時系列と同じ対数間隔のビン）を加算するのみで集計し、表示用のスレッドが一定の間隔で
+操作IDごとのスループット、p50/p95、エラー数と、実行中・待機中のセッション数、
+残り時間の見込みの表を作成する。端末（TTY）では同じ位置に表を再描画し、
+それ以外（CIのログ等）では表をそのまま追記する。
+"""
+import math
+import sys
+import threading
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, Any, Optional, TextIO
+
+from src.utils.console_table import format_table
+from src.utils.timeline import HISTOGRAM_BINS, histogram_bin, histogram_percentile
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """
+    秒数を時:分:秒の文字列にする
+
+    Args:
+        seconds: 秒数（Noneの場合は "-"）
+
+    Returns:
+        "H:MM:SS" 形式の文字列
+    """
+    if seconds is None or math.isnan(seconds):
+        return "-"
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class _ActionStats:
+    """1つの操作IDの集計"""
+
+    __slots__ = ("count", "errors", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.histogram = array('l', [0]) * (HISTOGRAM_BINS + 1)
+
+
+class LiveStats:
+    """実行中の統計を一定のメモリで集計するクラス"""
+
+    def __init__(self, total_sessions: int = 0):
+        """
+        コンストラクタ
+
+        Args:
+            total_sessions: 実行するセッション数
+        """
+        self.total_sessions = total_sessions
+        self._lock = threading.Lock()
+        self._origin = time.monotonic()
+        self.active_sessions = 0
+        self.started_sessions = 0
+        self.completed_sessions = 0
+        self.failed_sessions = 0
+        self._actions: Dict[str, _ActionStats] = {}
+
+    def start(self, total_sessions: Optional[int] = None) -> None:
+        """
+        経過時間の計測を開始する
+
+        Args:
+            total_sessions: 実行するセッション数（Noneの場合は変更しない）
+        """
+        with self._lock:
+            self._origin = time.monotonic()
+            if total_sessions is not None:
+                self.total_sessions = total_sessions
+
+    def session_started(self) -> None:
+        """セッションの開始を記録する"""
+        with self._lock:
+            self.active_sessions += 1
+            self.started_sessions += 1
+
+    def session_ended(self, success: bool) -> None:
+        """
+        セッションの終了を記録する
+
+        Args:
+            success: 成功したかどうか
+        """
+        with self._lock:
+            self.active_sessions = max(0, self.active_sessions - 1)
+            self.completed_sessions += 1
+            if not success:
+                self.failed_sessions += 1
+
+    def record_action(self, action_id: Any, duration: Optional[float], success: bool) -> None:
+        """
+        アクションの完了を記録する
+
+        Args:
+            action_id: 操作ID
+            duration: 所要時間（秒、不明な場合はNone）
+            success: 成功したかどうか
+        """
+        action_id = str(action_id)
+        with self._lock:
+            stats = self._actions.get(action_id)
+            if stats is None:
+                stats = self._actions[action_id] = _ActionStats()
+            stats.count += 1
+            if not success:
+                stats.errors += 1
+            if isinstance(duration, (int, float)):
+                stats.histogram[histogram_bin(duration)] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        現在の集計を返す
+
+        Returns:
+            elapsed（経過秒数）、sessions（total, active, queued, completed, failed）、
+            eta（残り時間の見込みの秒数、不明な場合はNone）、
+            actions（操作IDごとの count, errors, p50, p95、初出順）
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self._origin
+            sessions = {
+                "total": self.total_sessions,
+                "active": self.active_sessions,
+                "queued": max(0, self.total_sessions - self.started_sessions),
+                "completed": self.completed_sessions,
+                "failed": self.failed_sessions,
+            }
+            actions = [(action_id, stats.count, stats.errors, list(stats.histogram))
+                       for action_id, stats in self._actions.items()]
+        # 完了したセッションの平均的な速さで残りのセッションを実行した場合の時間
+        remaining = max(0, sessions["total"] - sessions["completed"])
+        eta = None
+        if remaining == 0:
+            eta = 0.0
+        elif sessions["completed"] and elapsed > 0:
+            eta = remaining * elapsed / sessions["completed"]
+        return {
+            "elapsed": elapsed,
+            "sessions": sessions,
+            "eta": eta,
+            "actions": [{"action_id": action_id, "count": count, "errors": errors,
+                         "p50": histogram_percentile(histogram, 50), "p95": histogram_percentile(histogram, 95)}
+                        for action_id, count, errors, histogram in actions],
+        }
+
+
+class LiveStatsReporter:
+    """実行中の統計の表を一定の間隔で表示するクラス"""
+
+    def __init__(self, stats: LiveStats, interval: float = 5.0, stream: Optional[TextIO] = None):
+        """
+        コンストラクタ
+
+        Args:
+            stats: 実行中の統計
+            interval: 表示の間隔（秒）
+            stream: 出力先（Noneの場合は標準出力）
+        """
+        self.stats = stats
+        self.interval = max(0.1, interval)
+        self.stream = stream or sys.stdout
+        isatty = getattr(self.stream, "isatty", None)
+        self.redraw = bool(isatty and isatty())
+        self._drawn_lines = 0
+        self._last_time: Optional[float] = None
+        self._last_counts: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def format(self, snapshot: Dict[str, Any]) -> str:
+        """
+        統計の表を作成する（前回の表示からのスループットを計算する）
+
+        Args:
+            snapshot: LiveStats.snapshot の戻り値
+
+        Returns:
+            表の文字列
+        """
+        elapsed = snapshot["elapsed"]
+        period = elapsed - self._last_time if self._last_time is not None else elapsed
+        rows = []
+        for action in snapshot["actions"]:
+            recent = action["count"] - self._last_counts.get(action["action_id"], 0)
+            rows.append([action["action_id"], str(action["count"]),
+                         f"{recent / period:.2f}" if period > 0 else "-",
+                         "-" if action["p50"] is None else f"{action['p50']:.3f}",
+                         "-" if action["p95"] is None else f"{action['p95']:.3f}",
+                         str(action["errors"])])
+            self._last_counts[action["action_id"]] = action["count"]
+        self._last_time = elapsed
+
+        sessions = snapshot["sessions"]
+        status = (f"[{datetime.now().strftime('%H:%M:%S')}] 経過 {format_duration(elapsed)}  "
+                  f"セッション 実行中 {sessions['active']} / 待機 {sessions['queued']} / "
+                  f"完了 {sessions['completed']}/{sessions['total']} (失敗 {sessions['failed']})  "
+                  f"残り {format_duration(snapshot['eta'])}")
+        if not rows:
+            return status
+        return status + "\n" + format_table(["操作ID", "件数", "件/秒", "p50(秒)", "p95(秒)", "エラー"], rows)
+
+    def render(self) -> None:
+        """現在の統計を表示する（端末の場合は前回の表を消して再描画する）"""
+        text = self.format(self.stats.snapshot())
+        if self.redraw:
+            # 前回の表の先頭に戻り、以降を消去する
+            prefix = f"\x1b[{self._drawn_lines}F\x1b[J" if self._drawn_lines else ""
+            self.stream.write(prefix + text + "\n")
+            self._drawn_lines = text.count("\n") + 1
+        else:
+            self.stream.write(text + "\n\n")
+        self.stream.flush()
+
+    def start(self) -> None:
+        """表示のスレッドを起動する"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="live-stats", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """表示のスレッドを停止し、最終的な統計を表示する"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=self.interval + 1.0)
+        self._thread = None
+        self.render()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.render()
+            except (OSError, ValueError):
+                # 出力先が閉じられた場合は表示を終了する
+                return
@@ -0,0 +1,196 @@
+"""
+ページ読み込みの計測モジュール
+
+URL移動とクリック系のアクションの後に、Navigation Timing と Resource Timing を1回のスクリプトの
+実行で取得し、DNS、接続、TTFB、DOMContentLoaded、load までの時間と、リソースの件数、転送量、
+キャッシュヒット率を記録する。ページ（ドキュメント）は performance.timeOrigin で識別し、
+前回の計測から新しいページに遷移していない場合は何も取得しない（クリックでページ遷移が
+発生しなかった場合、SPA の画面遷移の場合等）。
+
+操作IDごとの集計は時系列と同じ対数間隔のヒストグラムに加算するのみのため、
+ページ数が増えてもメモリ使用量は一定に保たれる。
+"""
+import threading
+from array import array
+from typing import Dict, Any, Iterable, List, Optional
+
+from src.utils.constants import OperationType
+from src.utils.timeline import HISTOGRAM_BINS, histogram_bin, histogram_percentile
+
+# ページ遷移が発生しうる操作タイプ
+NAVIGATION_TYPES = (OperationType.URL_MOVE, OperationType.CLICK, OperationType.FORCE_CLICK, OperationType.JS_CLICK)
+
+# 集計する時間の項目（キー, 見出し）
+TIMING_FIELDS = (("dns", "DNS"), ("connect", "接続"), ("ttfb", "TTFB"),
+                 ("dom_content_loaded", "DOMContentLoaded"), ("load", "load"))
+
+# 前回の計測と同じページ（timeOrigin が arguments[0] と一致）の場合は null を返す。
+# 時間はミリ秒（ナビゲーションの開始から）、サイズはバイト。
+PAGE_TIMING_SCRIPT = """
+var origin = performance.timeOrigin;
+if (origin === arguments[0]) { return null; }
+var nav = performance.getEntriesByType('navigation')[0];
+if (!nav) { return null; }
+var resources = performance.getEntriesByType('resource');
+var bytes = 0, sized = 0, cached = 0;
+for (var i = 0; i < resources.length; i++) {
+  var r = resources[i];
+  bytes += r.transferSize || 0;
+  if (r.transferSize > 0 || r.decodedBodySize > 0) {
+    sized++;
+    if (r.transferSize === 0) { cached++; }
+  }
+}
+return {origin: origin, url: nav.name, type: nav.type,
+        dns: nav.domainLookupEnd - nav.domainLookupStart, connect: nav.connectEnd - nav.connectStart,
+        ttfb: nav.responseStart, dom_content_loaded: nav.domContentLoadedEventEnd, load: nav.loadEventEnd,
+        document_bytes: nav.transferSize || 0, resources: resources.length, transfer_bytes: bytes,
+        sized_resources: sized, cached_resources: cached};
+"""
+
+
+def capture_page_timing(driver, last_origin: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    現在のページの読み込みの計測値を取得する
+
+    Args:
+        driver: WebDriver
+        last_origin: 前回計測したページの timeOrigin（同じページの場合は取得しない）
+
+    Returns:
+        origin, url, type, dns, connect, ttfb, dom_content_loaded, load（秒、未完了の場合はNone）、
+        resources, transfer_bytes（ドキュメントを含む）, sized_resources（サイズが取得できたリソース数）,
+        cached_resources, cache_hit_ratio（新しいページでない場合、取得できない場合はNone）
+    """
+    entry = driver.execute_script(PAGE_TIMING_SCRIPT, last_origin)
+    if not isinstance(entry, dict):
+        return None
+    timing = {"origin": entry.get("origin"), "url": entry.get("url", ""), "type": entry.get("type", "")}
+    for key, _ in TIMING_FIELDS:
+        value = entry.get(key)
+        # 0 は該当するイベントが未完了（load の前に計測した場合等）
+        timing[key] = round(value / 1000, 6) if isinstance(value, (int, float)) and value > 0 else None
+    # 接続の再利用・キャッシュの場合は DNS、接続の時間が 0 になる
+    for key in ("dns", "connect"):
+        if timing[key] is None and isinstance(entry.get(key), (int, float)):
+            timing[key] = 0.0
+    sized = int(entry.get("sized_resources") or 0)
+    cached = int(entry.get("cached_resources") or 0)
+    timing.update({
+        "resources": int(entry.get("resources") or 0),
+        "transfer_bytes": int(entry.get("document_bytes") or 0) + int(entry.get("transfer_bytes") or 0),
+        "sized_resources": sized,
+        "cached_resources": cached,
+        "cache_hit_ratio": round(cached / sized, 4) if sized else None,
+    })
+    return timing
+
+
+class _ActionPages:
+    """1つの操作IDのページ読み込みの集計"""
+
+    __slots__ = ("pages", "resources", "transfer_bytes", "sized_resources", "cached_resources", "sums", "counts",
+                 "histograms")
+
+    def __init__(self):
+        self.pages = 0
+        self.resources = 0
+        self.transfer_bytes = 0
+        self.sized_resources = 0
+        self.cached_resources = 0
+        self.sums = {key: 0.0 for key, _ in TIMING_FIELDS}
+        self.counts = {key: 0 for key, _ in TIMING_FIELDS}
+        self.histograms = {key: array('l', [0]) * (HISTOGRAM_BINS + 1) for key, _ in TIMING_FIELDS}
+
+
+class PageTimingStats:
+    """操作IDごとのページ読み込みの計測値を一定のメモリで集計するクラス"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 操作IDごとの集計（初出順）
+        self._actions: Dict[str, _ActionPages] = {}
+
+    def __len__(self) -> int:
+        return len(self._actions)
+
+    def add(self, action_id: Any, timing: Dict[str, Any]) -> None:
+        """
+        1ページの計測値を加算する
+
+        Args:
+            action_id: 操作ID
+            timing: capture_page_timing の戻り値
+        """
+        action_id = str(action_id)
+        with self._lock:
+            stats = self._actions.get(action_id)
+            if stats is None:
+                stats = self._actions[action_id] = _ActionPages()
+            stats.pages += 1
+            stats.resources += int(timing.get("resources") or 0)
+            stats.transfer_bytes += int(timing.get("transfer_bytes") or 0)
+            stats.sized_resources += int(timing.get("sized_resources") or 0)
+            stats.cached_resources += int(timing.get("cached_resources") or 0)
+            for key, _ in TIMING_FIELDS:
+                value = timing.get(key)
+                if isinstance(value, (int, float)):
+                    stats.sums[key] += value
+                    stats.counts[key] += 1
+                    stats.histograms[key][histogram_bin(value)] += 1
+
+    def add_session(self, session: Dict[str, Any]) -> None:
+        """
+        セッションの結果のアクションに記録された計測値を加算する
+
+        Args:
+            session: セッションの実行結果
+        """
+        for action in session.get("actions", []):
+            timing = action.get("page_timing")
+            if isinstance(timing, dict):
+                self.add(action.get("action_id", action.get("操作ID", "")), timing)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        操作IDごとの集計を返す
+
+        Returns:
+            action_id, pages, <項目>（mean, p50, p95 の辞書、計測値がない場合はNone）,
+            resources（1ページあたりの平均）, transfer_bytes（1ページあたりの平均）, cache_hit_ratio
+            のリスト（初出順）
+        """
+        with self._lock:
+            summary = []
+            for action_id, stats in self._actions.items():
+                row: Dict[str, Any] = {"action_id": action_id, "pages": stats.pages}
+                for key, _ in TIMING_FIELDS:
+                    count = stats.counts[key]
+                    histogram = stats.histograms[key]
+                    row[key] = {
+                        "mean": round(stats.sums[key] / count, 6),
+                        "p50": histogram_percentile(histogram, 50),
+                        "p95": histogram_percentile(histogram, 95),
+                    } if count else None
+                row["resources"] = round(stats.resources / stats.pages, 1)
+                row["transfer_bytes"] = round(stats.transfer_bytes / stats.pages)
+                row["cache_hit_ratio"] = (round(stats.cached_resources / stats.sized_resources, 4)
+                                          if stats.sized_resources else None)
+                summary.append(row)
+            return summary
+
+
+def summarize_page_timing(sessions: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    セッションの結果のページ読み込みの計測値を操作IDごとに集計する
+
+    Args:
+        sessions: セッションの実行結果
+
+    Returns:
+        PageTimingStats.summary の戻り値
+    """
+    stats = PageTimingStats()
+    for session in sessions:
+        stats.add_session(session)
+    return stats.summary()
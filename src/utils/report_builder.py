@@ -0,0 +1,384 @@
+"""
+保存済みのテスト結果からレポートを再生成するモジュール
+
+result/test_results.json とスクリーンショットのファイル一覧からレポートを再生成する。
+生成したレポートごとに入力（テスト結果、スクリーンショット、設定）のフィンガープリントを
+result/report_manifest.json に記録し、入力が変わったレポートのみを再生成する。
+"""
+import concurrent.futures
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from src.utils.error_clusters import cluster_errors
+from src.utils.excel_report import build_excel_report_config, resolve_report_mode, select_excel_report_generator
+from src.utils.file_utils import save_json
+from src.utils.html_report import generate_html_report
+from src.utils.logger import setup_logger
+from src.utils.page_timing import summarize_page_timing
+from src.utils.results_io import find_results_file, iter_sessions, load_results_metadata
+from src.utils.sample_export import SAMPLES_FILE, export_action_samples, resolve_sample_format
+from src.utils.toml_utils import get_bool, get_int, get_str
+from src.utils.web_vitals import summarize_web_vitals
+
+SUMMARY_FILE = "test_summary.json"
+MANIFEST_FILE = "report_manifest.json"
+
+
+def parse_session_spec(spec: str) -> List[int]:
+    """
+    セッションIDの指定を解析する
+
+    Args:
+        spec: カンマ区切りのセッションIDまたは範囲（例: "1-10,15"）
+
+    Returns:
+        昇順のセッションIDのリスト
+
+    Raises:
+        ValueError: 指定の形式が正しくない場合
+    """
+    session_ids = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        match = re.fullmatch(r'(\d+)\s*-\s*(\d+)', part)
+        if match:
+            start, end = int(match.group(1)), int(match.group(2))
+            if start > end:
+                raise ValueError(f"セッションIDの範囲が正しくありません: {part}")
+            session_ids.update(range(start, end + 1))
+        elif part.isdigit():
+            session_ids.add(int(part))
+        else:
+            raise ValueError(f"セッションIDの指定が正しくありません: {part}")
+    return sorted(session_ids)
+
+
+def select_sessions(results: Dict[str, Any], session_ids: Optional[List[int]]) -> Dict[str, Any]:
+    """
+    指定したセッションのみを含むテスト結果を作成する
+
+    Args:
+        results: テスト結果
+        session_ids: 対象のセッションID（Noneの場合は全セッション）
+
+    Returns:
+        テスト結果（セッション数の集計を対象のセッションで再計算したもの）
+    """
+    if session_ids is None:
+        return results
+    selected = set(session_ids)
+    sessions = [session for session in results.get("sessions", []) if session.get("session_id") in selected]
+    successful = sum(1 for session in sessions if session.get("success", False))
+    exemplars = [exemplar for exemplar in results.get("exemplars", []) if exemplar.get("session_id") in selected]
+    return {
+        **results,
+        "sessions": sessions,
+        "exemplars": exemplars,
+        "error_clusters": cluster_errors(sessions),
+        "page_timing": summarize_page_timing(sessions),
+        "web_vitals": summarize_web_vitals(sessions),
+        "total_sessions": len(sessions),
+        "successful_sessions": successful,
+        "failed_sessions": len(sessions) - successful,
+        "success": successful == len(sessions)
+    }
+
+
+def build_results_summary(results: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    テスト結果の要約を作成する
+
+    Args:
+        results: テスト結果
+
+    Returns:
+        セッション数の集計、エラーの分類、ページ読み込みと Web Vitals の集計、セッションごとの結果のみを含む要約
+    """
+    sessions = results.get("sessions", [])
+    successful = sum(1 for session in sessions if session.get("success", False))
+    error_clusters = results.get("error_clusters")
+    page_timing = results.get("page_timing")
+    web_vitals = results.get("web_vitals")
+    return {
+        "start_time": results.get("start_time"),
+        "end_time": results.get("end_time"),
+        "duration": results.get("duration", 0),
+        "total_sessions": len(sessions),
+        "successful_sessions": successful,
+        "failed_sessions": len(sessions) - successful,
+        "success_rate": round(successful / len(sessions) * 100, 1) if sessions else 0.0,
+        "error_clusters": error_clusters if error_clusters is not None else cluster_errors(sessions),
+        "page_timing": page_timing if page_timing is not None else summarize_page_timing(sessions),
+        "web_vitals": web_vitals if web_vitals is not None else summarize_web_vitals(sessions),
+        "sessions": [
+            {
+                "session_id": session.get("session_id"),
+                "user_id": session.get("user_id", ""),
+                "success": session.get("success", False),
+                "duration": session.get("duration", 0),
+                "actions": len(session.get("actions", [])),
+                "errors": len(session.get("errors", []))
+            }
+            for session in sessions
+        ]
+    }
+
+
+def screenshot_index(output_dir: str, sessions: List[Dict[str, Any]]) -> List[List[Any]]:
+    """
+    セッションのスクリーンショットと録画のファイル一覧を作成する（フィンガープリントの入力）
+
+    Args:
+        output_dir: 出力ディレクトリ
+        sessions: セッションの実行結果のリスト
+
+    Returns:
+        [出力ディレクトリからの相対パス, サイズ, 更新時刻(ns)] のリスト
+    """
+    paths = []
+    for session in sessions:
+        session_dir = os.path.join(output_dir, "screenshot", f"session_{session.get('session_id')}")
+        for root, _, files in os.walk(session_dir):
+            paths.extend(os.path.join(root, file) for file in files)
+        recording = session.get("recording")
+        if recording and recording.get("index"):
+            paths.append(os.path.join(output_dir, recording["index"]))
+
+    index = []
+    for path in sorted(paths):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        index.append([os.path.relpath(path, output_dir).replace(os.sep, "/"), stat.st_size, stat.st_mtime_ns])
+    return index
+
+
+def fingerprint(*inputs: Any) -> str:
+    """
+    入力のフィンガープリントを計算する
+
+    Args:
+        inputs: JSONに変換可能な入力
+
+    Returns:
+        SHA-256の16進文字列
+    """
+    data = json.dumps(inputs, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _build_excel(results: Dict[str, Any], output_dir: str, excel_config: Dict[str, Any], engine: str,
+                 shard_size: int, workers: int, mode: str, path: str) -> str:
+    """Excelレポートを生成する（ワーカープロセスで実行）"""
+    generator = select_excel_report_generator(engine, len(results.get("sessions", [])), shard_size, workers, mode)
+    return generator(results, output_dir, excel_config, excel_path=path)
+
+
+def _build_html(results: Dict[str, Any], output_dir: str, config: Dict[str, Any], path: str) -> str:
+    """HTMLレポートを生成する（ワーカープロセスで実行）"""
+    return generate_html_report(results, output_dir, config, html_path=path)
+
+
+def _build_samples(results: Dict[str, Any], output_dir: str, sample_format: str, path: str) -> str:
+    """アクション単位のサンプルを出力する（ワーカープロセスで実行）"""
+    return export_action_samples(results, output_dir, sample_format, path=path)
+
+
+def _build_summary(results: Dict[str, Any], path: str) -> str:
+    """テスト結果の要約を保存する（ワーカープロセスで実行）"""
+    save_json(build_results_summary(results), path)
+    return path if os.path.exists(path) else ""
+
+
+class ReportBuilder:
+    """保存済みのテスト結果からレポートを再生成するクラス"""
+
+    def __init__(self, output_dir: str, config: Dict[str, Any], session_ids: Optional[List[int]] = None,
+                 workers: int = 0, force: bool = False, engine: str = None, shard_size: int = None,
+                 mode: str = None, html: bool = None, sample_format: str = None):
+        """
+        コンストラクタ
+
+        Args:
+            output_dir: テスト実行時の出力ディレクトリ
+            config: 設定ファイルの内容
+            session_ids: 対象のセッションID（Noneの場合は全セッション）
+            workers: 並列に生成するプロセス数（0の場合はCPU数、1の場合は順番に生成）
+            force: 入力が変わっていないレポートも再生成する
+            engine: Excelレポートの生成方式（Noneの場合は設定ファイルの report_engine）
+            shard_size: 1つのワークブックに含めるセッション数（Noneの場合は設定ファイルの report_shard_size）
+            mode: レポートの構成（detailed / aggregate / auto、Noneの場合は設定ファイルの report_mode）
+            html: HTMLレポートも生成する（Noneの場合は設定ファイルの html_report）
+            sample_format: アクション単位のサンプルの出力形式（auto / parquet / csv / none、
+                Noneの場合は設定ファイルの sample_export）
+        """
+        self.output_dir = output_dir
+        self.result_dir = os.path.join(output_dir, "result")
+        self.config = config
+        self.session_ids = session_ids
+        self.workers = workers or os.cpu_count() or 1
+        self.force = force
+        self.engine = (engine or get_str(config, 'report_engine', 'standard')).lower()
+        self.shard_size = shard_size if shard_size is not None else get_int(config, 'report_shard_size', 0)
+        self.mode = (mode or get_str(config, 'report_mode', 'detailed')).lower()
+        self.aggregate_threshold = get_int(config, 'report_aggregate_threshold', 200)
+        self.html = html if html is not None else get_bool(config, 'html_report', False)
+        self.sample_format = resolve_sample_format(sample_format or get_str(config, 'sample_export', 'none'))
+        self.logger = setup_logger("ReportBuilder")
+        self.manifest_path = os.path.join(self.result_dir, MANIFEST_FILE)
+
+    def load_results(self) -> Dict[str, Any]:
+        """
+        保存済みのテスト結果を読み込む
+
+        Returns:
+            テスト結果（対象のセッションのみ）
+
+        Raises:
+            FileNotFoundError: テスト結果のファイルが存在しない場合
+        """
+        results_path = find_results_file(self.result_dir)
+        if results_path is None:
+            raise FileNotFoundError(f"テスト結果のファイルが見つかりません: {self.result_dir}")
+        # 対象のセッションのみを順に読み込む
+        results = load_results_metadata(results_path)
+        selected = None if self.session_ids is None else set(self.session_ids)
+        results["sessions"] = [session for session in iter_sessions(results_path)
+                               if selected is None or session.get("session_id") in selected]
+        return select_sessions(results, self.session_ids)
+
+    def _suffix(self) -> str:
+        """対象のセッションを指定した場合のファイル名の接尾辞"""
+        if self.session_ids is None:
+            return ""
+        # 連続するIDは範囲にまとめる（例: 1-10_15）
+        ranges = []
+        for session_id in self.session_ids:
+            if ranges and session_id == ranges[-1][1] + 1:
+                ranges[-1][1] = session_id
+            else:
+                ranges.append([session_id, session_id])
+        return "_sessions_" + "_".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+    def plan(self, results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        生成するレポートの一覧を作成する
+
+        Args:
+            results: テスト結果
+
+        Returns:
+            レポートごとの名前、出力先、フィンガープリント、生成関数と引数のリスト
+        """
+        suffix = self._suffix()
+        excel_config = build_excel_report_config(self.config)
+        screenshots = screenshot_index(self.output_dir, results.get("sessions", []))
+        excel_path = os.path.join(self.result_dir, f"test_report{suffix}.xlsx")
+        summary_path = os.path.join(self.result_dir, f"test_summary{suffix}.json")
+        mode = resolve_report_mode(self.mode, len(results.get("sessions", [])), self.aggregate_threshold)
+        plan = [
+            {
+                "name": "excel",
+                "path": excel_path,
+                "fingerprint": fingerprint(results, screenshots, excel_config, self.engine, self.shard_size, mode),
+                "func": _build_excel,
+                "args": (results, self.output_dir, excel_config, self.engine, self.shard_size, self.workers,
+                         mode, excel_path)
+            },
+            {
+                "name": "summary",
+                "path": summary_path,
+                "fingerprint": fingerprint(build_results_summary(results)),
+                "func": _build_summary,
+                "args": (results, summary_path)
+            }
+        ]
+        if self.html:
+            html_path = os.path.join(self.result_dir, f"test_report{suffix}.html")
+            plan.append({
+                "name": "html",
+                "path": html_path,
+                "fingerprint": fingerprint(results, excel_config),
+                "func": _build_html,
+                "args": (results, self.output_dir, excel_config, html_path)
+            })
+        if self.sample_format != "none":
+            samples_path = os.path.join(self.result_dir, f"{SAMPLES_FILE}{suffix}.{self.sample_format}")
+            plan.append({
+                "name": "samples",
+                "path": samples_path,
+                "fingerprint": fingerprint(results, self.sample_format),
+                "func": _build_samples,
+                "args": (results, self.output_dir, self.sample_format, samples_path)
+            })
+        return plan
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        """生成済みのレポートのフィンガープリントを読み込む"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def build(self) -> Dict[str, Dict[str, Any]]:
+        """
+        入力が変わったレポートを再生成する
+
+        Returns:
+            レポートの名前ごとの出力先と状態（built / skipped / failed）
+        """
+        results = self.load_results()
+        manifest = self._load_manifest()
+        status: Dict[str, Dict[str, Any]] = {}
+
+        pending = []
+        for item in self.plan(results):
+            key = os.path.relpath(item["path"], self.result_dir).replace(os.sep, "/")
+            recorded = manifest.get(key, {})
+            if (not self.force and recorded.get("fingerprint") == item["fingerprint"]
+                    and os.path.exists(item["path"])):
+                self.logger.info(f"入力に変更がないため再生成しません: {item['path']}")
+                status[item["name"]] = {"path": item["path"], "status": "skipped"}
+            else:
+                pending.append((key, item))
+
+        def record(key, item, path):
+            if path:
+                manifest[key] = {"fingerprint": item["fingerprint"], "generated_at": datetime.now().isoformat()}
+                status[item["name"]] = {"path": path, "status": "built"}
+                self.logger.info(f"レポートを生成しました: {path}")
+            else:
+                status[item["name"]] = {"path": item["path"], "status": "failed"}
+                self.logger.error(f"レポートの生成に失敗しました: {item['path']}")
+
+        if self.workers > 1 and len(pending) > 1:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=min(self.workers, len(pending))) as executor:
+                futures = {executor.submit(item["func"], *item["args"]): (key, item) for key, item in pending}
+                for future in concurrent.futures.as_completed(futures):
+                    key, item = futures[future]
+                    try:
+                        path = future.result()
+                    except Exception as e:
+                        self.logger.error(f"レポートの生成中にエラーが発生しました: {str(e)}")
+                        path = ""
+                    record(key, item, path)
+        else:
+            for key, item in pending:
+                try:
+                    path = item["func"](*item["args"])
+                except Exception as e:
+                    self.logger.error(f"レポートの生成中にエラーが発生しました: {str(e)}")
+                    path = ""
+                record(key, item, path)
+
+        if pending:
+            save_json(manifest, self.manifest_path)
+        return status
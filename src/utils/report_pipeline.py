@@ -0,0 +1,166 @@
+"""
+テスト実行と並行してExcelレポートを生成するパイプラインモジュール
+
+完了したセッションの結果をバックグラウンドのプロセスへ順次渡し、セッション詳細シートと
+スクリーンショットシート（スクリーンショットの収集と画像の読み込みを含む）を
+テストの実行中に書き出す。全セッションの終了後に残る処理はサマリーシートの追加と保存のみとなる。
+"""
+import multiprocessing
+import queue
+import traceback
+from typing import Dict, Any, Optional
+
+from src.utils.excel_report import StreamingExcelReportWriter
+from src.utils.logger import setup_logger
+
+# サマリーシートの作成に必要なセッションの項目
+SUMMARY_SESSION_KEYS = ("session_id", "user_id", "success", "duration")
+
+
+def _pipeline_worker(tasks, done, output_dir: str, config: Dict[str, Any], excel_path: Optional[str]) -> None:
+    """
+    バックグラウンドプロセスのエントリーポイント
+
+    Args:
+        tasks: ("session", セッションの実行結果) / ("finish", テスト結果) / ("cancel", None) を受け取るキュー
+        done: ("ok", Excelファイルのパス) / ("error", エラーメッセージ) を返すキュー
+        output_dir: 出力ディレクトリ
+        config: 設定情報
+        excel_path: 出力先のExcelファイルのパス
+    """
+    try:
+        writer = StreamingExcelReportWriter(output_dir, config, excel_path)
+        while True:
+            kind, payload = tasks.get()
+            if kind == "session":
+                writer.add_session(payload)
+            elif kind == "finish":
+                done.put(("ok", writer.finish(payload)))
+                return
+            else:
+                return
+    except Exception as e:
+        done.put(("error", f"{str(e)}\n{traceback.format_exc()}"))
+
+
+class ReportPipeline:
+    """完了したセッションから順にExcelレポートを生成するクラス"""
+
+    def __init__(self, output_dir: str, config: Dict[str, Any], excel_path: str = None,
+                 finish_timeout: float = 600.0):
+        """
+        コンストラクタ
+
+        Args:
+            output_dir: 出力ディレクトリ
+            config: 設定情報（Excelレポートの設定）
+            excel_path: 出力先のExcelファイルのパス（Noneの場合は result/test_report.xlsx）
+            finish_timeout: 保存の完了を待つ最大時間（秒）
+        """
+        self.output_dir = output_dir
+        self.config = config
+        self.excel_path = excel_path
+        self.finish_timeout = finish_timeout
+        self.logger = setup_logger("ReportPipeline")
+        self.submitted = 0
+
+        self._tasks = None
+        self._done = None
+        self._process = None
+
+    @property
+    def running(self) -> bool:
+        """バックグラウンドプロセスが実行中かどうか"""
+        return self._process is not None and self._process.is_alive()
+
+    def start(self) -> bool:
+        """
+        バックグラウンドプロセスを起動する
+
+        Returns:
+            起動できた場合True
+        """
+        context = multiprocessing.get_context()
+        # デーモンプロセスは子プロセスを起動できないため、サムネイルはプロセス内で順番に生成する
+        config = {**self.config, "thumbnail_workers": 1}
+        try:
+            self._tasks = context.Queue()
+            self._done = context.Queue()
+            self._process = context.Process(
+                target=_pipeline_worker, name="report-pipeline",
+                args=(self._tasks, self._done, self.output_dir, config, self.excel_path),
+                daemon=True
+            )
+            self._process.start()
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"レポート生成プロセスを起動できませんでした: {str(e)}")
+            self._process = None
+            return False
+        self.logger.info("テストの実行と並行してExcelレポートを生成します")
+        return True
+
+    def submit(self, session: Dict[str, Any]) -> None:
+        """
+        完了したセッションのシートの生成を依頼する（即座に戻る）
+
+        Args:
+            session: セッションの実行結果
+        """
+        if not self.running:
+            return
+        self._tasks.put(("session", session))
+        self.submitted += 1
+
+    def finish(self, results: Dict[str, Any]) -> str:
+        """
+        サマリーシートを追加してレポートを保存する
+
+        Args:
+            results: テスト結果
+
+        Returns:
+            Excelファイルのパス（失敗した場合は空文字列）
+        """
+        if self._process is None:
+            return ""
+
+        # サマリーに必要な項目のみを渡す（セッション詳細は送信済み）
+        summary = {
+            "app_users": results.get("app_users", []),
+            "exemplars": results.get("exemplars", []),
+            "error_clusters": results.get("error_clusters", []),
+            "page_timing": results.get("page_timing", []),
+            "web_vitals": results.get("web_vitals", []),
+            "timeline": results.get("timeline"),
+            "sessions": [{key: session.get(key) for key in SUMMARY_SESSION_KEYS if key in session}
+                         for session in results.get("sessions", [])]
+        }
+        excel_path = ""
+        try:
+            self._tasks.put(("finish", summary))
+            status, value = self._done.get(timeout=self.finish_timeout)
+            if status == "ok":
+                excel_path = value
+            else:
+                self.logger.error(f"Excelレポートの並行生成に失敗しました: {value}")
+        except queue.Empty:
+            self.logger.error(f"Excelレポートの保存が{self.finish_timeout}秒以内に完了しませんでした")
+        finally:
+            self._stop()
+        return excel_path
+
+    def cancel(self) -> None:
+        """レポートを保存せずにバックグラウンドプロセスを終了する"""
+        if self._process is None:
+            return
+        if self.running:
+            self._tasks.put(("cancel", None))
+        self._stop()
+
+    def _stop(self, timeout: float = 5.0) -> None:
+        """バックグラウンドプロセスの終了を待つ（応答がない場合は強制終了する）"""
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(timeout)
+        self._process = None
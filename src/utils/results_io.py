@@ -0,0 +1,353 @@
+"""
+テスト結果の保存・読み込みモジュール
+
+テスト結果（test_results.json）をセッション単位で逐次書き出し、全体を読み込まずに
+セッションを順に読み出せる形式で保存する。JSONの場合は以下のように1行に1セッションを
+インデントなしで出力するため、通常のJSONとしても読み込める。
+
+    {"format":"results-stream/1","sessions":[
+    {"session_id":1,...}
+    ,{"session_id":2,...}
+    ]
+    ,"success":true,"duration":12.5,...}
+
+orjsonがインストールされている場合はシリアライズに使用する。results_format = "msgpack" の場合は
+test_results.msgpack に [種別, 内容] の MessagePack オブジェクトの列として保存する（msgpackが必要）。
+"""
+import itertools
+import json
+import logging
+import os
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+# orjson・msgpackはオプション（ない場合は標準のjsonを使用する）
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+RESULTS_NAME = "test_results"
+RESULTS_FORMATS = ("json", "msgpack")
+STREAM_FORMAT = "results-stream/1"
+# ストリーム形式のJSONの1行目
+_STREAM_HEADER = ('{"format":"' + STREAM_FORMAT + '","sessions":[').encode("utf-8")
+
+
+def dumps_json(data: Any) -> bytes:
+    """
+    インデントなしのJSONに変換する（orjsonがある場合は使用する）
+
+    Args:
+        data: 変換するデータ
+
+    Returns:
+        UTF-8のJSON（改行を含まない）
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _loads_json(data: bytes) -> Any:
+    """JSONを読み込む（orjsonがある場合は使用する）"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def resolve_results_format(results_format: str) -> str:
+    """
+    保存形式を決定する
+
+    Args:
+        results_format: 設定値（json / msgpack）
+
+    Returns:
+        json / msgpack（msgpack を指定してインストールされていない場合は json）
+    """
+    results_format = (results_format or "json").lower()
+    if results_format not in RESULTS_FORMATS:
+        logging.warning(f"テスト結果の保存形式が不正です: {results_format}（json で保存します）")
+        return "json"
+    if results_format == "msgpack" and msgpack is None:
+        logging.warning("msgpackがインストールされていないため、テスト結果をJSONで保存します")
+        return "json"
+    return results_format
+
+
+def results_path(result_dir: str, results_format: str = "json") -> str:
+    """
+    テスト結果の保存先を返す
+
+    Args:
+        result_dir: result ディレクトリ
+        results_format: 保存形式（json / msgpack）
+
+    Returns:
+        test_results.json または test_results.msgpack のパス
+    """
+    return os.path.join(result_dir, f"{RESULTS_NAME}.{results_format}")
+
+
+def find_results_file(result_dir: str) -> Optional[str]:
+    """
+    保存済みのテスト結果のファイルを探す
+
+    Args:
+        result_dir: result ディレクトリ
+
+    Returns:
+        テスト結果のファイルのパス（見つからない場合はNone）
+    """
+    for results_format in RESULTS_FORMATS:
+        path = results_path(result_dir, results_format)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def is_results_file(path: str) -> bool:
+    """テスト結果のファイル（test_results.json / test_results.msgpack）かどうか"""
+    name, ext = os.path.splitext(os.path.basename(path))
+    return name == RESULTS_NAME and ext.lstrip(".") in RESULTS_FORMATS
+
+
+def _is_msgpack(path: str) -> bool:
+    """MessagePack形式のファイルかどうか"""
+    return path.endswith(".msgpack")
+
+
+class ResultsWriter:
+    """テスト結果をセッション単位で逐次書き出すクラス"""
+
+    def __init__(self, path: str, results_format: str = None):
+        """
+        コンストラクタ
+
+        Args:
+            path: 保存先のパス（書き込み中は <path>.part に出力し、完了時に置き換える）
+            results_format: 保存形式（Noneの場合は拡張子から決定する）
+        """
+        self.results_format = results_format or ("msgpack" if _is_msgpack(path) else "json")
+        self.path = path
+        self.part_path = f"{path}.part"
+        self.session_count = 0
+        self.failed = False
+        self._file = None
+        self._packer = None
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if self._file is not None:
+            self.abort()
+
+    def _open(self) -> None:
+        """書き込み先のファイルを開き、先頭部分を書き出す"""
+        directory = os.path.dirname(self.part_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.part_path, "wb")
+        if self.results_format == "msgpack":
+            self._packer = msgpack.Packer(default=str)
+            self._file.write(self._packer.pack(["format", STREAM_FORMAT]))
+        else:
+            self._file.write(_STREAM_HEADER + b"\n")
+
+    def _fail(self, e: Exception) -> None:
+        """書き込みに失敗した場合に書き込み途中のファイルを削除する"""
+        logging.error(f"テスト結果の書き込みに失敗しました: {str(e)}, パス: {self.path}")
+        self.failed = True
+        self.abort()
+
+    def write_session(self, session: Dict[str, Any]) -> None:
+        """
+        セッションの結果を書き出す（失敗した場合はログに記録し、以降は書き込まない）
+
+        Args:
+            session: セッションの結果
+        """
+        if self.failed:
+            return
+        try:
+            if self._file is None:
+                self._open()
+            if self._packer is not None:
+                self._file.write(self._packer.pack(["session", session]))
+            else:
+                self._file.write((b"," if self.session_count else b"") + dumps_json(session) + b"\n")
+            self.session_count += 1
+        except Exception as e:
+            self._fail(e)
+
+    def close(self, results: Dict[str, Any]) -> bool:
+        """
+        セッション以外の項目を書き出してファイルを完成させる
+
+        Args:
+            results: テスト結果（sessions 以外の項目を書き出す）
+
+        Returns:
+            保存に成功したかどうか
+        """
+        if self.failed:
+            return False
+        try:
+            if self._file is None:
+                self._open()
+            metadata = {key: value for key, value in results.items() if key != "sessions"}
+            if self._packer is not None:
+                self._file.write(self._packer.pack(["metadata", metadata]))
+            else:
+                tail = dumps_json(metadata)[1:]
+                self._file.write(b"]\n" + (b"," + tail if metadata else tail) + b"\n")
+            self._file.close()
+            self._file = None
+            os.replace(self.part_path, self.path)
+            return True
+        except Exception as e:
+            self._fail(e)
+            return False
+
+    def abort(self) -> None:
+        """書き込みを中止し、書き込み途中のファイルを削除する"""
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+
+
+def save_results(results: Dict[str, Any], path: str, results_format: str = None) -> bool:
+    """
+    テスト結果をストリーム形式で保存する
+
+    Args:
+        results: テスト結果
+        path: 保存先のパス
+        results_format: 保存形式（Noneの場合は拡張子から決定する）
+
+    Returns:
+        保存に成功したかどうか
+    """
+    with ResultsWriter(path, results_format) as writer:
+        for session in results.get("sessions", []):
+            writer.write_session(session)
+        return writer.close(results)
+
+
+def _iter_msgpack(path: str) -> Iterator[Tuple[str, Any]]:
+    """MessagePack形式のファイルの [種別, 内容] を順に読み出す"""
+    if msgpack is None:
+        raise ImportError(f"msgpackがインストールされていないため読み込めません: {path}")
+    with open(path, "rb") as f:
+        for kind, value in msgpack.Unpacker(f, raw=False, strict_map_key=False):
+            yield kind, value
+
+
+def _is_stream_json(f) -> bool:
+    """ストリーム形式のJSONかどうか（ファイルの位置は1行目の直後になる）"""
+    return f.readline().rstrip(b"\r\n") == _STREAM_HEADER
+
+
+def iter_sessions(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    保存済みのテスト結果からセッションを順に読み出す
+
+    ストリーム形式のファイルは1セッションずつ読み込むため、ファイル全体はメモリに読み込まない
+    （インデント付きの従来の形式の場合は全体を読み込む）。
+
+    Args:
+        path: テスト結果のファイルのパス
+
+    Yields:
+        セッションの結果
+    """
+    if _is_msgpack(path):
+        for kind, value in _iter_msgpack(path):
+            if kind == "session":
+                yield value
+        return
+
+    with open(path, "rb") as f:
+        if not _is_stream_json(f):
+            f.seek(0)
+            yield from _loads_json(f.read()).get("sessions", [])
+            return
+        for line in f:
+            line = line.strip()
+            if line == b"]":
+                return
+            if line:
+                yield _loads_json(line.lstrip(b","))
+
+
+def load_results_metadata(path: str) -> Dict[str, Any]:
+    """
+    保存済みのテスト結果からセッション以外の項目を読み込む
+
+    Args:
+        path: テスト結果のファイルのパス
+
+    Returns:
+        セッション（sessions）を除いたテスト結果
+    """
+    if _is_msgpack(path):
+        for kind, value in _iter_msgpack(path):
+            if kind == "metadata":
+                return value
+        return {}
+
+    with open(path, "rb") as f:
+        if not _is_stream_json(f):
+            f.seek(0)
+            data = _loads_json(f.read())
+            data.pop("sessions", None)
+            return data
+        # セッションの行は解析せずに読み飛ばす
+        for line in f:
+            if line.strip() == b"]":
+                break
+        tail = f.read().strip().lstrip(b",")
+        return _loads_json(b"{" + tail) if tail != b"}" else {}
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """
+    保存済みのテスト結果を読み込む
+
+    Args:
+        path: テスト結果のファイルのパス
+
+    Returns:
+        テスト結果
+    """
+    results = load_results_metadata(path)
+    results["sessions"] = list(iter_sessions(path))
+    return results
+
+
+def preview_results(path: str, limit: int) -> Tuple[Dict[str, Any], int]:
+    """
+    テスト結果のセッション以外の項目と先頭のセッションを読み込む（画面表示用）
+
+    Args:
+        path: テスト結果のファイルのパス
+        limit: 読み込むセッション数の上限
+
+    Returns:
+        (先頭 limit 件のセッションを含むテスト結果, 全セッション数)
+    """
+    results = load_results_metadata(path)
+    sessions = iter_sessions(path)
+    results["sessions"] = list(itertools.islice(sessions, limit))
+    return results, len(results["sessions"]) + sum(1 for _ in sessions)
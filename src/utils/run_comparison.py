@@ -0,0 +1,211 @@
+"""
+2つの実行（基準と候補）の比較モジュール
+
+保存済みのテスト結果をセッション単位で読み込んで統計を作成し、操作IDごとに所要時間の
+分布（p50/p95）の差とブートストラップ法による信頼区間、エラー率の差、エラー内訳の差を計算する。
+
+パーセンタイルのブートストラップは、再標本化した n 個の値の k 番目の順序統計量が
+元の値のうち floor(U * n) 番目（U はベータ分布 Beta(k, n - k + 1) に従う）になることを利用し、
+再標本化とソートを行わずに1回あたり定数時間で計算する。
+"""
+import math
+import os
+import random
+from statistics import NormalDist
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from src.utils.analytics import percentile
+from src.utils.results_io import find_results_file, iter_sessions, load_results_metadata
+from src.utils.run_statistics import RunStatistics
+
+# 判定結果
+VERDICT_SLOWER = "slower"
+VERDICT_FASTER = "faster"
+VERDICT_SAME = "same"
+VERDICT_ADDED = "added"
+VERDICT_REMOVED = "removed"
+
+COMPARISON_PERCENTILES = (50, 95)
+
+
+def load_run(output_dir: str) -> Tuple[Dict[str, Any], RunStatistics]:
+    """
+    保存済みのテスト結果を読み込んで統計を作成する（セッションは1件ずつ読み込む）
+
+    Args:
+        output_dir: テスト実行時の出力ディレクトリ
+
+    Returns:
+        (セッション以外のテスト結果, 統計)
+
+    Raises:
+        FileNotFoundError: テスト結果のファイルが存在しない場合
+    """
+    results_path = find_results_file(os.path.join(output_dir, "result"))
+    if results_path is None:
+        raise FileNotFoundError(f"テスト結果のファイルが見つかりません: {output_dir}")
+    statistics = RunStatistics()
+    for session in iter_sessions(results_path):
+        statistics.add_session(session)
+    return load_results_metadata(results_path), statistics
+
+
+def bootstrap_percentile(sorted_values: Sequence[float], p: float, rng: random.Random) -> float:
+    """
+    再標本化した値のパーセンタイル（最近順位）を1回分生成する
+
+    Args:
+        sorted_values: 昇順にソートされた値
+        p: パーセンタイル（0-100）
+        rng: 乱数生成器
+
+    Returns:
+        再標本化した値のパーセンタイル
+    """
+    n = len(sorted_values)
+    k = min(n, max(1, math.ceil(p / 100.0 * n)))
+    position = rng.betavariate(k, n - k + 1)
+    return sorted_values[min(n - 1, int(position * n))]
+
+
+def bootstrap_delta_ci(values_a: Sequence[float], values_b: Sequence[float], p: float, iterations: int = 1000,
+                       confidence: float = 0.95, rng: Optional[random.Random] = None) -> Tuple[float, float]:
+    """
+    パーセンタイルの差（B - A）のブートストラップ信頼区間を計算する
+
+    Args:
+        values_a: 基準の値（昇順）
+        values_b: 候補の値（昇順）
+        p: パーセンタイル（0-100）
+        iterations: ブートストラップの反復回数
+        confidence: 信頼水準
+        rng: 乱数生成器（Noneの場合は固定のシード）
+
+    Returns:
+        (下限, 上限)（いずれかの値がない場合は (NaN, NaN)）
+    """
+    if not values_a or not values_b:
+        return math.nan, math.nan
+    rng = rng or random.Random(0)
+    deltas = sorted(bootstrap_percentile(values_b, p, rng) - bootstrap_percentile(values_a, p, rng)
+                    for _ in range(iterations))
+    tail = (1 - confidence) / 2 * 100
+    return percentile(deltas, tail), percentile(deltas, 100 - tail)
+
+
+def proportion_delta_ci(failures_a: int, count_a: int, failures_b: int, count_b: int,
+                        confidence: float = 0.95) -> Tuple[float, float, float]:
+    """
+    エラー率の差（B - A）と正規近似の信頼区間を計算する
+
+    Args:
+        failures_a: 基準の失敗数
+        count_a: 基準の実行数
+        failures_b: 候補の失敗数
+        count_b: 候補の実行数
+        confidence: 信頼水準
+
+    Returns:
+        (差, 下限, 上限)（いずれかの実行数が0の場合は NaN）
+    """
+    if count_a == 0 or count_b == 0:
+        return math.nan, math.nan, math.nan
+    rate_a, rate_b = failures_a / count_a, failures_b / count_b
+    delta = rate_b - rate_a
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    margin = z * math.sqrt(rate_a * (1 - rate_a) / count_a + rate_b * (1 - rate_b) / count_b)
+    return delta, delta - margin, delta + margin
+
+
+def _sorted_latencies(statistics: RunStatistics, action_id: str) -> List[float]:
+    latencies, _ = statistics.action_cells(action_id)
+    return sorted(value for value in latencies if not math.isnan(value))
+
+
+def _distribution_delta(values_a: List[float], values_b: List[float], iterations: int, confidence: float,
+                        rng: random.Random) -> Dict[str, Any]:
+    """パーセンタイルごとの基準・候補の値、差、信頼区間"""
+    delta = {}
+    for p in COMPARISON_PERCENTILES:
+        a, b = percentile(values_a, p), percentile(values_b, p)
+        low, high = bootstrap_delta_ci(values_a, values_b, p, iterations, confidence, rng)
+        delta[f"p{p}"] = {"a": a, "b": b, "delta": b - a, "change": (b / a - 1) if a else math.nan,
+                          "ci": (low, high)}
+    return delta
+
+
+def _verdict(delta: Dict[str, Any], failure_rate: Tuple[float, float, float]) -> str:
+    """中央値またはエラー率の差の信頼区間が0を含まない場合に悪化・改善とする（悪化を優先）"""
+    low, high = delta["p50"]["ci"]
+    _, rate_low, rate_high = failure_rate
+    if low > 0 or rate_low > 0:
+        return VERDICT_SLOWER
+    if high < 0 or rate_high < 0:
+        return VERDICT_FASTER
+    return VERDICT_SAME
+
+
+def compare_statistics(stats_a: RunStatistics, stats_b: RunStatistics, iterations: int = 1000,
+                       confidence: float = 0.95, seed: int = 0) -> Dict[str, Any]:
+    """
+    2つの実行の統計を比較する
+
+    Args:
+        stats_a: 基準の実行の統計
+        stats_b: 候補の実行の統計
+        iterations: ブートストラップの反復回数
+        confidence: 信頼水準
+        seed: 乱数のシード（同じ入力から同じ結果を得るため）
+
+    Returns:
+        sessions（セッションの集計の比較）、actions（操作IDごとの比較、基準の順に候補のみの操作を追加）、
+        errors（エラー内訳の比較、件数の差が大きい順）
+    """
+    rng = random.Random(seed)
+    summary_a, summary_b = stats_a.session_summary(), stats_b.session_summary()
+    sessions = {
+        "count": (summary_a["count"], summary_b["count"]),
+        "failure": (summary_a["failure"], summary_b["failure"]),
+        "failure_rate": proportion_delta_ci(summary_a["failure"], summary_a["count"],
+                                            summary_b["failure"], summary_b["count"], confidence),
+        "duration": _distribution_delta(sorted(stats_a.durations), sorted(stats_b.durations),
+                                        iterations, confidence, rng),
+    }
+
+    actions = []
+    ids_a, ids_b = set(stats_a.action_ids), set(stats_b.action_ids)
+    action_ids = stats_a.action_ids + [action_id for action_id in stats_b.action_ids if action_id not in ids_a]
+    for action_id in action_ids:
+        in_a, in_b = action_id in ids_a, action_id in ids_b
+        a = stats_a.action_summary(action_id) if in_a else {"count": 0, "failure": 0}
+        b = stats_b.action_summary(action_id) if in_b else {"count": 0, "failure": 0}
+        values_a = _sorted_latencies(stats_a, action_id) if in_a else []
+        values_b = _sorted_latencies(stats_b, action_id) if in_b else []
+        delta = _distribution_delta(values_a, values_b, iterations, confidence, rng)
+        failure_rate = proportion_delta_ci(a["failure"], a["count"], b["failure"], b["count"], confidence)
+        if not in_a:
+            verdict = VERDICT_ADDED
+        elif not in_b:
+            verdict = VERDICT_REMOVED
+        else:
+            verdict = _verdict(delta, failure_rate)
+        actions.append({
+            "action_id": action_id,
+            "description": stats_a.action_description(action_id) or stats_b.action_description(action_id),
+            "count": (a["count"], b["count"]),
+            "failure": (a["failure"], b["failure"]),
+            "failure_rate": failure_rate,
+            **delta,
+            "verdict": verdict,
+        })
+
+    counts_a = {(action_id, message): count for action_id, message, count in stats_a.error_breakdown()}
+    counts_b = {(action_id, message): count for action_id, message, count in stats_b.error_breakdown()}
+    errors = [
+        {"action_id": key[0], "message": key[1], "count": (counts_a.get(key, 0), counts_b.get(key, 0))}
+        for key in dict.fromkeys(list(counts_a) + list(counts_b))
+    ]
+    errors.sort(key=lambda item: (-abs(item["count"][1] - item["count"][0]), item["action_id"], item["message"]))
+
+    return {"confidence": confidence, "iterations": iterations, "sessions": sessions,
+            "actions": actions, "errors": errors}
@@ -0,0 +1,502 @@
+"""
+実行履歴のデータベースと性能劣化の検出モジュール
+
+テストの実行ごとに、シナリオ・設定・ブラウザ・実行環境のフィンガープリントと操作IDごとの
+所要時間の集計をSQLiteのデータベースに記録する。同じシナリオ・ブラウザ・実行環境・負荷の設定
+（同時実行数、ユーザー数等）の直前の実行を基準（ローリングベースライン）として、操作IDごとの
+所要時間の劣化を統計的に判定する。
+
+所要時間のサンプルは操作IDごとに最大 HISTORY_MAX_SAMPLES 個の順序統計量（分布を等間隔に
+間引いた値）として保存するため、実行の規模によらずデータベースの増加量は一定である。
+"""
+import contextlib
+import hashlib
+import json
+import logging
+import math
+import os
+import platform
+import socket
+import sqlite3
+from array import array
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence
+
+from src.utils.analytics import percentile
+from src.utils.run_statistics import RunStatistics
+from src.utils.toml_utils import get_str
+
+HISTORY_FILE = "run_history.sqlite3"
+# 操作IDごとに保存する所要時間のサンプル数の上限
+HISTORY_MAX_SAMPLES = 2000
+SCHEMA_VERSION = 2
+
+# 所要時間に影響する設定（負荷のフィンガープリントに含める。ユーザー数はテスト結果のセッション数）
+LOAD_CONFIG_KEYS = ("url", "max_concurrent_sessions", "slow_mode", "action_delay", "timeout", "retry_count",
+                    "test_mode", "screenshot_timing", "recording")
+
+# 判定結果
+VERDICT_REGRESSION = "regression"
+VERDICT_IMPROVEMENT = "improvement"
+VERDICT_NO_CHANGE = "no_change"
+VERDICT_INSUFFICIENT = "insufficient"
+
+# Mann-Whitney検定に必要なサンプル数（これより少ない場合は実行ごとの中央値のzスコアで判定する）
+MIN_TEST_SAMPLES = 8
+# zスコアで判定する場合に必要な基準の実行数
+MIN_BASELINE_RUNS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    started_at TEXT,
+    duration REAL,
+    url TEXT,
+    scenario_hash TEXT,
+    config_hash TEXT,
+    load_hash TEXT,
+    browser TEXT,
+    env_hash TEXT,
+    environment TEXT,
+    total_sessions INTEGER,
+    failed_sessions INTEGER,
+    output_dir TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_fingerprint ON runs (scenario_hash, browser, env_hash, started_at);
+CREATE TABLE IF NOT EXISTS action_stats (
+    run INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    action_id TEXT NOT NULL,
+    description TEXT,
+    count INTEGER,
+    failures INTEGER,
+    mean REAL,
+    p50 REAL,
+    p90 REAL,
+    p95 REAL,
+    p99 REAL,
+    max REAL,
+    samples BLOB,
+    PRIMARY KEY (run, action_id)
+);
+"""
+
+
+def _hash(data: bytes) -> str:
+    """フィンガープリント用の短いハッシュ値"""
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def file_hash(path: str) -> str:
+    """
+    ファイルの内容のハッシュ値を返す
+
+    Args:
+        path: ファイルのパス
+
+    Returns:
+        ハッシュ値（ファイルが読めない場合は空文字列）
+    """
+    try:
+        with open(path, "rb") as f:
+            return _hash(f.read())
+    except (OSError, TypeError):
+        return ""
+
+
+def config_hash(config: Dict[str, Any]) -> str:
+    """
+    設定のハッシュ値を返す
+
+    Args:
+        config: 設定ファイルの内容
+
+    Returns:
+        キーの順序によらないハッシュ値
+    """
+    return _hash(json.dumps(config, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+
+
+def load_hash(config: Dict[str, Any], sessions: int) -> str:
+    """
+    負荷の設定のハッシュ値を返す
+
+    Args:
+        config: 設定ファイルの内容
+        sessions: ユーザー数（セッション数）
+
+    Returns:
+        LOAD_CONFIG_KEYS の値とユーザー数のハッシュ値
+    """
+    return config_hash({**{key: config.get(key) for key in LOAD_CONFIG_KEYS}, "sessions": sessions})
+
+
+def environment_fingerprint() -> Dict[str, Any]:
+    """
+    実行環境の情報を返す
+
+    Returns:
+        ホスト名、OS、CPUアーキテクチャ、CPU数、Pythonのバージョン
+    """
+    return {
+        "host": socket.gethostname(),
+        "os": f"{platform.system()} {platform.release()}",
+        "machine": platform.machine(),
+        "cpus": os.cpu_count() or 0,
+        "python": platform.python_version(),
+    }
+
+
+def downsample(sorted_values: Sequence[float], max_samples: int = HISTORY_MAX_SAMPLES) -> List[float]:
+    """
+    ソート済みの値を分布を保ったまま間引く（等間隔の順序統計量）
+
+    Args:
+        sorted_values: 昇順にソートされた値
+        max_samples: 間引いた後の個数の上限
+
+    Returns:
+        間引いた値（上限以下の場合はそのまま）
+    """
+    count = len(sorted_values)
+    if count <= max_samples:
+        return list(sorted_values)
+    step = (count - 1) / (max_samples - 1)
+    return [sorted_values[round(i * step)] for i in range(max_samples)]
+
+
+def mann_whitney_greater(current: Sequence[float], baseline: Sequence[float]) -> float:
+    """
+    今回の値が基準より大きい（遅い）ことの片側Mann-Whitney U検定
+
+    Args:
+        current: 今回の値
+        baseline: 基準の値
+
+    Returns:
+        p値（正規近似、同順位と連続性を補正）
+    """
+    n1, n2 = len(current), len(baseline)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    combined = sorted([(value, 0) for value in current] + [(value, 1) for value in baseline])
+    rank_sum = 0.0
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        # 同順位は平均順位（1始まり）
+        rank = (i + j) / 2.0 + 1
+        ties = j - i + 1
+        rank_sum += rank * sum(1 for k in range(i, j + 1) if combined[k][1] == 0)
+        tie_term += ties ** 3 - ties
+        i = j + 1
+    n = n1 + n2
+    u = rank_sum - n1 * (n1 + 1) / 2.0
+    variance = n1 * n2 / 12.0 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2.0 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def z_score(value: float, baseline: Sequence[float]) -> float:
+    """
+    基準の値の平均・標準偏差に対するzスコア
+
+    Args:
+        value: 今回の値
+        baseline: 基準の値（2個以上）
+
+    Returns:
+        zスコア（標準偏差が0の場合は差の有無に応じて±inf または 0）
+    """
+    mean = sum(baseline) / len(baseline)
+    std = math.sqrt(sum((x - mean) ** 2 for x in baseline) / (len(baseline) - 1))
+    if std == 0:
+        return 0.0 if value == mean else math.copysign(math.inf, value - mean)
+    return (value - mean) / std
+
+
+def _encode_samples(values: Sequence[float]) -> bytes:
+    return array('d', values).tobytes()
+
+
+def _decode_samples(data: Optional[bytes]) -> array:
+    samples = array('d')
+    if data:
+        samples.frombytes(data)
+    return samples
+
+
+class RunHistory:
+    """実行履歴のデータベース"""
+
+    def __init__(self, db_path: str):
+        """
+        コンストラクタ
+
+        Args:
+            db_path: SQLiteのデータベースファイルのパス（存在しない場合は作成する）
+        """
+        self.db_path = db_path
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """データベースに接続する（終了時にコミットして閉じる）"""
+        directory = os.path.dirname(os.path.abspath(self.db_path))
+        os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA foreign_keys = ON")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < SCHEMA_VERSION:
+                conn.executescript(_SCHEMA)
+                if 0 < version < 2:
+                    # 以前の実行は負荷の設定が不明のため、どの実行の基準にもならない
+                    conn.execute("ALTER TABLE runs ADD COLUMN load_hash TEXT")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def record_run(self, results: Dict[str, Any], config: Dict[str, Any], scenario_file: str = "",
+                   output_dir: str = "", statistics: Optional[RunStatistics] = None,
+                   environment: Optional[Dict[str, Any]] = None) -> int:
+        """
+        テストの実行を記録する
+
+        Args:
+            results: テスト結果
+            config: 設定ファイルの内容
+            scenario_file: シナリオファイルのパス
+            output_dir: 出力ディレクトリ（ディレクトリ名を実行IDとする）
+            statistics: 実行中に記録した統計（Noneの場合はテスト結果から作成する）
+            environment: 実行環境の情報（Noneの場合は現在の環境）
+
+        Returns:
+            記録した実行の番号
+        """
+        if statistics is None:
+            statistics = RunStatistics.from_results(results)
+        environment = environment if environment is not None else environment_fingerprint()
+        run_id = os.path.basename(os.path.normpath(output_dir)) if output_dir else ""
+        total_sessions = results.get("total_sessions", statistics.session_count)
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO runs (run_id, started_at, duration, url, scenario_hash, config_hash, load_hash, browser,"
+                " env_hash, environment, total_sessions, failed_sessions, output_dir)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id or results.get("start_time", ""), results.get("start_time") or datetime.now().isoformat(),
+                 results.get("duration", 0), str(config.get("url", "")), file_hash(scenario_file),
+                 config_hash(config), load_hash(config, total_sessions), str(config.get("browser", "")),
+                 _hash(json.dumps(environment, sort_keys=True).encode("utf-8")),
+                 json.dumps(environment, ensure_ascii=False), total_sessions,
+                 results.get("failed_sessions", 0), os.path.abspath(output_dir) if output_dir else ""))
+            run = cursor.lastrowid
+            rows = []
+            for action_id in statistics.action_ids:
+                summary = statistics.action_summary(action_id)
+                latencies, _ = statistics.action_cells(action_id)
+                values = sorted(value for value in latencies if not math.isnan(value))
+                rows.append((run, action_id, statistics.action_description(action_id), summary["count"],
+                             summary["failure"], *(None if math.isnan(summary[key]) else summary[key]
+                                                   for key in ("mean", "p50", "p90", "p95", "p99", "max")),
+                             _encode_samples(downsample(values))))
+            conn.executemany("INSERT INTO action_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return run
+
+    def runs(self, scenario_hash: str = None, browser: str = None, env_hash: str = None,
+             before: int = None, limit: int = None, load_hash: str = None) -> List[Dict[str, Any]]:
+        """
+        記録した実行を新しい順に返す
+
+        Args:
+            scenario_hash: シナリオのハッシュ値で絞り込む
+            browser: ブラウザで絞り込む
+            env_hash: 実行環境のハッシュ値で絞り込む
+            before: この番号より前の実行のみ
+            limit: 件数の上限
+            load_hash: 負荷の設定のハッシュ値で絞り込む
+
+        Returns:
+            実行の情報のリスト
+        """
+        conditions, params = [], []
+        for column, value in (("scenario_hash", scenario_hash), ("browser", browser), ("env_hash", env_hash),
+                              ("load_hash", load_hash)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if before is not None:
+            conditions.append("id < ?")
+            params.append(before)
+        query = "SELECT * FROM runs"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY started_at DESC, id DESC"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query, params)]
+
+    def find_run(self, run_id: str = None) -> Optional[Dict[str, Any]]:
+        """
+        実行を探す
+
+        Args:
+            run_id: 実行ID（出力ディレクトリ名）または番号（Noneの場合は最新の実行）
+
+        Returns:
+            実行の情報（見つからない場合はNone）
+        """
+        with self._connect() as conn:
+            if run_id is None:
+                row = conn.execute("SELECT * FROM runs ORDER BY started_at DESC, id DESC LIMIT 1").fetchone()
+            else:
+                row = conn.execute("SELECT * FROM runs WHERE run_id = ? OR CAST(id AS TEXT) = ?"
+                                   " ORDER BY id DESC LIMIT 1", (run_id, run_id)).fetchone()
+        return dict(row) if row else None
+
+    def action_stats(self, runs: Sequence[int]) -> Dict[int, Dict[str, Dict[str, Any]]]:
+        """
+        実行ごとの操作IDの集計を返す
+
+        Args:
+            runs: 実行の番号
+
+        Returns:
+            実行の番号 → 操作ID → 集計（samples は所要時間のサンプルの配列）
+        """
+        stats: Dict[int, Dict[str, Dict[str, Any]]] = {run: {} for run in runs}
+        if not runs:
+            return stats
+        placeholders = ",".join("?" * len(runs))
+        with self._connect() as conn:
+            for row in conn.execute(f"SELECT * FROM action_stats WHERE run IN ({placeholders})", list(runs)):
+                item = dict(row)
+                item["samples"] = _decode_samples(item["samples"])
+                stats[item["run"]][item["action_id"]] = item
+        return stats
+
+    def baseline_runs(self, run: Dict[str, Any], count: int = 5) -> List[Dict[str, Any]]:
+        """
+        実行の比較対象（同じシナリオ・ブラウザ・実行環境・負荷の設定の直前の実行）を返す
+
+        Args:
+            run: 対象の実行
+            count: 基準とする実行数
+
+        Returns:
+            基準の実行のリスト（新しい順）
+        """
+        return self.runs(run["scenario_hash"], run["browser"], run["env_hash"], before=run["id"], limit=count,
+                         load_hash=run.get("load_hash") or "")
+
+    def detect_regressions(self, run: Dict[str, Any], baseline_count: int = 5, alpha: float = 0.01,
+                           min_change: float = 0.1, z_threshold: float = 3.0) -> List[Dict[str, Any]]:
+        """
+        操作IDごとに基準からの所要時間の劣化を判定する
+
+        十分なサンプルがある場合は今回と基準（直前の実行のサンプルを合わせたもの）の片側
+        Mann-Whitney U検定、少ない場合は基準の実行ごとの中央値に対する今回の中央値のzスコアで判定し、
+        中央値の変化率が min_change 以上の場合のみ劣化（または改善）とする。
+
+        Args:
+            run: 対象の実行
+            baseline_count: 基準とする直前の実行数
+            alpha: 有意水準
+            min_change: 劣化とする中央値の変化率の下限（0.1 = 10%）
+            z_threshold: zスコアで判定する場合の閾値
+
+        Returns:
+            操作IDごとの判定（action_id, description, baseline_p50, p50, change, p_value, z, method, verdict）
+        """
+        baseline = self.baseline_runs(run, baseline_count)
+        stats = self.action_stats([run["id"]] + [item["id"] for item in baseline])
+        findings = []
+        for action_id, current in stats[run["id"]].items():
+            history = [stats[item["id"]][action_id] for item in baseline if action_id in stats[item["id"]]]
+            pooled = sorted(value for item in history for value in item["samples"])
+            finding = {
+                "action_id": action_id,
+                "description": current["description"],
+                "baseline_runs": len(history),
+                "baseline_p50": percentile(pooled, 50) if pooled else None,
+                "p50": current["p50"],
+                "change": None,
+                "p_value": None,
+                "z": None,
+                "method": "",
+                "verdict": VERDICT_INSUFFICIENT,
+            }
+            findings.append(finding)
+            if not pooled or current["p50"] is None:
+                continue
+            if finding["baseline_p50"]:
+                finding["change"] = current["p50"] / finding["baseline_p50"] - 1
+            significant_slower = significant_faster = False
+            if len(current["samples"]) >= MIN_TEST_SAMPLES and len(pooled) >= MIN_TEST_SAMPLES:
+                finding["method"] = "mann-whitney"
+                finding["p_value"] = mann_whitney_greater(current["samples"], pooled)
+                significant_slower = finding["p_value"] < alpha
+                significant_faster = mann_whitney_greater(pooled, current["samples"]) < alpha
+            else:
+                medians = [item["p50"] for item in history if item["p50"] is not None]
+                if len(medians) < MIN_BASELINE_RUNS:
+                    continue
+                finding["method"] = "z-score"
+                finding["z"] = z_score(current["p50"], medians)
+                significant_slower = finding["z"] >= z_threshold
+                significant_faster = finding["z"] <= -z_threshold
+            change = finding["change"] or 0.0
+            if significant_slower and change >= min_change:
+                finding["verdict"] = VERDICT_REGRESSION
+            elif significant_faster and change <= -min_change:
+                finding["verdict"] = VERDICT_IMPROVEMENT
+            else:
+                finding["verdict"] = VERDICT_NO_CHANGE
+        return findings
+
+
+def history_db_path(config: Dict[str, Any], output_base: str = "output") -> str:
+    """
+    実行履歴のデータベースファイルのパスを返す
+
+    Args:
+        config: 設定ファイルの内容
+        output_base: 出力ディレクトリの親ディレクトリ
+
+    Returns:
+        history_db の値（空の場合は出力ディレクトリの親ディレクトリの run_history.sqlite3）
+    """
+    return get_str(config, 'history_db', '') or os.path.join(output_base, HISTORY_FILE)
+
+
+def record_run_history(db_path: str, results: Dict[str, Any], config: Dict[str, Any], scenario_file: str = "",
+                       output_dir: str = "", statistics: Optional[RunStatistics] = None) -> Optional[int]:
+    """
+    テストの実行を実行履歴に記録する（失敗した場合はログに記録する）
+
+    Args:
+        db_path: データベースファイルのパス
+        results: テスト結果
+        config: 設定ファイルの内容
+        scenario_file: シナリオファイルのパス
+        output_dir: 出力ディレクトリ
+        statistics: 実行中に記録した統計
+
+    Returns:
+        記録した実行の番号（失敗した場合はNone）
+    """
+    try:
+        run = RunHistory(db_path).record_run(results, config, scenario_file, output_dir, statistics)
+        logging.info(f"実行履歴に記録しました: {db_path} (#{run})")
+        return run
+    except Exception as e:
+        logging.error(f"実行履歴の記録に失敗しました: {str(e)}")
+        return None
@@ -0,0 +1,185 @@
+"""
+実行全体のセッション・アクションの統計モジュール
+
+セッションの完了時に結果を1回だけ参照し、セッションごとの要約と操作IDごとの
+所要時間・結果を型付き配列（array）に追記する。大規模な実行でもセッションの結果の辞書を
+保持・再走査せずに、集計レポート（セッション×アクションの行列、パーセンタイル、エラーの分類）を作成できる。
+"""
+import math
+import threading
+from array import array
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.utils.analytics import summarize
+from src.utils.error_clusters import ErrorClusters
+
+# アクションの状態
+STATUS_NOT_RUN = 0
+STATUS_SUCCESS = 1
+STATUS_FAILURE = 2
+
+class _ActionColumn:
+    """操作IDごとの所要時間と結果（セッションの行と同じ並び）"""
+
+    def __init__(self, description: str, rows: int):
+        self.description = description
+        self.latencies = array('d', [math.nan]) * rows
+        self.statuses = array('b', [STATUS_NOT_RUN]) * rows
+
+
+class RunStatistics:
+    """実行全体のセッション・アクションの統計を保持するクラス"""
+
+    def __init__(self, max_error_kinds: int = 100):
+        """
+        コンストラクタ
+
+        Args:
+            max_error_kinds: エラーの分類として保持する種類数の上限
+        """
+        self.max_error_kinds = max_error_kinds
+        self._lock = threading.Lock()
+        # セッションごとの要約（完了順）
+        self.session_ids = array('q')
+        self.user_ids: List[str] = []
+        self.successes = array('b')
+        self.durations = array('d')
+        # 操作IDごとの列（初出順）
+        self._actions: Dict[str, _ActionColumn] = {}
+        # エラーメッセージのテンプレートごとの分類
+        self.errors = ErrorClusters(max_error_kinds)
+
+    @classmethod
+    def from_results(cls, results: Dict[str, Any], max_error_kinds: int = 100) -> "RunStatistics":
+        """
+        保存済みのテスト結果から統計を作成する
+
+        Args:
+            results: テスト結果
+            max_error_kinds: エラー内訳として保持するエラーの種類数の上限
+
+        Returns:
+            統計
+        """
+        statistics = cls(max_error_kinds)
+        for session in results.get("sessions", []):
+            statistics.add_session(session)
+        return statistics
+
+    @property
+    def session_count(self) -> int:
+        """記録したセッション数"""
+        return len(self.session_ids)
+
+    @property
+    def action_ids(self) -> List[str]:
+        """記録した操作ID（初出順）"""
+        return list(self._actions)
+
+    def add_session(self, session: Dict[str, Any]) -> None:
+        """
+        完了したセッションの結果を記録する
+
+        Args:
+            session: セッションの実行結果
+        """
+        with self._lock:
+            row = len(self.session_ids)
+            session_id = session.get("session_id", 0)
+            self.session_ids.append(session_id if isinstance(session_id, int) else 0)
+            self.user_ids.append(str(session.get("user_id", "")))
+            self.successes.append(1 if session.get("success", False) else 0)
+            self.durations.append(float(session.get("duration", 0) or 0))
+            for column in self._actions.values():
+                column.latencies.append(math.nan)
+                column.statuses.append(STATUS_NOT_RUN)
+
+            for action in session.get("actions", []):
+                action_id = str(action.get("action_id", action.get("操作ID", "")))
+                column = self._actions.get(action_id)
+                if column is None:
+                    description = action.get("description", action.get("説明", "")) or ""
+                    column = _ActionColumn(str(description), row + 1)
+                    self._actions[action_id] = column
+                success = action.get("result", action.get("success", False))
+                column.statuses[row] = STATUS_SUCCESS if success else STATUS_FAILURE
+                duration = action.get("duration")
+                if isinstance(duration, (int, float)):
+                    column.latencies[row] = float(duration)
+
+            # 失敗したアクションとアクション以外のエラーを分類する
+            self.errors.add_session(session)
+
+    def action_description(self, action_id: str) -> str:
+        """操作IDの説明"""
+        column = self._actions.get(action_id)
+        return column.description if column else ""
+
+    def action_cells(self, action_id: str) -> Tuple[array, array]:
+        """
+        操作IDの所要時間と結果をセッションの行の並びで返す
+
+        Args:
+            action_id: 操作ID
+
+        Returns:
+            (所要時間の配列（未実行はNaN）, 状態の配列)
+        """
+        column = self._actions[action_id]
+        return column.latencies, column.statuses
+
+    def action_summary(self, action_id: str, percentiles=(50, 90, 95, 99)) -> Dict[str, Any]:
+        """
+        操作IDごとの所要時間の集計を返す
+
+        Args:
+            action_id: 操作ID
+            percentiles: 計算するパーセンタイル
+
+        Returns:
+            実行数、成功数、失敗数、平均、パーセンタイル、最大値
+        """
+        latencies, statuses = self.action_cells(action_id)
+        failures = statuses.count(STATUS_FAILURE)
+        executed = len(statuses) - statuses.count(STATUS_NOT_RUN)
+        summary = summarize(latencies, percentiles)
+        summary.update({"count": executed, "success": executed - failures, "failure": failures})
+        return summary
+
+    def session_summary(self, percentiles=(50, 90, 95, 99)) -> Dict[str, Any]:
+        """
+        セッション全体の集計を返す
+
+        Args:
+            percentiles: 所要時間について計算するパーセンタイル
+
+        Returns:
+            セッション数、成功数、失敗数、所要時間の平均・パーセンタイル・最大値
+        """
+        successful = self.successes.count(1)
+        summary = summarize(self.durations, percentiles)
+        summary.update({"success": successful, "failure": len(self.durations) - successful})
+        return summary
+
+    def error_breakdown(self) -> List[Tuple[str, str, int]]:
+        """
+        エラー内訳を件数の多い順に返す
+
+        Returns:
+            (操作ID, エラーメッセージのテンプレート, 件数) のリスト
+        """
+        with self._lock:
+            return self.errors.breakdown()
+
+    def error_clusters(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        エラーの分類を件数の多い順に返す
+
+        Args:
+            limit: 返す件数の上限（Noneの場合はすべて）
+
+        Returns:
+            ErrorClusters.clusters の戻り値
+        """
+        with self._lock:
+            return self.errors.clusters(limit)
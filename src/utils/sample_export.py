@@ -0,0 +1,221 @@
+"""
+アクション単位の実行結果（サンプル）の列指向エクスポートモジュール
+
+テスト結果のセッション・アクションの入れ子構造を、1アクション1行のフラットなレコードに
+展開して result/action_samples.parquet（pyarrow がない場合は action_samples.csv）に出力する。
+実行IDの列を含むため、複数の実行のファイルをそのまま pandas や DuckDB で結合して分析できる。
+"""
+import csv
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional
+
+# pyarrowはオプション（ない場合はCSVで出力する）
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+SAMPLES_FILE = "action_samples"
+# Parquetファイルの行グループあたりの行数（メモリ上に保持する行数の上限）
+ROW_GROUP_SIZE = 100000
+
+# 列名と型（pyarrowの型名）
+SAMPLE_COLUMNS = (
+    ("run_id", "string"),
+    ("session_id", "int64"),
+    ("user_id", "string"),
+    ("action_index", "int32"),
+    ("action_id", "string"),
+    ("action_type", "string"),
+    ("start_time", "timestamp"),
+    ("duration", "float64"),
+    ("before_action", "float64"),
+    ("action", "float64"),
+    ("after_action", "float64"),
+    ("success", "bool_"),
+    ("error_code", "string"),
+    ("error", "string"),
+)
+
+# エラーメッセージに含まれる例外名（例: TimeoutException）
+_EXCEPTION_PATTERN = re.compile(r"\b([A-Z]\w*(?:Exception|Error))\b")
+
+
+def error_code(error: Any) -> str:
+    """
+    エラーメッセージから集計用のエラーコードを作成する
+
+    Args:
+        error: エラーメッセージ
+
+    Returns:
+        例外名（含まれる場合）またはメッセージの区切り（:）より前の部分。エラーがない場合は空文字列
+    """
+    if not error:
+        return ""
+    message = str(error).strip()
+    match = _EXCEPTION_PATTERN.search(message)
+    if match:
+        return match.group(1)
+    return re.split(r"[:：\n]", message, 1)[0].strip()[:50]
+
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    """ISO形式の日時を変換する（変換できない場合はNone）"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def _number(value: Any) -> Optional[float]:
+    """数値の場合のみfloatに変換する"""
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def iter_action_samples(results: Dict[str, Any], run_id: str = "") -> Iterator[Dict[str, Any]]:
+    """
+    テスト結果をアクション単位のレコードに展開する
+
+    Args:
+        results: テスト結果
+        run_id: 実行ID（出力ディレクトリ名など、複数の実行を結合する際の識別子）
+
+    Yields:
+        SAMPLE_COLUMNS の列を持つレコード
+    """
+    for session in results.get("sessions", []):
+        session_id = session.get("session_id")
+        user_id = str(session.get("user_id", ""))
+        for index, action in enumerate(session.get("actions", [])):
+            success = bool(action.get("result", action.get("success", False)))
+            error = "" if success else str(action.get("error") or "")
+            phases = action.get("phases") or {}
+            yield {
+                "run_id": run_id,
+                "session_id": session_id if isinstance(session_id, int) else None,
+                "user_id": user_id,
+                "action_index": index,
+                "action_id": str(action.get("action_id", action.get("操作ID", ""))),
+                "action_type": str(action.get("操作タイプ", "")),
+                "start_time": _parse_time(action.get("start_time")),
+                "duration": _number(action.get("duration")),
+                "before_action": _number(phases.get("before_action")),
+                "action": _number(phases.get("action")),
+                "after_action": _number(phases.get("after_action")),
+                "success": success,
+                "error_code": error_code(error),
+                "error": error,
+            }
+
+
+def resolve_sample_format(sample_format: str) -> str:
+    """
+    出力形式を決定する
+
+    Args:
+        sample_format: 設定値（auto / parquet / csv / none）
+
+    Returns:
+        parquet / csv / none（parquet を指定して pyarrow がない場合は csv）
+    """
+    sample_format = (sample_format or "none").lower()
+    if sample_format not in ("auto", "parquet", "csv"):
+        return "none"
+    if sample_format == "csv":
+        return "csv"
+    if pyarrow is None:
+        if sample_format == "parquet":
+            logging.warning("pyarrowがインストールされていないため、アクションのサンプルをCSVで出力します")
+        return "csv"
+    return "parquet"
+
+
+def _arrow_type(name: str):
+    """列の型名をpyarrowの型に変換する"""
+    if name == "timestamp":
+        return pyarrow.timestamp("us")
+    return getattr(pyarrow, name)()
+
+
+def _write_parquet(samples: Iterator[Dict[str, Any]], path: str) -> int:
+    """レコードを行グループ単位でParquetファイルに書き込む"""
+    schema = pyarrow.schema([(name, _arrow_type(type_name)) for name, type_name in SAMPLE_COLUMNS])
+    columns: Dict[str, List[Any]] = {name: [] for name, _ in SAMPLE_COLUMNS}
+    count = 0
+
+    def flush(writer):
+        writer.write_table(pyarrow.table({name: pyarrow.array(values, type=schema.field(name).type)
+                                          for name, values in columns.items()}, schema=schema))
+        for values in columns.values():
+            values.clear()
+
+    with pyarrow.parquet.ParquetWriter(path, schema, compression="zstd") as writer:
+        for sample in samples:
+            for name, values in columns.items():
+                values.append(sample[name])
+            count += 1
+            if count % ROW_GROUP_SIZE == 0:
+                flush(writer)
+        if count % ROW_GROUP_SIZE or count == 0:
+            flush(writer)
+    return count
+
+
+def _write_csv(samples: Iterator[Dict[str, Any]], path: str) -> int:
+    """レコードをCSVファイルに書き込む"""
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=[name for name, _ in SAMPLE_COLUMNS])
+        writer.writeheader()
+        for sample in samples:
+            if sample["start_time"] is not None:
+                sample["start_time"] = sample["start_time"].isoformat()
+            writer.writerow(sample)
+            count += 1
+    return count
+
+
+def export_action_samples(results: Dict[str, Any], output_dir: str, sample_format: str = "auto",
+                          run_id: str = None, path: str = None) -> str:
+    """
+    アクション単位のレコードを列指向のファイルに出力する
+
+    Args:
+        results: テスト結果
+        output_dir: 出力ディレクトリ
+        sample_format: 出力形式（auto / parquet / csv）
+        run_id: 実行ID（Noneの場合は出力ディレクトリ名）
+        path: 出力先のパス（Noneの場合は result/action_samples.<拡張子>）
+
+    Returns:
+        出力したファイルのパス（出力しなかった、または失敗した場合は空文字列）
+    """
+    sample_format = resolve_sample_format(sample_format)
+    if sample_format == "none":
+        return ""
+    if run_id is None:
+        run_id = os.path.basename(os.path.normpath(os.path.abspath(output_dir)))
+    if path is None:
+        path = os.path.join(output_dir, "result", f"{SAMPLES_FILE}.{sample_format}")
+    elif os.path.splitext(path)[1].lstrip(".") != sample_format:
+        path = f"{os.path.splitext(path)[0]}.{sample_format}"
+
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        samples = iter_action_samples(results, run_id)
+        count = _write_parquet(samples, path) if sample_format == "parquet" else _write_csv(samples, path)
+        logging.info(f"アクションのサンプルを出力しました: {path} ({count} 件)")
+        return path
+    except Exception as e:
+        logging.error(f"アクションのサンプルの出力に失敗しました: {str(e)}")
+        # 書き込み途中のファイルは残さない
+        if os.path.exists(path):
+            os.remove(path)
+        return ""
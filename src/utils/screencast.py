@@ -0,0 +1,208 @@
+"""
+CDPスクリーンキャストによる画面録画モジュール
+
+Chrome DevTools Protocol の Page.startScreencast で配信されるフレームを
+バックグラウンドスレッドで受信し、セッションごとのフレームストリップ
+（JPEGファイルとインデックス）として保存する。アクション単位のスクリーンショットと
+異なり、WebDriverのコマンド往復や画像のリサイズ処理がアクションごとに発生しない。
+"""
+import base64
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+SCREENCAST_INDEX_FILE = "screencast.json"
+
+
+class ScreencastRecorder:
+    """CDPスクリーンキャストのフレームを記録するクラス"""
+
+    def __init__(self, driver, output_dir: str, session_dir: str, logger: logging.Logger,
+                 fps: float = 2.0, quality: int = 40, max_width: int = 1024, max_height: int = 768):
+        """
+        コンストラクタ
+
+        Args:
+            driver: WebDriverインスタンス（Chromium系のみ対応）
+            output_dir: 出力ディレクトリ（相対パスの基準）
+            session_dir: フレームを保存するディレクトリ
+            logger: ロガー
+            fps: 保存する最大フレームレート
+            quality: JPEG品質（0-100）
+            max_width: フレームの最大幅
+            max_height: フレームの最大高さ
+        """
+        self.driver = driver
+        self.output_dir = output_dir
+        self.session_dir = session_dir
+        self.logger = logger
+        self.min_interval = 1.0 / fps if fps > 0 else 0.0
+        self.quality = quality
+        self.max_width = max_width
+        self.max_height = max_height
+
+        self._frames: List[Dict[str, Any]] = []
+        self._markers: List[Dict[str, Any]] = []
+        self._stop_event = threading.Event()
+        self._started_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[str] = None
+
+    @staticmethod
+    def is_supported(driver) -> bool:
+        """
+        ドライバーがスクリーンキャストに対応しているか判定する
+
+        Args:
+            driver: WebDriverインスタンス
+
+        Returns:
+            対応している場合True
+        """
+        return hasattr(driver, 'execute_cdp_cmd') and hasattr(driver, 'bidi_connection')
+
+    def start(self, timeout: float = 10.0) -> bool:
+        """
+        録画を開始する
+
+        Args:
+            timeout: 録画開始を待機する最大時間（秒）
+
+        Returns:
+            録画を開始できた場合True
+        """
+        os.makedirs(self.session_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name=f"screencast-{os.path.basename(self.session_dir)}",
+                                        daemon=True)
+        self._thread.start()
+        if not self._started_event.wait(timeout) or self._error:
+            self.logger.warning(f"スクリーンキャストを開始できませんでした: {self._error or 'タイムアウト'}")
+            self._stop_event.set()
+            return False
+        self.logger.info(f"スクリーンキャストを開始しました: {self.session_dir}")
+        return True
+
+    def mark(self, action_id: Any) -> None:
+        """
+        アクションの開始位置をマーカーとして記録する
+
+        Args:
+            action_id: 操作ID
+        """
+        # フレームの受信スレッドとは独立した追記のみのため、ロックは不要
+        self._markers.append({"action_id": str(action_id), "timestamp": time.time()})
+
+    def stop(self, timeout: float = 5.0) -> Dict[str, Any]:
+        """
+        録画を停止し、インデックスを保存する
+
+        Args:
+            timeout: 受信スレッドの終了を待機する最大時間（秒）
+
+        Returns:
+            録画情報（インデックスのパスと操作IDごとの先頭フレーム）
+        """
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+        frames = list(self._frames)
+        markers = []
+        frame_index = 0
+        for marker in self._markers:
+            # マーカー以降で最初のフレームを対応付ける（なければ直前のフレーム）
+            while frame_index < len(frames) and frames[frame_index]["timestamp"] < marker["timestamp"]:
+                frame_index += 1
+            if frames:
+                frame = frames[min(frame_index, len(frames) - 1)]["file"]
+            else:
+                frame = None
+            markers.append({**marker, "frame": frame})
+
+        index_path = os.path.join(self.session_dir, SCREENCAST_INDEX_FILE)
+        try:
+            with open(index_path, 'w', encoding='utf-8') as f:
+                json.dump({"frames": frames, "markers": markers}, f, ensure_ascii=False)
+        except Exception as e:
+            self.logger.error(f"スクリーンキャストのインデックス保存に失敗しました: {str(e)}")
+
+        self.logger.info(f"スクリーンキャストを停止しました: {len(frames)} フレーム")
+
+        # 操作IDごとに最初のマーカーのフレームを返す
+        action_frames: Dict[str, Optional[str]] = {}
+        for marker in markers:
+            action_frames.setdefault(marker["action_id"], marker["frame"])
+        return {
+            "index": os.path.relpath(index_path, self.output_dir),
+            "frame_count": len(frames),
+            "markers": action_frames
+        }
+
+    def _run(self) -> None:
+        """受信スレッドのエントリーポイント"""
+        try:
+            import trio
+            trio.run(self._record)
+        except Exception as e:
+            self._error = str(e)
+            self.logger.debug(f"スクリーンキャストの受信を終了しました: {str(e)}")
+        finally:
+            self._started_event.set()
+
+    async def _record(self) -> None:
+        """CDPセッションでフレームを受信して保存する"""
+        import trio
+
+        async with self.driver.bidi_connection() as connection:
+            session, devtools = connection.session, connection.devtools
+            await session.execute(devtools.page.start_screencast(
+                format_='jpeg', quality=self.quality,
+                max_width=self.max_width, max_height=self.max_height
+            ))
+            self._started_event.set()
+
+            async def wait_for_stop():
+                while not self._stop_event.is_set():
+                    await trio.sleep(0.1)
+                nursery.cancel_scope.cancel()
+
+            async def receive_frames():
+                last_saved = 0.0
+                async for frame in session.listen(devtools.page.ScreencastFrame):
+                    # 受信したフレームには必ずACKを返す（返さないと配信が止まる）
+                    await session.execute(devtools.page.screencast_frame_ack(frame.session_id))
+                    now = time.time()
+                    if now - last_saved < self.min_interval:
+                        continue
+                    last_saved = now
+                    self._save_frame(frame.data, now)
+
+            async with trio.open_nursery() as nursery:
+                nursery.start_soon(wait_for_stop)
+                nursery.start_soon(receive_frames)
+
+            try:
+                with trio.move_on_after(2):
+                    await session.execute(devtools.page.stop_screencast())
+            except Exception:
+                pass
+
+    def _save_frame(self, data: str, timestamp: float) -> None:
+        """
+        フレームを保存する（JPEGデータをデコードせずにそのまま書き出す）
+
+        Args:
+            data: Base64エンコードされたJPEGデータ
+            timestamp: 受信時刻（エポック秒）
+        """
+        filename = f"frame_{len(self._frames) + 1:06d}.jpg"
+        filepath = os.path.join(self.session_dir, filename)
+        with open(filepath, 'wb') as f:
+            f.write(base64.b64decode(data))
+        self._frames.append({
+            "file": os.path.relpath(filepath, self.output_dir),
+            "timestamp": timestamp
+        })
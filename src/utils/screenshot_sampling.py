@@ -0,0 +1,102 @@
+"""
+スクリーンショットのサンプリングポリシーモジュール
+
+大規模な負荷テストでは全セッションでスクリーンショットを撮影すると
+コストが大きいため、撮影対象のセッションと操作IDを絞り込む。
+撮影可否はセッション開始時に一度だけ決定する。
+"""
+from typing import Dict, Any, List, Optional, FrozenSet
+
+from src.utils.toml_utils import get_bool, get_int, get_list
+
+
+class ScreenshotSamplingPolicy:
+    """スクリーンショットの撮影対象を決定するクラス"""
+
+    def __init__(self, first: int = 0, every: int = 0, actions: Optional[List[Any]] = None,
+                 always_on_error: bool = True):
+        """
+        コンストラクタ
+
+        Args:
+            first: 先頭から撮影対象とするセッション数（0の場合は無効）
+            every: N セッションに1つを撮影対象とする間隔（0の場合は無効）
+            actions: 撮影対象とする操作IDのリスト（空の場合は全操作）
+            always_on_error: 対象外のセッションでもエラー時は撮影するかどうか
+        """
+        self.first = max(0, first)
+        self.every = max(0, every)
+        self.actions: Optional[FrozenSet[str]] = (
+            frozenset(str(action_id) for action_id in actions) if actions else None
+        )
+        self.always_on_error = always_on_error
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ScreenshotSamplingPolicy":
+        """
+        設定からポリシーを作成する
+
+        Args:
+            config: 設定情報
+
+        Returns:
+            サンプリングポリシー
+        """
+        return cls(
+            first=get_int(config, 'screenshot_sample_first', 0),
+            every=get_int(config, 'screenshot_sample_every', 0),
+            actions=get_list(config, 'screenshot_sample_actions', []),
+            always_on_error=get_bool(config, 'screenshot_sample_on_error', True)
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """セッション単位のサンプリングが有効かどうか"""
+        return self.first > 0 or self.every > 0
+
+    def is_session_sampled(self, session_id: int) -> bool:
+        """
+        セッションが撮影対象かどうかを判定する
+
+        Args:
+            session_id: セッションID（1始まり）
+
+        Returns:
+            撮影対象の場合True
+        """
+        if not self.enabled:
+            return True
+        if self.first > 0 and session_id <= self.first:
+            return True
+        if self.every > 0 and (session_id - 1) % self.every == 0:
+            return True
+        return False
+
+    def timing_for_session(self, session_id: int, screenshot_timing: List[str]) -> List[str]:
+        """
+        セッションに適用するスクリーンショットタイミングを返す
+
+        Args:
+            session_id: セッションID
+            screenshot_timing: 設定されたスクリーンショットタイミング
+
+        Returns:
+            セッションで有効なスクリーンショットタイミング
+        """
+        if self.is_session_sampled(session_id):
+            return list(screenshot_timing)
+        if self.always_on_error:
+            return ['on_error']
+        return []
+
+    def is_action_sampled(self, action_id: Any) -> bool:
+        """
+        操作IDがアクション前後の撮影対象かどうかを判定する
+
+        Args:
+            action_id: 操作ID
+
+        Returns:
+            撮影対象の場合True
+        """
+        return self.actions is None or str(action_id) in self.actions
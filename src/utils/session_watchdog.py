@@ -0,0 +1,194 @@
+"""
+セッションの実行時間を監視するウォッチドッグモジュール
+
+driver.get や execute_script がハングするとワーカースレッドが解放されず、
+テスト全体が終了しなくなる。セッション単位・アクション単位の実行時間の上限を
+監視スレッドで確認し、超過したセッションのWebDriver接続を強制的に切断する。
+"""
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+
+from src.utils.logger import setup_logger
+from src.utils.toml_utils import get_float
+
+
+class _WatchedSession:
+    """監視中のセッションの状態"""
+
+    def __init__(self, abort: Callable[[str], None]):
+        self.abort = abort
+        self.started = time.monotonic()
+        self.action_started: Optional[float] = None
+        self.action_id: Any = None
+        self.reason: Optional[str] = None
+        # 中断の処理を行ったかどうか（ドライバーの起動前で中断できなかった場合は次の確認で再試行する）
+        self.aborted = False
+        self.attempts = 0  # 中断を試みた回数
+
+
+class SessionWatchdog:
+    """セッションとアクションの実行時間の上限を監視するクラス"""
+
+    def __init__(self, session_timeout: float = 0.0, action_timeout: float = 0.0, interval: float = 0.5):
+        """
+        コンストラクタ
+
+        Args:
+            session_timeout: セッション全体の実行時間の上限（秒、0の場合は無制限）
+            action_timeout: 1アクションの実行時間の上限（秒、0の場合は無制限）
+            interval: 監視間隔（秒）
+        """
+        self.session_timeout = session_timeout
+        self.action_timeout = action_timeout
+        self.interval = interval
+        self.logger = setup_logger("SessionWatchdog")
+
+        self._lock = threading.Lock()
+        self._sessions: Dict[int, _WatchedSession] = {}
+        self._timed_out_sessions = 0
+        self._lost_seconds = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["SessionWatchdog"]:
+        """
+        設定からウォッチドッグを作成する
+
+        Args:
+            config: 設定情報
+
+        Returns:
+            上限が設定されていない場合はNone
+        """
+        session_timeout = get_float(config, 'session_timeout', 0.0)
+        action_timeout = get_float(config, 'action_timeout', 0.0)
+        if session_timeout <= 0 and action_timeout <= 0:
+            return None
+        return cls(session_timeout, action_timeout, get_float(config, 'watchdog_interval', 0.5))
+
+    def start(self) -> None:
+        """監視スレッドを開始する"""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="session-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Dict[str, Any]:
+        """
+        監視スレッドを停止する
+
+        Returns:
+            ウォッチドッグの集計結果
+        """
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(self.interval * 4)
+            self._thread = None
+        return self.get_stats()
+
+    def start_session(self, session_id: int, abort: Callable[[str], None]) -> None:
+        """
+        セッションの監視を開始する
+
+        Args:
+            session_id: セッションID
+            abort: 上限を超過した場合に呼び出す中断処理（引数は超過理由、中断できなかった場合はFalseを返す）
+        """
+        with self._lock:
+            self._sessions[session_id] = _WatchedSession(abort)
+
+    def start_action(self, session_id: int, action_id: Any) -> None:
+        """アクションの監視を開始する"""
+        with self._lock:
+            watched = self._sessions.get(session_id)
+            if watched:
+                watched.action_started = time.monotonic()
+                watched.action_id = action_id
+
+    def end_action(self, session_id: int) -> None:
+        """アクションの監視を終了する"""
+        with self._lock:
+            watched = self._sessions.get(session_id)
+            if watched:
+                watched.action_started = None
+
+    def end_session(self, session_id: int) -> Optional[str]:
+        """
+        セッションの監視を終了する
+
+        Args:
+            session_id: セッションID
+
+        Returns:
+            上限を超過した場合はその理由、それ以外はNone
+        """
+        with self._lock:
+            watched = self._sessions.pop(session_id, None)
+            if watched is None or watched.reason is None:
+                return None
+            # 上限を超過したセッションが消費した時間を損失時間として集計
+            self._timed_out_sessions += 1
+            self._lost_seconds += time.monotonic() - watched.started
+            return watched.reason
+
+    def is_timed_out(self, session_id: int) -> bool:
+        """セッションが上限を超過したかどうか"""
+        with self._lock:
+            watched = self._sessions.get(session_id)
+            return watched is not None and watched.reason is not None
+
+    def _run(self) -> None:
+        """監視スレッドのエントリーポイント"""
+        while not self._stop_event.wait(self.interval):
+            self.check()
+
+    def check(self) -> None:
+        """上限を超過したセッションを中断する"""
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            for session_id, watched in self._sessions.items():
+                if watched.aborted:
+                    continue
+                if watched.reason is not None:
+                    # 前回中断できなかったセッションを再試行する
+                    expired.append((session_id, watched))
+                    continue
+                if self.session_timeout > 0 and now - watched.started > self.session_timeout:
+                    watched.reason = f"セッションの実行時間が上限（{self.session_timeout}秒）を超えました"
+                elif (self.action_timeout > 0 and watched.action_started is not None
+                      and now - watched.action_started > self.action_timeout):
+                    watched.reason = (f"アクション {watched.action_id} の実行時間が"
+                                      f"上限（{self.action_timeout}秒）を超えました")
+                else:
+                    continue
+                expired.append((session_id, watched))
+
+        # 中断処理はロックの外で行う
+        for session_id, watched in expired:
+            watched.attempts += 1
+            if watched.attempts == 1:
+                self.logger.warning(f"セッション{session_id}を中断します: {watched.reason}")
+            try:
+                aborted = watched.abort(watched.reason) is not False
+            except Exception as e:
+                aborted = True
+                self.logger.error(f"セッション{session_id}の中断処理に失敗しました: {str(e)}")
+            with self._lock:
+                watched.aborted = aborted
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        ウォッチドッグの集計結果を返す
+
+        Returns:
+            上限を超過したセッション数と損失時間
+        """
+        with self._lock:
+            return {
+                "session_timeout": self.session_timeout,
+                "action_timeout": self.action_timeout,
+                "timed_out_sessions": self._timed_out_sessions,
+                "lost_seconds": round(self._lost_seconds, 3)
+            }
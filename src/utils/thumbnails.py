@@ -0,0 +1,140 @@
+"""
+Excelレポートに埋め込むスクリーンショットのサムネイル生成モジュール
+
+スクリーンショットを縮小したJPEGを出力ディレクトリの thumbnail/ 配下に
+screenshot/ と同じ構成で保存する。生成はワーカープロセスのプールで並列に行い、
+元の画像より新しいサムネイルが既にある場合は再生成しない（レポートの再生成時も再利用される）。
+"""
+import concurrent.futures
+import logging
+import os
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+try:
+    from PIL import Image as PILImage
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+THUMBNAIL_DIR = "thumbnail"
+THUMBNAIL_QUALITY = 80
+
+
+def thumbnail_path(path: str, output_dir: str, width: int) -> str:
+    """
+    スクリーンショットのサムネイルの保存先を返す
+
+    Args:
+        path: スクリーンショットのパス
+        output_dir: 出力ディレクトリ
+        width: サムネイルの最大幅（ピクセル）
+
+    Returns:
+        サムネイルのパス（thumbnail/ 配下、screenshot/ からの相対パスを維持し、ファイル名に幅を付加）
+    """
+    relative = os.path.relpath(os.path.abspath(path), os.path.abspath(os.path.join(output_dir, "screenshot")))
+    if relative.startswith(os.pardir):
+        relative = os.path.basename(path)
+    return os.path.join(output_dir, THUMBNAIL_DIR, f"{os.path.splitext(relative)[0]}_w{width}.jpg")
+
+
+def make_thumbnail(source: str, target: str, width: int) -> Tuple[int, int]:
+    """
+    スクリーンショットを縮小して保存する（既に新しいサムネイルがある場合はそのまま使用する）
+
+    Args:
+        source: スクリーンショットのパス
+        target: サムネイルの保存先
+        width: サムネイルの最大幅（ピクセル）
+
+    Returns:
+        サムネイルの (幅, 高さ)
+    """
+    if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+        with PILImage.open(target) as image:
+            return image.size
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with PILImage.open(source) as image:
+        # 縮小してから変換する（reducing_gap により整数倍の縮小を先に行い高速化する）
+        image.thumbnail((width, image.height), PILImage.Resampling.LANCZOS, reducing_gap=2.0)
+        image = image.convert("RGB")
+        image.save(target, "JPEG", quality=THUMBNAIL_QUALITY)
+        return image.size
+
+
+def _thumbnail_task(args) -> Tuple[str, Optional[Dict[str, Any]], str]:
+    """ワーカープロセスでサムネイルを生成する（例外は呼び出し元に文字列で返す）"""
+    source, target, width = args
+    try:
+        thumb_width, thumb_height = make_thumbnail(source, target, width)
+        return source, {"path": target, "width": thumb_width, "height": thumb_height}, ""
+    except Exception as e:
+        return source, None, str(e)
+
+
+class ThumbnailPool:
+    """スクリーンショットのサムネイルを並列に生成するクラス"""
+
+    def __init__(self, output_dir: str, width: int = 320, workers: int = 0):
+        """
+        コンストラクタ
+
+        Args:
+            output_dir: 出力ディレクトリ
+            width: サムネイルの最大幅（ピクセル）
+            workers: サムネイルを生成するプロセス数（0の場合はCPU数、1の場合は順番に生成）
+        """
+        self.output_dir = output_dir
+        self.width = width
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = None
+
+    def __enter__(self) -> "ThumbnailPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _map(self, tasks):
+        """サムネイルの生成を実行する（プロセスを起動できない環境では順番に生成する）"""
+        if self.workers > 1 and len(tasks) > 1:
+            try:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+                return list(self._executor.map(_thumbnail_task, tasks))
+            except (OSError, NotImplementedError) as e:
+                logging.warning(f"ワーカープロセスを起動できないため、サムネイルを順番に生成します: {str(e)}")
+                self.workers = 1
+        return [_thumbnail_task(task) for task in tasks]
+
+    def generate(self, paths: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        スクリーンショットのサムネイルを生成する
+
+        Args:
+            paths: スクリーンショットのパス
+
+        Returns:
+            スクリーンショットのパスごとのサムネイル（path, width, height）。
+            生成に失敗した画像は含まない
+        """
+        if not PIL_AVAILABLE:
+            logging.error("Pillowがインストールされていないため、サムネイルを生成できません")
+            return {}
+
+        tasks = [(path, thumbnail_path(path, self.output_dir, self.width), self.width)
+                 for path in dict.fromkeys(paths) if path]
+        thumbnails = {}
+        for source, thumbnail, error in self._map(tasks):
+            if thumbnail:
+                thumbnails[source] = thumbnail
+            else:
+                logging.error(f"サムネイルの生成に失敗しました: {error}, パス: {source}")
+        return thumbnails
+
+    def close(self) -> None:
+        """ワーカープロセスを終了する"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
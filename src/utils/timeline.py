@@ -0,0 +1,210 @@
+"""
+実行中の時系列（スループット、同時実行数、レイテンシ）の収集モジュール
+
+経過時間を一定の間隔（バケット）に区切り、バケットごとにアクティブなセッション数、
+完了したアクション数、エラー数、所要時間のヒストグラムを記録する。ヒストグラムは
+対数間隔の固定のビンで、バケット数が上限を超えた場合は隣接するバケットを統合して
+間隔を2倍にするため、実行時間やアクション数によらずメモリ使用量は一定となる。
+"""
+import math
+import threading
+import time
+from array import array
+from typing import Dict, Any, List, Optional
+
+from src.utils.toml_utils import get_float, get_int
+
+# 所要時間のヒストグラムのビン（1ms から 2^(1/4) 倍ずつ、約17分まで。最後のビンはそれ以上）
+HISTOGRAM_BASE = 0.001
+HISTOGRAM_STEPS_PER_DOUBLING = 4
+HISTOGRAM_BINS = 80
+
+
+def histogram_bin(value: float) -> int:
+    """
+    所要時間が属するヒストグラムのビンを返す
+
+    Args:
+        value: 所要時間（秒）
+
+    Returns:
+        ビンの番号（0 〜 HISTOGRAM_BINS）
+    """
+    if value <= HISTOGRAM_BASE:
+        return 0
+    index = math.ceil(math.log2(value / HISTOGRAM_BASE) * HISTOGRAM_STEPS_PER_DOUBLING)
+    return min(index, HISTOGRAM_BINS)
+
+
+def histogram_upper_bound(index: int) -> float:
+    """
+    ヒストグラムのビンの上限値を返す
+
+    Args:
+        index: ビンの番号
+
+    Returns:
+        ビンの上限値（秒）
+    """
+    return HISTOGRAM_BASE * 2 ** (index / HISTOGRAM_STEPS_PER_DOUBLING)
+
+
+def histogram_percentile(histogram, p: float) -> Optional[float]:
+    """
+    ヒストグラムからパーセンタイルを推定する（該当するビンの上限値）
+
+    Args:
+        histogram: ビンごとの件数
+        p: パーセンタイル（0-100）
+
+    Returns:
+        パーセンタイル値（件数が0の場合はNone）
+    """
+    total = sum(histogram)
+    if total == 0:
+        return None
+    rank = max(1, math.ceil(total * p / 100.0))
+    cumulative = 0
+    for index, count in enumerate(histogram):
+        cumulative += count
+        if cumulative >= rank:
+            return histogram_upper_bound(index)
+    return histogram_upper_bound(len(histogram) - 1)
+
+
+class _Bucket:
+    """1つの時間間隔の集計"""
+
+    __slots__ = ("active", "actions", "errors", "histogram")
+
+    def __init__(self, active: int = 0):
+        self.active = active
+        self.actions = 0
+        self.errors = 0
+        self.histogram = array('l', [0]) * (HISTOGRAM_BINS + 1)
+
+    def merge(self, other: "_Bucket") -> None:
+        """隣接するバケットの集計を統合する"""
+        self.active = max(self.active, other.active)
+        self.actions += other.actions
+        self.errors += other.errors
+        for index, count in enumerate(other.histogram):
+            if count:
+                self.histogram[index] += count
+
+
+class TimelineCollector:
+    """実行中の時系列を一定のメモリで収集するクラス"""
+
+    def __init__(self, interval: float = 1.0, max_buckets: int = 600):
+        """
+        コンストラクタ
+
+        Args:
+            interval: バケットの間隔（秒）
+            max_buckets: 保持するバケット数の上限（超えた場合は間隔を2倍にする）
+        """
+        self.interval = interval
+        self.max_buckets = max(2, max_buckets)
+        self._lock = threading.Lock()
+        self._origin: Optional[float] = None
+        self._active = 0
+        self._buckets: List[_Bucket] = []
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["TimelineCollector"]:
+        """
+        設定ファイルの内容から作成する
+
+        Args:
+            config: 設定ファイルの内容
+
+        Returns:
+            時系列の収集（timeline_interval が0以下の場合はNone）
+        """
+        interval = get_float(config, 'timeline_interval', 1.0)
+        if interval <= 0:
+            return None
+        return cls(interval, get_int(config, 'timeline_max_buckets', 600))
+
+    def start(self) -> None:
+        """経過時間の計測を開始する"""
+        with self._lock:
+            self._origin = time.monotonic()
+
+    def _current_bucket(self) -> _Bucket:
+        """現在時刻のバケットを返す（ロックを取得した状態で呼び出す）"""
+        now = time.monotonic()
+        if self._origin is None:
+            self._origin = now
+        index = int((now - self._origin) / self.interval)
+        while len(self._buckets) <= index:
+            # 新しいバケットの同時実行数は実行中のセッション数から始める
+            self._buckets.append(_Bucket(self._active))
+            if len(self._buckets) > self.max_buckets:
+                self._compact()
+                index = int((now - self._origin) / self.interval)
+        return self._buckets[index]
+
+    def _compact(self) -> None:
+        """隣接するバケットを統合して間隔を2倍にする"""
+        merged = []
+        for i in range(0, len(self._buckets), 2):
+            bucket = self._buckets[i]
+            if i + 1 < len(self._buckets):
+                bucket.merge(self._buckets[i + 1])
+            merged.append(bucket)
+        self._buckets = merged
+        self.interval *= 2
+
+    def session_started(self) -> None:
+        """セッションの開始を記録する"""
+        with self._lock:
+            self._active += 1
+            bucket = self._current_bucket()
+            bucket.active = max(bucket.active, self._active)
+
+    def session_ended(self) -> None:
+        """セッションの終了を記録する"""
+        with self._lock:
+            self._current_bucket()
+            self._active = max(0, self._active - 1)
+
+    def record_action(self, duration: Optional[float], success: bool) -> None:
+        """
+        アクションの完了を記録する
+
+        Args:
+            duration: 所要時間（秒、不明な場合はNone）
+            success: 成功したかどうか
+        """
+        with self._lock:
+            bucket = self._current_bucket()
+            bucket.actions += 1
+            if not success:
+                bucket.errors += 1
+            if isinstance(duration, (int, float)):
+                bucket.histogram[histogram_bin(duration)] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        時系列をテスト結果に保存する形式で返す
+
+        Returns:
+            バケットの間隔と、バケットごとの経過時間、同時実行数、完了アクション数、
+            エラー数、所要時間のp50・p95
+        """
+        with self._lock:
+            interval = self.interval
+            buckets = [
+                {
+                    "time": round(i * interval, 3),
+                    "active": bucket.active,
+                    "actions": bucket.actions,
+                    "errors": bucket.errors,
+                    "p50": histogram_percentile(bucket.histogram, 50),
+                    "p95": histogram_percentile(bucket.histogram, 95),
+                }
+                for i, bucket in enumerate(self._buckets)
+            ]
+        return {"interval": interval, "buckets": buckets}
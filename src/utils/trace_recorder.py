@@ -0,0 +1,252 @@
+"""
+実行全体のトレース（Trace Event Format）の記録モジュール
+
+ブラウザの起動、アクションとそのフェーズ、スクリーンショット、ブラウザの終了処理、
+レポートの生成を Trace Event Format の Complete イベント（"ph": "X"）として記録し、
+Perfetto（https://ui.perfetto.dev）や chrome://tracing で読み込めるJSONに書き出す。
+セッションはワーカー（スレッド）ごとのトラックに、セッション内の処理はセッションごとの
+トラックに配置するため、複数セッションの処理の重なりを1つの画面で確認できる。
+
+イベントはメモリ上のバッファに追加するのみで、一定の件数ごとにまとめてファイルに追記する。
+ファイルは JSON Array Format（終端の "]" は省略可能）のため、実行が中断した場合も読み込める。
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from src.utils.logger import setup_logger
+from src.utils.toml_utils import get_bool, get_int
+
+TRACE_FILE = "trace.json"
+# トラックのプロセスID（ワーカーのスレッド／セッション）
+WORKER_PID = 1
+SESSION_PID = 2
+
+Track = Tuple[int, int]
+
+
+class TraceRecorder:
+    """Trace Event Format のイベントをバッファリングして書き出すクラス"""
+
+    def __init__(self, path: str, buffer_events: int = 4096):
+        """
+        コンストラクタ
+
+        Args:
+            path: 出力先のファイルパス
+            buffer_events: ファイルに書き出すまでにバッファに保持するイベント数
+        """
+        self.path = path
+        self.buffer_events = max(1, buffer_events)
+        self.logger = setup_logger("TraceRecorder")
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._buffer: List[Dict[str, Any]] = []
+        self._threads: Dict[int, int] = {}
+        self._sessions: Dict[int, str] = {}
+        self._file = None
+        self._opened = False
+        self._closed = False
+        self.events = 0
+        self._buffer.extend([
+            {"ph": "M", "name": "process_name", "pid": WORKER_PID, "tid": 0, "args": {"name": "ワーカー"}},
+            {"ph": "M", "name": "process_sort_index", "pid": WORKER_PID, "tid": 0, "args": {"sort_index": 0}},
+            {"ph": "M", "name": "process_name", "pid": SESSION_PID, "tid": 0, "args": {"name": "セッション"}},
+            {"ph": "M", "name": "process_sort_index", "pid": SESSION_PID, "tid": 0, "args": {"sort_index": 1}},
+        ])
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], output_dir: str) -> Optional["TraceRecorder"]:
+        """
+        設定ファイルの内容から作成する
+
+        Args:
+            config: 設定ファイルの内容
+            output_dir: 出力ディレクトリ（result/trace.json に書き出す）
+
+        Returns:
+            トレースの記録（trace が無効の場合はNone）
+        """
+        if not get_bool(config, 'trace', False):
+            return None
+        return cls(os.path.join(output_dir, "result", TRACE_FILE), get_int(config, 'trace_buffer_events', 4096))
+
+    def timestamp(self, counter: Optional[float] = None) -> float:
+        """
+        time.perf_counter() の値をトレースのタイムスタンプ（記録開始からのマイクロ秒）に変換する
+
+        Args:
+            counter: time.perf_counter() の値（Noneの場合は現在時刻）
+
+        Returns:
+            タイムスタンプ（マイクロ秒）
+        """
+        if counter is None:
+            counter = time.perf_counter()
+        return round((counter - self._origin) * 1_000_000, 1)
+
+    def worker_track(self) -> Track:
+        """
+        現在のスレッドのトラックを返す（初回はスレッド名を記録する）
+
+        Returns:
+            (プロセスID, スレッドID)
+        """
+        ident = threading.get_ident()
+        tid = self._threads.get(ident)
+        if tid is None:
+            with self._lock:
+                tid = self._threads.get(ident)
+                if tid is None:
+                    tid = self._threads[ident] = len(self._threads) + 1
+                    self._buffer.append({"ph": "M", "name": "thread_name", "pid": WORKER_PID, "tid": tid,
+                                         "args": {"name": threading.current_thread().name}})
+        return WORKER_PID, tid
+
+    def session_track(self, session_id: int, label: Optional[str] = None) -> Track:
+        """
+        セッションのトラックを返す（初回は表示名を記録する）
+
+        Args:
+            session_id: セッションID
+            label: 表示名（ユーザー名等）
+
+        Returns:
+            (プロセスID, スレッドID)
+        """
+        if session_id not in self._sessions:
+            with self._lock:
+                if session_id not in self._sessions:
+                    name = f"セッション{session_id}" + (f" ({label})" if label else "")
+                    self._sessions[session_id] = name
+                    self._buffer.append({"ph": "M", "name": "thread_name", "pid": SESSION_PID, "tid": session_id,
+                                         "args": {"name": name}})
+                    self._buffer.append({"ph": "M", "name": "thread_sort_index", "pid": SESSION_PID,
+                                         "tid": session_id, "args": {"sort_index": session_id}})
+        return SESSION_PID, session_id
+
+    def complete(self, name: str, start: float, end: float, track: Optional[Track] = None, category: str = "",
+                 args: Optional[Dict[str, Any]] = None) -> None:
+        """
+        開始・終了時刻が決まった処理を記録する
+
+        Args:
+            name: 処理の名前
+            start: 開始時刻（time.perf_counter() の値）
+            end: 終了時刻（time.perf_counter() の値）
+            track: トラック（Noneの場合は現在のスレッド）
+            category: カテゴリ（Perfetto での絞り込みに使用）
+            args: 付加情報
+        """
+        pid, tid = track or self.worker_track()
+        start_us = self.timestamp(start)
+        event = {"ph": "X", "name": name, "cat": category, "pid": pid, "tid": tid, "ts": start_us,
+                 "dur": max(0.0, round(self.timestamp(end) - start_us, 1))}
+        if args:
+            event["args"] = args
+        self._append(event)
+
+    def instant(self, name: str, track: Optional[Track] = None, category: str = "",
+                args: Optional[Dict[str, Any]] = None) -> None:
+        """
+        瞬間的な出来事を記録する
+
+        Args:
+            name: 名前
+            track: トラック（Noneの場合は現在のスレッド）
+            category: カテゴリ
+            args: 付加情報
+        """
+        pid, tid = track or self.worker_track()
+        event = {"ph": "i", "s": "t", "name": name, "cat": category, "pid": pid, "tid": tid, "ts": self.timestamp()}
+        if args:
+            event["args"] = args
+        self._append(event)
+
+    @contextmanager
+    def span(self, name: str, track: Optional[Track] = None, category: str = "",
+             args: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        with ブロックの処理を記録する
+
+        Args:
+            name: 処理の名前
+            track: トラック（Noneの場合は現在のスレッド）
+            category: カテゴリ
+            args: 付加情報（ブロック内で項目を追加できる）
+
+        Yields:
+            付加情報の辞書
+        """
+        args = dict(args or {})
+        track = track or self.worker_track()
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.complete(name, start, time.perf_counter(), track, category, args)
+
+    def _append(self, event: Dict[str, Any]) -> None:
+        """イベントをバッファに追加し、上限に達した場合は書き出す"""
+        with self._lock:
+            if self._closed:
+                return
+            self._buffer.append(event)
+            self.events += 1
+            if len(self._buffer) < self.buffer_events:
+                return
+            events, self._buffer = self._buffer, []
+        self._write(events)
+
+    def _write(self, events: List[Dict[str, Any]]) -> None:
+        """イベントをファイルに追記する（1行1イベント）"""
+        if not events:
+            return
+        with self._write_lock:
+            try:
+                if self._file is None:
+                    # 閉じた後に書き出そうとしたイベントは破棄する
+                    if self._opened:
+                        return
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    self._file = open(self.path, "w", encoding="utf-8")
+                    self._opened = True
+                    self._file.write("[\n")
+                else:
+                    self._file.write(",\n")
+                self._file.write(",\n".join(json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+                                            for event in events))
+                self._file.flush()
+            except OSError as e:
+                self.logger.error(f"トレースの書き出しに失敗しました: {str(e)}")
+
+    def close(self) -> Optional[str]:
+        """
+        バッファに残ったイベントを書き出してファイルを閉じる
+
+        Returns:
+            出力したファイルのパス（書き出せなかった場合はNone）
+        """
+        with self._lock:
+            if self._closed:
+                return self.path if os.path.exists(self.path) else None
+            self._closed = True
+            events, self._buffer = self._buffer, []
+        self._write(events)
+        with self._write_lock:
+            if self._file is None:
+                return None
+            try:
+                self._file.write("\n]\n")
+                self._file.close()
+            except OSError as e:
+                self.logger.error(f"トレースの書き出しに失敗しました: {str(e)}")
+                return None
+            finally:
+                self._file = None
+        self.logger.info(f"トレース: {self.path} ({self.events} イベント)")
+        return self.path
@@ -0,0 +1,293 @@
+"""
+Core Web Vitals とロングタスクの収集モジュール
+
+ブラウザの初期化時に CDP の Page.addScriptToEvaluateOnNewDocument で PerformanceObserver を
+登録するスクリプトを追加し、以降に読み込まれるすべてのページで LCP（Largest Contentful Paint）、
+レイアウトシフト、操作の応答時間（Event Timing）、ロングタスクをページ内のバッファに記録する。
+バッファはアクションごとに1回のスクリプトの実行で取り出して初期化するため、
+CLS、INP、ロングタスクはそのアクションの実行中に発生した分のみが記録される
+（LCP はページごとに最初に取り出した時点の値を1回のみ記録する）。
+
+操作IDごとの集計は時系列と同じ対数間隔のヒストグラム（CLS は一定の幅のヒストグラム）に
+加算するのみのため、アクション数が増えてもメモリ使用量は一定に保たれる。
+"""
+import math
+import threading
+from array import array
+from typing import Dict, Any, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from src.utils.timeline import HISTOGRAM_BINS, histogram_bin, histogram_percentile
+
+# 集計する指標（キー, 見出し, 「良好」の上限値）。しきい値は web.dev の Core Web Vitals の基準
+VITAL_FIELDS = (("lcp", "LCP", 2.5), ("cls", "CLS", 0.1), ("inp", "INP", 0.2))
+
+# CLS は単位のない値のため、時間用の対数間隔のビンではなく 0 から一定の幅のビンで集計する
+# （0 は 0 のまま、しきい値の 0.1 はビンの境界に一致する）。上限を超えた値は最後のビンに集計する
+CLS_BIN_WIDTH = 0.005
+CLS_BINS = 200
+
+# ページの読み込みの開始時（ドキュメントのスクリプトより前）に評価されるスクリプト
+WEB_VITALS_SCRIPT = """
+(function () {
+  if (window !== window.top || window.__aitestVitals || typeof PerformanceObserver === 'undefined') { return; }
+  var state = window.__aitestVitals = {lcp: null, lcpReported: false, cls: 0, inp: null,
+                                       longTasks: 0, longTaskTime: 0, longTaskMax: 0};
+  function observe(type, callback, options) {
+    try {
+      new PerformanceObserver(function (list) { list.getEntries().forEach(callback); })
+        .observe(Object.assign({type: type, buffered: true}, options || {}));
+    } catch (e) {}
+  }
+  function interaction(e) {
+    if (e.interactionId && (state.inp === null || e.duration > state.inp)) { state.inp = e.duration; }
+  }
+  observe('largest-contentful-paint', function (e) { state.lcp = e.startTime; });
+  observe('layout-shift', function (e) { if (!e.hadRecentInput) { state.cls += e.value; } });
+  observe('event', interaction, {durationThreshold: 16});
+  observe('first-input', interaction);
+  observe('longtask', function (e) {
+    state.longTasks++;
+    state.longTaskTime += e.duration;
+    state.longTaskMax = Math.max(state.longTaskMax, e.duration);
+  });
+})();
+"""
+
+# バッファを取り出して初期化する（収集スクリプトのないページでは null を返す）。時間はミリ秒。
+DRAIN_SCRIPT = """
+var s = window.__aitestVitals;
+if (!s) { return null; }
+var result = {url: location.href, lcp: s.lcpReported ? null : s.lcp, cls: s.cls, inp: s.inp,
+              long_tasks: s.longTasks, long_task_time: s.longTaskTime, long_task_max: s.longTaskMax};
+if (s.lcp !== null) { s.lcpReported = true; }
+s.cls = 0; s.inp = null; s.longTasks = 0; s.longTaskTime = 0; s.longTaskMax = 0;
+return result;
+"""
+
+
+def install_web_vitals(driver) -> bool:
+    """
+    以降に読み込まれるページに収集スクリプトを追加する（Chromium系のみ）
+
+    Args:
+        driver: WebDriver
+
+    Returns:
+        追加できた場合True（CDPに対応していないブラウザの場合はFalse）
+    """
+    if not hasattr(driver, 'execute_cdp_cmd'):
+        return False
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {"source": WEB_VITALS_SCRIPT})
+    return True
+
+
+def _seconds(value: Any) -> Optional[float]:
+    """ミリ秒を秒に変換する（値がない場合はNone）"""
+    return round(value / 1000, 6) if isinstance(value, (int, float)) else None
+
+
+def drain_web_vitals(driver) -> Optional[Dict[str, Any]]:
+    """
+    現在のページのバッファを取り出して初期化する
+
+    Args:
+        driver: WebDriver
+
+    Returns:
+        url, lcp（秒、記録済みの場合はNone）, cls, inp（秒、操作がない場合はNone）,
+        long_tasks, long_task_time, long_task_max（秒）（収集スクリプトのないページの場合はNone）
+    """
+    entry = driver.execute_script(DRAIN_SCRIPT)
+    if not isinstance(entry, dict):
+        return None
+    return {
+        "url": entry.get("url", ""),
+        "lcp": _seconds(entry.get("lcp")),
+        "cls": round(float(entry.get("cls") or 0), 6),
+        "inp": _seconds(entry.get("inp")),
+        "long_tasks": int(entry.get("long_tasks") or 0),
+        "long_task_time": _seconds(entry.get("long_task_time") or 0),
+        "long_task_max": _seconds(entry.get("long_task_max") or 0),
+    }
+
+
+def cls_bin(value: float) -> int:
+    """
+    CLS が属するビンを返す
+
+    Args:
+        value: CLS
+
+    Returns:
+        ビンの番号（0 〜 CLS_BINS、0 は値が 0 のビン）
+    """
+    if value <= 0:
+        return 0
+    # 浮動小数点の誤差でしきい値（0.1 等）が次のビンに入らないように丸める
+    return min(math.ceil(round(value / CLS_BIN_WIDTH, 9)), CLS_BINS)
+
+
+def cls_percentile(histogram, p: float, maximum: float) -> Optional[float]:
+    """
+    CLS のヒストグラムからパーセンタイルを推定する（該当するビンの上限値）
+
+    Args:
+        histogram: ビンごとの件数
+        p: パーセンタイル（0-100）
+        maximum: 最大値（上限を超えたビンの場合に使用する）
+
+    Returns:
+        パーセンタイル値（件数が0の場合はNone）
+    """
+    total = sum(histogram)
+    if total == 0:
+        return None
+    rank = max(1, math.ceil(total * p / 100.0))
+    cumulative = 0
+    for index, count in enumerate(histogram):
+        cumulative += count
+        if cumulative >= rank:
+            break
+    if index >= CLS_BINS:
+        return maximum
+    return round(index * CLS_BIN_WIDTH, 6)
+
+
+def _page(url: str) -> str:
+    """集計に使用するページ（クエリ文字列とフラグメントを除いたURL）"""
+    parts = urlsplit(url or "")
+    return f"{parts.scheme}://{parts.netloc}{parts.path}" if parts.netloc else (url or "")
+
+
+class _ActionVitals:
+    """1つの操作IDの Web Vitals の集計"""
+
+    __slots__ = ("samples", "page", "latency", "histograms", "counts", "good", "cls_max", "long_tasks",
+                 "long_task_time", "long_task_max")
+
+    def __init__(self):
+        self.samples = 0
+        self.page = ""
+        self.latency = array('l', [0]) * (HISTOGRAM_BINS + 1)
+        self.histograms = {key: array('l', [0]) * ((CLS_BINS if key == "cls" else HISTOGRAM_BINS) + 1)
+                           for key, _, _ in VITAL_FIELDS}
+        self.cls_max = 0.0
+        self.counts = {key: 0 for key, _, _ in VITAL_FIELDS}
+        self.good = {key: 0 for key, _, _ in VITAL_FIELDS}
+        self.long_tasks = 0
+        self.long_task_time = 0.0
+        self.long_task_max = 0.0
+
+
+class WebVitalsStats:
+    """操作IDごとの Web Vitals とアクションの所要時間を一定のメモリで集計するクラス"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 操作IDごとの集計（初出順）
+        self._actions: Dict[str, _ActionVitals] = {}
+
+    def __len__(self) -> int:
+        return len(self._actions)
+
+    def add(self, action_id: Any, vitals: Dict[str, Any], duration: Optional[float] = None) -> None:
+        """
+        1アクション分の収集値を加算する
+
+        Args:
+            action_id: 操作ID
+            vitals: drain_web_vitals の戻り値
+            duration: アクションの所要時間（秒）
+        """
+        action_id = str(action_id)
+        with self._lock:
+            stats = self._actions.get(action_id)
+            if stats is None:
+                stats = self._actions[action_id] = _ActionVitals()
+            stats.samples += 1
+            stats.page = _page(vitals.get("url", "")) or stats.page
+            if isinstance(duration, (int, float)):
+                stats.latency[histogram_bin(duration)] += 1
+            for key, _, threshold in VITAL_FIELDS:
+                value = vitals.get(key)
+                if isinstance(value, (int, float)):
+                    stats.counts[key] += 1
+                    if key == "cls":
+                        stats.histograms[key][cls_bin(value)] += 1
+                        stats.cls_max = max(stats.cls_max, value)
+                    else:
+                        stats.histograms[key][histogram_bin(value)] += 1
+                    if value <= threshold:
+                        stats.good[key] += 1
+            stats.long_tasks += int(vitals.get("long_tasks") or 0)
+            stats.long_task_time += float(vitals.get("long_task_time") or 0)
+            stats.long_task_max = max(stats.long_task_max, float(vitals.get("long_task_max") or 0))
+
+    def add_session(self, session: Dict[str, Any]) -> None:
+        """
+        セッションの結果のアクションに記録された収集値を加算する
+
+        Args:
+            session: セッションの実行結果
+        """
+        for action in session.get("actions", []):
+            vitals = action.get("web_vitals")
+            if isinstance(vitals, dict):
+                self.add(action.get("action_id", action.get("操作ID", "")), vitals, action.get("duration"))
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        操作IDごとの集計を返す
+
+        Returns:
+            action_id, page（直近のページ）, samples, latency（所要時間の p50, p95）,
+            <指標>（count, p75, p95, good（「良好」の割合）の辞書、値がない場合はNone）,
+            long_tasks, long_task_time, long_task_max のリスト（初出順）
+        """
+        with self._lock:
+            summary = []
+            for action_id, stats in self._actions.items():
+                row: Dict[str, Any] = {
+                    "action_id": action_id,
+                    "page": stats.page,
+                    "samples": stats.samples,
+                    "latency": {"p50": histogram_percentile(stats.latency, 50),
+                                "p95": histogram_percentile(stats.latency, 95)},
+                }
+                for key, _, _ in VITAL_FIELDS:
+                    count = stats.counts[key]
+                    histogram = stats.histograms[key]
+                    if key == "cls":
+                        p75, p95 = (cls_percentile(histogram, p, stats.cls_max) for p in (75, 95))
+                    else:
+                        p75, p95 = (histogram_percentile(histogram, p) for p in (75, 95))
+                    row[key] = {
+                        "count": count,
+                        "p75": p75,
+                        "p95": p95,
+                        "good": round(stats.good[key] / count, 4),
+                    } if count else None
+                row.update({
+                    "long_tasks": stats.long_tasks,
+                    "long_task_time": round(stats.long_task_time, 6),
+                    "long_task_max": round(stats.long_task_max, 6),
+                })
+                summary.append(row)
+            return summary
+
+
+def summarize_web_vitals(sessions: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    セッションの結果の Web Vitals を操作IDごとに集計する
+
+    Args:
+        sessions: セッションの実行結果
+
+    Returns:
+        WebVitalsStats.summary の戻り値
+    """
+    stats = WebVitalsStats()
+    for session in sessions:
+        stats.add_session(session)
+    return stats.summary()
@@ -97,3 +97,39 @@ class TestBrowserSession:
             assert result['success'] is True
             assert len(result['actions']) == 2
             assert mock_action_handler.handle_action.call_count == 2
+
+    def test_abort_before_driver_started(self, test_user, test_config, temp_dir):
+        """ドライバーのサービスの起動前は中断できず、再試行の対象になるテスト"""
+        session = BrowserSession(test_user, test_config, 1, str(temp_dir))
+        
+        assert session.abort("タイムアウト") is False
+        assert session.abort_reason == "タイムアウト"
+
+    @patch('src.browser_session.kill_process_tree', return_value=2)
+    def test_abort_while_driver_starting(self, mock_kill, test_user, test_config, temp_dir):
+        """WebDriverの作成中はサービスのプロセスを終了するテスト"""
+        session = BrowserSession(test_user, test_config, 1, str(temp_dir))
+        service = MagicMock()
+        service.process.pid = 12345
+        session._set_service(service)
+        
+        with patch('src.utils.browser_reaper._child_pids', return_value=[]):
+            assert session.abort("タイムアウト") is True
+        mock_kill.assert_called_once_with(12345)
+
+    @patch('src.browser_session.kill_process_tree', return_value=1)
+    def test_initialize_aborted_during_startup(self, mock_kill, test_user, test_config, temp_dir):
+        """ブラウザの起動中に中断された場合は初期化を失敗させるテスト"""
+        session = BrowserSession(test_user, test_config, 1, str(temp_dir))
+        driver = MagicMock()
+        driver.service.process.pid = 12345
+        
+        def create_browser(browser_type, headless, service_created=None):
+            session.abort("タイムアウト")
+            return driver
+        
+        with patch('src.utils.browser_utils.create_browser', side_effect=create_browser), \
+             patch('src.utils.browser_reaper._child_pids', return_value=[]):
+            assert session.initialize() is False
+        assert session.driver is None
+        mock_kill.assert_called_once_with(12345)
@@ -36,7 +36,7 @@ class TestConcurrentTester:
              patch('src.concurrent_tester.BrowserSession') as mock_browser_session_class, \
              patch('src.concurrent_tester.create_output_directory', return_value=str(temp_dir)), \
              patch('src.concurrent_tester.save_json'), \
-             patch('src.concurrent_tester.generate_excel_report'):
+             patch('src.concurrent_tester.select_excel_report_generator'):
             
             # ScenarioLoaderのモック
             mock_scenario_loader = MagicMock()
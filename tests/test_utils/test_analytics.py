@@ -0,0 +1,140 @@
+"""
+アクション単位のサンプルの集計のテスト
+"""
+import math
+import os
+import pytest
+from src.analyze_command import main as analyze_main
+from src.utils import analytics
+from src.utils.analytics import SampleSet, moving_average, percentile, summarize
+from src.utils.results_io import results_path, save_results
+from src.utils.sample_export import export_action_samples
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """NumPyを使用する場合と標準ライブラリのみの場合の両方で実行する"""
+    if request.param == "numpy":
+        if analytics.np is None:
+            pytest.skip("numpyがインストールされていません")
+    else:
+        monkeypatch.setattr(analytics, "np", None)
+    return request.param
+
+def _results():
+    """2操作×10セッション（10秒間隔）のテスト結果。操作ID 2 はセッション10で外れ値、セッション9で失敗"""
+    sessions = []
+    for i in range(10):
+        start = f"2025-01-01T12:00:{i * 5:02d}"
+        sessions.append({
+            'session_id': i + 1, 'user_id': 'user1', 'success': i != 8, 'duration': 2.0,
+            'actions': [
+                {'操作ID': '1', '説明': 'ログイン', 'result': True, 'duration': float(i + 1), 'start_time': start},
+                {'操作ID': '2', '説明': '検索', 'result': i != 8, 'duration': 10.0 if i == 9 else 1.0,
+                 'start_time': start, 'error': None if i != 8 else 'TimeoutException: 検索'},
+            ]
+        })
+    return {'start_time': '2025-01-01T12:00:00', 'total_sessions': 10, 'failed_sessions': 1, 'sessions': sessions}
+
+class TestAnalytics:
+    """サンプルの集計のテスト"""
+
+    def test_summarize(self, backend):
+        """平均・最大値・パーセンタイルの計算のテスト（NaNは除外）"""
+        summary = summarize([4.0, 1.0, math.nan, 3.0, 2.0], (0, 50, 90))
+        assert summary['count'] == 4
+        assert summary['mean'] == pytest.approx(2.5)
+        assert summary['max'] == 4.0
+        assert summary['p50'] == pytest.approx(2.5)
+        assert summary['p90'] == pytest.approx(percentile([1.0, 2.0, 3.0, 4.0], 90))
+        assert math.isnan(summarize([], (50,))['p50'])
+
+    def test_grouped_percentiles(self, backend):
+        """操作IDごとのパーセンタイルと失敗数のテスト"""
+        samples = SampleSet.from_results(_results())
+        stats = samples.grouped_percentiles((50, 90))
+        assert list(stats) == ['1', '2']
+        assert stats['1']['count'] == 10
+        assert stats['1']['p50'] == pytest.approx(5.5)
+        assert stats['1']['p90'] == pytest.approx(9.1)
+        assert stats['1']['max'] == 10.0
+        assert stats['1']['failure'] == 0
+        assert stats['2']['failure'] == 1
+        assert stats['2']['mean'] == pytest.approx(1.9)
+
+    def test_time_series(self, backend):
+        """時間帯ごとの件数・エラー率・パーセンタイルのテスト"""
+        samples = SampleSet.from_results(_results())
+        series = samples.time_series(10.0)
+        assert [row['start'] for row in series] == [0.0, 10.0, 20.0, 30.0, 40.0]
+        assert [row['count'] for row in series] == [4] * 5
+        assert series[4]['errors'] == 1
+        assert series[4]['error_rate'] == pytest.approx(0.25)
+        assert series[0]['p50'] == pytest.approx(1.0)
+
+        series = samples.time_series(20.0, action_id='1')
+        assert [row['count'] for row in series] == [4, 4, 2]
+        assert series[2]['p95'] == pytest.approx(9.95)
+        assert samples.time_series(10.0, action_id='unknown') == []
+
+    def test_moving_average(self, backend):
+        """移動平均のテスト（NaNは除外）"""
+        averages = moving_average([1.0, math.nan, 2.0, 3.0, math.nan, math.nan, 4.0], 2)
+        assert averages[:5] == [1.0, 1.0, 2.0, 2.5, 3.0]
+        assert math.isnan(averages[5])
+        assert averages[6] == 4.0
+
+    def test_outliers(self, backend):
+        """四分位範囲による外れ値の検出のテスト"""
+        outliers = SampleSet.from_results(_results()).outliers(3.0)
+        assert len(outliers) == 1
+        assert outliers[0]['action_id'] == '2'
+        assert outliers[0]['session_id'] == 10
+        assert outliers[0]['duration'] == 10.0
+        assert outliers[0]['threshold'] == pytest.approx(1.0)
+
+    def test_load(self, temp_dir):
+        """テスト結果とCSVのサンプルの読み込み（複数ファイルの結合）のテスト"""
+        results = _results()
+        output_dir = os.path.join(str(temp_dir), 'run1')
+        assert save_results(results, results_path(os.path.join(output_dir, 'result')))
+        csv_path = export_action_samples(results, str(temp_dir), 'csv', path=os.path.join(str(temp_dir), 'node2.csv'))
+
+        from_results = SampleSet.load([output_dir])
+        merged = SampleSet.load([output_dir, csv_path])
+        assert len(from_results) == 20
+        assert len(merged) == 40
+        assert merged.grouped_percentiles()['2']['failure'] == 2
+        assert list(merged.start_times[:2]) == list(merged.start_times[20:22])
+        with pytest.raises(FileNotFoundError):
+            SampleSet.load([os.path.join(str(temp_dir), 'missing')])
+
+    def test_load_parquet(self, temp_dir, backend, monkeypatch):
+        """Parquetのサンプルを行グループごとに読み込み、テスト結果と同じ列になるテスト"""
+        pytest.importorskip("pyarrow")
+        from src.utils import sample_export
+        monkeypatch.setattr(sample_export, "ROW_GROUP_SIZE", 3)
+        results = _results()
+        results['sessions'][0]['actions'][0]['start_time'] = None
+        results['sessions'][1]['actions'][1]['duration'] = None
+        path = export_action_samples(results, str(temp_dir), 'parquet')
+
+        loaded = SampleSet.load([path])
+        expected = SampleSet.from_results(results)
+        assert loaded.action_ids == expected.action_ids
+        for name in ('codes', 'session_ids', 'successes'):
+            assert list(getattr(loaded, name)) == list(getattr(expected, name))
+        for name in ('start_times', 'durations'):
+            assert [None if math.isnan(value) else value for value in getattr(loaded, name)] == \
+                [None if math.isnan(value) else value for value in getattr(expected, name)]
+
+    def test_analyze_command(self, temp_dir, capsys):
+        """analyzeコマンドの表示と終了コードのテスト"""
+        output_dir = os.path.join(str(temp_dir), 'run1')
+        assert save_results(_results(), results_path(os.path.join(output_dir, 'result')))
+
+        assert analyze_main([output_dir, '--interval', '10']) == 0
+        output = capsys.readouterr().out
+        assert "サンプル: 20 件" in output
+        assert "25.0%" in output
+        assert analyze_main([os.path.join(str(temp_dir), 'missing')]) == 1
+        assert analyze_main([output_dir, '--interval', '0']) == 1
@@ -0,0 +1,71 @@
+"""
+ブラウザの非同期終了処理のテスト
+"""
+import subprocess
+import sys
+import time
+import pytest
+from unittest.mock import MagicMock
+from src.utils.browser_reaper import BrowserReaper, get_driver_pids
+
+def _mock_session(driver, session_id=1):
+    """終了処理対象のセッションのモックを作成する"""
+    session = MagicMock()
+    session.session_id = session_id
+    session.detach_driver.return_value = driver
+    return session
+
+class TestBrowserReaper:
+    """BrowserReaperクラスのテスト"""
+
+    def test_get_driver_pids_without_service(self):
+        """プロセス情報がないドライバーのテスト"""
+        assert get_driver_pids(MagicMock()) == []
+        assert get_driver_pids(object()) == []
+
+    def test_submit_quits_in_background(self):
+        """終了処理がバックグラウンドで行われるテスト"""
+        reaper = BrowserReaper(quit_timeout=5)
+        driver = MagicMock()
+        failing_driver = MagicMock()
+        failing_driver.quit.side_effect = Exception("quit failed")
+
+        reaper.submit(_mock_session(driver, 1))
+        reaper.submit(_mock_session(failing_driver, 2))
+        reaper.submit(_mock_session(None, 3))
+        stats = reaper.shutdown()
+
+        driver.quit.assert_called_once()
+        assert stats['submitted'] == 2
+        assert stats['quit_ok'] == 1
+        assert stats['quit_failed'] == 1
+
+    def test_quit_timeout(self):
+        """終了処理が期限を超えた場合のテスト"""
+        reaper = BrowserReaper(quit_timeout=0.1, workers=1)
+        driver = MagicMock()
+        driver.quit.side_effect = lambda: time.sleep(1)
+
+        reaper.submit(_mock_session(driver))
+        stats = reaper.shutdown()
+
+        assert stats['quit_timeout'] == 1
+        assert stats['quit_ok'] == 0
+
+    @pytest.mark.skipif(sys.platform == 'win32', reason="POSIXのみ")
+    def test_orphan_sweep(self):
+        """残存プロセスの掃除のテスト"""
+        process = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+        try:
+            driver = MagicMock()
+            driver.service.process.pid = process.pid
+            reaper = BrowserReaper()
+            reaper.register(driver)
+
+            stats = reaper.shutdown()
+
+            assert stats['orphans_swept'] == 1
+            assert process.wait(timeout=5) != 0
+        finally:
+            if process.poll() is None:
+                process.kill()
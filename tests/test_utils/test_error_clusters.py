@@ -0,0 +1,111 @@
+"""
+エラーメッセージの分類のテスト
+"""
+import os
+from src.utils.error_clusters import OTHER_ERRORS, ErrorClusters, cluster_errors, error_template
+from src.utils.report_builder import build_results_summary, select_sessions
+
+def _failed_session(session_id, action_id, error, start_time, screenshots=None):
+    """操作で失敗したセッション"""
+    return {
+        'session_id': session_id, 'user_id': 'user1', 'success': False,
+        'start_time': start_time, 'end_time': start_time,
+        'screenshots': screenshots or [],
+        'actions': [{'操作ID': '1', 'result': True, 'duration': 0.1, 'start_time': start_time},
+                    {'操作ID': action_id, 'result': False, 'duration': 0.2, 'start_time': start_time,
+                     'error': error}],
+        'errors': [f"アクション {action_id} の実行に失敗しました: {error}"],
+    }
+
+class TestErrorClusters:
+    """エラーの分類のテスト"""
+
+    def test_error_template(self):
+        """ID、数値、URL、日時の置き換えのテスト"""
+        assert error_template('アクション 4 の実行に失敗しました: 要素が見つかりません: #login-button') == \
+            'アクション <N> の実行に失敗しました: 要素が見つかりません: #login-button'
+        assert error_template('invalid session id: session 5f2c1a9be8d04c7e9a1b2c3d4e5f6a7b not found') == \
+            'invalid session id: session <ID> not found'
+        assert error_template('読み込みに失敗: https://example.com/orders/1234?tab=2 (30秒)\nStacktrace:\n#0 0x55d5') == \
+            '読み込みに失敗: <URL> (<N>秒)'
+        assert error_template('発生日時 2025-01-01T12:00:00.123 id=123e4567-e89b-12d3-a456-426614174000') == \
+            '発生日時 <TIME> id=<ID>'
+        # セレクタの一部の数値は残す
+        assert error_template('h2 が見つかりません: #button3') == 'h2 が見つかりません: #button3'
+        assert error_template('') == '不明なエラー'
+
+    def test_add_session(self):
+        """テンプレートごとの件数、発生日時、操作ID、代表のスクリーンショットのテスト"""
+        clusters = ErrorClusters()
+        clusters.add_session(_failed_session(1, '3', 'タイムアウトしました (30 秒)', '2025-01-01T12:00:05'))
+        clusters.add_session(_failed_session(2, '3', 'タイムアウトしました (31 秒)', '2025-01-01T12:00:01', [
+            'screenshot/session_2/action_3/error_3_session_2_20250101_120001.png']))
+        clusters.add_session(_failed_session(3, '4', 'タイムアウトしました (45 秒)', '2025-01-01T12:00:09', [
+            'screenshot/session_3/action_4/error_4_session_3_20250101_120009.png']))
+        clusters.add_session(_failed_session(4, '4', '要素が見つかりません: #login', '2025-01-01T12:00:03'))
+        clusters.add_session({'session_id': 5, 'success': False, 'end_time': '2025-01-01T12:00:10', 'actions': [],
+                              'screenshots': ['screenshot/session_5/exception_20250101_120010.png'],
+                              'errors': ['ブラウザの初期化に失敗しました']})
+        # 成功したセッションは分類しない
+        clusters.add_session({'session_id': 6, 'success': True, 'actions': [{'操作ID': '1', 'result': True}]})
+
+        result = clusters.clusters()
+        assert clusters.total == 5
+        assert [cluster['count'] for cluster in result] == [3, 1, 1]
+        timeout = result[0]
+        assert timeout['template'] == 'タイムアウトしました (<N> 秒)'
+        assert timeout['first_seen'] == '2025-01-01T12:00:01'
+        assert timeout['last_seen'] == '2025-01-01T12:00:09'
+        assert timeout['action_ids'] == ['3', '4']
+        assert timeout['example'] == 'タイムアウトしました (30 秒)'
+        assert timeout['session_id'] == 2
+        assert timeout['screenshot'] == 'screenshot/session_2/action_3/error_3_session_2_20250101_120001.png'
+
+        initialization = next(cluster for cluster in result if cluster['action_ids'] == ['-'])
+        assert initialization['screenshot'] == 'screenshot/session_5/exception_20250101_120010.png'
+        not_found = next(cluster for cluster in result if cluster['template'].startswith('要素'))
+        assert not_found['screenshot'] is None and not_found['session_id'] == 4
+
+        assert clusters.breakdown()[0] == ('3', 'タイムアウトしました (<N> 秒)', 2)
+        assert len(clusters.clusters(limit=1)) == 1
+
+    def test_max_clusters(self):
+        """分類の数の上限を超えた場合に「その他のエラー」に集計するテスト"""
+        clusters = ErrorClusters(max_clusters=2)
+        for i in range(1000):
+            clusters.add(str(i % 3), f"エラー種別{chr(0x3042 + i % 50)}: {i}")
+        result = clusters.clusters()
+        assert len(clusters) == 3
+        assert sum(cluster['count'] for cluster in result) == 1000
+        assert result[0]['template'] == OTHER_ERRORS
+        assert result[0]['count'] == 1000 - 40
+
+    def test_reports(self):
+        """テスト結果の要約とセッションを選択した場合の分類のテスト"""
+        sessions = [_failed_session(1, '3', 'タイムアウト 1', '2025-01-01T12:00:00'),
+                    _failed_session(2, '4', '要素が見つかりません', '2025-01-01T12:00:01')]
+        results = {'sessions': sessions}
+        assert cluster_errors(sessions)[0]['count'] == 1
+        summary = build_results_summary(results)
+        assert [cluster['template'] for cluster in summary['error_clusters']] == ['タイムアウト <N>', '要素が見つかりません']
+        # テスト結果に保存済みの分類があればそれを使用する
+        assert build_results_summary({**results, 'error_clusters': []})['error_clusters'] == []
+        selected = select_sessions({**results, 'error_clusters': cluster_errors(sessions)}, [2])
+        assert [cluster['template'] for cluster in selected['error_clusters']] == ['要素が見つかりません']
+
+    def test_excel_sheet(self, temp_dir):
+        """Excelレポートのエラー分類シートのテスト"""
+        import openpyxl
+        from src.utils.excel_report import generate_excel_report_aggregate
+
+        screenshot = os.path.join('screenshot', 'session_1', 'action_3', 'error_3_session_1_20250101_120000.png')
+        sessions = [_failed_session(1, '3', 'タイムアウト 1', '2025-01-01T12:00:00', [screenshot])]
+        results = {'app_users': ['user1'], 'sessions': sessions, 'error_clusters': cluster_errors(sessions)}
+        excel_path = generate_excel_report_aggregate(results, str(temp_dir), {'report_title': 'テスト結果'})
+
+        wb = openpyxl.load_workbook(excel_path)
+        assert wb.sheetnames == ['サマリー', '集計', 'エラー分類', 'エラー内訳']
+        sheet = wb['エラー分類']
+        assert [cell.value for cell in sheet[4]][:4] == [1, 'タイムアウト <N>', '3', '2025-01-01T12:00:00']
+        assert sheet['H4'].value == 'error_3_session_1_20250101_120000.png'
+        assert sheet['H4'].hyperlink.target == '../' + screenshot.replace(os.sep, '/')
@@ -82,3 +82,215 @@ class TestExcelReport:
             # 検証
             assert result == output_file
             mock_workbook.save.assert_called_once_with(output_file)
+
+
+class TestExcelReportStreaming:
+    """書き込み専用ワークブックによるExcelレポート生成のテスト"""
+
+    @staticmethod
+    def _create_screenshots(output_dir, session_id, action_ids):
+        """Excel出力フラグ付きのスクリーンショットを作成する"""
+        from PIL import Image as PILImage
+        session_dir = os.path.join(output_dir, "screenshot", f"session_{session_id}")
+        os.makedirs(session_dir, exist_ok=True)
+        for action_id in action_ids:
+            for kind in ("before", "after"):
+                path = os.path.join(session_dir, f"{kind}_{action_id}_session_{session_id}_20250101.png")
+                PILImage.new("RGB", (40, 30), (255, 255, 255)).save(path)
+                open(path + ".excel", "w").close()
+
+    def test_generate_excel_report_streaming(self, temp_dir):
+        """標準のレポートと同じシート構成で出力されるテスト"""
+        import openpyxl
+        from src.utils.excel_report import generate_excel_report_streaming
+
+        output_dir = str(temp_dir)
+        self._create_screenshots(output_dir, 1, ["1", "2"])
+        results = {
+            'app_users': ['test_user1'],
+            'sessions': [
+                {
+                    'session_id': 1,
+                    'user_id': 'test_user1',
+                    'success': False,
+                    'duration': 1.5,
+                    'actions': [
+                        {'操作ID': '1', '操作タイプ': 'URL移動', '説明': 'ログインページに移動', 'result': False,
+                         'error': 'タイムアウト'},
+                        {'操作ID': '2', '操作タイプ': 'クリック', '説明': 'ログイン', 'result': True}
+                    ]
+                },
+                {'session_id': 2, 'user_id': 'test_user1', 'success': True, 'duration': 1.0, 'actions': []}
+            ]
+        }
+
+        excel_path = generate_excel_report_streaming(results, output_dir, {'report_title': 'テスト結果', 'zoom_scale': 60})
+
+        assert excel_path == os.path.join(output_dir, "result", "test_report.xlsx")
+        wb = openpyxl.load_workbook(excel_path)
+        assert wb.sheetnames == ['サマリー', 'セッション1', 'スクリーンショット1', 'セッション2', 'スクリーンショット2']
+        assert wb['サマリー']['A1'].value == 'テスト結果'
+
+        # エラーメッセージはアクションの次の行に出力される
+        session_sheet = wb['セッション1']
+        assert session_sheet['A7'].value == 'エラー:'
+        assert session_sheet['B7'].value == 'タイムアウト'
+        assert session_sheet['A8'].value == '2'
+
+        # スクリーンショットはアクションごとに52行間隔で配置される
+        screenshot_sheet = wb['スクリーンショット1']
+        assert screenshot_sheet.sheet_view.zoomScale == 60
+        assert screenshot_sheet['A3'].value == 'アクション 1: ログインページに移動'
+        assert screenshot_sheet['A55'].value == 'アクション 2: ログイン'
+        assert len(screenshot_sheet._images) == 4
+        assert wb['スクリーンショット2']['A2'].value == 'セッションディレクトリが存在しません'
+
+
+class TestExcelReportSharded:
+    """複数のワークブックに分割したExcelレポート生成のテスト"""
+
+    def test_split_into_shards(self):
+        """セッションの分割のテスト"""
+        from src.utils.excel_report import split_into_shards
+
+        sessions = [{'session_id': i} for i in range(1, 8)]
+        shards = split_into_shards(sessions, 3)
+
+        assert [len(shard) for shard in shards] == [3, 3, 1]
+        assert shards[2][0]['session_id'] == 7
+        assert split_into_shards([], 3) == []
+
+    def test_generate_excel_report_sharded(self, temp_dir):
+        """シャードとインデックスのワークブックが出力されるテスト"""
+        import openpyxl
+        from src.utils.excel_report import generate_excel_report_sharded
+
+        output_dir = str(temp_dir)
+        results = {
+            'app_users': ['test_user1'],
+            'sessions': [
+                {'session_id': i, 'user_id': 'test_user1', 'success': i != 2, 'duration': 1.0, 'actions': []}
+                for i in range(1, 6)
+            ]
+        }
+
+        index_path = generate_excel_report_sharded(results, output_dir, {'report_title': 'テスト結果'}, 2, workers=2)
+
+        shard_dir = os.path.join(output_dir, "result", "shards")
+        assert index_path == os.path.join(output_dir, "result", "test_report.xlsx")
+        assert sorted(os.listdir(shard_dir)) == ['test_report_001.xlsx', 'test_report_002.xlsx', 'test_report_003.xlsx']
+
+        wb = openpyxl.load_workbook(index_path)
+        assert wb.sheetnames == ['サマリー', 'シャード一覧']
+        shard_sheet = wb['シャード一覧']
+        assert [shard_sheet[f'B{row}'].value for row in (4, 5, 6)] == ['1 - 2', '3 - 4', '5 - 5']
+        assert shard_sheet['E4'].value == 1
+        assert shard_sheet['F4'].hyperlink.target == 'shards/test_report_001.xlsx'
+
+        shard = openpyxl.load_workbook(os.path.join(shard_dir, 'test_report_002.xlsx'))
+        assert shard.sheetnames == ['サマリー', 'セッション3', 'スクリーンショット3', 'セッション4', 'スクリーンショット4']
+        assert shard['サマリー']['A1'].value == 'テスト結果 (2/3)'
+
+
+class TestExcelReportAggregate:
+    """集計レポートのテスト"""
+
+    def test_resolve_report_mode(self):
+        """レポートの構成の決定テスト"""
+        from src.utils.excel_report import resolve_report_mode
+
+        assert resolve_report_mode('detailed', 1000, 200) == 'detailed'
+        assert resolve_report_mode('aggregate', 1, 200) == 'aggregate'
+        assert resolve_report_mode('auto', 200, 200) == 'detailed'
+        assert resolve_report_mode('auto', 201, 200) == 'aggregate'
+
+    def test_generate_excel_report_aggregate(self, temp_dir):
+        """セッション×アクションの行列とエラー内訳が出力されるテスト"""
+        import openpyxl
+        from src.utils.excel_report import generate_excel_report_aggregate
+
+        results = {'app_users': ['test_user1'], 'sessions': [
+            {'session_id': 1, 'user_id': 'test_user1', 'success': True, 'duration': 2.0, 'actions': [
+                {'操作ID': '1', '説明': 'ログイン', 'result': True, 'duration': 0.5},
+                {'操作ID': '2', '説明': '検索', 'result': True, 'duration': 1.5}]},
+            {'session_id': 2, 'user_id': 'test_user1', 'success': False, 'duration': 1.0, 'actions': [
+                {'操作ID': '1', '説明': 'ログイン', 'result': False, 'duration': 1.0, 'error': 'タイムアウト'}]}
+        ]}
+
+        excel_path = generate_excel_report_aggregate(results, str(temp_dir), {'report_title': 'テスト結果'})
+
+        wb = openpyxl.load_workbook(excel_path)
+        assert wb.sheetnames == ['サマリー', '集計', 'エラー内訳']
+        matrix = wb['集計']
+        assert [matrix.cell(row=3, column=col).value for col in range(1, 7)] == [
+            'セッションID', 'ユーザーID', '結果', '所要時間(秒)', '1', '2']
+        assert matrix['E5'].value == 2       # 実行数
+        assert matrix['E6'].value == 1       # 失敗数
+        assert matrix['E8'].value == 0.75    # p50
+        assert [cell.value for cell in matrix[13]][:6] == [1, 'test_user1', '成功', 2.0, 0.5, 1.5]
+        assert [cell.value for cell in matrix[14]][:6] == [2, 'test_user1', '失敗', 1.0, 1.0, '-']
+        assert [cell.value for cell in wb['エラー内訳'][4]] == ['1', 'タイムアウト', 1]
+
+
+class TestExcelReportTimeline:
+    """時系列シートのテスト"""
+
+    TIMELINE = {'interval': 1.0, 'buckets': [
+        {'time': 0.0, 'active': 2, 'actions': 3, 'errors': 0, 'p50': 0.2, 'p95': 0.4},
+        {'time': 1.0, 'active': 1, 'actions': 0, 'errors': 0, 'p50': None, 'p95': None},
+        {'time': 2.0, 'active': 1, 'actions': 2, 'errors': 1, 'p50': 0.3, 'p95': 1.2},
+    ]}
+
+    @pytest.mark.parametrize('engine', ['standard', 'streaming', 'aggregate'])
+    def test_timeline_sheet(self, temp_dir, engine):
+        """時系列のデータとグラフがサマリーの直後に出力されるテスト"""
+        import openpyxl
+        from src.utils.excel_report import (
+            generate_excel_report_aggregate, generate_excel_report_streaming
+        )
+
+        results = {'app_users': ['test_user1'], 'timeline': self.TIMELINE, 'sessions': [
+            {'session_id': 1, 'user_id': 'test_user1', 'success': True, 'duration': 1.0, 'actions': []}]}
+        generator = {'standard': generate_excel_report, 'streaming': generate_excel_report_streaming,
+                     'aggregate': generate_excel_report_aggregate}[engine]
+
+        excel_path = generator(results, str(temp_dir), {'report_title': 'テスト結果'})
+
+        wb = openpyxl.load_workbook(excel_path)
+        assert wb.sheetnames[:2] == ['サマリー', '時系列']
+        sheet = wb['時系列']
+        assert sheet['A1'].value == '時系列（間隔: 1秒）'
+        assert [cell.value for cell in sheet[3]][:6] == [
+            '経過時間(秒)', '同時実行セッション数', '完了アクション数', 'エラー数', 'p50(秒)', 'p95(秒)']
+        assert [cell.value for cell in sheet[6]][:6] == [2.0, 1, 2, 1, 0.3, 1.2]
+        assert sheet['E5'].value is None
+        assert len(sheet._charts) == 3
+
+
+class TestExcelReportThumbnails:
+    """サムネイルを埋め込んだスクリーンショットシートのテスト"""
+
+    @pytest.mark.parametrize('engine', ['standard', 'streaming'])
+    def test_thumbnails(self, temp_dir, engine):
+        """サムネイルを埋め込み、ラベルから原寸の画像にリンクするテスト"""
+        import openpyxl
+        from src.utils.excel_report import generate_excel_report_streaming
+
+        output_dir = str(temp_dir)
+        TestExcelReportStreaming._create_screenshots(output_dir, 1, ["1", "2"])
+        results = {'app_users': ['test_user1'], 'sessions': [
+            {'session_id': 1, 'user_id': 'test_user1', 'success': True, 'duration': 1.0, 'actions': [
+                {'操作ID': '1', '説明': 'ログイン', 'result': True},
+                {'操作ID': '2', '説明': '検索', 'result': True}]}]}
+        generator = generate_excel_report if engine == 'standard' else generate_excel_report_streaming
+
+        excel_path = generator(results, output_dir, {'thumbnail_width': 20, 'thumbnail_workers': 1})
+
+        sheet = openpyxl.load_workbook(excel_path)['スクリーンショット1']
+        assert sheet['B4'].value == 'Before:'
+        assert sheet['B4'].hyperlink.target == '../screenshot/session_1/before_1_session_1_20250101.png'
+        assert sheet['C4'].hyperlink.target == '../screenshot/session_1/after_1_session_1_20250101.png'
+        # サムネイル（20x15ピクセル）の高さに合わせてアクション間の行数を詰める
+        assert sheet['A8'].value == 'アクション 2: 検索'
+        assert len(sheet._images) == 4
+        assert os.path.exists(os.path.join(output_dir, 'thumbnail', 'session_1', 'before_1_session_1_20250101_w20.jpg'))
@@ -0,0 +1,47 @@
+"""
+エグゼンプラー収集のテスト
+"""
+import os
+import pytest
+from src.utils.exemplar import ExemplarCollector
+
+class TestExemplarCollector:
+    """ExemplarCollectorクラスのテスト"""
+
+    def test_from_config_disabled(self, temp_dir):
+        """エグゼンプラーモードが無効の場合のテスト"""
+        assert ExemplarCollector.from_config({}, str(temp_dir)) is None
+        assert ExemplarCollector.from_config({'exemplar_mode': True}, str(temp_dir)) is not None
+
+    def test_observe_threshold(self, temp_dir):
+        """閾値判定のテスト"""
+        collector = ExemplarCollector(str(temp_dir), threshold_factor=2.0, min_samples=5)
+
+        # サンプル不足の間は収集しない
+        for _ in range(5):
+            assert collector.observe('1', 1.0) is None
+
+        assert collector.observe('1', 2.5) == pytest.approx(2.0)
+        # 低速サンプルもベースラインに含まれる（p95 = 2.5）
+        assert collector.observe('1', 4.5) is None
+        # 別の操作IDはベースラインを共有しない
+        assert collector.observe('2', 10.0) is None
+
+    def test_keep_slowest(self, temp_dir):
+        """遅い順に上位N件のみ保持するテスト"""
+        collector = ExemplarCollector(str(temp_dir), min_samples=1, keep=2)
+
+        dirs = []
+        for i, duration in enumerate([3.0, 5.0, 4.0]):
+            rel_dir = os.path.join('exemplar', f'e{i}')
+            os.makedirs(os.path.join(str(temp_dir), rel_dir))
+            dirs.append(rel_dir)
+            collector.add('1', duration, {'action_id': '1', 'duration': duration, 'dir': rel_dir})
+
+        exemplars = collector.get_exemplars()
+        assert [e['duration'] for e in exemplars] == [5.0, 4.0]
+        # 破棄された証跡は削除される
+        assert not os.path.exists(os.path.join(str(temp_dir), dirs[0]))
+        # 上位N件より速いアクションは収集対象にならない
+        collector.observe('1', 1.0)
+        assert collector.observe('1', 3.5) is None
@@ -33,3 +33,15 @@ class TestFileUtils:
         with open(file_path, 'r') as f:
             saved_data = json.load(f)
             assert saved_data == test_data
+
+    def test_save_json_compact(self, temp_dir):
+        """インデントの指定によるJSON保存の形式のテスト"""
+        file_path = os.path.join(str(temp_dir), 'test.json')
+
+        save_json({'a': 1, 'b': [1, 2]}, file_path)
+        with open(file_path, 'r', encoding='utf-8') as f:
+            assert f.read() == '{"a":1,"b":[1,2]}'
+
+        save_json({'a': 1}, file_path, indent=2)
+        with open(file_path, 'r', encoding='utf-8') as f:
+            assert f.read() == '{\n  "a": 1\n}'
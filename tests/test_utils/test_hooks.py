@@ -0,0 +1,155 @@
+"""
+ライフサイクルフックのテスト
+"""
+import dataclasses
+import sys
+import threading
+import types
+
+import pytest
+
+from src.utils import hooks as hooks_module
+from src.utils.hooks import (AfterAction, ErrorOccurred, HookManager, RunStarted, SessionEnded, load_hook)
+
+
+class _Recorder:
+    """イベントを記録するフック"""
+
+    def __init__(self):
+        self.events = []
+        self.threads = set()
+        self.closed = False
+
+    def on_after_action(self, event):
+        self.events.append(event)
+        self.threads.add(threading.current_thread().name)
+
+    def on_error(self, event):
+        self.events.append(event)
+
+    def close(self):
+        self.closed = True
+
+
+class _Broken:
+    """例外を発生させるフック"""
+
+    def on_after_action(self, event):
+        raise RuntimeError("送信に失敗しました")
+
+
+def _after_action(action_id="1", duration=0.25):
+    return AfterAction(session_id=1, action_id=action_id, action_type="click", success=True,
+                       start_time="2025-01-01T12:00:00", duration=duration, phases={"action": duration})
+
+
+@pytest.fixture
+def hook_module(monkeypatch):
+    """フックを提供するモジュール"""
+    module = types.ModuleType("sample_hooks")
+    module.Recorder = _Recorder
+    module.instance = _Recorder()
+    monkeypatch.setitem(sys.modules, "sample_hooks", module)
+    return module
+
+
+class TestHooks:
+    """ライフサイクルフックのテスト"""
+
+    def test_events(self):
+        """イベントのデータクラスのテスト"""
+        event = _after_action()
+        assert event.timestamp > 0
+        assert AfterAction.method == "on_after_action"
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            event.duration = 1.0
+        with pytest.raises(TypeError):
+            # キーワード引数のみ
+            RunStarted("output", "2025-01-01T12:00:00", 10)
+        assert SessionEnded(session_id=1, user_id="user1", success=False, start_time="a", end_time="b",
+                            duration=1.5).errors == ()
+
+    def test_load_hook(self, hook_module):
+        """"モジュール:属性" の形式の読み込みのテスト"""
+        assert isinstance(load_hook("sample_hooks:Recorder"), _Recorder)
+        assert load_hook("sample_hooks:instance") is hook_module.instance
+        with pytest.raises(ValueError):
+            load_hook("sample_hooks")
+        with pytest.raises(AttributeError):
+            load_hook("sample_hooks:Missing")
+
+    def test_from_config(self, hook_module, monkeypatch):
+        """設定ファイルとエントリーポイントからの登録のテスト"""
+        monkeypatch.setattr(hooks_module, "_entry_point_hooks", lambda: [("entry", _Recorder())])
+        assert HookManager.from_config({"hooks_entry_points": False}) is None
+
+        manager = HookManager.from_config({"hooks": ["sample_hooks:instance", "missing_module:Hook"]})
+        assert len(manager.hooks) == 2
+        assert manager.hooks[0] is hook_module.instance
+        assert not manager.asynchronous
+
+        manager = HookManager.from_config({"hooks": "sample_hooks:Recorder", "hooks_entry_points": False,
+                                           "hooks_async": True})
+        assert len(manager.hooks) == 1 and manager.asynchronous
+        manager.close()
+
+    def test_dispatch(self):
+        """実装したメソッドのイベントのみ通知し、例外で止まらないテスト"""
+        recorder = _Recorder()
+        manager = HookManager([recorder, _Broken(), object()])
+        assert manager.wants(AfterAction) and manager.wants(ErrorOccurred)
+        assert not manager.wants(RunStarted)
+
+        manager.emit(_after_action())
+        manager.emit(RunStarted(output_dir="output", start_time="2025-01-01T12:00:00", total_sessions=1))
+        manager.emit(ErrorOccurred(session_id=1, message="エラー", action_id="1"))
+        assert [type(event) for event in recorder.events] == [AfterAction, ErrorOccurred]
+        assert recorder.threads == {threading.current_thread().name}
+        assert manager.close() == {"dropped": 0, "failures": 1}
+        assert recorder.closed
+
+    def test_asynchronous(self):
+        """専用のスレッドからの通知とキューが一杯の場合の破棄のテスト"""
+        release = threading.Event()
+
+        class Slow(_Recorder):
+            def on_after_action(self, event):
+                release.wait(5)
+                super().on_after_action(event)
+
+        slow = Slow()
+        manager = HookManager([slow], asynchronous=True, queue_size=2)
+        manager.start()
+        for i in range(10):
+            # 通知が遅くてもイベントの追加は待たない
+            manager.emit(_after_action(str(i)))
+        release.set()
+        stats = manager.close()
+        assert slow.threads == {"hook-dispatcher"}
+        assert stats["dropped"] == 10 - len(slow.events)
+        assert 2 <= len(slow.events) <= 3
+        assert slow.events[0].action_id == "0"
+        assert slow.closed
+
+    def test_start(self):
+        """通知スレッドは start() まで起動せず、起動前のイベントはキューに保持するテスト"""
+        recorder = _Recorder()
+        manager = HookManager([recorder], asynchronous=True)
+        manager.emit(_after_action("1"))
+        assert "hook-dispatcher" not in {thread.name for thread in threading.enumerate()}
+        assert recorder.events == []
+
+        manager.start()
+        manager.emit(_after_action("2"))
+        manager.close()
+        assert [event.action_id for event in recorder.events] == ["1", "2"]
+        assert recorder.threads == {"hook-dispatcher"}
+
+    def test_close_without_start(self):
+        """起動しなかった場合は close() でキューに残ったイベントを通知するテスト"""
+        recorder = _Recorder()
+        manager = HookManager([recorder], asynchronous=True)
+        manager.emit(_after_action("1"))
+
+        assert manager.close() == {"dropped": 0, "failures": 0}
+        assert [event.action_id for event in recorder.events] == ["1"]
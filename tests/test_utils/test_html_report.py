@@ -0,0 +1,75 @@
+"""
+HTMLレポート生成のテスト
+"""
+import json
+import os
+import re
+from src.utils.html_report import build_html_report_data, generate_html_report, render_html_report
+
+def _results():
+    """テスト用のテスト結果"""
+    return {
+        'duration': 12.5,
+        'sessions': [
+            {'session_id': 1, 'user_id': 'user1', 'success': True, 'duration': 2.0, 'errors': [],
+             'actions': [{'操作ID': '1', '説明': 'ログイン', 'result': True, 'duration': 0.25},
+                         {'操作ID': '2', '説明': '検索', 'result': True, 'duration': 1.5}],
+             'screenshots': [os.path.join('screenshot', 'session_1', 'before_1_session_1_20250101.png'),
+                             os.path.join('screenshot', 'session_1', 'exception_session_1_20250101.png')]},
+            {'session_id': 2, 'user_id': 'user1', 'success': False, 'duration': 1.0,
+             'errors': ['アクション 1 の実行に失敗しました: タイムアウト'],
+             'actions': [{'操作ID': '1', '説明': 'ログイン', 'result': False, 'duration': 1.0,
+                          'error': 'タイムアウト</script>'}]},
+        ]
+    }
+
+def _embedded_data(page):
+    """HTMLに埋め込まれたデータを取り出す"""
+    match = re.search(r'<script id="report-data" type="application/json">(.*?)</script>', page, re.S)
+    return json.loads(match.group(1))
+
+class TestHtmlReport:
+    """HTMLレポート生成のテスト"""
+
+    def test_build_html_report_data(self):
+        """重複する文字列を表にまとめたコンパクトなデータのテスト"""
+        data = build_html_report_data(_results(), {'report_title': 'テスト結果'})
+
+        assert data['title'] == 'テスト結果'
+        assert data['summary']['total'] == 2
+        assert data['summary']['failure'] == 1
+        assert data['users'] == ['user1']
+        assert data['actions'] == [['1', 'ログイン'], ['2', '検索']]
+        assert data['sessions'][0] == [1, 0, 1, 2.0, -1]
+        assert data['sessions'][1][4] == 0
+        assert data['steps'][0] == [[0, 1, 250, -1], [1, 1, 1500, -1]]
+        assert data['steps'][1] == [[0, 0, 1000, 1]]
+        assert data['errors'][1] == 'タイムアウト</script>'
+        # セッションのスクリーンショットディレクトリ直下の画像はファイル名のみを格納する
+        assert data['shots'][0] == [
+            [0, 'b', 'before_1_session_1_20250101.png'],
+            [-1, 'e', 'exception_session_1_20250101.png'],
+        ]
+        assert data['base'] == '../'
+
+    def test_render_escapes_embedded_data(self):
+        """埋め込みデータとタイトルがエスケープされるテスト"""
+        data = build_html_report_data(_results(), {'report_title': '<b>__DATA__</b>'})
+        page = render_html_report(data)
+
+        assert '<title>&lt;b&gt;__DATA__&lt;/b&gt;</title>' in page
+        assert 'タイムアウト</script>' not in page
+        assert _embedded_data(page)['errors'][1] == 'タイムアウト</script>'
+
+    def test_generate_html_report(self, temp_dir):
+        """HTMLファイルの出力と出力ディレクトリへの相対パスのテスト"""
+        output_dir = str(temp_dir)
+
+        html_path = generate_html_report(_results(), output_dir, {})
+        assert html_path == os.path.join(output_dir, 'result', 'test_report.html')
+        with open(html_path, encoding='utf-8') as f:
+            assert _embedded_data(f.read())['base'] == '../'
+
+        other_path = generate_html_report(_results(), output_dir, {}, html_path=os.path.join(output_dir, 'report.html'))
+        with open(other_path, encoding='utf-8') as f:
+            assert _embedded_data(f.read())['base'] == './'
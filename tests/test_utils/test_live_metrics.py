@@ -0,0 +1,124 @@
+"""
+実行中のメトリクスの公開のテスト
+"""
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.utils.live_metrics import LiveMetrics
+
+
+class _Driver:
+    """コマンドを記録するだけのドライバー"""
+
+    def __init__(self):
+        self.executed = []
+
+    def execute(self, driver_command, params=None):
+        if driver_command == "findElement":
+            raise RuntimeError("no such element")
+        self.executed.append(driver_command)
+        return {"value": None}
+
+    def get(self, url):
+        return self.execute("get", {"url": url})
+
+
+def _samples(text):
+    """メトリクスの文字列を {名前{ラベル}: 値} に変換する"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+class TestLiveMetrics:
+    """実行中のメトリクスのテスト"""
+
+    def test_from_config(self):
+        """設定ファイルからの作成のテスト"""
+        assert LiveMetrics.from_config({}) is None
+        assert LiveMetrics.from_config({'metrics_port': 0}) is None
+        metrics = LiveMetrics.from_config({'metrics_port': '9500', 'metrics_host': '0.0.0.0'})
+        assert (metrics.host, metrics.port) == ('0.0.0.0', 9500)
+
+    def test_render(self):
+        """セッション数、所要時間のヒストグラム、ゲージの出力のテスト"""
+        metrics = LiveMetrics(port=0)
+        for _ in range(3):
+            metrics.session_started()
+        metrics.session_ended(True)
+        metrics.session_ended(False)
+        metrics.record_action("1", 0.08, True)
+        metrics.record_action("1", 0.3, True)
+        metrics.record_action("1", 120.0, False)
+        metrics.record_action('ログイン"2"', None, False)
+        metrics.screenshot_started()
+        metrics.add_gauge("teardown_queue_depth", "終了処理を待っているブラウザの数", lambda: 4)
+        metrics.add_gauge("broken", "取得に失敗するゲージ", lambda: 1 / 0)
+
+        text = metrics.render()
+        samples = _samples(text)
+        assert "# TYPE aitest_action_duration_seconds histogram" in text
+        assert samples["aitest_active_sessions"] == 1
+        assert samples["aitest_sessions_started_total"] == 3
+        assert samples["aitest_sessions_completed_total"] == 2
+        assert samples["aitest_sessions_failed_total"] == 1
+        assert samples['aitest_action_duration_seconds_bucket{action_id="1",le="0.05"}'] == 0
+        assert samples['aitest_action_duration_seconds_bucket{action_id="1",le="0.1"}'] == 1
+        assert samples['aitest_action_duration_seconds_bucket{action_id="1",le="0.5"}'] == 2
+        assert samples['aitest_action_duration_seconds_bucket{action_id="1",le="60.0"}'] == 2
+        assert samples['aitest_action_duration_seconds_bucket{action_id="1",le="+Inf"}'] == 3
+        assert samples['aitest_action_duration_seconds_sum{action_id="1"}'] == pytest.approx(120.38)
+        assert samples['aitest_action_duration_seconds_count{action_id="1"}'] == 3
+        assert samples['aitest_action_failures_total{action_id="1"}'] == 1
+        assert samples['aitest_action_failures_total{action_id="ログイン\\"2\\""}'] == 1
+        assert samples["aitest_screenshots_in_progress"] == 1
+        assert samples["aitest_teardown_queue_depth"] == 4
+        assert "aitest_broken" not in text
+
+        metrics.screenshot_finished()
+        samples = _samples(metrics.render())
+        assert samples["aitest_screenshots_in_progress"] == 0
+        assert samples["aitest_screenshots_total"] == 1
+
+    def test_instrument_driver(self):
+        """WebDriverのコマンド数の記録のテスト"""
+        metrics = LiveMetrics(port=0)
+        driver = _Driver()
+        metrics.instrument_driver(driver)
+        driver.get("https://example.com")
+        driver.execute("screenshot")
+        driver.execute("screenshot")
+        with pytest.raises(RuntimeError):
+            driver.execute("findElement", {"using": "css selector", "value": "#missing"})
+
+        assert driver.executed == ["get", "screenshot", "screenshot"]
+        samples = _samples(metrics.render())
+        assert samples['aitest_webdriver_commands_total{command="get"}'] == 1
+        assert samples['aitest_webdriver_commands_total{command="screenshot"}'] == 2
+        assert samples['aitest_webdriver_commands_total{command="findElement"}'] == 1
+        assert samples['aitest_webdriver_command_errors_total{command="findElement"}'] == 1
+        assert samples["aitest_webdriver_commands_in_flight"] == 0
+
+    def test_server(self):
+        """HTTPエンドポイントのテスト"""
+        metrics = LiveMetrics(port=0)
+        assert metrics.start()
+        try:
+            metrics.session_started()
+            with urllib.request.urlopen(metrics.url, timeout=5) as response:
+                assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+                samples = _samples(response.read().decode("utf-8"))
+            assert samples["aitest_active_sessions"] == 1
+            assert "aitest_host_memory_total_bytes" in samples or "aitest_host_load1" in samples
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(metrics.url.replace("/metrics", "/other"), timeout=5)
+
+            # 使用中のポートでは起動に失敗する
+            assert not LiveMetrics(port=metrics.port).start()
+        finally:
+            metrics.stop()
@@ -0,0 +1,97 @@
+"""
+実行中の統計の端末表示のテスト
+"""
+import io
+import time
+
+import pytest
+
+from src.utils.live_stats import LiveStats, LiveStatsReporter, format_duration
+
+
+class _Terminal(io.StringIO):
+    """端末として扱われる出力先"""
+
+    def isatty(self):
+        return True
+
+
+def _stats():
+    stats = LiveStats()
+    stats.start(10)
+    for _ in range(4):
+        stats.session_started()
+    stats.session_ended(True)
+    stats.session_ended(False)
+    for duration in (0.1, 0.2, 0.2, 0.3, 2.0):
+        stats.record_action("1", duration, True)
+    stats.record_action("2", 0.5, False)
+    stats.record_action("2", None, False)
+    return stats
+
+
+class TestLiveStats:
+    """実行中の統計のテスト"""
+
+    def test_format_duration(self):
+        """時間の表示のテスト"""
+        assert format_duration(None) == "-"
+        assert format_duration(0) == "0:00:00"
+        assert format_duration(3725.4) == "1:02:05"
+
+    def test_snapshot(self):
+        """セッション数、操作IDごとの集計、残り時間の見込みのテスト"""
+        snapshot = _stats().snapshot()
+        assert snapshot["sessions"] == {"total": 10, "active": 2, "queued": 6, "completed": 2, "failed": 1}
+        # 完了した2セッションの速さで残りの8セッションを実行した場合の時間
+        assert snapshot["eta"] == pytest.approx(snapshot["elapsed"] * 8 / 2)
+        first, second = snapshot["actions"]
+        assert (first["action_id"], first["count"], first["errors"]) == ("1", 5, 0)
+        # 所要時間は対数ヒストグラムから推定する（誤差は約19%以内）
+        assert 0.2 <= first["p50"] <= 0.2 * 1.19
+        assert 2.0 <= first["p95"] <= 2.0 * 1.19
+        assert (second["count"], second["errors"]) == (2, 2)
+
+        empty = LiveStats(3).snapshot()
+        assert empty["eta"] is None and empty["actions"] == []
+        finished = LiveStats(0).snapshot()
+        assert finished["eta"] == 0.0
+
+    def test_plain_output(self):
+        """端末でない場合は表を追記するテスト"""
+        stream = io.StringIO()
+        reporter = LiveStatsReporter(_stats(), 1.0, stream)
+        assert not reporter.redraw
+        reporter.render()
+        reporter.render()
+        output = stream.getvalue()
+        assert "\x1b[" not in output
+        assert output.count("操作ID") == 2
+        assert "実行中 2 / 待機 6 / 完了 2/10 (失敗 1)" in output
+        # 2回目のスループットは前回の表示からの件数で計算する
+        last_table = output.strip().split("\n\n")[-1]
+        assert [line.split()[2] for line in last_table.splitlines()[3:]] == ["0.00", "0.00"]
+
+    def test_terminal_redraw(self):
+        """端末の場合は前回の表を消して再描画するテスト"""
+        stream = _Terminal()
+        reporter = LiveStatsReporter(_stats(), 1.0, stream)
+        assert reporter.redraw
+        reporter.render()
+        first = stream.getvalue()
+        assert not first.startswith("\x1b[")
+        lines = first.count("\n")
+        reporter.render()
+        assert stream.getvalue()[len(first):].startswith(f"\x1b[{lines}F\x1b[J")
+
+    def test_thread(self):
+        """一定の間隔での表示と停止時の最終表示のテスト"""
+        stream = io.StringIO()
+        reporter = LiveStatsReporter(_stats(), 0.1, stream)
+        reporter.start()
+        time.sleep(0.35)
+        reporter.stop()
+        assert stream.getvalue().count("経過") >= 3
+        count = stream.getvalue().count("経過")
+        reporter.stop()
+        assert stream.getvalue().count("経過") == count
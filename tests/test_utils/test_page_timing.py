@@ -0,0 +1,181 @@
+"""
+ページ読み込みの計測のテスト
+"""
+import json
+from unittest.mock import MagicMock, patch
+
+import openpyxl
+import pytest
+
+from src.browser_session import BrowserSession
+from src.concurrent_tester import ConcurrentTester
+from src.utils.excel_report import _page_timing_values
+from src.utils.page_timing import PageTimingStats, capture_page_timing, summarize_page_timing
+from src.utils.report_builder import build_results_summary
+
+
+def _entry(origin=1000.0, **overrides):
+    """PAGE_TIMING_SCRIPT の戻り値（ミリ秒）"""
+    entry = {"origin": origin, "url": "https://example.com/", "type": "navigate", "dns": 12.0, "connect": 0,
+             "ttfb": 180.0, "dom_content_loaded": 450.0, "load": 900.0, "document_bytes": 2048,
+             "resources": 10, "transfer_bytes": 8192, "sized_resources": 8, "cached_resources": 2}
+    entry.update(overrides)
+    return entry
+
+
+class TestCapturePageTiming:
+    """計測値の取得のテスト"""
+
+    def test_converts_to_seconds(self):
+        """ミリ秒を秒に変換し、キャッシュヒット率を計算する"""
+        driver = MagicMock()
+        driver.execute_script.return_value = _entry()
+
+        timing = capture_page_timing(driver, 500.0)
+
+        assert driver.execute_script.call_count == 1
+        assert driver.execute_script.call_args[0][1] == 500.0
+        assert timing["origin"] == 1000.0
+        assert timing["dns"] == pytest.approx(0.012)
+        assert timing["connect"] == 0.0
+        assert timing["ttfb"] == pytest.approx(0.18)
+        assert timing["load"] == pytest.approx(0.9)
+        assert timing["transfer_bytes"] == 2048 + 8192
+        assert timing["cache_hit_ratio"] == 0.25
+
+    def test_incomplete_load(self):
+        """load の前に計測した場合は None"""
+        driver = MagicMock()
+        driver.execute_script.return_value = _entry(load=0, sized_resources=0, cached_resources=0)
+
+        timing = capture_page_timing(driver)
+
+        assert timing["load"] is None
+        assert timing["cache_hit_ratio"] is None
+
+    def test_same_page(self):
+        """同じページの場合（スクリプトが null を返す）は None"""
+        driver = MagicMock()
+        driver.execute_script.return_value = None
+
+        assert capture_page_timing(driver, 1000.0) is None
+
+
+class TestPageTimingStats:
+    """操作IDごとの集計のテスト"""
+
+    def test_summary(self):
+        """件数、パーセンタイル、平均、キャッシュヒット率"""
+        driver = MagicMock()
+        stats = PageTimingStats()
+        for ttfb in (100.0, 200.0, 300.0):
+            driver.execute_script.return_value = _entry(ttfb=ttfb)
+            stats.add("1", capture_page_timing(driver))
+        driver.execute_script.return_value = _entry(load=0, resources=4, sized_resources=4, cached_resources=4)
+        stats.add("2", capture_page_timing(driver))
+
+        summary = stats.summary()
+
+        assert [row["action_id"] for row in summary] == ["1", "2"]
+        first, second = summary
+        assert first["pages"] == 3
+        assert first["ttfb"]["mean"] == pytest.approx(0.2)
+        assert 0.1 <= first["ttfb"]["p50"] <= 0.25
+        assert first["ttfb"]["p95"] >= 0.3
+        assert first["resources"] == 10
+        assert first["cache_hit_ratio"] == 0.25
+        assert second["load"] is None
+        assert second["cache_hit_ratio"] == 1.0
+
+    def test_summarize_sessions(self):
+        """保存済みのセッションの結果から集計する"""
+        driver = MagicMock()
+        driver.execute_script.return_value = _entry()
+        timing = capture_page_timing(driver)
+        sessions = [{"session_id": i, "actions": [{"action_id": "1", "page_timing": timing},
+                                                 {"action_id": "2"}]} for i in range(2)]
+
+        summary = summarize_page_timing(sessions)
+
+        assert len(summary) == 1
+        assert summary[0]["pages"] == 2
+        assert build_results_summary({"sessions": sessions})["page_timing"] == summary
+
+    def test_excel_values(self):
+        """Excelの行の値（計測値がない項目は "-"）"""
+        driver = MagicMock()
+        driver.execute_script.return_value = _entry(load=0)
+        stats = PageTimingStats()
+        stats.add("1", capture_page_timing(driver))
+
+        values = _page_timing_values(stats.summary()[0])
+
+        assert values[:2] == ["1", 1]
+        assert "-" in values
+        assert values[-1] == "25.0%"
+
+
+class TestBrowserSessionPageTiming:
+    """アクションの後の計測のテスト"""
+
+    def _session(self, tmp_path, test_user, enabled=True):
+        config = {"url": "https://example.com", "screenshot_timing": [], "page_timing": enabled}
+        session = BrowserSession(test_user, config, 1, str(tmp_path))
+        session.driver = MagicMock()
+        return session
+
+    def test_records_new_page_only(self, tmp_path, test_user, monkeypatch):
+        """新しいページのみ記録し、前回の timeOrigin を渡す"""
+        session = self._session(tmp_path, test_user)
+        monkeypatch.setattr("src.browser_session.ActionHandler.handle_action", lambda self, action: (True, None))
+        session.driver.execute_script.return_value = _entry()
+
+        session.perform_action({"操作ID": "1", "操作タイプ": "URL移動", "対象要素": "/"})
+        assert session.last_action_timing["page_timing"]["ttfb"] == pytest.approx(0.18)
+
+        session.driver.execute_script.return_value = None
+        session.perform_action({"操作ID": "2", "操作タイプ": "クリック", "対象要素": "#button"})
+        assert "page_timing" not in session.last_action_timing
+        assert session.driver.execute_script.call_args[0][1] == 1000.0
+
+    def test_skips_other_actions(self, tmp_path, test_user, monkeypatch):
+        """ページ遷移しない操作タイプ、無効の場合はスクリプトを実行しない"""
+        monkeypatch.setattr("src.browser_session.ActionHandler.handle_action", lambda self, action: (True, None))
+        session = self._session(tmp_path, test_user)
+        session.perform_action({"操作ID": "1", "操作タイプ": "テキスト入力", "対象要素": "#name"})
+        disabled = self._session(tmp_path, test_user, enabled=False)
+        disabled.perform_action({"操作ID": "1", "操作タイプ": "URL移動", "対象要素": "/"})
+
+        session.driver.execute_script.assert_not_called()
+        disabled.driver.execute_script.assert_not_called()
+
+
+class TestConcurrentTesterPageTiming:
+    """実行全体の集計のテスト"""
+
+    def test_results_and_report(self, mock_config_loader, tmp_path):
+        """操作IDごとの集計がテスト結果とExcelレポートに出力される"""
+        mock_config_loader.config.update({'page_timing': True, 'run_history': False, 'async_teardown': False})
+        driver = MagicMock()
+        driver.execute_script.return_value = _entry()
+        timing = capture_page_timing(driver)
+        with patch('src.concurrent_tester.ScenarioLoader') as scenario_loader_class, \
+             patch('src.concurrent_tester.BrowserSession') as browser_session_class, \
+             patch('src.concurrent_tester.create_output_directory', return_value=str(tmp_path)):
+            scenario_loader_class.return_value.get_actions.return_value = [
+                {'操作ID': '1', '操作タイプ': 'URL移動', '対象要素': '/'}
+            ]
+            session = browser_session_class.return_value
+            session.initialize.return_value = True
+            session.capture_enabled = False
+            session.perform_action.return_value = (True, None)
+            session.last_action_timing = {"duration": 0.3, "page_timing": timing}
+
+            results = ConcurrentTester(mock_config_loader).run()
+
+        sessions = len(mock_config_loader.load_user_config.return_value)
+        assert [row["action_id"] for row in results["page_timing"]] == ["1"]
+        assert results["page_timing"][0]["pages"] == sessions
+        with open(tmp_path / "result" / "test_results.json", encoding="utf-8") as f:
+            assert json.load(f)["page_timing"] == results["page_timing"]
+        assert "ページ読み込み" in openpyxl.load_workbook(results["excel_report"]).sheetnames
@@ -0,0 +1,118 @@
+"""
+保存済みのテスト結果からのレポート再生成のテスト
+"""
+import json
+import os
+import pytest
+from src.utils.report_builder import (
+    ReportBuilder, build_results_summary, parse_session_spec, select_sessions
+)
+
+def _write_results(output_dir, session_count=3):
+    """テスト用のテスト結果を保存する"""
+    sessions = [
+        {'session_id': i, 'user_id': f'user{i}', 'success': i != 2, 'duration': 1.0, 'actions': []}
+        for i in range(1, session_count + 1)
+    ]
+    result_dir = os.path.join(output_dir, "result")
+    os.makedirs(result_dir, exist_ok=True)
+    with open(os.path.join(result_dir, "test_results.json"), 'w', encoding='utf-8') as f:
+        json.dump({'app_users': ['user1'], 'sessions': sessions}, f)
+
+class TestReportBuilderFunctions:
+    """レポート再生成の補助関数のテスト"""
+
+    def test_parse_session_spec(self):
+        """セッションIDの指定の解析テスト"""
+        assert parse_session_spec("1-3,7, 5") == [1, 2, 3, 5, 7]
+        assert parse_session_spec("4") == [4]
+        with pytest.raises(ValueError):
+            parse_session_spec("3-1")
+        with pytest.raises(ValueError):
+            parse_session_spec("a")
+
+    def test_select_sessions(self):
+        """セッションの絞り込みと集計の再計算のテスト"""
+        results = {
+            'sessions': [{'session_id': i, 'success': i != 2} for i in range(1, 4)],
+            'exemplars': [{'session_id': 2}, {'session_id': 3}]
+        }
+        selected = select_sessions(results, [2, 3])
+
+        assert [session['session_id'] for session in selected['sessions']] == [2, 3]
+        assert selected['exemplars'] == [{'session_id': 2}, {'session_id': 3}]
+        assert selected['successful_sessions'] == 1
+        assert selected['failed_sessions'] == 1
+        assert select_sessions(results, None) is results
+
+    def test_build_results_summary(self):
+        """テスト結果の要約のテスト"""
+        summary = build_results_summary({'sessions': [
+            {'session_id': 1, 'success': True, 'actions': [{}, {}]},
+            {'session_id': 2, 'success': False, 'errors': ['error']}
+        ]})
+
+        assert summary['total_sessions'] == 2
+        assert summary['success_rate'] == 50.0
+        assert summary['sessions'][0]['actions'] == 2
+        assert summary['sessions'][1]['errors'] == 1
+
+class TestReportBuilder:
+    """ReportBuilderクラスのテスト"""
+
+    def test_build_skips_unchanged(self, temp_dir):
+        """入力が変わっていないレポートを再生成しないテスト"""
+        output_dir = str(temp_dir)
+        _write_results(output_dir)
+
+        status = ReportBuilder(output_dir, {}, workers=1).build()
+        assert status['excel']['status'] == 'built'
+        assert status['summary']['status'] == 'built'
+        assert os.path.exists(os.path.join(output_dir, "result", "report_manifest.json"))
+
+        status = ReportBuilder(output_dir, {}, workers=1).build()
+        assert status['excel']['status'] == 'skipped'
+        assert status['summary']['status'] == 'skipped'
+
+        # 設定が変わった場合はExcelレポートのみ再生成する
+        status = ReportBuilder(output_dir, {'report_title': '別のタイトル'}, workers=1).build()
+        assert status['excel']['status'] == 'built'
+        assert status['summary']['status'] == 'skipped'
+
+    def test_build_session_subset(self, temp_dir):
+        """対象のセッションを指定した場合に別ファイルに出力するテスト"""
+        output_dir = str(temp_dir)
+        _write_results(output_dir, session_count=5)
+
+        status = ReportBuilder(output_dir, {}, session_ids=[1, 2, 3, 5], workers=2).build()
+
+        assert status['excel']['path'].endswith("test_report_sessions_1-3_5.xlsx")
+        with open(status['summary']['path'], encoding='utf-8') as f:
+            assert json.load(f)['total_sessions'] == 4
+
+    def test_build_html(self, temp_dir):
+        """HTMLレポートを有効にした場合に生成対象に含めるテスト"""
+        output_dir = str(temp_dir)
+        _write_results(output_dir)
+
+        assert 'html' not in ReportBuilder(output_dir, {}, workers=1).build()
+        status = ReportBuilder(output_dir, {'html_report': True}, workers=1).build()
+        assert status['html']['status'] == 'built'
+        assert status['html']['path'].endswith("test_report.html")
+        assert ReportBuilder(output_dir, {}, workers=1, html=True).build()['html']['status'] == 'skipped'
+
+    def test_build_samples(self, temp_dir):
+        """アクション単位のサンプルの出力を生成対象に含めるテスト"""
+        output_dir = str(temp_dir)
+        _write_results(output_dir)
+
+        assert 'samples' not in ReportBuilder(output_dir, {}, workers=1).build()
+        status = ReportBuilder(output_dir, {}, workers=1, sample_format='csv').build()
+        assert status['samples']['status'] == 'built'
+        assert status['samples']['path'].endswith("action_samples.csv")
+        assert os.path.exists(status['samples']['path'])
+
+    def test_missing_results(self, temp_dir):
+        """テスト結果のファイルがない場合のテスト"""
+        with pytest.raises(FileNotFoundError):
+            ReportBuilder(str(temp_dir), {}).build()
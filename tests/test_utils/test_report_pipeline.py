@@ -0,0 +1,80 @@
+"""
+Excelレポートの並行生成パイプラインのテスト
+"""
+import os
+import openpyxl
+from src.utils.report_pipeline import ReportPipeline
+
+class TestReportPipeline:
+    """ReportPipelineクラスのテスト"""
+
+    @staticmethod
+    def _session(session_id, success=True):
+        """テスト用のセッションの実行結果"""
+        return {
+            'session_id': session_id,
+            'user_id': f'user{session_id}',
+            'success': success,
+            'duration': 1.0,
+            'actions': [{'操作ID': '1', '操作タイプ': 'クリック', '説明': 'ログイン', 'result': success}]
+        }
+
+    def test_sessions_written_in_completion_order(self, temp_dir):
+        """完了した順にセッションのシートが書き出され、サマリーが先頭に追加されるテスト"""
+        output_dir = str(temp_dir)
+        pipeline = ReportPipeline(output_dir, {'report_title': 'テスト結果'})
+        assert pipeline.start() is True
+
+        sessions = [self._session(2), self._session(1, success=False)]
+        for session in sessions:
+            pipeline.submit(session)
+        excel_path = pipeline.finish({'app_users': ['user1', 'user2'], 'sessions': sessions})
+
+        assert excel_path == os.path.join(output_dir, "result", "test_report.xlsx")
+        assert pipeline.running is False
+        wb = openpyxl.load_workbook(excel_path)
+        assert wb.sheetnames == ['サマリー', 'セッション2', 'スクリーンショット2', 'セッション1', 'スクリーンショット1']
+        assert wb['サマリー']['A1'].value == 'テスト結果'
+        assert wb['セッション1']['F6'].value == '失敗'
+
+    def test_thumbnails(self, temp_dir):
+        """サムネイルを埋め込む場合もバックグラウンドプロセスでレポートを保存できるテスト"""
+        from PIL import Image as PILImage
+        output_dir = str(temp_dir)
+        session_dir = os.path.join(output_dir, "screenshot", "session_1")
+        os.makedirs(session_dir)
+        for action_id in ("1", "2"):
+            for kind in ("before", "after"):
+                path = os.path.join(session_dir, f"{kind}_{action_id}_session_1_20250101.png")
+                PILImage.new("RGB", (40, 30), (255, 255, 255)).save(path)
+                open(path + ".excel", "w").close()
+        pipeline = ReportPipeline(output_dir, {'thumbnail_width': 20, 'thumbnail_workers': 2})
+        assert pipeline.start() is True
+
+        session = self._session(1)
+        session['actions'].append({'操作ID': '2', '操作タイプ': 'クリック', '説明': '検索', 'result': True})
+        pipeline.submit(session)
+        excel_path = pipeline.finish({'app_users': ['user1'], 'sessions': [session]})
+
+        assert excel_path == os.path.join(output_dir, "result", "test_report.xlsx")
+        assert len(openpyxl.load_workbook(excel_path)['スクリーンショット1']._images) == 4
+
+    def test_worker_error_returns_empty_path(self, temp_dir):
+        """バックグラウンドプロセスでエラーが発生した場合に空文字列を返すテスト"""
+        pipeline = ReportPipeline(str(temp_dir), {'failure_color': 'invalid'})
+        assert pipeline.start() is True
+
+        pipeline.submit(self._session(1))
+        assert pipeline.finish({'sessions': [self._session(1)]}) == ""
+
+    def test_cancel(self, temp_dir):
+        """保存せずに終了するテスト"""
+        output_dir = str(temp_dir)
+        pipeline = ReportPipeline(output_dir, {})
+        pipeline.start()
+        pipeline.submit(self._session(1))
+        pipeline.cancel()
+
+        assert pipeline.running is False
+        assert not os.path.exists(os.path.join(output_dir, "result", "test_report.xlsx"))
+        assert pipeline.finish({'sessions': []}) == ""
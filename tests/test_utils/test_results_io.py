@@ -0,0 +1,137 @@
+"""
+テスト結果の保存・読み込みのテスト
+"""
+import json
+import os
+import pytest
+import src.utils.results_io as results_io
+from src.utils.results_io import (
+    ResultsWriter, find_results_file, iter_sessions, load_results, load_results_metadata,
+    preview_results, resolve_results_format, save_results
+)
+
+def _results(session_count=3):
+    """テスト用のテスト結果"""
+    return {
+        'success': False,
+        'duration': 12.5,
+        'sessions': [
+            {'session_id': i, 'user_id': f'user{i}', 'success': i != 2,
+             'errors': ['改行を含む\nエラー'] if i == 2 else []}
+            for i in range(1, session_count + 1)
+        ],
+        'timeline': {'interval': 1.0, 'buckets': []}
+    }
+
+class TestResultsIo:
+    """テスト結果の保存・読み込みのテスト"""
+
+    def test_save_and_load(self, temp_dir):
+        """ストリーム形式で保存して読み込むテスト"""
+        path = os.path.join(str(temp_dir), 'result', 'test_results.json')
+        results = _results()
+
+        assert save_results(results, path)
+        assert not os.path.exists(path + '.part')
+        assert load_results(path) == results
+        assert load_results_metadata(path) == {'success': False, 'duration': 12.5,
+                                               'timeline': {'interval': 1.0, 'buckets': []}}
+        assert [session['session_id'] for session in iter_sessions(path)] == [1, 2, 3]
+
+    def test_stream_layout(self, temp_dir):
+        """1行1セッションのインデントなしの通常のJSONとして読み込めるテスト"""
+        path = os.path.join(str(temp_dir), 'test_results.json')
+        save_results(_results(), path)
+
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 6
+        assert lines[2].startswith(',{"session_id":2')
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        assert data['format'] == results_io.STREAM_FORMAT
+        assert len(data['sessions']) == 3
+        assert data['duration'] == 12.5
+
+    def test_empty_results(self, temp_dir):
+        """セッションもその他の項目もない場合のテスト"""
+        path = os.path.join(str(temp_dir), 'test_results.json')
+
+        assert save_results({}, path)
+        assert list(iter_sessions(path)) == []
+        assert load_results_metadata(path) == {}
+        with open(path, 'r', encoding='utf-8') as f:
+            assert json.load(f)['sessions'] == []
+
+    def test_legacy_format(self, temp_dir):
+        """インデント付きの従来の形式のファイルを読み込むテスト"""
+        path = os.path.join(str(temp_dir), 'test_results.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(_results(), f, ensure_ascii=False, indent=2)
+
+        assert [session['session_id'] for session in iter_sessions(path)] == [1, 2, 3]
+        assert 'sessions' not in load_results_metadata(path)
+        assert load_results(path) == _results()
+
+    def test_incremental_writer(self, temp_dir):
+        """セッションを逐次書き出し、完了時にファイルを置き換えるテスト"""
+        path = os.path.join(str(temp_dir), 'test_results.json')
+        writer = ResultsWriter(path)
+
+        writer.write_session({'session_id': 2})
+        writer.write_session({'session_id': 1})
+        assert os.path.exists(path + '.part')
+        assert not os.path.exists(path)
+
+        assert writer.close({'success': True, 'sessions': [{'session_id': 9}]})
+        assert load_results(path) == {'success': True, 'sessions': [{'session_id': 2}, {'session_id': 1}]}
+
+    def test_writer_failure(self, temp_dir):
+        """シリアライズに失敗した場合に途中のファイルを残さないテスト"""
+        path = os.path.join(str(temp_dir), 'test_results.json')
+        writer = ResultsWriter(path)
+
+        writer.write_session({'session_id': 1})
+        circular = {}
+        circular['self'] = circular
+        writer.write_session(circular)
+
+        assert writer.failed
+        assert not writer.close({})
+        assert not os.path.exists(path + '.part')
+        assert not os.path.exists(path)
+
+    def test_preview_results(self, temp_dir):
+        """先頭のセッションのみを読み込むテスト"""
+        path = os.path.join(str(temp_dir), 'test_results.json')
+        save_results(_results(5), path)
+
+        data, session_count = preview_results(path, 2)
+        assert session_count == 5
+        assert [session['session_id'] for session in data['sessions']] == [1, 2]
+        assert data['duration'] == 12.5
+
+    def test_find_results_file(self, temp_dir):
+        """保存済みのテスト結果のファイルを探すテスト"""
+        result_dir = str(temp_dir)
+        assert find_results_file(result_dir) is None
+        save_results(_results(), os.path.join(result_dir, 'test_results.json'))
+        assert find_results_file(result_dir) == os.path.join(result_dir, 'test_results.json')
+
+    def test_resolve_results_format(self, monkeypatch):
+        """msgpackの有無による保存形式の決定のテスト"""
+        assert resolve_results_format(None) == 'json'
+        assert resolve_results_format('xml') == 'json'
+
+        monkeypatch.setattr(results_io, 'msgpack', None)
+        assert resolve_results_format('msgpack') == 'json'
+
+    def test_msgpack(self, temp_dir):
+        """MessagePack形式で保存して読み込むテスト"""
+        pytest.importorskip("msgpack")
+        path = os.path.join(str(temp_dir), 'test_results.msgpack')
+
+        assert save_results(_results(), path)
+        assert find_results_file(str(temp_dir)) == path
+        assert load_results(path) == _results()
+        assert [session['session_id'] for session in iter_sessions(path)] == [1, 2, 3]
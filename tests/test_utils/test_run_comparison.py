@@ -0,0 +1,138 @@
+"""
+2つの実行の比較のテスト
+"""
+import math
+import os
+import random
+import pytest
+from openpyxl import load_workbook
+from src.compare_command import main as compare_main
+from src.utils.console_table import display_width, format_table
+from src.utils.results_io import results_path, save_results
+from src.utils.run_comparison import (
+    VERDICT_ADDED, VERDICT_FASTER, VERDICT_REMOVED, VERDICT_SAME, VERDICT_SLOWER,
+    bootstrap_delta_ci, compare_statistics, load_run, proportion_delta_ci
+)
+from src.utils.run_statistics import RunStatistics
+
+def _results(seed, login=1.0, search=0.5, errors=0, extra_action=None):
+    """操作ID 1, 2（と追加の操作）の所要時間を正規分布から生成したテスト結果"""
+    rng = random.Random(seed)
+    sessions = []
+    for i in range(200):
+        failed = i < errors
+        actions = [{'操作ID': '1', '説明': 'ログイン', 'result': True, 'duration': rng.gauss(login, 0.05)},
+                   {'操作ID': '2', '説明': '検索', 'result': not failed, 'duration': rng.gauss(search, 0.05),
+                    'error': 'TimeoutException: 検索がタイムアウトしました' if failed else None}]
+        if extra_action:
+            actions.append({'操作ID': extra_action, '説明': '追加', 'result': True, 'duration': 0.1})
+        sessions.append({'session_id': i + 1, 'user_id': 'user1', 'success': not failed,
+                         'duration': sum(action['duration'] for action in actions), 'actions': actions})
+    return {'start_time': '2025-01-01T12:00:00', 'duration': 10.0, 'total_sessions': len(sessions),
+            'failed_sessions': errors, 'sessions': sessions}
+
+def _save_run(temp_dir, name, results):
+    """テスト結果を出力ディレクトリに保存する"""
+    output_dir = os.path.join(str(temp_dir), name)
+    assert save_results(results, results_path(os.path.join(output_dir, 'result')))
+    return output_dir
+
+class TestRunComparison:
+    """実行の比較のテスト"""
+
+    def test_bootstrap_delta_ci(self):
+        """パーセンタイルの差の信頼区間のテスト"""
+        rng = random.Random(1)
+        a = sorted(rng.gauss(1.0, 0.1) for _ in range(500))
+        slower = sorted(rng.gauss(1.2, 0.1) for _ in range(500))
+
+        low, high = bootstrap_delta_ci(a, a, 50, 500)
+        assert low < 0 < high
+        low, high = bootstrap_delta_ci(a, slower, 50, 500)
+        assert 0.15 < low < high < 0.25
+        low, high = bootstrap_delta_ci(a, slower, 95, 500)
+        assert low > 0
+        assert all(math.isnan(value) for value in bootstrap_delta_ci([], a, 50))
+
+    def test_proportion_delta_ci(self):
+        """エラー率の差の信頼区間のテスト"""
+        delta, low, high = proportion_delta_ci(10, 1000, 50, 1000)
+        assert delta == pytest.approx(0.04)
+        assert 0 < low < delta < high
+        delta, low, high = proportion_delta_ci(10, 1000, 12, 1000)
+        assert low < 0 < high
+        assert all(math.isnan(value) for value in proportion_delta_ci(0, 0, 1, 10))
+
+    def test_compare_statistics(self):
+        """操作IDごとの判定とエラー内訳の差のテスト"""
+        stats_a = RunStatistics.from_results(_results(1, extra_action='9'))
+        stats_b = RunStatistics.from_results(_results(2, login=1.2, search=0.4, errors=20, extra_action='10'))
+        comparison = compare_statistics(stats_a, stats_b, iterations=300)
+
+        actions = {action['action_id']: action for action in comparison['actions']}
+        assert [action['action_id'] for action in comparison['actions']] == ['1', '2', '9', '10']
+        assert actions['1']['verdict'] == VERDICT_SLOWER
+        assert actions['1']['p50']['delta'] == pytest.approx(0.2, abs=0.03)
+        assert actions['1']['p50']['change'] == pytest.approx(0.2, abs=0.03)
+        # 所要時間は改善したがエラー率が悪化した場合は悪化を優先する
+        assert actions['2']['p50']['ci'][1] < 0
+        assert actions['2']['verdict'] == VERDICT_SLOWER
+        assert actions['2']['failure'] == (0, 20)
+        assert actions['9']['verdict'] == VERDICT_REMOVED
+        assert actions['10']['verdict'] == VERDICT_ADDED
+        assert math.isnan(actions['10']['p50']['delta'])
+
+        assert comparison['sessions']['count'] == (200, 200)
+        assert comparison['sessions']['failure'] == (0, 20)
+        assert comparison['errors'] == [{'action_id': '2', 'message': 'TimeoutException: 検索がタイムアウトしました',
+                                         'count': (0, 20)}]
+
+    def test_compare_statistics_same_and_faster(self):
+        """差がない場合と改善した場合の判定のテスト"""
+        stats_a = RunStatistics.from_results(_results(1))
+        same = compare_statistics(stats_a, RunStatistics.from_results(_results(2)), iterations=300)
+        assert {action['verdict'] for action in same['actions']} == {VERDICT_SAME}
+        faster = compare_statistics(stats_a, RunStatistics.from_results(_results(2, login=0.8)), iterations=300)
+        assert faster['actions'][0]['verdict'] == VERDICT_FASTER
+        # 同じシードでは同じ結果になる
+        again = compare_statistics(stats_a, RunStatistics.from_results(_results(2, login=0.8)), iterations=300)
+        assert again['actions'][0]['p50']['ci'] == faster['actions'][0]['p50']['ci']
+
+    def test_load_run(self, temp_dir):
+        """保存済みのテスト結果の読み込みのテスト"""
+        output_dir = _save_run(temp_dir, '20250101_120000', _results(1, errors=3))
+        metadata, statistics = load_run(output_dir)
+        assert metadata['total_sessions'] == 200
+        assert 'sessions' not in metadata
+        assert statistics.session_count == 200
+        assert statistics.action_ids == ['1', '2']
+        with pytest.raises(FileNotFoundError):
+            load_run(os.path.join(str(temp_dir), 'missing'))
+
+    def test_format_table(self):
+        """全角文字を含む表の桁揃えのテスト"""
+        assert display_width("ログインa") == 9
+        lines = format_table(["操作ID", "説明"], [["1", "ログイン"], ["10", "x"]]).splitlines()
+        assert lines[1] == "------  --------"
+        assert lines[2] == "1       ログイン"
+
+    def test_compare_command(self, temp_dir, capsys):
+        """compareコマンドの表示、レポートと終了コードのテスト"""
+        run_a = _save_run(temp_dir, '20250101_120000', _results(1))
+        run_b = _save_run(temp_dir, '20250108_120000', _results(2, login=1.3, errors=5))
+        config = os.path.join(str(temp_dir), 'missing.toml')
+
+        assert compare_main([run_a, run_b, '--config', config, '--iterations', '200']) == 0
+        output = capsys.readouterr().out
+        assert "ログイン" in output and "悪化" in output
+        assert "TimeoutException" in output
+        report = os.path.join(run_b, 'result', 'comparison_20250101_120000.xlsx')
+        workbook = load_workbook(report, read_only=True)
+        assert workbook.sheetnames == ['比較', 'エラー比較']
+        workbook.close()
+
+        assert compare_main([run_a, run_b, '--config', config, '--iterations', '200', '--fail-on-regression']) == 2
+        assert compare_main([run_a, run_a, '--config', config, '--iterations', '200', '--fail-on-regression',
+                             '--output', os.path.join(str(temp_dir), 'same.xlsx')]) == 0
+        assert compare_main([run_a, os.path.join(str(temp_dir), 'missing'), '--config', config]) == 1
+        assert compare_main([run_a, run_b, '--config', config, '--confidence', '1.5']) == 1
@@ -0,0 +1,196 @@
+"""
+実行履歴のデータベースと性能劣化の検出のテスト
+"""
+import os
+import random
+import pytest
+from src.history_command import main as history_main
+from src.utils.run_history import (
+    RunHistory, VERDICT_IMPROVEMENT, VERDICT_INSUFFICIENT, VERDICT_NO_CHANGE, VERDICT_REGRESSION,
+    downsample, history_db_path, mann_whitney_greater, record_run_history, z_score
+)
+
+ENVIRONMENT = {'host': 'test', 'os': 'Linux', 'machine': 'x86_64', 'cpus': 4, 'python': '3.12'}
+
+def _results(start_time, latencies, session_count=None):
+    """操作ID 1 の所要時間を指定したテスト結果"""
+    latencies = list(latencies)
+    return {
+        'start_time': start_time,
+        'duration': 10.0,
+        'total_sessions': session_count or len(latencies),
+        'failed_sessions': 0,
+        'sessions': [
+            {'session_id': i + 1, 'user_id': 'user1', 'success': True, 'duration': latency,
+             'actions': [{'操作ID': '1', '説明': 'ログイン', 'result': True, 'duration': latency},
+                         {'操作ID': '2', '説明': '検索', 'result': True, 'duration': 0.5}]}
+            for i, latency in enumerate(latencies)
+        ]
+    }
+
+def _record(history, temp_dir, day, latencies, scenario_file, config=None):
+    """実行を記録する"""
+    output_dir = os.path.join(str(temp_dir), f"202501{day:02d}_120000")
+    return history.record_run(_results(f"2025-01-{day:02d}T12:00:00", latencies), config or {'browser': 'chrome'},
+                              scenario_file, output_dir, environment=ENVIRONMENT)
+
+@pytest.fixture
+def scenario_file(temp_dir):
+    """テスト用のシナリオファイル"""
+    path = os.path.join(str(temp_dir), 'scenario.csv')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('操作ID,操作タイプ\n1,URL移動\n')
+    return path
+
+class TestRunHistory:
+    """実行履歴のテスト"""
+
+    def test_mann_whitney_greater(self):
+        """片側Mann-Whitney U検定のテスト"""
+        rng = random.Random(1)
+        baseline = [rng.gauss(1.0, 0.1) for _ in range(200)]
+        slower = [rng.gauss(1.3, 0.1) for _ in range(200)]
+        same = [rng.gauss(1.0, 0.1) for _ in range(200)]
+
+        assert mann_whitney_greater(slower, baseline) < 1e-6
+        assert mann_whitney_greater(baseline, slower) > 0.99
+        assert mann_whitney_greater(same, baseline) > 0.01
+        assert mann_whitney_greater([1.0] * 10, [1.0] * 10) == 1.0
+        assert mann_whitney_greater([], baseline) == 1.0
+
+    def test_z_score(self):
+        """基準に対するzスコアのテスト"""
+        assert z_score(3.0, [1.0, 2.0, 3.0]) == pytest.approx(1.0)
+        assert z_score(1.0, [1.0, 1.0]) == 0.0
+        assert z_score(2.0, [1.0, 1.0]) == float('inf')
+
+    def test_downsample(self):
+        """分布を保った間引きのテスト"""
+        values = list(range(10001))
+        sampled = downsample(values, 101)
+        assert len(sampled) == 101
+        assert sampled[0] == 0 and sampled[-1] == 10000 and sampled[50] == 5000
+        assert downsample([1, 2], 101) == [1, 2]
+
+    def test_record_run(self, temp_dir, scenario_file):
+        """実行と操作IDごとの集計の記録のテスト"""
+        history = RunHistory(os.path.join(str(temp_dir), 'history', 'run_history.sqlite3'))
+        run_number = _record(history, temp_dir, 1, [1.0, 2.0, 3.0], scenario_file)
+
+        run = history.find_run()
+        assert run['id'] == run_number
+        assert run['run_id'] == "20250101_120000"
+        assert run['browser'] == "chrome"
+        assert run['total_sessions'] == 3
+        assert len(run['scenario_hash']) == 16
+        assert history.find_run("20250101_120000")['id'] == run_number
+        assert history.find_run(str(run_number))['id'] == run_number
+        assert history.find_run("unknown") is None
+
+        stats = history.action_stats([run_number])[run_number]
+        assert set(stats) == {'1', '2'}
+        assert stats['1']['p50'] == 2.0
+        assert stats['1']['description'] == "ログイン"
+        assert list(stats['1']['samples']) == [1.0, 2.0, 3.0]
+
+    def test_baseline_matches_fingerprint(self, temp_dir, scenario_file):
+        """基準にはシナリオ・ブラウザ・実行環境が同じ直前の実行のみを使用するテスト"""
+        history = RunHistory(os.path.join(str(temp_dir), 'run_history.sqlite3'))
+        first = _record(history, temp_dir, 1, [1.0], scenario_file)
+        _record(history, temp_dir, 2, [1.0], scenario_file, {'browser': 'firefox'})
+        second = _record(history, temp_dir, 3, [1.0], scenario_file)
+        with open(scenario_file, 'a', encoding='utf-8') as f:
+            f.write('2,クリック\n')
+        _record(history, temp_dir, 4, [1.0], scenario_file)
+        latest = _record(history, temp_dir, 5, [1.0], scenario_file)
+
+        runs = history.runs()
+        assert [run['id'] for run in history.baseline_runs(runs[0], 5)] == [latest - 1]
+        target = history.find_run(str(second))
+        assert [run['id'] for run in history.baseline_runs(target, 5)] == [first]
+
+    def test_baseline_matches_load(self, temp_dir, scenario_file):
+        """同時実行数・ユーザー数が異なる実行は基準に使用しないテスト"""
+        history = RunHistory(os.path.join(str(temp_dir), 'run_history.sqlite3'))
+        config = {'browser': 'chrome', 'max_concurrent_sessions': 5}
+        first = _record(history, temp_dir, 1, [1.0, 1.0], scenario_file, config)
+        _record(history, temp_dir, 2, [1.0, 1.0], scenario_file, {**config, 'max_concurrent_sessions': 50})
+        _record(history, temp_dir, 3, [1.0], scenario_file, config)
+        # 負荷に影響しない設定の違いは同じ基準とする
+        second = _record(history, temp_dir, 4, [1.0, 1.0], scenario_file, {**config, 'html_report': True})
+        latest = _record(history, temp_dir, 5, [1.0, 1.0], scenario_file, config)
+
+        target = history.find_run(str(latest))
+        assert [run['id'] for run in history.baseline_runs(target, 5)] == [second, first]
+
+    def test_migrate_schema(self, temp_dir, scenario_file):
+        """以前の形式のデータベースに負荷の設定の列を追加するテスト"""
+        import sqlite3
+        db_path = os.path.join(str(temp_dir), 'run_history.sqlite3')
+        history = RunHistory(db_path)
+        old = _record(history, temp_dir, 1, [1.0], scenario_file)
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("ALTER TABLE runs DROP COLUMN load_hash")
+            conn.execute("PRAGMA user_version = 1")
+
+        latest = _record(history, temp_dir, 2, [1.0], scenario_file)
+
+        assert history.find_run(str(old))['load_hash'] is None
+        assert history.baseline_runs(history.find_run(str(latest)), 5) == []
+
+    def test_detect_regression(self, temp_dir, scenario_file):
+        """サンプル数が十分な場合のMann-Whitney検定による判定のテスト"""
+        history = RunHistory(os.path.join(str(temp_dir), 'run_history.sqlite3'))
+        rng = random.Random(2)
+        for day in range(1, 4):
+            _record(history, temp_dir, day, [rng.gauss(1.0, 0.05) for _ in range(50)], scenario_file)
+        _record(history, temp_dir, 4, [rng.gauss(1.5, 0.05) for _ in range(50)], scenario_file)
+
+        findings = {item['action_id']: item for item in history.detect_regressions(history.find_run())}
+        assert findings['1']['verdict'] == VERDICT_REGRESSION
+        assert findings['1']['method'] == "mann-whitney"
+        assert findings['1']['change'] == pytest.approx(0.5, abs=0.1)
+        assert findings['1']['baseline_runs'] == 3
+        # 所要時間が一定の操作は変化なし
+        assert findings['2']['verdict'] == VERDICT_NO_CHANGE
+
+        _record(history, temp_dir, 5, [rng.gauss(1.0, 0.05) for _ in range(50)], scenario_file)
+        findings = {item['action_id']: item for item in history.detect_regressions(history.find_run(), 1)}
+        assert findings['1']['verdict'] == VERDICT_IMPROVEMENT
+
+    def test_detect_regression_small_runs(self, temp_dir, scenario_file):
+        """サンプル数が少ない場合のzスコアによる判定とデータ不足のテスト"""
+        history = RunHistory(os.path.join(str(temp_dir), 'run_history.sqlite3'))
+        _record(history, temp_dir, 1, [1.0], scenario_file)
+        findings = history.detect_regressions(history.find_run())
+        assert findings[0]['verdict'] == VERDICT_INSUFFICIENT
+
+        for day, latency in ((2, 1.05), (3, 0.95), (4, 2.0)):
+            _record(history, temp_dir, day, [latency], scenario_file)
+        findings = {item['action_id']: item for item in history.detect_regressions(history.find_run())}
+        assert findings['1']['method'] == "z-score"
+        assert findings['1']['verdict'] == VERDICT_REGRESSION
+
+    def test_record_run_history(self, temp_dir, scenario_file):
+        """記録に失敗した場合にテストの実行を妨げないテスト"""
+        db_path = os.path.join(str(temp_dir), 'run_history.sqlite3')
+        assert record_run_history(db_path, _results("2025-01-01T12:00:00", [1.0]), {}, scenario_file,
+                                  str(temp_dir)) == 1
+        assert record_run_history(str(temp_dir), {}, {}) is None
+        assert history_db_path({}, "out") == os.path.join("out", "run_history.sqlite3")
+        assert history_db_path({'history_db': 'db/history.sqlite3'}) == "db/history.sqlite3"
+
+    def test_history_command(self, temp_dir, scenario_file, capsys):
+        """historyコマンドの表示と終了コードのテスト"""
+        db_path = os.path.join(str(temp_dir), 'run_history.sqlite3')
+        history = RunHistory(db_path)
+        for day, latency in ((1, 1.0), (2, 1.02), (3, 0.98), (4, 3.0)):
+            _record(history, temp_dir, day, [latency], scenario_file)
+
+        assert history_main(['--db', db_path]) == 0
+        output = capsys.readouterr().out
+        assert "20250101_120000" in output and "20250104_120000" in output
+        assert "劣化" in output
+        assert history_main(['--db', db_path, '--fail-on-regression']) == 2
+        assert history_main(['--db', db_path, '--run', '20250102_120000', '--fail-on-regression']) == 0
+        assert history_main(['--db', os.path.join(str(temp_dir), 'missing.sqlite3')]) == 1
@@ -0,0 +1,89 @@
+"""
+実行全体の統計のテスト
+"""
+import math
+from src.utils.analytics import percentile
+from src.utils.error_clusters import OTHER_ERRORS, normalize_error
+from src.utils.run_statistics import RunStatistics, STATUS_FAILURE, STATUS_NOT_RUN, STATUS_SUCCESS
+
+def _session(session_id, durations, failed_at=None, success=None):
+    """テスト用のセッションの実行結果（failed_at の操作で失敗し、以降は未実行）"""
+    actions = []
+    for i, duration in enumerate(durations, 1):
+        failed = i == failed_at
+        actions.append({'action_id': str(i), 'description': f'操作{i}', 'success': not failed,
+                        'duration': duration, 'error': 'タイムアウト\nスタックトレース' if failed else None})
+        if failed:
+            break
+    return {'session_id': session_id, 'user_id': f'user{session_id}',
+            'success': failed_at is None if success is None else success, 'duration': sum(durations),
+            'actions': actions}
+
+class TestRunStatistics:
+    """RunStatisticsクラスのテスト"""
+
+    def test_percentile(self):
+        """パーセンタイルの計算テスト"""
+        values = [1.0, 2.0, 3.0, 4.0]
+        assert percentile(values, 0) == 1.0
+        assert percentile(values, 50) == 2.5
+        assert percentile(values, 100) == 4.0
+        assert math.isnan(percentile([], 50))
+
+    def test_matrix(self):
+        """セッション×アクションの所要時間と状態のテスト"""
+        statistics = RunStatistics()
+        statistics.add_session(_session(2, [0.1, 0.2]))
+        statistics.add_session(_session(1, [0.3, 0.4], failed_at=1))
+        statistics.add_session(_session(3, [0.5, 0.6, 0.7]))
+
+        assert statistics.session_count == 3
+        assert list(statistics.session_ids) == [2, 1, 3]
+        assert statistics.action_ids == ['1', '2', '3']
+        assert statistics.action_description('3') == '操作3'
+
+        latencies, statuses = statistics.action_cells('2')
+        assert list(statuses) == [STATUS_SUCCESS, STATUS_NOT_RUN, STATUS_SUCCESS]
+        assert latencies[0] == 0.2 and math.isnan(latencies[1])
+
+        # 後から追加された操作IDは既存のセッションを未実行として扱う
+        latencies, statuses = statistics.action_cells('3')
+        assert list(statuses) == [STATUS_NOT_RUN, STATUS_NOT_RUN, STATUS_SUCCESS]
+        assert statistics.action_cells('1')[1][1] == STATUS_FAILURE
+
+    def test_summaries(self):
+        """操作IDごと・セッション全体の集計テスト"""
+        statistics = RunStatistics()
+        for session_id, duration in enumerate([1.0, 2.0, 3.0], 1):
+            statistics.add_session(_session(session_id, [duration]))
+        statistics.add_session(_session(4, [4.0], failed_at=1))
+
+        summary = statistics.action_summary('1')
+        assert summary['count'] == 4
+        assert summary['failure'] == 1
+        assert summary['mean'] == 2.5
+        assert summary['p50'] == 2.5
+        assert summary['max'] == 4.0
+
+        sessions = statistics.session_summary()
+        assert sessions['count'] == 4
+        assert sessions['success'] == 3
+
+    def test_error_breakdown(self):
+        """エラー内訳の集計と種類数の上限のテスト"""
+        statistics = RunStatistics(max_error_kinds=2)
+        statistics.add_session(_session(1, [0.1], failed_at=1))
+        statistics.add_session(_session(2, [0.1], failed_at=1))
+        statistics.add_session({'session_id': 3, 'success': False, 'actions': [], 'errors': ['初期化に失敗']})
+        statistics.add_session({'session_id': 4, 'success': False, 'actions': [], 'errors': ['別のエラー']})
+
+        assert statistics.error_breakdown() == [('1', 'タイムアウト', 2), ('-', 'その他のエラー', 1),
+                                                ('-', '初期化に失敗', 1)]
+        assert OTHER_ERRORS == 'その他のエラー'
+        assert normalize_error('') == '不明なエラー'
+
+    def test_from_results(self):
+        """保存済みのテスト結果から作成するテスト"""
+        statistics = RunStatistics.from_results({'sessions': [_session(1, [0.1]), _session(2, [0.2])]})
+        assert statistics.session_count == 2
+        assert statistics.action_summary('1')['count'] == 2
@@ -0,0 +1,95 @@
+"""
+アクション単位のサンプルのエクスポートのテスト
+"""
+import csv
+import os
+import pytest
+import src.utils.sample_export as sample_export
+from src.utils.sample_export import error_code, export_action_samples, iter_action_samples, resolve_sample_format
+
+def _results():
+    """テスト用のテスト結果"""
+    return {
+        'sessions': [
+            {'session_id': 1, 'user_id': 'user1',
+             'actions': [{'操作ID': '1', '操作タイプ': '入力', 'result': True, 'duration': 0.25,
+                          'start_time': '2025-01-01T12:00:00.500000',
+                          'phases': {'before_action': 0.01, 'action': 0.25, 'after_action': 0.1}},
+                         {'操作ID': '2', '操作タイプ': 'クリック', 'result': False, 'duration': 10.0,
+                          'error': 'Message: TimeoutException: 要素が見つかりません'}]},
+            {'session_id': 2, 'user_id': 'user2',
+             'actions': [{'操作ID': '1', '操作タイプ': '入力', 'result': False, 'duration': 1.0,
+                          'error': '要素が見つかりません: #login'}]},
+        ]
+    }
+
+class TestSampleExport:
+    """アクション単位のサンプルのエクスポートのテスト"""
+
+    def test_error_code(self):
+        """エラーメッセージからエラーコードを作成するテスト"""
+        assert error_code(None) == ""
+        assert error_code("Message: TimeoutException: timed out") == "TimeoutException"
+        assert error_code("StaleElementReferenceException") == "StaleElementReferenceException"
+        assert error_code("要素が見つかりません: #login") == "要素が見つかりません"
+
+    def test_iter_action_samples(self):
+        """アクションごとに1行に展開するテスト"""
+        samples = list(iter_action_samples(_results(), "run1"))
+
+        assert len(samples) == 3
+        assert samples[0]['run_id'] == "run1"
+        assert samples[0]['action_id'] == "1"
+        assert samples[0]['action_index'] == 0
+        assert samples[0]['success'] is True
+        assert samples[0]['before_action'] == 0.01
+        assert samples[0]['start_time'].year == 2025
+        assert samples[1]['error_code'] == "TimeoutException"
+        assert samples[1]['start_time'] is None
+        assert samples[1]['after_action'] is None
+        assert samples[2]['session_id'] == 2
+        assert samples[2]['error_code'] == "要素が見つかりません"
+
+    def test_resolve_sample_format(self, monkeypatch):
+        """pyarrowの有無による出力形式の決定のテスト"""
+        assert resolve_sample_format("none") == "none"
+        assert resolve_sample_format("") == "none"
+        assert resolve_sample_format("CSV") == "csv"
+
+        monkeypatch.setattr(sample_export, "pyarrow", None)
+        assert resolve_sample_format("auto") == "csv"
+        assert resolve_sample_format("parquet") == "csv"
+
+    def test_export_csv(self, temp_dir):
+        """CSVで出力するテスト"""
+        path = export_action_samples(_results(), str(temp_dir), "csv")
+
+        assert path == os.path.join(str(temp_dir), "result", "action_samples.csv")
+        with open(path, encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 3
+        assert rows[0]['run_id'] == os.path.basename(str(temp_dir))
+        assert rows[0]['start_time'] == "2025-01-01T12:00:00.500000"
+        assert rows[1]['error_code'] == "TimeoutException"
+
+    def test_export_none(self, temp_dir):
+        """出力しない設定のテスト"""
+        assert export_action_samples(_results(), str(temp_dir), "none") == ""
+        assert not os.path.exists(os.path.join(str(temp_dir), "result"))
+
+    def test_export_parquet(self, temp_dir, monkeypatch):
+        """Parquetで型付きの列として出力するテスト"""
+        pyarrow = pytest.importorskip("pyarrow")
+        import pyarrow.parquet
+        monkeypatch.setattr(sample_export, "ROW_GROUP_SIZE", 2)
+
+        path = export_action_samples(_results(), str(temp_dir), "auto", run_id="run1")
+
+        assert path.endswith("action_samples.parquet")
+        parquet_file = pyarrow.parquet.ParquetFile(path)
+        assert parquet_file.metadata.num_row_groups == 2
+        table = parquet_file.read()
+        assert table.num_rows == 3
+        assert table.schema.field('success').type == pyarrow.bool_()
+        assert table.schema.field('start_time').type == pyarrow.timestamp('us')
+        assert table.column('error_code').to_pylist() == ["", "TimeoutException", "要素が見つかりません"]
@@ -0,0 +1,39 @@
+"""
+スクリーンキャスト録画のテスト
+"""
+import json
+import os
+from unittest.mock import MagicMock
+from src.utils.screencast import ScreencastRecorder, SCREENCAST_INDEX_FILE
+
+class TestScreencastRecorder:
+    """ScreencastRecorderクラスのテスト"""
+
+    def test_is_supported(self):
+        """対応ブラウザの判定テスト"""
+        assert ScreencastRecorder.is_supported(MagicMock()) is True
+        assert ScreencastRecorder.is_supported(object()) is False
+
+    def test_stop_maps_markers_to_frames(self, temp_dir):
+        """アクション境界のマーカーとフレームの対応付けのテスト"""
+        session_dir = os.path.join(str(temp_dir), 'screenshot', 'session_1', 'screencast')
+        os.makedirs(session_dir)
+        recorder = ScreencastRecorder(MagicMock(), str(temp_dir), session_dir, MagicMock())
+        recorder._save_frame('AAAA', 10.0)
+        recorder._save_frame('AAAA', 12.0)
+        recorder._markers = [
+            {'action_id': '1', 'timestamp': 9.0},
+            {'action_id': '2', 'timestamp': 11.0},
+            {'action_id': '3', 'timestamp': 13.0}
+        ]
+
+        info = recorder.stop()
+
+        frame1 = os.path.join('screenshot', 'session_1', 'screencast', 'frame_000001.jpg')
+        frame2 = os.path.join('screenshot', 'session_1', 'screencast', 'frame_000002.jpg')
+        assert info['frame_count'] == 2
+        assert info['markers'] == {'1': frame1, '2': frame2, '3': frame2}
+        with open(os.path.join(session_dir, SCREENCAST_INDEX_FILE), encoding='utf-8') as f:
+            index = json.load(f)
+        assert len(index['frames']) == 2
+        assert [m['action_id'] for m in index['markers']] == ['1', '2', '3']
@@ -0,0 +1,45 @@
+"""
+スクリーンショットのサンプリングポリシーのテスト
+"""
+from src.utils.screenshot_sampling import ScreenshotSamplingPolicy
+
+class TestScreenshotSamplingPolicy:
+    """ScreenshotSamplingPolicyクラスのテスト"""
+
+    def test_disabled_samples_all_sessions(self):
+        """サンプリング未設定時は全セッションが対象になるテスト"""
+        policy = ScreenshotSamplingPolicy.from_config({})
+        timing = ['before_action', 'on_error']
+
+        assert policy.enabled is False
+        assert policy.timing_for_session(1, timing) == timing
+        assert policy.timing_for_session(500, timing) == timing
+
+    def test_first_and_every(self):
+        """先頭Nセッションと1/Nセッションの判定テスト"""
+        policy = ScreenshotSamplingPolicy(first=2, every=10)
+
+        assert policy.is_session_sampled(1) is True
+        assert policy.is_session_sampled(2) is True
+        assert policy.is_session_sampled(3) is False
+        assert policy.is_session_sampled(11) is True
+        assert policy.is_session_sampled(12) is False
+
+    def test_unsampled_session_timing(self):
+        """対象外セッションのタイミングのテスト"""
+        timing = ['before_action', 'after_action', 'on_error']
+
+        policy = ScreenshotSamplingPolicy(first=1, always_on_error=True)
+        assert policy.timing_for_session(2, timing) == ['on_error']
+
+        policy = ScreenshotSamplingPolicy(first=1, always_on_error=False)
+        assert policy.timing_for_session(2, timing) == []
+
+    def test_action_filter(self):
+        """操作IDによる絞り込みのテスト"""
+        policy = ScreenshotSamplingPolicy.from_config({'screenshot_sample_actions': [1, '4']})
+
+        assert policy.is_action_sampled('1') is True
+        assert policy.is_action_sampled(4) is True
+        assert policy.is_action_sampled('2') is False
+        assert ScreenshotSamplingPolicy().is_action_sampled('2') is True
@@ -0,0 +1,80 @@
+"""
+セッションのウォッチドッグのテスト
+"""
+import time
+from unittest.mock import MagicMock
+from src.utils.session_watchdog import SessionWatchdog
+
+class TestSessionWatchdog:
+    """SessionWatchdogクラスのテスト"""
+
+    def test_from_config(self):
+        """上限が未設定の場合は無効になるテスト"""
+        assert SessionWatchdog.from_config({}) is None
+        watchdog = SessionWatchdog.from_config({'session_timeout': 60, 'action_timeout': 10})
+        assert watchdog.session_timeout == 60
+        assert watchdog.action_timeout == 10
+
+    def test_action_timeout(self):
+        """アクションの上限超過で中断されるテスト"""
+        watchdog = SessionWatchdog(action_timeout=0.05)
+        abort = MagicMock()
+        watchdog.start_session(1, abort)
+        watchdog.start_action(1, '3')
+
+        time.sleep(0.1)
+        watchdog.check()
+        watchdog.check()
+
+        abort.assert_called_once()
+        assert '3' in abort.call_args[0][0]
+        assert watchdog.is_timed_out(1) is True
+        assert watchdog.end_session(1) is not None
+        stats = watchdog.get_stats()
+        assert stats['timed_out_sessions'] == 1
+        assert stats['lost_seconds'] > 0
+
+    def test_within_limits(self):
+        """上限内のセッションは中断されないテスト"""
+        watchdog = SessionWatchdog(session_timeout=60, action_timeout=0.05)
+        abort = MagicMock()
+        watchdog.start_session(1, abort)
+        watchdog.start_action(1, '1')
+        watchdog.end_action(1)
+
+        time.sleep(0.1)
+        watchdog.check()
+
+        abort.assert_not_called()
+        assert watchdog.end_session(1) is None
+        assert watchdog.get_stats()['timed_out_sessions'] == 0
+
+    def test_monitor_thread(self):
+        """監視スレッドによるセッション上限の検出テスト"""
+        watchdog = SessionWatchdog(session_timeout=0.05, interval=0.02)
+        abort = MagicMock()
+        watchdog.start()
+        watchdog.start_session(1, abort)
+
+        time.sleep(0.2)
+        stats_before = watchdog.get_stats()
+        watchdog.end_session(1)
+        stats = watchdog.stop()
+
+        abort.assert_called_once()
+        assert stats_before['timed_out_sessions'] == 0
+        assert stats['timed_out_sessions'] == 1
+
+    def test_retry_until_aborted(self):
+        """ドライバーの起動前で中断できなかったセッションを再試行するテスト"""
+        watchdog = SessionWatchdog(session_timeout=0.05)
+        abort = MagicMock(side_effect=[False, False, None])
+        watchdog.start_session(1, abort)
+
+        time.sleep(0.1)
+        for _ in range(5):
+            watchdog.check()
+
+        assert abort.call_count == 3
+        assert watchdog.is_timed_out(1) is True
+        assert watchdog.end_session(1) is not None
@@ -0,0 +1,64 @@
+"""
+スクリーンショットのサムネイル生成のテスト
+"""
+import os
+import pytest
+from PIL import Image as PILImage
+from src.utils.thumbnails import ThumbnailPool, make_thumbnail, thumbnail_path
+
+class TestThumbnails:
+    """サムネイル生成のテスト"""
+
+    @staticmethod
+    def _create_screenshot(output_dir, name, size=(1024, 768)):
+        """テスト用のスクリーンショットを作成する"""
+        session_dir = os.path.join(output_dir, "screenshot", "session_1")
+        os.makedirs(session_dir, exist_ok=True)
+        path = os.path.join(session_dir, name)
+        PILImage.new("RGB", size, (200, 100, 50)).save(path)
+        return path
+
+    def test_thumbnail_path(self, temp_dir):
+        """サムネイルの保存先がスクリーンショットの構成を維持するテスト"""
+        output_dir = str(temp_dir)
+        path = os.path.join(output_dir, "screenshot", "session_1", "before_1.png")
+        assert thumbnail_path(path, output_dir, 320) == os.path.join(
+            output_dir, "thumbnail", "session_1", "before_1_w320.jpg")
+
+    def test_make_thumbnail(self, temp_dir):
+        """縮小と既存のサムネイルの再利用のテスト"""
+        output_dir = str(temp_dir)
+        source = self._create_screenshot(output_dir, "before_1.png")
+        target = thumbnail_path(source, output_dir, 320)
+
+        assert make_thumbnail(source, target, 320) == (320, 240)
+        with PILImage.open(target) as image:
+            assert image.format == "JPEG"
+
+        # 元の画像より新しいサムネイルは再生成しない
+        mtime = os.path.getmtime(target)
+        assert make_thumbnail(source, target, 320) == (320, 240)
+        assert os.path.getmtime(target) == mtime
+
+    def test_small_image_is_not_enlarged(self, temp_dir):
+        """指定した幅より小さい画像は拡大しないテスト"""
+        output_dir = str(temp_dir)
+        source = self._create_screenshot(output_dir, "after_1.png", (200, 100))
+        assert make_thumbnail(source, thumbnail_path(source, output_dir, 320), 320) == (200, 100)
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_generate(self, temp_dir, workers):
+        """複数の画像のサムネイルを生成し、失敗した画像を除外するテスト"""
+        output_dir = str(temp_dir)
+        paths = [self._create_screenshot(output_dir, f"before_{i}.png") for i in range(3)]
+        broken = os.path.join(output_dir, "screenshot", "session_1", "broken.png")
+        with open(broken, "w") as f:
+            f.write("not an image")
+
+        with ThumbnailPool(output_dir, 160, workers) as pool:
+            thumbnails = pool.generate(paths + [broken, paths[0], None])
+
+        assert sorted(thumbnails) == sorted(paths)
+        assert thumbnails[paths[0]]["width"] == 160
+        assert thumbnails[paths[0]]["height"] == 120
+        assert all(os.path.exists(thumbnail["path"]) for thumbnail in thumbnails.values())
@@ -0,0 +1,73 @@
+"""
+実行中の時系列の収集のテスト
+"""
+import pytest
+from src.utils.timeline import (
+    TimelineCollector, HISTOGRAM_BINS, histogram_bin, histogram_percentile, histogram_upper_bound
+)
+
+class TestTimelineCollector:
+    """TimelineCollectorクラスのテスト"""
+
+    def test_histogram_bin(self):
+        """ヒストグラムのビンの上限値が所要時間以上になるテスト"""
+        for value in (0.0005, 0.001, 0.0123, 0.5, 1.0, 7.3, 120.0):
+            index = histogram_bin(value)
+            assert histogram_upper_bound(index) >= value
+            assert index == 0 or histogram_upper_bound(index - 1) < value
+        assert histogram_bin(1e9) == HISTOGRAM_BINS
+
+    def test_histogram_percentile(self):
+        """ヒストグラムからのパーセンタイルの推定テスト"""
+        histogram = [0] * (HISTOGRAM_BINS + 1)
+        for value in [0.1] * 90 + [2.0] * 10:
+            histogram[histogram_bin(value)] += 1
+        assert histogram_percentile(histogram, 50) == pytest.approx(0.1, rel=0.19)
+        assert histogram_percentile(histogram, 95) == pytest.approx(2.0, rel=0.19)
+        assert histogram_percentile([0] * 4, 50) is None
+
+    def test_buckets(self, mocker):
+        """区間ごとの同時実行数、完了アクション数、エラー数のテスト"""
+        clock = mocker.patch('src.utils.timeline.time.monotonic', return_value=100.0)
+        timeline = TimelineCollector(interval=1.0)
+        timeline.start()
+        timeline.session_started()
+        timeline.session_started()
+        timeline.record_action(0.2, True)
+        clock.return_value = 101.5
+        timeline.record_action(0.4, False)
+        timeline.session_ended()
+        clock.return_value = 103.2
+        timeline.record_action(0.3, True)
+
+        data = timeline.to_dict()
+        assert data['interval'] == 1.0
+        buckets = data['buckets']
+        assert [bucket['time'] for bucket in buckets] == [0.0, 1.0, 2.0, 3.0]
+        assert [bucket['active'] for bucket in buckets] == [2, 2, 1, 1]
+        assert [bucket['actions'] for bucket in buckets] == [1, 1, 0, 1]
+        assert [bucket['errors'] for bucket in buckets] == [0, 1, 0, 0]
+        assert buckets[1]['p95'] == pytest.approx(0.4, rel=0.19)
+        assert buckets[2]['p50'] is None
+
+    def test_compaction(self, mocker):
+        """区間数が上限を超えた場合に間隔を2倍にして統合するテスト"""
+        clock = mocker.patch('src.utils.timeline.time.monotonic', return_value=0.0)
+        timeline = TimelineCollector(interval=1.0, max_buckets=4)
+        timeline.start()
+        for second in range(10):
+            clock.return_value = second + 0.5
+            timeline.record_action(0.1, second != 3)
+
+        data = timeline.to_dict()
+        assert data['interval'] == 4.0
+        assert [bucket['time'] for bucket in data['buckets']] == [0.0, 4.0, 8.0]
+        assert [bucket['actions'] for bucket in data['buckets']] == [4, 4, 2]
+        assert [bucket['errors'] for bucket in data['buckets']] == [1, 0, 0]
+
+    def test_from_config(self):
+        """設定による有効・無効の切り替えテスト"""
+        assert TimelineCollector.from_config({'timeline_interval': 0}) is None
+        timeline = TimelineCollector.from_config({'timeline_interval': 5, 'timeline_max_buckets': 100})
+        assert timeline.interval == 5.0
+        assert timeline.max_buckets == 100
@@ -0,0 +1,101 @@
+"""
+実行全体のトレースの記録のテスト
+"""
+import json
+import os
+import threading
+import time
+
+from src.utils.browser_reaper import BrowserReaper
+from src.utils.trace_recorder import SESSION_PID, WORKER_PID, TraceRecorder
+
+
+def _load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class TestTraceRecorder:
+    """トレースの記録のテスト"""
+
+    def test_from_config(self, temp_dir):
+        """設定ファイルからの作成のテスト"""
+        assert TraceRecorder.from_config({}, str(temp_dir)) is None
+        recorder = TraceRecorder.from_config({'trace': True, 'trace_buffer_events': 10}, str(temp_dir))
+        assert recorder.path == os.path.join(str(temp_dir), 'result', 'trace.json')
+        assert recorder.buffer_events == 10
+
+    def test_events(self, temp_dir):
+        """ワーカー・セッションのトラックと処理の記録のテスト"""
+        path = os.path.join(str(temp_dir), 'trace.json')
+        recorder = TraceRecorder(path, buffer_events=3)
+        start = time.perf_counter()
+        track = recorder.session_track(1, 'user1')
+        recorder.complete('操作 1', start, start + 0.25, track, 'action', {'success': True})
+        with recorder.span('Excelレポートの生成', category='report') as args:
+            args['sheets'] = 3
+
+        def worker():
+            with recorder.span('セッション2', category='session'):
+                recorder.instant('中断', recorder.session_track(2))
+
+        thread = threading.Thread(target=worker, name='worker-1')
+        thread.start()
+        thread.join()
+        assert recorder.close() == path
+        # 閉じた後のイベントは記録しない
+        recorder.complete('遅れたイベント', start, start)
+        assert recorder.close() == path
+
+        events = _load(path)
+        names = {(event['pid'], event['tid']): event['args']['name'] for event in events
+                 if event['ph'] == 'M' and event['name'] == 'thread_name'}
+        assert names[(SESSION_PID, 1)] == 'セッション1 (user1)'
+        assert names[(SESSION_PID, 2)] == 'セッション2'
+        assert 'worker-1' in names.values()
+
+        spans = {event['name']: event for event in events if event['ph'] in ('X', 'i')}
+        assert set(spans) == {'操作 1', 'Excelレポートの生成', 'セッション2', '中断'}
+        action = spans['操作 1']
+        assert (action['pid'], action['tid'], action['cat']) == (SESSION_PID, 1, 'action')
+        assert action['dur'] == 250000.0
+        assert action['args'] == {'success': True}
+        report = spans['Excelレポートの生成']
+        assert report['pid'] == WORKER_PID and report['args'] == {'sheets': 3}
+        assert spans['セッション2']['tid'] != report['tid']
+        assert recorder.events == 4
+
+    def test_interrupted_file(self, temp_dir):
+        """閉じる前のファイルも終端を補えば読み込めるテスト"""
+        path = os.path.join(str(temp_dir), 'trace.json')
+        recorder = TraceRecorder(path, buffer_events=3)
+        start = time.perf_counter()
+        for i in range(5):
+            recorder.complete(f'操作 {i}', start, start + i)
+        with open(path, 'r', encoding='utf-8') as f:
+            events = json.loads(f.read() + ']')
+        # バッファに残った最後のイベントはまだ書き出されていない
+        assert [event['name'] for event in events if event['ph'] == 'X'] == ['操作 0', '操作 1', '操作 2', '操作 3']
+        recorder.close()
+        assert len([event for event in _load(path) if event['ph'] == 'X']) == 5
+
+    def test_empty(self, temp_dir):
+        """メタデータのみの場合も書き出すテスト"""
+        path = os.path.join(str(temp_dir), 'trace.json')
+        assert TraceRecorder(path).close() == path
+        assert all(event['ph'] == 'M' for event in _load(path))
+
+    def test_reaper(self, temp_dir, mocker):
+        """ブラウザの終了処理をセッションのトラックに記録するテスト"""
+        path = os.path.join(str(temp_dir), 'trace.json')
+        recorder = TraceRecorder(path)
+        reaper = BrowserReaper(quit_timeout=1.0, workers=1, tracer=recorder)
+        session = mocker.MagicMock()
+        session.session_id = 7
+        session.detach_driver.return_value = mocker.MagicMock()
+        mocker.patch('src.utils.browser_reaper.get_driver_pids', return_value=[])
+        reaper.submit(session)
+        reaper.shutdown()
+        recorder.close()
+        teardown = [event for event in _load(path) if event['name'] == 'ブラウザの終了']
+        assert [(event['pid'], event['tid']) for event in teardown] == [(SESSION_PID, 7)]
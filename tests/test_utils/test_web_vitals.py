@@ -0,0 +1,209 @@
+"""
+Web Vitals の収集のテスト
+"""
+import json
+from unittest.mock import MagicMock, patch
+
+import openpyxl
+import pytest
+
+from src.browser_session import BrowserSession
+from src.concurrent_tester import ConcurrentTester
+from src.utils.excel_report import WEB_VITALS_COLUMNS, _web_vitals_values
+from src.utils.report_builder import build_results_summary
+from src.utils.web_vitals import (CLS_BINS, WEB_VITALS_SCRIPT, WebVitalsStats, cls_bin, drain_web_vitals,
+                                  install_web_vitals, summarize_web_vitals)
+
+
+def _entry(**overrides):
+    """DRAIN_SCRIPT の戻り値（ミリ秒）"""
+    entry = {"url": "https://example.com/orders?page=2", "lcp": 1800.0, "cls": 0.05, "inp": 120.0,
+             "long_tasks": 2, "long_task_time": 180.0, "long_task_max": 120.0}
+    entry.update(overrides)
+    return entry
+
+
+class TestWebVitalsCollector:
+    """収集スクリプトの追加と取り出しのテスト"""
+
+    def test_install(self):
+        """CDPで収集スクリプトを追加する"""
+        driver = MagicMock()
+
+        assert install_web_vitals(driver)
+        driver.execute_cdp_cmd.assert_called_once_with('Page.addScriptToEvaluateOnNewDocument',
+                                                       {"source": WEB_VITALS_SCRIPT})
+
+    def test_install_without_cdp(self):
+        """CDPに対応していないブラウザでは追加しない"""
+        driver = MagicMock(spec=["execute_script"])
+
+        assert not install_web_vitals(driver)
+
+    def test_drain(self):
+        """ミリ秒を秒に変換する"""
+        driver = MagicMock()
+        driver.execute_script.return_value = _entry(inp=None)
+
+        vitals = drain_web_vitals(driver)
+
+        assert vitals["lcp"] == pytest.approx(1.8)
+        assert vitals["cls"] == pytest.approx(0.05)
+        assert vitals["inp"] is None
+        assert vitals["long_tasks"] == 2
+        assert vitals["long_task_time"] == pytest.approx(0.18)
+
+    def test_drain_without_collector(self):
+        """収集スクリプトのないページでは None"""
+        driver = MagicMock()
+        driver.execute_script.return_value = None
+
+        assert drain_web_vitals(driver) is None
+
+
+class TestWebVitalsStats:
+    """操作IDごとの集計のテスト"""
+
+    def test_summary(self):
+        """パーセンタイル、良好率、ロングタスク、所要時間"""
+        driver = MagicMock()
+        stats = WebVitalsStats()
+        for lcp, duration in ((1000.0, 0.5), (2000.0, 0.6), (4000.0, 0.7)):
+            driver.execute_script.return_value = _entry(lcp=lcp)
+            stats.add("1", drain_web_vitals(driver), duration)
+        driver.execute_script.return_value = _entry(lcp=None, inp=None, cls=0.3, long_tasks=0, long_task_time=0,
+                                                    long_task_max=0)
+        stats.add("2", drain_web_vitals(driver))
+
+        first, second = stats.summary()
+
+        assert first["action_id"] == "1"
+        assert first["page"] == "https://example.com/orders"
+        assert first["samples"] == 3
+        assert first["latency"]["p50"] >= 0.6
+        assert first["lcp"]["count"] == 3
+        assert first["lcp"]["good"] == pytest.approx(2 / 3, abs=1e-4)
+        assert first["lcp"]["p95"] >= 4.0
+        assert first["long_tasks"] == 6
+        assert first["long_task_max"] == pytest.approx(0.12)
+        assert second["lcp"] is None
+        assert second["inp"] is None
+        assert second["cls"]["good"] == 0.0
+        assert second["latency"]["p50"] is None
+
+    def test_cls_bins(self):
+        """CLS は 0 から一定の幅のビンで集計する"""
+        assert cls_bin(0.0) == 0
+        assert cls_bin(0.1) == cls_bin(0.096)
+        assert cls_bin(0.1) < cls_bin(0.1001)
+        assert cls_bin(5.0) == CLS_BINS
+
+    def test_cls_percentiles(self):
+        """CLS が 0 の場合は 0、パーセンタイルとしきい値が一致する"""
+        stats = WebVitalsStats()
+        for cls in (0.0, 0.0):
+            stats.add("1", {"cls": cls})
+        for cls in (0.05, 0.08, 0.12, 0.3):
+            stats.add("2", {"cls": cls})
+        for cls in (0.1, 0.1, 0.1, 2.5):
+            stats.add("3", {"cls": cls})
+
+        zero, mixed, threshold = (row["cls"] for row in stats.summary())
+
+        assert zero["p75"] == 0.0
+        assert zero["p95"] == 0.0
+        assert mixed["p75"] == pytest.approx(0.12)
+        assert mixed["good"] == 0.5
+        assert threshold["p75"] == pytest.approx(0.1)
+        assert threshold["good"] == 0.75
+        assert threshold["p95"] == 2.5
+
+    def test_summarize_sessions(self):
+        """保存済みのセッションの結果から集計する"""
+        driver = MagicMock()
+        driver.execute_script.return_value = _entry()
+        vitals = drain_web_vitals(driver)
+        sessions = [{"session_id": i, "actions": [{"action_id": "1", "duration": 0.4, "web_vitals": vitals},
+                                                 {"action_id": "2", "duration": 0.1}]} for i in range(2)]
+
+        summary = summarize_web_vitals(sessions)
+
+        assert [row["action_id"] for row in summary] == ["1"]
+        assert summary[0]["samples"] == 2
+        assert build_results_summary({"sessions": sessions})["web_vitals"] == summary
+
+    def test_excel_values(self):
+        """Excelの行の値（値がない項目は "-"）"""
+        driver = MagicMock()
+        driver.execute_script.return_value = _entry(inp=None)
+        stats = WebVitalsStats()
+        stats.add("1", drain_web_vitals(driver), 0.5)
+
+        values = _web_vitals_values(stats.summary()[0])
+
+        assert len(values) == len(WEB_VITALS_COLUMNS)
+        assert values[0] == "1"
+        assert values[6] == "100.0%"
+        assert values[9:11] == ["-", "-"]
+
+
+class TestBrowserSessionWebVitals:
+    """アクションごとの取り出しのテスト"""
+
+    def _session(self, tmp_path, test_user, monkeypatch, enabled=True):
+        monkeypatch.setattr("src.browser_session.ActionHandler.handle_action", lambda self, action: (True, None))
+        config = {"url": "https://example.com", "screenshot_timing": [], "web_vitals": enabled}
+        session = BrowserSession(test_user, config, 1, str(tmp_path))
+        session.driver = MagicMock()
+        session._web_vitals_installed = enabled
+        return session
+
+    def test_drains_once_per_action(self, tmp_path, test_user, monkeypatch):
+        """すべての操作タイプでアクションごとに1回取り出す"""
+        session = self._session(tmp_path, test_user, monkeypatch)
+        session.driver.execute_script.return_value = _entry()
+
+        session.perform_action({"操作ID": "1", "操作タイプ": "テキスト入力", "対象要素": "#name"})
+
+        assert session.driver.execute_script.call_count == 1
+        assert session.last_action_timing["web_vitals"]["inp"] == pytest.approx(0.12)
+
+    def test_not_installed(self, tmp_path, test_user, monkeypatch):
+        """収集スクリプトを追加していない場合は取り出さない"""
+        session = self._session(tmp_path, test_user, monkeypatch, enabled=False)
+
+        session.perform_action({"操作ID": "1", "操作タイプ": "URL移動", "対象要素": "/"})
+
+        session.driver.execute_script.assert_not_called()
+        assert "web_vitals" not in session.last_action_timing
+
+
+class TestConcurrentTesterWebVitals:
+    """実行全体の集計のテスト"""
+
+    def test_results_and_report(self, mock_config_loader, tmp_path):
+        """操作IDごとの集計がテスト結果とExcelレポートに出力される"""
+        mock_config_loader.config.update({'web_vitals': True, 'run_history': False, 'async_teardown': False})
+        driver = MagicMock()
+        driver.execute_script.return_value = _entry()
+        vitals = drain_web_vitals(driver)
+        with patch('src.concurrent_tester.ScenarioLoader') as scenario_loader_class, \
+             patch('src.concurrent_tester.BrowserSession') as browser_session_class, \
+             patch('src.concurrent_tester.create_output_directory', return_value=str(tmp_path)):
+            scenario_loader_class.return_value.get_actions.return_value = [
+                {'操作ID': '1', '操作タイプ': 'URL移動', '対象要素': '/'}
+            ]
+            session = browser_session_class.return_value
+            session.initialize.return_value = True
+            session.capture_enabled = False
+            session.perform_action.return_value = (True, None)
+            session.last_action_timing = {"duration": 0.3, "web_vitals": vitals}
+
+            results = ConcurrentTester(mock_config_loader).run()
+
+        sessions = len(mock_config_loader.load_user_config.return_value)
+        assert [row["action_id"] for row in results["web_vitals"]] == ["1"]
+        assert results["web_vitals"][0]["samples"] == sessions
+        with open(tmp_path / "result" / "test_results.json", encoding="utf-8") as f:
+            assert json.load(f)["web_vitals"] == results["web_vitals"]
+        assert "Web Vitals" in openpyxl.load_workbook(results["excel_report"]).sheetnames